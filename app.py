@@ -48,7 +48,9 @@ import urllib.parse
 
 import knowledge_base
 import ml_utils
+import result_cache
 import styles
+import topic_model
 import constants
 import gdpr_compliance
 import ui_components
@@ -383,7 +385,9 @@ def render_debug_page():
             |-----------|-------|-----|
             | Iterations | 50 | 5x standard for better convergence |
             | Mode | Batch | More accurate than online |
-            | N-grams | 1-2 | Captures phrases like "data analysis" |
+            | Topics | 12 | Pretrained once on reference JDs (knowledge-base roles) |
+            
+            **Per request:** transform only - the JD's topic mixture and the words each topic explains
             
             **Multilingual:** Filters stop words in EN, IT, ES, FR, DE
             
@@ -399,9 +403,12 @@ def render_debug_page():
             
             **Process:**
             1. Convert skills to vectors using character patterns
-            2. K-Means finds natural groupings (2-5 clusters)
+            2. K-Means finds natural groupings (5 clusters)
             3. PCA reduces to 2D for visualization
             
+            **Precomputed map:** vectors, clusters and 2D layout are fitted once on every
+            knowledge-base skill; new skills are projected into the same map.
+            
             **Why character n-grams?** "Python" and "PyTorch" share patterns, 
             making them cluster together in "Data Science" tools.
             
@@ -500,6 +507,11 @@ def render_debug_page():
             if st.button("Clear All Cache", use_container_width=True):
                 st.cache_data.clear()
                 st.cache_resource.clear()
+                ml_utils.train_rf_model.cache_clear()
+                ml_utils.pdf_text.PDF_TEXT_CACHE.clear()
+                result_cache.RESULT_CACHE.clear()
+                ml_utils.CLUSTERING_CACHE.clear()
+                ml_utils.WORDCLOUD_CACHE.clear()
                 st.success("Cache cleared!")
         with act2:
             if st.button("Clear Analysis", use_container_width=True):
@@ -720,7 +732,7 @@ def render_debug_page():
             all_skills = list(res["matching_hard"] | res["missing_hard"] | res["extra_hard"])
             
             # Run clustering
-            df_viz, dendro_path, clusters = ml_utils.perform_skill_clustering(all_skills)
+            df_viz, dendro_png, clusters = ml_utils.perform_skill_clustering(all_skills)
             
             if df_viz is not None:
                 # Scatter plot with skill status
@@ -788,10 +800,10 @@ def render_debug_page():
                                     st.caption("Strong coverage in this skill area")
                 
                 # Dendrogram with explanation
-                if dendro_path:
+                if dendro_png:
                     with st.expander("Hierarchical Clustering (Dendrogram)"):
                         st.caption("Tree structure showing how skills relate. Agglomerative (Bottom-Up) approach.")
-                        st.image(dendro_path, caption="Ward's Linkage Method")
+                        st.image(dendro_png, caption="Ward's Linkage Method")
         else:
             st.info("Run an analysis first to see skill clustering.")
     
@@ -838,8 +850,8 @@ def render_debug_page():
             # =============================================
             st.markdown("### Skill Extraction Analysis")
             
-            cv_hard, cv_soft = ml_utils.extract_skills_from_text(cv_text)
-            jd_hard, jd_soft = ml_utils.extract_skills_from_text(jd_text, is_jd=True)
+            cv_hard, cv_soft = ml_utils.parse_document(cv_text).skills()
+            jd_hard, jd_soft = ml_utils.parse_document(jd_text, is_jd=True).skills()
             
             sk1, sk2 = st.columns(2)
             
@@ -927,7 +939,8 @@ def render_debug_page():
                 jd_corpus = [line for line in jd_text.split('\n') if len(line.split()) > 3]
                 
                 if len(jd_corpus) > 5:
-                    result = ml_utils.perform_topic_modeling(jd_corpus)
+                    result = result_cache.memoized_call(ml_utils.perform_topic_modeling, jd_corpus,
+                                                        tables=topic_model.TOPIC_MODEL_TABLES)
                     
                     if result:
                         for idx, topic in enumerate(result['topics'], 1):
@@ -946,6 +959,16 @@ def render_debug_page():
                     st.caption("JD too short for analysis")
         else:
             st.info("Run an analysis first to see NLP insights.")
+        st.caption(f"Analysis results (shared across sessions): {result_cache.RESULT_CACHE.stats()}")
+        st.caption(f"Skill clustering (per skill list): {ml_utils.CLUSTERING_CACHE.stats()}")
+        st.caption(f"Topic word clouds (per JD): {ml_utils.WORDCLOUD_CACHE.stats()}")
+        
+        # PDF extraction timings (latest uploads, per page)
+        extractions = ml_utils.pdf_text.recent_extractions()
+        if extractions:
+            st.markdown("### PDF Extraction")
+            st.caption(f"Text cache (SHA-256 of file bytes): {ml_utils.pdf_text.PDF_TEXT_CACHE.stats()}")
+            st.dataframe(pd.DataFrame(extractions[::-1]), use_container_width=True, hide_index=True)
     
     # =========================================================================
     # TAB 5: KNOWLEDGE BASE
@@ -1128,11 +1151,12 @@ def render_debug_page():
             if has_cv:
                 st.divider()
                 st.markdown("### Detected Interest Signal")
-                cv_level, score = ml_utils.detect_seniority(cv_text_session)
+                cv_doc = ml_utils.parse_document(cv_text_session)
+                cv_level, score = cv_doc.seniority
                 st.write(f"Detected Seniority: **{cv_level}** (Confidence: {score:.2f})")
                 
                 # Show extracted skills used for discovery
-                cv_hard, cv_soft = ml_utils.extract_skills_from_text(cv_text_session)
+                cv_hard, cv_soft = cv_doc.skills()
                 all_found = cv_hard | cv_soft
                 st.markdown(f"**Skills used for matching:** ({len(all_found)} detected)")
                 st.write(", ".join(sorted(all_found)))
@@ -1256,7 +1280,8 @@ def render_cv_builder():
             if jd_text:
                 st.divider()
                 # 1. Extract JD Requirements
-                jd_hard, jd_soft = ml_utils.extract_skills_from_text(jd_text, is_jd=True)
+                jd_doc = ml_utils.parse_document(jd_text, is_jd=True)
+                jd_hard, jd_soft = jd_doc.skills()
                 jd_reqs = jd_hard | jd_soft
                 
                 # 2. Extract CV Skills (from all current fields)
@@ -1291,8 +1316,9 @@ def render_cv_builder():
                         
                 full_cv_text = " ".join(parts)
                 
+                cv_doc = ml_utils.parse_document(full_cv_text)
                 if full_cv_text:
-                    th, ts = ml_utils.extract_skills_from_text(full_cv_text)
+                    th, ts = cv_doc.skills()
                     user_skills.update(th)
                     user_skills.update(ts)
                 
@@ -1300,7 +1326,7 @@ def render_cv_builder():
                 # 3. Calculate Score using Centralized Logic (Inference Aware)
                 if jd_text:
                     # Use analyze_gap to get full power of inference rules (A -> B)
-                    gap_analysis = ml_utils.analyze_gap(full_cv_text, jd_text)
+                    gap_analysis = ml_utils.analyze_gap(cv_doc, jd_doc)
                     
                     score = int(gap_analysis["match_percentage"])
                     missing = gap_analysis["missing_hard"]
@@ -1333,7 +1359,7 @@ def render_cv_builder():
         
         # Smart Suggestions Logic
         if jd_text:
-            jd_hard, _ = ml_utils.extract_skills_from_text(jd_text, is_jd=True)
+            jd_hard, _ = ml_utils.parse_document(jd_text, is_jd=True).skills()
             user_skills = set(cv_data.get("competencies", []))
             missing = jd_hard - user_skills
             
@@ -1755,6 +1781,14 @@ def render_landing_page():
 
 
 
+def _read_pdf_upload(uploaded_file) -> str:
+    """Text of an uploaded PDF; warns when only the first pages were read."""
+    doc = ml_utils.extract_pdf_document(uploaded_file)
+    if doc.truncated:
+        st.warning(f"Only the first {doc.pages} of {doc.total_pages} pages of {uploaded_file.name} were read.")
+    return doc.text
+
+
 # =============================================================================
 # CAREER DISCOVERY PAGE
 # =============================================================================
@@ -1803,7 +1837,7 @@ def render_career_discovery():
         cv_text = ""
         if cv_file:
             try:
-                cv_text = ml_utils.extract_text_from_pdf(cv_file)
+                cv_text = _read_pdf_upload(cv_file)
                 st.success(f"CV loaded: {len(cv_text.split())} words")
             except Exception as e:
                 st.error(f"Error: {e}")
@@ -2085,7 +2119,7 @@ def render_evaluation_page():
         else:
             uploaded_jd = st.file_uploader("Upload PDF", type=["pdf"], key="jd_pdf", label_visibility="collapsed")
             if uploaded_jd:
-                try: jd = ml_utils.extract_text_from_pdf(uploaded_jd)
+                try: jd = _read_pdf_upload(uploaded_jd)
                 except Exception as e: st.error(f"PDF Error: {e}")
     
     # Column 2: CV (always second)
@@ -2098,7 +2132,7 @@ def render_evaluation_page():
         else:
             uploaded_cv = st.file_uploader("Upload PDF", type=["pdf"], key="cv_pdf", label_visibility="collapsed")
             if uploaded_cv:
-                try: cv = ml_utils.extract_text_from_pdf(uploaded_cv)
+                try: cv = _read_pdf_upload(uploaded_cv)
                 except Exception as e: st.error(f"PDF Error: {e}")
     
     # Column 3: Project Context (if enabled)
@@ -2114,7 +2148,7 @@ def render_evaluation_page():
                 else:
                     uploaded_proj = st.file_uploader("Upload PDF", type=["pdf"], key="proj_pdf", label_visibility="collapsed")
                     if uploaded_proj:
-                        try: project_text = ml_utils.extract_text_from_pdf(uploaded_proj)
+                        try: project_text = _read_pdf_upload(uploaded_proj)
                         except Exception as e: st.error(f"PDF Error: {e}")
     
     # Column 4: Cover Letter (if enabled)
@@ -2130,7 +2164,7 @@ def render_evaluation_page():
                 else:
                     uploaded_cl = st.file_uploader("Upload PDF", type=["pdf"], key="cl_pdf", label_visibility="collapsed")
                     if uploaded_cl:
-                        try: cover_letter_text = ml_utils.extract_text_from_pdf(uploaded_cl)
+                        try: cover_letter_text = _read_pdf_upload(uploaded_cl)
                         except Exception as e: st.error(f"PDF Error: {e}")
     
     st.markdown('</div>', unsafe_allow_html=True)
@@ -2165,21 +2199,23 @@ def render_evaluation_page():
         # Progress bar with stages
         progress_bar = st.progress(0, text="Initializing analysis...")
         
-        # Stage 1: Skill Extraction
+        # Stage 1: Skill Extraction (once per document, shared by every analysis below)
         progress_bar.progress(20, text="Extracting skills from documents...")
+        cv_doc = ml_utils.parse_document(cv)
+        jd_doc = ml_utils.parse_document(jd, is_jd=True)
         
         # CV vs JD Analysis (with or without projects)
         if show_project_eval and project_text:
             progress_bar.progress(40, text="Analyzing project portfolio...")
-            res = ml_utils.analyze_gap_with_project(cv, jd, project_text)
+            res = ml_utils.analyze_gap_with_project(cv_doc, jd_doc, project_text)
         else:
-            res = ml_utils.analyze_gap(cv, jd)
+            res = ml_utils.analyze_gap(cv_doc, jd_doc)
         
         # Stage 2: Analisi Cover Letter (se abilitata)
         cl_analysis = None
         if show_cover_letter and cover_letter_text:
             progress_bar.progress(60, text="Evaluating cover letter...")
-            cl_analysis = ml_utils.analyze_cover_letter(cover_letter_text, jd, cv)
+            cl_analysis = ml_utils.analyze_cover_letter(cover_letter_text, jd_doc, cv_doc)
         
         # Stage 3: Generazione insights
         progress_bar.progress(80, text="Generating career insights...")
@@ -2354,7 +2390,9 @@ def render_results(res, jd_text=None, cv_text=None, cl_analysis=None):
         st.subheader("Job Context Analysis")
         jd_corpus = [line for line in jd_text.split('\n') if len(line.split()) > 3]
         if len(jd_corpus) > 5:
-            result = ml_utils.perform_topic_modeling(jd_corpus)
+            # Memoized: reruns (e.g. the Compass filter below) reuse the topics
+            result = result_cache.memoized_call(ml_utils.perform_topic_modeling, jd_corpus,
+                                                tables=topic_model.TOPIC_MODEL_TABLES)
             if result:
                 # Use a cleaner card layout
                 with st.container():
@@ -2384,7 +2422,8 @@ def render_results(res, jd_text=None, cv_text=None, cl_analysis=None):
     st.caption("Alternative roles based on your profile and education")
     
     # Call Unified Discovery Engine
-    recs = ml_utils.discover_careers(cv_text=cv_text if cv_text else "")
+    recs = result_cache.memoized_call(ml_utils.discover_careers, cv_text=cv_text if cv_text else "",
+                                      tables=ml_utils.DISCOVERY_TABLES)
     
     # Optional Filter
     match_range = st.radio(
@@ -2524,9 +2563,14 @@ def render_results(res, jd_text=None, cv_text=None, cl_analysis=None):
 # RUBEN AI ASSISTANT - Sidebar Integration
 # =============================================================================
 
+@st.fragment
 def render_chatbot():
     """
     Renders Ruben AI Assistant at the bottom of the sidebar.
+
+    Runs as a fragment: sending a message reruns only the chat panel, not
+    the page behind it (results, charts, discovery cards). The page itself
+    is still rerun on navigation, which also resets the history below.
     """
     # 1. Initialize State
     if "chat_history" not in st.session_state:
@@ -2545,8 +2589,8 @@ def render_chatbot():
         st.session_state["last_chat_page"] = current_page
 
     # Define Callback to process chat. Streamlit automatically reruns the
-    # script after on_change callbacks, so calling st.rerun() here is a no-op
-    # and emits a warning -- intentionally omitted.
+    # fragment after on_change callbacks, so calling st.rerun() here is a
+    # no-op and emits a warning -- intentionally omitted.
     def process_chat():
         user_msg = st.session_state.get("chat_input_widget", "")
         if user_msg:
@@ -2680,101 +2724,114 @@ def render_interview_prep():
     
     else:
         # Practice Mode - Full width question display
-        q_idx = st.session_state.get("current_q_index", 0)
-        current_q = questions[q_idx]
-        
-        # Progress Bar with step indicators
-        progress = (q_idx + 1) / len(questions)
-        st.markdown(f"""
-        <div style="margin-bottom: 1.5rem;">
-            <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
-                <span style="font-weight: 600;">Question {q_idx + 1} of {len(questions)}</span>
-                <span style="color: var(--text-secondary);">{int(progress * 100)}% Complete</span>
-            </div>
-            <div style="background: var(--bg-elevated); border-radius: 10px; height: 6px; width: 100%;">
-                <div style="background: linear-gradient(90deg, var(--primary-blue), var(--accent-green)); 
-                            width: {progress * 100}%; height: 6px; border-radius: 10px; transition: width 0.3s ease;"></div>
-            </div>
+        render_interview_question(questions)
+
+
+def _go_to_question(index):
+    # Button callback: the index changes before the fragment reruns
+    st.session_state["current_q_index"] = index
+
+
+@st.fragment
+def render_interview_question(questions):
+    """
+    Question card, answer box and navigation of a practice session.
+
+    Runs as a fragment: evaluating an answer or moving between questions
+    reruns only this block. Leaving the session (New Session / Finish)
+    reruns the whole page to show the setup view again.
+    """
+    q_idx = st.session_state.get("current_q_index", 0)
+    current_q = questions[q_idx]
+    
+    # Progress Bar with step indicators
+    progress = (q_idx + 1) / len(questions)
+    st.markdown(f"""
+    <div style="margin-bottom: 1.5rem;">
+        <div style="display: flex; justify-content: space-between; margin-bottom: 0.5rem;">
+            <span style="font-weight: 600;">Question {q_idx + 1} of {len(questions)}</span>
+            <span style="color: var(--text-secondary);">{int(progress * 100)}% Complete</span>
         </div>
-        """, unsafe_allow_html=True)
-        
-        # Question Card
-        category = current_q.get('category', 'general').replace('_', ' ').title()
-        st.markdown(f"""
-        <div class="glass-card" style="border-left: 4px solid var(--primary-blue); margin-bottom: 1rem;">
-            <div style="display: flex; justify-content: space-between; align-items: flex-start;">
-                <h3 style="margin: 0; line-height: 1.4;">{current_q.get('question', 'No question')}</h3>
-            </div>
-            <div style="margin-top: 1rem;">
-                <span class="skill-tag-project" style="font-size: 0.8rem;">{category}</span>
-            </div>
+        <div style="background: var(--bg-elevated); border-radius: 10px; height: 6px; width: 100%;">
+            <div style="background: linear-gradient(90deg, var(--primary-blue), var(--accent-green)); 
+                        width: {progress * 100}%; height: 6px; border-radius: 10px; transition: width 0.3s ease;"></div>
         </div>
-        """, unsafe_allow_html=True)
-        
-        # Answer Area
-        saved_answer = st.session_state.get("interview_answers", {}).get(q_idx, "")
-        answer = st.text_area(
-            "Your Answer",
-            value=saved_answer,
-            height=180,
-            placeholder="💡 Tip: Use the STAR method for behavioral questions (Situation, Task, Action, Result)"
-        )
-        
-        # Action Buttons
-        col1, col2, col3, col4 = st.columns([1, 1.5, 2.5, 1.2])
-        
-        with col1:
-            if q_idx > 0:
-                if st.button("← Back", use_container_width=True):
-                    st.session_state["current_q_index"] = q_idx - 1
-                    st.rerun()
-        
-        with col2:
-            if st.button("New Session", use_container_width=True):
-                st.session_state["interview_questions"] = []
-                st.session_state["current_q_index"] = 0
-                st.session_state["interview_answers"] = {}
-                st.rerun()
-        
-        with col3:
-            if st.button("Evaluate My Answer", type="primary", use_container_width=True):
-                if answer.strip():
-                    st.session_state["interview_answers"][q_idx] = answer
-                    result = ml_utils.evaluate_interview_answer(current_q, answer)
-                    
-                    # Score Colors
-                    if result['score'] >= 60:
-                        color, bg = "#00C853", "rgba(0, 200, 83, 0.1)"
-                    elif result['score'] >= 40:
-                        color, bg = "#FFB300", "rgba(255, 179, 0, 0.1)"
-                    else:
-                        color, bg = "#E53935", "rgba(229, 57, 53, 0.1)"
-                    
-                    st.markdown(f"""
-                    <div style="background: {bg}; border: 1px solid {color}; border-radius: 16px; 
-                                padding: 2rem; text-align: center; margin-top: 1rem;">
-                        <div style="font-size: 2.5rem; font-weight: 700; color: {color};">{result['score']}%</div>
-                        <div style="font-size: 1.2rem; font-weight: 600; color: {color}; margin: 0.5rem 0;">{result['rating']}</div>
-                        <p style="color: var(--text-secondary); margin-top: 1rem;">{result['feedback']}</p>
-                    </div>
-                    """, unsafe_allow_html=True)
-                    
-                    if result['tips']:
-                        st.markdown("#### Tips to Improve")
-                        for tip in result['tips']:
-                            st.info(f"- {tip}")
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Question Card
+    category = current_q.get('category', 'general').replace('_', ' ').title()
+    st.markdown(f"""
+    <div class="glass-card" style="border-left: 4px solid var(--primary-blue); margin-bottom: 1rem;">
+        <div style="display: flex; justify-content: space-between; align-items: flex-start;">
+            <h3 style="margin: 0; line-height: 1.4;">{current_q.get('question', 'No question')}</h3>
+        </div>
+        <div style="margin-top: 1rem;">
+            <span class="skill-tag-project" style="font-size: 0.8rem;">{category}</span>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    # Answer Area
+    saved_answer = st.session_state.get("interview_answers", {}).get(q_idx, "")
+    answer = st.text_area(
+        "Your Answer",
+        value=saved_answer,
+        height=180,
+        placeholder="💡 Tip: Use the STAR method for behavioral questions (Situation, Task, Action, Result)"
+    )
+    
+    # Action Buttons
+    col1, col2, col3, col4 = st.columns([1, 1.5, 2.5, 1.2])
+    
+    with col1:
+        if q_idx > 0:
+            st.button("← Back", use_container_width=True, on_click=_go_to_question, args=(q_idx - 1,))
+    
+    with col2:
+        if st.button("New Session", use_container_width=True):
+            st.session_state["interview_questions"] = []
+            st.session_state["current_q_index"] = 0
+            st.session_state["interview_answers"] = {}
+            st.rerun()
+    
+    with col3:
+        if st.button("Evaluate My Answer", type="primary", use_container_width=True):
+            if answer.strip():
+                st.session_state["interview_answers"][q_idx] = answer
+                result = ml_utils.evaluate_interview_answer(current_q, answer)
+                
+                # Score Colors
+                if result['score'] >= 60:
+                    color, bg = "#00C853", "rgba(0, 200, 83, 0.1)"
+                elif result['score'] >= 40:
+                    color, bg = "#FFB300", "rgba(255, 179, 0, 0.1)"
                 else:
-                    st.warning("Please write your answer before evaluating.")
-        
-        with col4:
-            if q_idx < len(questions) - 1:
-                if st.button("Next →", use_container_width=True):
-                    st.session_state["current_q_index"] = q_idx + 1
-                    st.rerun()
+                    color, bg = "#E53935", "rgba(229, 57, 53, 0.1)"
+                
+                st.markdown(f"""
+                <div style="background: {bg}; border: 1px solid {color}; border-radius: 16px; 
+                            padding: 2rem; text-align: center; margin-top: 1rem;">
+                    <div style="font-size: 2.5rem; font-weight: 700; color: {color};">{result['score']}%</div>
+                    <div style="font-size: 1.2rem; font-weight: 600; color: {color}; margin: 0.5rem 0;">{result['rating']}</div>
+                    <p style="color: var(--text-secondary); margin-top: 1rem;">{result['feedback']}</p>
+                </div>
+                """, unsafe_allow_html=True)
+                
+                if result['tips']:
+                    st.markdown("#### Tips to Improve")
+                    for tip in result['tips']:
+                        st.info(f"- {tip}")
             else:
-                if st.button("Finish", use_container_width=True):
-                    st.session_state["interview_questions"] = []
-                    st.rerun()
+                st.warning("Please write your answer before evaluating.")
+    
+    with col4:
+        if q_idx < len(questions) - 1:
+            st.button("Next →", use_container_width=True, on_click=_go_to_question, args=(q_idx + 1,))
+        else:
+            if st.button("Finish", use_container_width=True):
+                st.session_state["interview_questions"] = []
+                st.rerun()
 
 
 
@@ -0,0 +1,219 @@
+"""
+================================================================================
+CareerMatch AI - Offline Batch Screening (PDF CVs x JDs -> JSONL)
+================================================================================
+
+Bulk screening from the command line:
+
+    python batch_screen.py CV_DIR --jd role.txt [--jd other.txt] --out results.jsonl
+
+- Walks CV_DIR recursively for *.pdf files, lazily and in sorted order.
+- Extracts the text with ml_utils.extract_text_from_pdf.
+- Runs analyze_gap against every JD.
+- Writes one JSON line per (CV, JD) pair as soon as that CV completes.
+
+Each JD is parsed once in the parent and shipped to the workers in the
+pool initializer. Each CV is parsed once for all the JDs. At most
+`workers * WINDOW_PER_WORKER` CVs are in flight, so memory stays bounded
+whatever the directory size.
+
+Checkpoint/resume: after a CV's lines are flushed to the output, its path
+is appended to the checkpoint file (default: <out>.ckpt). A rerun skips
+the listed CVs and appends to the output. A CV interrupted between the two
+writes is processed again, so its lines may appear twice; they are
+identical.
+
+Output lines:
+    {"cv": "<path relative to CV_DIR>", "jd": "<jd name>", "result": {analyze_gap}}
+    {"cv": "<path>", "error": "<message>"}          # unreadable / empty PDF, failed analysis
+
+At the end, throughput (CVs/s) and p50/p95 per-CV latency (extraction plus
+all its JDs, measured in the worker) are printed to stderr.
+
+Public API:
+- iter_pdfs(root)                          -> relative PDF paths, sorted
+- run_batch(cv_dir, jd_paths, out, ...)    -> summary dict
+- CLI: python batch_screen.py CV_DIR --jd FILE --out FILE [--workers N]
+================================================================================
+"""
+
+from __future__ import annotations
+
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, as_completed, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from doc_cache import ParsedDocument
+from scoring_service import to_json
+
+# CVs submitted ahead per worker (bounds memory and checkpoint lag)
+WINDOW_PER_WORKER = 4
+
+
+# =============================================================================
+# INPUT
+# =============================================================================
+def iter_pdfs(root: str) -> Iterator[str]:
+    """PDF paths under root (relative, '/'-separated), walked lazily in sorted order."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            if name.lower().endswith(".pdf"):
+                rel = os.path.relpath(os.path.join(dirpath, name), root)
+                yield rel.replace(os.sep, "/")
+
+
+def load_jds(jd_paths: Sequence[str]) -> List[Tuple[str, ParsedDocument]]:
+    """(name, parsed JD) for each JD file; name is the file name without extension."""
+    import scoring_core
+
+    jds = []
+    for path in jd_paths:
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        name = os.path.splitext(os.path.basename(path))[0]
+        jds.append((name, scoring_core.parse_document(text, is_jd=True)))
+    return jds
+
+
+def read_checkpoint(path: str) -> Set[str]:
+    if not path or not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as f:
+        return {line.rstrip("\n") for line in f if line.strip()}
+
+
+# =============================================================================
+# WORKER
+# =============================================================================
+_JDS: List[Tuple[str, ParsedDocument]] = []
+
+
+def _init_worker(jds: List[Tuple[str, ParsedDocument]]) -> None:
+    global _JDS
+    _JDS = jds
+
+
+def screen_cv(cv_dir: str, rel_path: str, jds: List[Tuple[str, ParsedDocument]] = None) -> Tuple[str, List[str], float, bool]:
+    """(rel_path, JSON lines, seconds, failed) for one CV against every JD."""
+    import ml_utils
+    import scoring_core
+
+    start = time.perf_counter()
+    jds = _JDS if jds is None else jds
+    try:
+        text = ml_utils.extract_text_from_pdf(os.path.join(cv_dir, rel_path))
+        if not text.strip():
+            raise ValueError("no extractable text")
+        cv_doc = scoring_core.parse_document(text)
+        lines = [to_json({"cv": rel_path, "jd": name, "result": scoring_core.analyze_gap(cv_doc, jd_doc)})
+                 for name, jd_doc in jds]
+    except Exception as e:
+        # One bad CV must not abort the batch: report it and move on
+        return rel_path, [to_json({"cv": rel_path, "error": str(e)})], time.perf_counter() - start, True
+    return rel_path, lines, time.perf_counter() - start, False
+
+
+# =============================================================================
+# DRIVER
+# =============================================================================
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (q in 0-100); 0.0 for no values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def run_batch(cv_dir: str, jd_paths: Sequence[str], out_path: str, workers: int = None,
+              checkpoint: Optional[str] = None, limit: Optional[int] = None, progress=None) -> Dict:
+    """
+    Screen every PDF under cv_dir against the JD files and append JSONL to out_path.
+
+    workers <= 1 runs in-process. limit caps the number of new CVs (useful
+    for sampling or staged runs). progress(done) is called after each CV.
+    Returns {"cvs", "skipped", "errors", "lines", "seconds", "docs_per_s",
+    "p50_ms", "p95_ms"}.
+    """
+    workers = (os.cpu_count() or 1) if workers is None else workers
+    checkpoint = checkpoint or out_path + ".ckpt"
+    done_paths = read_checkpoint(checkpoint)
+    jds = load_jds(jd_paths)
+
+    todo = (p for p in iter_pdfs(cv_dir) if p not in done_paths)
+    if limit is not None:
+        todo = (p for _, p in zip(range(limit), todo))
+
+    latencies: List[float] = []
+    stats = {"cvs": 0, "skipped": len(done_paths), "errors": 0, "lines": 0}
+    start = time.perf_counter()
+
+    with open(out_path, "a", encoding="utf-8") as out, open(checkpoint, "a", encoding="utf-8") as ckpt:
+        def _record(rel_path: str, lines: List[str], seconds: float, failed: bool) -> None:
+            out.write("\n".join(lines) + "\n")
+            out.flush()
+            ckpt.write(rel_path + "\n")
+            ckpt.flush()
+            latencies.append(seconds)
+            stats["cvs"] += 1
+            stats["lines"] += len(lines)
+            stats["errors"] += failed
+            if progress:
+                progress(stats["cvs"])
+
+        if workers <= 1:
+            for rel_path in todo:
+                _record(*screen_cv(cv_dir, rel_path, jds))
+        else:
+            window = workers * WINDOW_PER_WORKER
+            with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                     initializer=_init_worker, initargs=(jds,)) as executor:
+                pending = set()
+                for rel_path in todo:
+                    pending.add(executor.submit(screen_cv, cv_dir, rel_path))
+                    if len(pending) >= window:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            _record(*future.result())
+                for future in as_completed(pending):
+                    _record(*future.result())
+
+    seconds = time.perf_counter() - start
+    stats.update({
+        "seconds": round(seconds, 3),
+        "docs_per_s": round(stats["cvs"] / seconds, 2) if seconds > 0 else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+    })
+    return stats
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Screen a directory of PDF CVs against one or more JDs (JSONL output).")
+    parser.add_argument("cv_dir", help="directory searched recursively for *.pdf")
+    parser.add_argument("--jd", action="append", required=True, help="JD text file (repeatable)")
+    parser.add_argument("--out", required=True, help="JSONL output (appended)")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: CPU count, 1 = in-process)")
+    parser.add_argument("--checkpoint", default=None, help="checkpoint file (default: <out>.ckpt)")
+    parser.add_argument("--limit", type=int, default=None, help="process at most N new CVs")
+    args = parser.parse_args(argv)
+
+    def _progress(done):
+        if done % 50 == 0:
+            print(f"  {done} CVs...", file=sys.stderr)
+
+    stats = run_batch(args.cv_dir, args.jd, args.out, workers=args.workers,
+                      checkpoint=args.checkpoint, limit=args.limit, progress=_progress)
+    print(f"{stats['cvs']} CVs ({stats['skipped']} already done, {stats['errors']} errors), "
+          f"{stats['lines']} lines in {stats['seconds']:.1f}s: {stats['docs_per_s']:.2f} docs/s, "
+          f"p50 {stats['p50_ms']:.0f} ms, p95 {stats['p95_ms']:.0f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
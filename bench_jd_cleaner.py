@@ -0,0 +1,159 @@
+"""
+================================================================================
+Benchmark: JD Cleaning (preprocess_jd_text, pathological inputs)
+================================================================================
+Confronta preprocess_jd_text (JDCleaner precompilato, jd_cleaner.py) con la
+versione precedente (un re.sub per header e per pattern), copiata qui come
+riferimento, su JD generate di dimensione crescente (1 KB -> --size):
+
+- jd:         testo normale senza header di sezione
+- sections:   JD con sezioni "What we offer:" / "Chi siamo" ogni poche righe
+- blank:      solo righe vuote (caso patologico della regex di sezione)
+- blank+ws:   righe vuote alternate a spazi
+
+La versione legacy viene saltata sulle dimensioni successive appena una
+chiamata supera --budget secondi (la crescita è quadratica). La colonna
+"same" indica se i due output coincidono (sulle JD con header differiscono
+per costruzione: la legacy rimuoveva solo parte delle sezioni).
+
+Usage:
+    python bench_jd_cleaner.py [--size BYTES] [--budget SECONDS] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import constants
+import scoring_core
+
+JD_PARAGRAPH = (
+    "We are looking for a Backend Developer to join our platform team.\n"
+    "- Build REST APIs in Python and Django, deployed on AWS with Docker.\n"
+    "- 3+ years of experience with PostgreSQL and Redis.\n"
+    "Strong communication skills and a degree in Computer Science.\n"
+)
+SECTION_BLOCK = (
+    "What we offer:\n"
+    "- Meal vouchers, health insurance and 25 days of vacation\n"
+    "- RAL 40.000 EUR, full-time, 40 hours/week\n"
+    "\n"
+    "Chi siamo\n"
+    "Siamo una scale-up fintech con 120 persone.\n"
+    "\n"
+)
+
+CASES = {
+    "jd": lambda size: (JD_PARAGRAPH * (size // len(JD_PARAGRAPH) + 1))[:size],
+    "sections": lambda size: ((JD_PARAGRAPH + SECTION_BLOCK) * (size // len(JD_PARAGRAPH + SECTION_BLOCK) + 1))[:size],
+    "blank": lambda size: "\n" * size,
+    "blank+ws": lambda size: ("\n \n" * (size // 3 + 1))[:size],
+}
+
+
+# =============================================================================
+# LEGACY REFERENCE (scoring_core before jd_cleaner)
+# =============================================================================
+def legacy_preprocess_jd_text(text: str) -> str:
+    non_skill_patterns = getattr(constants, "NON_SKILL_PATTERNS", {})
+
+    if not non_skill_patterns:
+        return text
+
+    cleaned = text
+
+    # Step 1: Remove entire sections by header
+    for pattern in non_skill_patterns.get("section_headers", []):
+        section_regex = rf'(?:^|\n)\s*{pattern}[:\s]*.*?(?=\n\s*[A-Z]|\n\n|\Z)'
+        cleaned = re.sub(section_regex, '\n', cleaned, flags=re.IGNORECASE | re.DOTALL | re.MULTILINE)
+
+    # Step 2: Remove individual non-skill patterns
+    categories_to_filter = [
+        "salary", "hours", "duration", "benefits", "contract",
+        "eligibility", "training", "agency", "freelance", "volunteering", "legal"
+    ]
+
+    for category in categories_to_filter:
+        for pattern in non_skill_patterns.get(category, []):
+            try:
+                cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE)
+            except re.error:
+                continue  # Skip invalid regex patterns
+
+    # Step 3: Clean up whitespace
+    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
+
+    return cleaned
+
+
+# =============================================================================
+# BENCHMARK
+# =============================================================================
+def _timed(fn, text):
+    start = time.perf_counter()
+    out = fn(text)
+    return out, (time.perf_counter() - start) * 1000
+
+
+def sizes_up_to(limit):
+    size = 1024
+    while size < limit:
+        yield size
+        size *= 2
+    yield limit
+
+
+def run(size=50_000, budget=5.0):
+    scoring_core.get_jd_cleaner()  # compile outside the timings
+    rows = []
+    for case, make in CASES.items():
+        legacy_alive = True
+        for n in sizes_up_to(size):
+            text = make(n)
+            new_out, new_ms = _timed(scoring_core.preprocess_jd_text, text)
+            row = {"case": case, "bytes": n, "new_ms": round(new_ms, 3), "legacy_ms": None, "same": None}
+            if legacy_alive:
+                legacy_out, legacy_ms = _timed(legacy_preprocess_jd_text, text)
+                row["legacy_ms"] = round(legacy_ms, 3)
+                row["same"] = legacy_out == new_out
+                legacy_alive = legacy_ms <= budget * 1000
+            rows.append(row)
+    return {"size": size, "budget_s": budget, "rows": rows}
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--size", type=int, default=50_000, help="largest generated JD in bytes")
+    parser.add_argument("--budget", type=float, default=5.0,
+                        help="stop timing the legacy version once a call exceeds this many seconds")
+    parser.add_argument("--json", default=None, help="write the full report to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = run(size=args.size, budget=args.budget)
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    print(f"\n  {'case':<10} {'bytes':>7}  {'legacy ms':>11}  {'new ms':>9}  same", file=out)
+    for row in report["rows"]:
+        legacy = f"{row['legacy_ms']:11.2f}" if row["legacy_ms"] is not None else f"{'skipped':>11}"
+        same = "-" if row["same"] is None else ("yes" if row["same"] else "no")
+        print(f"  {row['case']:<10} {row['bytes']:>7}  {legacy}  {row['new_ms']:9.2f}  {same}", file=out)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n  report written to {args.json}", file=out)
+
+
+if __name__ == "__main__":
+    main()
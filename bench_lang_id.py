@@ -0,0 +1,377 @@
+"""
+================================================================================
+Benchmark: Language Identification (lang_id vs legacy detectors)
+================================================================================
+Confronta il modello a n-grammi di caratteri (lang_id.identify) con i due
+rilevatori che sostituisce, copiati qui come riferimento:
+
+- detect_language (CV, cover letter): marker " parola " per lingua, None
+  sotto 3 punti
+- _detect_chat_language (chat Ruben): liste di parole, default 'en'
+
+Set etichettati: i messaggi chat di bench_ruben.EVAL_SET e DOCUMENT_SET
+(estratti di CV e cover letter, più testi senza lingua decidibile come
+liste di skill). Per ciascun percorso riporta accuratezza per lingua e
+latenza p50/p99 (lang_id senza cache e con cache per hash del testo).
+
+Sui documenti lang_id a freddo è più lento del rilevatore legacy (circa il
+doppio a p50): il gate a marker di detect_language resta
+(vedi il suo docstring) e il modello si aggiunge alla scansione. La riga
+"document marker gate" misura il solo gate; la cache riporta il costo
+vicino al solo gate.
+
+Usage:
+    python bench_lang_id.py [--repeat N] [--json results.json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import bench_ruben
+import lang_id
+import ml_utils
+import scoring_core
+from bench_ruben import time_calls
+
+# Bump when the sets or the report layout change
+EVAL_VERSION = 1
+
+# (text, language name or None when no native language should be inferred).
+# Written for this benchmark, not taken from lang_id.TRAINING_TEXTS.
+DOCUMENT_SET = [
+    # --- English ---
+    ("Software engineer with five years of experience building backend services in Java and Go. "
+     "Led the migration of the billing platform to Kubernetes and mentored two junior developers.", "English"),
+    ("Dear Hiring Manager, I am writing to apply for the Marketing Analyst position advertised on your "
+     "website. My background in digital campaigns makes me a strong fit for your team.", "English"),
+    ("Education: MSc in Computer Science, University of Edinburgh. Relevant coursework included "
+     "distributed systems, databases and information retrieval.", "English"),
+    ("Responsible for the monthly financial close, reconciliations and the preparation of management "
+     "reports for the regional directors.", "English"),
+    ("Customer-focused sales representative who exceeded quarterly targets and built long-term "
+     "relationships with key accounts in the retail sector.", "English"),
+    # --- Italian ---
+    ("Ingegnere del software con cinque anni di esperienza nello sviluppo di servizi backend in Java. "
+     "Ho guidato la migrazione della piattaforma di fatturazione e seguito due sviluppatori junior.", "Italian"),
+    ("Gentile responsabile delle risorse umane, vi scrivo per candidarmi alla posizione di analista "
+     "marketing pubblicata sul vostro sito. La mia formazione mi rende adatto al vostro gruppo.", "Italian"),
+    ("Istruzione: laurea magistrale in informatica presso il Politecnico di Milano, con una tesi sui "
+     "sistemi distribuiti e sulle basi di dati.", "Italian"),
+    ("Responsabile della chiusura contabile mensile, delle riconciliazioni bancarie e della "
+     "preparazione dei report per la direzione regionale.", "Italian"),
+    ("Addetta alle vendite orientata al cliente, ho superato gli obiettivi trimestrali e costruito "
+     "relazioni durature con i clienti principali del settore.", "Italian"),
+    # --- Spanish ---
+    ("Ingeniero de software con cinco años de experiencia desarrollando servicios backend en Java. "
+     "Dirigí la migración de la plataforma de facturación y formé a dos desarrolladores junior.", "Spanish"),
+    ("Estimado responsable de selección, le escribo para solicitar el puesto de analista de marketing "
+     "publicado en su web. Mi experiencia en campañas digitales encaja con su equipo.", "Spanish"),
+    ("Formación: máster en informática por la Universidad Politécnica de Madrid, con asignaturas de "
+     "sistemas distribuidos y bases de datos.", "Spanish"),
+    ("Responsable del cierre contable mensual, las conciliaciones bancarias y la elaboración de "
+     "informes para la dirección regional.", "Spanish"),
+    ("Comercial orientada al cliente que superó los objetivos trimestrales y creó relaciones "
+     "duraderas con las cuentas clave del sector minorista.", "Spanish"),
+    # --- French ---
+    ("Ingénieur logiciel avec cinq ans d'expérience dans le développement de services backend en Java. "
+     "J'ai piloté la migration de la plateforme de facturation et encadré deux développeurs juniors.", "French"),
+    ("Madame, Monsieur, je vous adresse ma candidature pour le poste d'analyste marketing publié sur "
+     "votre site. Mon parcours dans les campagnes numériques correspond à vos attentes.", "French"),
+    ("Formation : master en informatique à l'Université de Lyon, avec des cours de systèmes "
+     "distribués et de bases de données.", "French"),
+    ("Chargé de la clôture comptable mensuelle, des rapprochements bancaires et de la préparation "
+     "des rapports pour la direction régionale.", "French"),
+    ("Commerciale orientée client, j'ai dépassé les objectifs trimestriels et développé des relations "
+     "durables avec les grands comptes du secteur de la distribution.", "French"),
+    # --- German ---
+    ("Softwareentwickler mit fünf Jahren Erfahrung in der Entwicklung von Backend-Diensten in Java. "
+     "Ich habe die Migration der Abrechnungsplattform geleitet und zwei Junior-Entwickler betreut.", "German"),
+    ("Sehr geehrte Damen und Herren, hiermit bewerbe ich mich um die Stelle als Marketing-Analyst, "
+     "die auf Ihrer Webseite ausgeschrieben ist. Meine Erfahrung passt gut zu Ihrem Team.", "German"),
+    ("Ausbildung: Master in Informatik an der Technischen Universität München mit Schwerpunkt auf "
+     "verteilten Systemen und Datenbanken.", "German"),
+    ("Verantwortlich für den monatlichen Abschluss, die Kontenabstimmung und die Erstellung von "
+     "Berichten für die regionale Geschäftsleitung.", "German"),
+    ("Kundenorientierte Vertriebsmitarbeiterin, die die Quartalsziele übertroffen und langfristige "
+     "Beziehungen zu Schlüsselkunden im Einzelhandel aufgebaut hat.", "German"),
+    # --- Portuguese ---
+    ("Engenheiro de software com cinco anos de experiência no desenvolvimento de serviços backend em "
+     "Java. Liderei a migração da plataforma de faturação e orientei dois programadores juniores.", "Portuguese"),
+    ("Prezado responsável de recrutamento, venho candidatar-me à vaga de analista de marketing "
+     "publicada no vosso site. A minha experiência em campanhas digitais encaixa na vossa equipa.", "Portuguese"),
+    ("Formação: mestrado em informática pela Universidade de Lisboa, com disciplinas de sistemas "
+     "distribuídos e bases de dados.", "Portuguese"),
+    ("Responsável pelo fecho contabilístico mensal, pelas reconciliações bancárias e pela preparação "
+     "de relatórios para a direção regional.", "Portuguese"),
+    ("Vendedora focada no cliente que superou as metas trimestrais e construiu relações duradouras "
+     "com as principais contas do setor de varejo.", "Portuguese"),
+    # --- No native language to infer ---
+    ("Python, SQL, Tableau, Power BI, Docker, Kubernetes, AWS, Git", None),
+    ("Data Scientist", None),
+    ("Machine Learning, NLP, PyTorch, TensorFlow, Spark", None),
+    ("CV - Mario Rossi - mario.rossi@example.com - +39 333 1234567", None),
+    ("Java Spring Boot Microservices REST API", None),
+]
+
+
+# =============================================================================
+# LEGACY REFERENCES (scoring_core / ml_utils before lang_id)
+# =============================================================================
+def legacy_detect_language(text: str) -> str:
+    """
+    Enhanced language detection for native language inference.
+    If a CV is written in a specific language, we can infer the candidate 
+    is likely a native speaker of that language.
+    
+    Supports: Italian, English, Spanish, French, German, Portuguese
+    Returns the detected native language as a skill string.
+    """
+    text = text.lower()
+    
+    # Language markers (common words unique to each language)
+    language_markers = {
+        "Italian": {
+            "markers": {" il ", " lo ", " la ", " gli ", " le ", " di ", " è ", " per ", 
+                       " delle ", " nella ", " sono ", " che ", " con ", " una ", " del ",
+                       " nel ", " alla ", " dalla ", " presso ", " laurea ", " esperienza ",
+                       " competenze ", " lavoro ", " sviluppo ", " gestione "},
+            "strong_markers": {" esperienza lavorativa", " istruzione ", " competenze tecniche",
+                              " laurea in ", " presso ", " dal ", " al "}
+        },
+        "English": {
+            "markers": {" the ", " a ", " an ", " and ", " is ", " of ", " for ", " to ", 
+                       " in ", " with ", " that ", " this ", " have ", " has ", " was ",
+                       " were ", " been ", " experience ", " skills ", " work ", " team "},
+            "strong_markers": {" work experience ", " education ", " skills ", " bachelor",
+                              " master ", " university ", " developed ", " managed "}
+        },
+        "Spanish": {
+            "markers": {" el ", " la ", " los ", " las ", " de ", " en ", " que ", " y ",
+                       " es ", " para ", " con ", " una ", " por ", " como ", " más ",
+                       " del ", " experiencia ", " trabajo ", " desarrollo "},
+            "strong_markers": {" experiencia laboral ", " educación ", " habilidades ",
+                              " licenciatura ", " universidad ", " desarrollé "}
+        },
+        "French": {
+            "markers": {" le ", " la ", " les ", " de ", " du ", " des ", " et ", " en ",
+                       " est ", " une ", " un ", " pour ", " avec ", " dans ", " sur ",
+                       " expérience ", " travail ", " développement "},
+            "strong_markers": {" expérience professionnelle ", " formation ", " compétences ",
+                              " licence ", " université ", " développé "}
+        },
+        "German": {
+            "markers": {" der ", " die ", " das ", " und ", " in ", " ist ", " mit ", " für ",
+                       " von ", " zu ", " auf ", " bei ", " eine ", " einer ", " eines ",
+                       " erfahrung ", " arbeit ", " entwicklung "},
+            "strong_markers": {" berufserfahrung ", " ausbildung ", " kenntnisse ",
+                              " bachelor ", " universität ", " entwickelt "}
+        },
+        "Portuguese": {
+            "markers": {" o ", " a ", " os ", " as ", " de ", " em ", " que ", " e ",
+                       " é ", " para ", " com ", " uma ", " por ", " como ", " mais ",
+                       " do ", " experiência ", " trabalho ", " desenvolvimento "},
+            "strong_markers": {" experiência profissional ", " educação ", " habilidades ",
+                              " licenciatura ", " universidade ", " desenvolvi "}
+        }
+    }
+    
+    # Calculate scores for each language
+    scores = {}
+    for lang, data in language_markers.items():
+        # Count regular markers
+        regular_score = sum(1 for w in data["markers"] if w in text)
+        # Strong markers count double
+        strong_score = sum(2 for w in data["strong_markers"] if w in text)
+        scores[lang] = regular_score + strong_score
+    
+    # Find the best match
+    best_lang = max(scores, key=scores.get)
+    best_score = scores[best_lang]
+    
+    # Only return if score is significant (at least 3 markers found)
+    if best_score >= 3:
+        return best_lang
+    
+    return None
+
+
+def legacy_detect_chat_language(message: str) -> str:
+    """
+    Detects the language of a chat message.
+    Returns language code: 'en', 'it', 'es', 'fr', 'de', 'pt'
+    Default: 'en' (English)
+    """
+    if not message:
+        return 'en'
+        
+    m = " " + message.lower() + " "
+    
+    # Language-specific words with scores
+    lang_words = {
+        'it': ["ciao", "come", "cosa", "dove", "quando", "chi", "puoi", "vorrei", "aiuto", "grazie", 
+               "lavoro", "colloquio", "stipendio", "curriculum", "sono", "posso", "usare", "questo", 
+               "strumento", "buongiorno", "buonasera", "prego", "perfetto", "italiano"],
+        'es': ["hola", "como", "que", "donde", "cuando", "quien", "puedes", "quiero", "ayuda", "gracias",
+               "trabajo", "necesito", "curriculum", "soy", "puedo", "usar", "esto", "buenos", "buenas",
+               "perfecto", "español", "entrevista"],
+        'fr': ["bonjour", "comment", "quoi", "où", "quand", "qui", "pouvez", "voudrais", "aide", "merci",
+               "travail", "je", "puis", "utiliser", "ceci", "suis", "peux", "analyser", "français",
+               "bonsoir", "salut", "entretien", "mon", "mes", "vous"],
+        'de': ["hallo", "wie", "was", "wo", "wann", "wer", "können", "möchte", "hilfe", "danke",
+               "arbeit", "ich", "kann", "benutzen", "dies", "bin", "meinen", "lebenslauf", "verbessern",
+               "guten", "tag", "morgen", "bitte", "deutsch"],
+        'pt': ["olá", "como", "que", "onde", "quando", "quem", "pode", "quero", "ajuda", "obrigado",
+               "trabalho", "preciso", "curriculo", "sou", "posso", "usar", "isso", "meu", "português",
+               "bom", "dia", "boa", "noite", "obrigada"]
+    }
+    
+    # Quick checks for strong language indicators
+    # Italian strong keywords
+    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["ciao", "grazie", "stipendio", "colloquio", "buongiorno"]):
+        return 'it'
+    # Spanish strong keywords
+    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["hola", "gracias", "necesito", "buenos"]):
+        return 'es'
+    # French strong keywords
+    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["bonjour", "merci", "salut", "bonsoir", "puis-je"]):
+        return 'fr'
+    # German strong keywords
+    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["hallo", "danke", "guten", "bitte", "lebenslauf"]):
+        return 'de'
+    # Portuguese strong keywords (note: "olá" with accent)
+    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["olá", "ola", "obrigado", "obrigada", "preciso"]):
+        return 'pt'
+    
+    # Score-based detection
+    scores = {}
+    for lang, words in lang_words.items():
+        scores[lang] = sum(1 for w in words if f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}"))
+    
+    # Find best match
+    max_score = max(scores.values()) if scores else 0
+    if max_score > 0:
+        best_lang = max(scores, key=scores.get)
+        return best_lang
+    
+    return 'en'
+
+
+# =============================================================================
+# EVALUATION
+# =============================================================================
+def _new_chat_language(message):
+    return ml_utils._detect_chat_language(message)
+
+
+def _new_document_language(text):
+    return scoring_core.detect_language(text)
+
+
+def _uncached(fn):
+    """fn with the lang_id cache emptied before each call (cold lookups)."""
+    def call(text):
+        lang_id.IDENTIFY_CACHE.clear()
+        return fn(text)
+    return call
+
+
+def accuracy(detector, items):
+    """Overall and per-label accuracy of detector over (text, expected) pairs, plus the errors."""
+    per_label, errors = {}, []
+    for text, expected in items:
+        got = detector(text)
+        row = per_label.setdefault(str(expected), [0, 0])
+        row[0] += got == expected
+        row[1] += 1
+        if got != expected:
+            errors.append({"text": text[:70], "expected": expected, "got": got})
+    correct = sum(r[0] for r in per_label.values())
+    return {
+        "accuracy": round(correct / len(items), 4),
+        "per_label": {label: round(r[0] / r[1], 4) for label, r in per_label.items()},
+        "errors": errors,
+    }
+
+
+def run(repeat=20):
+    chat = [(message, lang) for message, lang, _ in bench_ruben.EVAL_SET]
+    documents = list(DOCUMENT_SET)
+    chat_texts = [m for m, _ in chat]
+    doc_texts = [t for t, _ in documents]
+
+    report = {
+        "eval_version": EVAL_VERSION,
+        "chat_messages": len(chat),
+        "documents": len(documents),
+        "chat": {
+            "legacy": accuracy(legacy_detect_chat_language, chat),
+            "lang_id": accuracy(_new_chat_language, chat),
+        },
+        "document": {
+            "legacy": accuracy(legacy_detect_language, documents),
+            "lang_id": accuracy(_new_document_language, documents),
+        },
+    }
+
+    lang_id.get_model()  # train outside the timings
+    report["latency"] = {
+        "chat legacy": time_calls(legacy_detect_chat_language, chat_texts, repeat),
+        "chat lang_id (cold)": time_calls(_uncached(_new_chat_language), chat_texts, repeat),
+        "chat lang_id (cached)": time_calls(_new_chat_language, chat_texts, repeat),
+        "document legacy": time_calls(legacy_detect_language, doc_texts, repeat),
+        "document marker gate": time_calls(scoring_core.has_language_evidence, doc_texts, repeat),
+        "document lang_id (cold)": time_calls(_uncached(_new_document_language), doc_texts, repeat),
+        "document lang_id (cached)": time_calls(_new_document_language, doc_texts, repeat),
+    }
+    start = time.perf_counter()
+    lang_id.LanguageModel()
+    report["train_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    return report
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over each set")
+    parser.add_argument("--json", default=None, help="write the full report to this file ('-' for stdout)")
+    args = parser.parse_args()
+
+    report = run(repeat=args.repeat)
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    print(f"\n{report['chat_messages']} chat messages, {report['documents']} documents "
+          f"(model trained in {report['train_ms']:.1f} ms)", file=out)
+    for path in ("chat", "document"):
+        legacy, new = report[path]["legacy"], report[path]["lang_id"]
+        print(f"\n  {path:<10} legacy  lang_id", file=out)
+        print(f"  {'overall':<10} {legacy['accuracy']:6.1%}  {new['accuracy']:6.1%}", file=out)
+        for label in legacy["per_label"]:
+            print(f"  {label:<10} {legacy['per_label'][label]:6.1%}  {new['per_label'][label]:6.1%}", file=out)
+    print("\n  latency (ms)                  p50      p99", file=out)
+    for name, row in report["latency"].items():
+        print(f"  {name:<28} {row['p50_ms']:7.3f}  {row['p99_ms']:7.3f}", file=out)
+    for path in ("chat", "document"):
+        errors = report[path]["lang_id"]["errors"]
+        if errors:
+            print(f"\n  lang_id {path} errors:", file=out)
+            for err in errors:
+                print(f"    {err['text']!r}: expected {err['expected']}, got {err['got']}", file=out)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n  report written to {args.json}", file=out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+================================================================================
+Benchmark: Ruben Intent Classifier (accuracy + latency)
+================================================================================
+Valuta ruben_intent su un set di messaggi etichettati nelle sei lingue di
+_RUBEN_RESPONSES (EN, IT, ES, FR, DE, PT):
+
+- matrice di confusione e accuratezza per lingua (intent e lingua rilevata)
+- accuratezza end-to-end di get_chatbot_response (risposta attesa)
+- sweep di CONFIDENCE_THRESHOLD (accuracy, precision, recall, falsi positivi)
+- latenza p50/p99 per chiamata di classify_intent, classify_intents e
+  get_chatbot_response
+
+L'output JSON (--json) è pensato per confrontare run successive.
+
+Usage:
+    python bench_ruben.py [--repeat N] [--json results.json] [--page PAGE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ml_utils
+import ruben_intent
+
+# Bump when EVAL_SET or the report layout changes (runs are comparable
+# only within the same version).
+EVAL_VERSION = 1
+
+NONE_LABEL = "none"
+
+THRESHOLDS = [round(0.20 + 0.05 * k, 2) for k in range(11)]  # 0.20 .. 0.70
+
+# (message, language, expected intent or None for out-of-scope). Paraphrases
+# rather than copies of INTENT_PROTOTYPES, so this measures generalization.
+EVAL_SET = [
+    # --- English ---
+    ("hello Ruben", "en", "greeting"),
+    ("thanks, that was useful", "en", "thanks"),
+    ("any tips to get ready for my job interview?", "en", "interview"),
+    ("which questions do they ask in a technical interview", "en", "interview"),
+    ("I want to become a data scientist", "en", "data_science"),
+    ("are there jobs in machine learning engineering", "en", "data_science"),
+    ("careers with aws and snowflake", "en", "cloud"),
+    ("what salary can a data analyst expect", "en", "salary"),
+    ("how should I negotiate my salary offer", "en", "salary"),
+    ("which skills should I learn next", "en", "skills"),
+    ("how can I improve my resume", "en", "resume"),
+    ("I want to switch careers into tech", "en", "career_change"),
+    ("are there remote jobs I could do from home", "en", "remote"),
+    ("how do I grow my network on linkedin", "en", "networking"),
+    ("how do I write a cover letter", "en", "cover_letter"),
+    ("where can I find job openings", "en", "job_search"),
+    ("what's the weather like tomorrow", "en", None),
+    # --- Italian ---
+    ("ciao Ruben", "it", "greeting"),
+    ("grazie per l'aiuto", "it", "thanks"),
+    ("come mi preparo al colloquio di lavoro", "it", "interview"),
+    ("vorrei diventare data scientist", "it", "data_science"),
+    ("che carriera posso fare con aws", "it", "cloud"),
+    ("quanto guadagna un data analyst in italia", "it", "salary"),
+    ("quali skill devo imparare", "it", "skills"),
+    ("come posso migliorare il mio curriculum", "it", "resume"),
+    ("voglio cambiare carriera", "it", "career_change"),
+    ("cerco lavoro da remoto", "it", "remote"),
+    ("come scrivo una lettera di presentazione", "it", "cover_letter"),
+    ("dove trovo offerte di lavoro", "it", "job_search"),
+    ("che tempo fa domani a milano", "it", None),
+    # --- Spanish ---
+    ("hola, buenos dias", "es", "greeting"),
+    ("muchas gracias por todo", "es", "thanks"),
+    ("como preparar una entrevista de trabajo", "es", "interview"),
+    ("quiero ser cientifico de datos", "es", "data_science"),
+    ("cuanto gana un analista de datos", "es", "salary"),
+    ("que habilidades necesito aprender", "es", "skills"),
+    ("como mejorar mi curriculum", "es", "resume"),
+    ("quiero cambiar de carrera", "es", "career_change"),
+    ("busco trabajo remoto", "es", "remote"),
+    ("como escribir una carta de presentacion", "es", "cover_letter"),
+    ("donde busco ofertas de empleo", "es", "job_search"),
+    ("cual es la capital de francia", "es", None),
+    # --- French ---
+    ("bonjour Ruben", "fr", "greeting"),
+    ("merci beaucoup pour votre aide", "fr", "thanks"),
+    ("comment preparer mon entretien d'embauche", "fr", "interview"),
+    ("je veux devenir data scientist", "fr", "data_science"),
+    ("combien gagne un data analyst", "fr", "salary"),
+    ("quelles competences dois-je apprendre", "fr", "skills"),
+    ("comment ameliorer mon cv", "fr", "resume"),
+    ("je veux changer de carriere", "fr", "career_change"),
+    ("je cherche un emploi en teletravail", "fr", "remote"),
+    ("comment ecrire une lettre de motivation", "fr", "cover_letter"),
+    ("ou trouver des offres d'emploi", "fr", "job_search"),
+    ("quelle heure est-il a paris", "fr", None),
+    # --- German ---
+    ("hallo Ruben", "de", "greeting"),
+    ("danke fur die hilfe", "de", "thanks"),
+    ("wie bereite ich mich auf das vorstellungsgesprach vor", "de", "interview"),
+    ("ich mochte data scientist werden", "de", "data_science"),
+    ("wie viel verdient ein data analyst", "de", "salary"),
+    ("welche fahigkeiten soll ich lernen", "de", "skills"),
+    ("wie kann ich meinen lebenslauf verbessern", "de", "resume"),
+    ("ich mochte den beruf wechseln", "de", "career_change"),
+    ("ich suche eine stelle im homeoffice", "de", "remote"),
+    ("wie schreibe ich ein anschreiben", "de", "cover_letter"),
+    ("wo finde ich stellenangebote", "de", "job_search"),
+    ("wie wird das wetter morgen", "de", None),
+    # --- Portuguese ---
+    ("olá Ruben, bom dia", "pt", "greeting"),
+    ("muito obrigado pela ajuda", "pt", "thanks"),
+    ("como me preparo para uma entrevista de emprego", "pt", "interview"),
+    ("quero ser cientista de dados", "pt", "data_science"),
+    ("quanto ganha um analista de dados", "pt", "salary"),
+    ("que habilidades devo aprender", "pt", "skills"),
+    ("como melhorar meu curriculo", "pt", "resume"),
+    ("quero mudar de carreira", "pt", "career_change"),
+    ("procuro trabalho remoto", "pt", "remote"),
+    ("como escrever uma carta de apresentacao", "pt", "cover_letter"),
+    ("onde encontro vagas de emprego", "pt", "job_search"),
+    ("qual e a previsao do tempo amanha", "pt", None),
+]
+
+
+# =============================================================================
+# ACCURACY
+# =============================================================================
+def _label(intent, confidence, threshold):
+    return intent if intent is not None and confidence >= threshold else NONE_LABEL
+
+
+def confusion_matrix(expected, predicted):
+    """{expected: {predicted: count}} over the labels that occur."""
+    matrix = {}
+    for exp, pred in zip(expected, predicted):
+        row = matrix.setdefault(exp, {})
+        row[pred] = row.get(pred, 0) + 1
+    return matrix
+
+
+def sweep(expected, scored, thresholds):
+    """Accuracy / precision / recall / false accepts for each threshold."""
+    rows = []
+    in_scope = sum(1 for e in expected if e != NONE_LABEL)
+    out_scope = len(expected) - in_scope
+    for t in thresholds:
+        predicted = [_label(i, c, t) for i, c in scored]
+        correct = sum(p == e for p, e in zip(predicted, expected))
+        accepted = [(p, e) for p, e in zip(predicted, expected) if p != NONE_LABEL]
+        true_pos = sum(p == e for p, e in accepted)
+        false_accepts = sum(1 for p, e in accepted if e == NONE_LABEL)
+        rows.append({
+            "threshold": t,
+            "accuracy": round(correct / len(expected), 4),
+            "precision": round(true_pos / len(accepted), 4) if accepted else 0.0,
+            "recall": round(true_pos / in_scope, 4) if in_scope else 0.0,
+            "false_accept_rate": round(false_accepts / out_scope, 4) if out_scope else 0.0,
+        })
+    return rows
+
+
+def expected_response(intent, lang, message, page):
+    """Reply get_chatbot_response should give for a labelled message."""
+    if intent is None:
+        page_key = ml_utils._PAGE_TO_RESPONSE_KEY.get(page)
+        responses = ml_utils._RUBEN_RESPONSES[lang]
+        if page_key and page_key in responses:
+            return responses[page_key]
+        return ruben_intent.fallback_response(message, lang)
+    return ruben_intent.get_intent_response(intent, lang)
+
+
+# =============================================================================
+# LATENCY
+# =============================================================================
+def percentile(values, q):
+    """Nearest-rank percentile (q in 0-100)."""
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+def time_calls(fn, messages, repeat):
+    """p50 / p99 / mean in ms of fn(message), each message called `repeat` times."""
+    timings = []
+    for _ in range(repeat):
+        for message in messages:
+            start = time.perf_counter()
+            fn(message)
+            timings.append(time.perf_counter() - start)
+    return {
+        "calls": len(timings),
+        "p50_ms": round(percentile(timings, 50) * 1000, 4),
+        "p99_ms": round(percentile(timings, 99) * 1000, 4),
+        "mean_ms": round(sum(timings) / len(timings) * 1000, 4),
+    }
+
+
+# =============================================================================
+# MAIN
+# =============================================================================
+def run(repeat=20, page=None):
+    """Full report as a JSON-serializable dict."""
+    messages = [m for m, _, _ in EVAL_SET]
+    langs = [lang for _, lang, _ in EVAL_SET]
+    expected = [intent or NONE_LABEL for _, _, intent in EVAL_SET]
+    threshold = ruben_intent.CONFIDENCE_THRESHOLD
+
+    ruben_intent.classify_intent("warm up")  # build the classifier outside the timed region
+    scored = [ruben_intent.classify_intent(m) for m in messages]
+    predicted = [_label(i, c, threshold) for i, c in scored]
+    detected = [ml_utils._detect_chat_language(m) for m in messages]
+    replies = [ml_utils.get_chatbot_response(m, page) for m in messages]  # language detected too
+    reply_ok = [r == expected_response(i, lang, m, page)
+                for r, (m, lang, i) in zip(replies, EVAL_SET)]
+
+    per_language = {}
+    for lang in ml_utils._RUBEN_RESPONSES:
+        rows = [k for k, l in enumerate(langs) if l == lang]
+        per_language[lang] = {
+            "messages": len(rows),
+            "intent_accuracy": round(sum(predicted[k] == expected[k] for k in rows) / len(rows), 4) if rows else None,
+            "language_detection": round(sum(detected[k] == lang for k in rows) / len(rows), 4) if rows else None,
+            "response_accuracy": round(sum(reply_ok[k] for k in rows) / len(rows), 4) if rows else None,
+        }
+
+    errors = [{"message": m, "lang": lang, "expected": e, "predicted": p, "confidence": round(c, 4)}
+              for (m, lang, _), e, p, (_, c) in zip(EVAL_SET, expected, predicted, scored) if e != p]
+
+    batch = time_calls(lambda _: ruben_intent.classify_intents(messages), [None], repeat)
+    return {
+        "eval_version": EVAL_VERSION,
+        "environment": {"python": platform.python_version(), "machine": platform.machine()},
+        "messages": len(messages),
+        "threshold": threshold,
+        "page": page,
+        "intent_accuracy": round(sum(p == e for p, e in zip(predicted, expected)) / len(expected), 4),
+        "response_accuracy": round(sum(reply_ok) / len(reply_ok), 4),
+        "per_language": per_language,
+        "confusion_matrix": confusion_matrix(expected, predicted),
+        "threshold_sweep": sweep(expected, scored, THRESHOLDS),
+        "errors": errors,
+        "latency": {
+            "classify_intent": time_calls(ruben_intent.classify_intent, messages, repeat),
+            "get_chatbot_response": time_calls(lambda m: ml_utils.get_chatbot_response(m, page), messages, repeat),
+            "classify_intents_per_message": {
+                "p50_ms": round(batch["p50_ms"] / len(messages), 4),
+                "p99_ms": round(batch["p99_ms"] / len(messages), 4),
+            },
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--repeat", type=int, default=20, help="timed passes over the message set")
+    parser.add_argument("--json", default=None, help="write the full report to this file ('-' for stdout)")
+    parser.add_argument("--page", default="Chat", help="current_page passed to get_chatbot_response "
+                        "(default: a page without its own blurb, so low-priority intents are scored)")
+    args = parser.parse_args()
+
+    report = run(repeat=args.repeat, page=args.page)
+    # Keep stdout clean for the JSON when it goes there
+    out = sys.stderr if args.json == "-" else sys.stdout
+
+    print(f"\n{report['messages']} messages, threshold {report['threshold']}, page {report['page']!r}", file=out)
+    print(f"  intent accuracy   {report['intent_accuracy']:.1%}", file=out)
+    print(f"  response accuracy {report['response_accuracy']:.1%}", file=out)
+    print("\n  lang  intent  detect  response", file=out)
+    for lang, row in report["per_language"].items():
+        print(f"  {lang:<5} {row['intent_accuracy']:6.1%}  {row['language_detection']:6.1%}  {row['response_accuracy']:6.1%}", file=out)
+    print("\n  threshold  acc     prec    recall  false-accept", file=out)
+    for row in report["threshold_sweep"]:
+        print(f"  {row['threshold']:<9.2f}  {row['accuracy']:.3f}  {row['precision']:.3f}  "
+              f"{row['recall']:.3f}  {row['false_accept_rate']:.3f}", file=out)
+    print("\n  latency (ms)                  p50      p99", file=out)
+    for name, row in report["latency"].items():
+        print(f"  {name:<28} {row['p50_ms']:7.3f}  {row['p99_ms']:7.3f}", file=out)
+    if report["errors"]:
+        print(f"\n  {len(report['errors'])} misclassified:", file=out)
+        for err in report["errors"]:
+            print(f"    [{err['lang']}] {err['message']!r}: expected {err['expected']}, "
+                  f"got {err['predicted']} ({err['confidence']:.2f})", file=out)
+
+    if args.json == "-":
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        print()
+    elif args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n  report written to {args.json}", file=out)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+================================================================================
+Benchmark: Skill Extraction (exact automaton + typo index)
+================================================================================
+Confronta il fuzzy matching originale (fuzz.ratio per ogni skill x ogni
+token) con il TypoIndex di skill_matcher, e verifica che i risultati siano
+identici.
+
+Usage:
+    python bench_skill_extraction.py [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import knowledge_base
+import sample_data
+import skill_matcher
+from thefuzz import fuzz
+
+
+def legacy_fuzzy(text, hard_skills, soft_skills, hard_exact, soft_exact):
+    """The nested fuzz.ratio loops from the original extract_skills_from_text."""
+    words = text.lower().split()
+    text_words = set(words)
+    bigrams = set(' '.join(words[i:i+2]) for i in range(len(words)-1))
+    hard_found, soft_found = set(), set()
+    for skill in hard_skills:
+        if skill in hard_exact or len(skill) < 5:
+            continue
+        if skill.lower() in ["excel", "lead", "plan", "drive", "base"]:
+            continue
+        for word in text_words:
+            if len(word) > 4 and fuzz.ratio(word, skill.lower()) > 90:
+                hard_found.add(skill)
+                break
+        for bigram in bigrams:
+            if fuzz.ratio(bigram, skill.lower()) > 90:
+                hard_found.add(skill)
+                break
+    for skill in soft_skills:
+        if skill in soft_exact or len(skill) < 5:
+            continue
+        for word in text_words:
+            if len(word) > 4 and fuzz.ratio(word, skill.lower()) > 88:
+                soft_found.add(skill)
+                break
+    return hard_found, soft_found
+
+
+def indexed_fuzzy(text, hard_exact, soft_exact):
+    """Same fallback through skill_matcher.TypoIndex."""
+    words = text.lower().split()
+    text_words = set(words)
+    bigrams = set(' '.join(words[i:i+2]) for i in range(len(words)-1))
+    hard_index, soft_index = skill_matcher.get_typo_indexes()
+    hard_found, soft_found = set(), set()
+    for word in text_words:
+        if len(word) >= skill_matcher.FUZZY_MIN_WORD_LEN:
+            hard_found |= hard_index.lookup(word)
+            soft_found |= soft_index.lookup(word)
+    for bigram in bigrams:
+        hard_found |= hard_index.lookup(bigram)
+    return hard_found - hard_exact, soft_found - soft_exact
+
+
+def make_long_cv(n_words=3000, seed=42):
+    """Synthetic long CV: sample text + skill names with typos + filler."""
+    rng = random.Random(seed)
+    names = [s.lower() for s in list(knowledge_base.HARD_SKILLS) + list(knowledge_base.SOFT_SKILLS)]
+    filler = sample_data.SAMPLE_CV.split()
+    out = []
+    for _ in range(n_words):
+        if rng.random() < 0.1:
+            name = rng.choice(names)
+            if len(name) > 4:
+                i = rng.randrange(len(name))
+                name = name[:i] + name[i + 1:]  # drop one character
+            out.append(name)
+        else:
+            out.append(rng.choice(filler))
+    return " ".join(out)
+
+
+def bench(label, fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    elapsed = (time.perf_counter() - start) / repeat
+    print(f"  {label:<28} {elapsed * 1000:9.2f} ms/doc")
+    return result, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[3])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    hard_skills = knowledge_base.HARD_SKILLS
+    soft_skills = knowledge_base.SOFT_SKILLS
+    hard_matcher, soft_matcher = skill_matcher.get_skill_matchers()
+    skill_matcher.get_typo_indexes()  # build outside the timed region
+
+    docs = {
+        "sample CV": sample_data.SAMPLE_CV,
+        "sample JD": sample_data.SAMPLE_JD,
+        "long CV (3k words)": make_long_cv(),
+    }
+    all_equal = True
+    for name, text in docs.items():
+        print(f"\n{name} ({len(text.split())} words)")
+        text_lower = text.lower()
+        hard_exact = hard_matcher.match(text_lower)
+        soft_exact = soft_matcher.match(text_lower)
+        legacy, t_legacy = bench("legacy fuzz.ratio loops", lambda: legacy_fuzzy(
+            text, hard_skills, soft_skills, hard_exact, soft_exact), args.repeat)
+        indexed, t_indexed = bench("TypoIndex", lambda: indexed_fuzzy(
+            text, hard_exact, soft_exact), args.repeat)
+        equal = legacy == indexed
+        all_equal &= equal
+        print(f"  speed-up: {t_legacy / max(t_indexed, 1e-9):.1f}x   identical results: {equal}")
+
+    sys.exit(0 if all_equal else 1)
+
+
+if __name__ == "__main__":
+    main()
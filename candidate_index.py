@@ -0,0 +1,235 @@
+"""
+================================================================================
+CareerMatch AI - Candidate Index (Recruiter mode)
+================================================================================
+
+Screening N candidate CVs for one JD used to cost N full analyze_gap calls.
+The candidate side is indexed once:
+
+- every CV's stated and expanded hard skills are stored as bitsets over a
+  shared skill vocabulary, together with the bitset of the skill clusters
+  it touches;
+- posting lists map skill -> candidates (stated / expanded) and
+  cluster -> candidates.
+
+A JD query then walks its required skills once. For each skill the
+posting lists give the candidates with a direct (1.0), inferred (0.9) or
+transferable (0.7) match, and the points of all candidates are accumulated
+in one NumPy array. The additions happen in the same order as in
+analyze_gap, so match_percentage is exactly the analyze_gap value
+(including the composite score for role-name JDs).
+
+Public API:
+- CandidateIndex  -> .add(id, cv), .remove(id), .query(jd, top_k), .scores(jd)
+================================================================================
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Hashable, List, Optional, Set, Tuple, Union
+
+import numpy as np
+
+import knowledge_base
+import scoring_core
+from doc_cache import ParsedDocument, as_parsed
+from skill_graph import iter_bits
+
+
+def _cluster_map() -> Dict[str, List[int]]:
+    """Lowercase skill name -> ids of the SKILL_CLUSTERS containing it."""
+    clusters_of: Dict[str, List[int]] = {}
+    for cid, cdata in enumerate(getattr(knowledge_base, "SKILL_CLUSTERS", {}).values()):
+        members = {s.lower() for s in (cdata.get("skills", []) if isinstance(cdata, dict) else cdata)}
+        for member in members:
+            clusters_of.setdefault(member, []).append(cid)
+    return clusters_of
+
+
+class CandidateIndex:
+    """Inverted skill index over candidate CVs, scored against one JD at a time."""
+
+    def __init__(self):
+        self._vocab: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._clusters_of = _cluster_map()
+
+        # Per-slot candidate data (slots of removed candidates are reused)
+        self._slots: Dict[Hashable, int] = {}
+        self._ids: List[Optional[Hashable]] = []
+        self._docs: List[Optional[ParsedDocument]] = []
+        self._direct_bits: List[int] = []
+        self._expanded_bits: List[int] = []
+        self._cluster_bits: List[int] = []
+        self._free: List[int] = []
+
+        # Posting lists
+        self._direct: Dict[int, Set[int]] = {}
+        self._expanded: Dict[int, Set[int]] = {}
+        self._clustered: Dict[int, Set[int]] = {}
+
+    # -------------------------------------------------------------------------
+    # CANDIDATES
+    # -------------------------------------------------------------------------
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def __contains__(self, candidate_id: Hashable) -> bool:
+        return candidate_id in self._slots
+
+    def candidate_ids(self) -> List[Hashable]:
+        return list(self._slots)
+
+    def _intern(self, name: str) -> int:
+        sid = self._vocab.get(name)
+        if sid is None:
+            sid = len(self._names)
+            self._vocab[name] = sid
+            self._names.append(name)
+        return sid
+
+    def _bits(self, names) -> int:
+        bits = 0
+        for name in names:
+            bits |= 1 << self._intern(name)
+        return bits
+
+    def add(self, candidate_id: Hashable, cv: Union[str, ParsedDocument]) -> None:
+        """Index a candidate CV (text or ParsedDocument); replaces an existing entry."""
+        if candidate_id in self._slots:
+            self.remove(candidate_id)
+        doc = as_parsed(cv)
+        hard_lower = {s.lower() for s in doc.hard}
+        direct_bits = self._bits(hard_lower)
+        expanded_bits = self._bits(doc.expanded)
+        cluster_bits = 0
+        for skill in hard_lower:
+            for cid in self._clusters_of.get(skill, ()):
+                cluster_bits |= 1 << cid
+
+        if self._free:
+            slot = self._free.pop()
+            self._ids[slot] = candidate_id
+            self._docs[slot] = doc
+            self._direct_bits[slot] = direct_bits
+            self._expanded_bits[slot] = expanded_bits
+            self._cluster_bits[slot] = cluster_bits
+        else:
+            slot = len(self._ids)
+            self._ids.append(candidate_id)
+            self._docs.append(doc)
+            self._direct_bits.append(direct_bits)
+            self._expanded_bits.append(expanded_bits)
+            self._cluster_bits.append(cluster_bits)
+        self._slots[candidate_id] = slot
+
+        for sid in iter_bits(direct_bits):
+            self._direct.setdefault(sid, set()).add(slot)
+        for sid in iter_bits(expanded_bits):
+            self._expanded.setdefault(sid, set()).add(slot)
+        for cid in iter_bits(cluster_bits):
+            self._clustered.setdefault(cid, set()).add(slot)
+
+    def remove(self, candidate_id: Hashable) -> bool:
+        """Drop a candidate; returns False if it was not indexed."""
+        slot = self._slots.pop(candidate_id, None)
+        if slot is None:
+            return False
+        for postings, bits in ((self._direct, self._direct_bits[slot]),
+                               (self._expanded, self._expanded_bits[slot]),
+                               (self._clustered, self._cluster_bits[slot])):
+            for key in iter_bits(bits):
+                postings[key].discard(slot)
+        self._ids[slot] = None
+        self._docs[slot] = None
+        self._direct_bits[slot] = self._expanded_bits[slot] = self._cluster_bits[slot] = 0
+        self._free.append(slot)
+        return True
+
+    def skills(self, candidate_id: Hashable) -> Set[str]:
+        """Expanded (lowercase) hard skills of a candidate."""
+        bits = self._expanded_bits[self._slots[candidate_id]]
+        return {self._names[sid] for sid in iter_bits(bits)}
+
+    # -------------------------------------------------------------------------
+    # QUERY
+    # -------------------------------------------------------------------------
+    def _match_sets(self, jd_norm: str) -> Tuple[Set[int], Set[int], Set[int]]:
+        """Slots with a direct / inferred / transferable match for one JD skill."""
+        sid = self._vocab.get(jd_norm)
+        direct = self._direct.get(sid, set()) if sid is not None else set()
+        expanded = self._expanded.get(sid, set()) if sid is not None else set()
+        inferred = expanded - direct
+        transferable = set()
+        for cid in self._clusters_of.get(jd_norm, ()):
+            transferable |= self._clustered.get(cid, set())
+        transferable -= expanded
+        transferable -= direct
+        return direct, inferred, transferable
+
+    def _score_slots(self, job_doc: ParsedDocument) -> Tuple[np.ndarray, List[str], Optional[str]]:
+        job_hard, _, best_role = scoring_core._jd_requirements(job_doc)
+        points = np.zeros(len(self._ids))
+        weights = (scoring_core.WEIGHT_DIRECT, scoring_core.WEIGHT_INFERRED, scoring_core.WEIGHT_TRANSFERABLE)
+        jd_skills = list(job_hard)
+        for jd_skill in jd_skills:
+            for slots, weight in zip(self._match_sets(jd_skill.lower()), weights):
+                if slots:
+                    points[np.fromiter(slots, dtype=np.intp, count=len(slots))] += weight
+
+        totals = np.full(len(self._ids), len(jd_skills))
+        scores = scoring_core.calculate_match_scores(points, totals)
+
+        # Role-name JDs: composite score of the archetype (as analyze_gap)
+        if best_role:
+            slots = [slot for slot in self._slots.values() if self._docs[slot].text]
+            profiles = [(self._docs[slot].hard | self._docs[slot].soft, self._docs[slot].text) for slot in slots]
+            for slot, role_score in zip(slots, scoring_core.score_role_many(profiles, best_role)):
+                if role_score is not None and role_score > 5:
+                    scores[slot] = role_score
+        return scores, jd_skills, best_role
+
+    def scores(self, jd: Union[str, ParsedDocument]) -> Dict[Hashable, float]:
+        """match_percentage of every candidate against the JD."""
+        if not self._slots:
+            return {}
+        scores, _, _ = self._score_slots(as_parsed(jd, is_jd=True))
+        return {cid: float(scores[slot]) for cid, slot in self._slots.items()}
+
+    def query(self, jd: Union[str, ParsedDocument], top_k: int = 10) -> List[Dict]:
+        """
+        Top-k candidates for a JD, best first.
+
+        Each entry has candidate_id, match_percentage (same value as
+        analyze_gap(cv, jd)), matching_hard, transferable and missing_hard.
+        Ties keep index order.
+        """
+        if not self._slots:
+            return []
+        scores, jd_skills, _ = self._score_slots(as_parsed(jd, is_jd=True))
+        active = np.fromiter(sorted(self._slots.values()), dtype=np.intp)
+        order = active[np.argsort(-scores[active], kind="stable")][:top_k]
+
+        results = []
+        for slot in order:
+            direct_bits = self._direct_bits[slot]
+            expanded_bits = self._expanded_bits[slot]
+            cluster_bits = self._cluster_bits[slot]
+            matched, transferable, missing = [], [], []
+            for jd_skill in jd_skills:
+                jd_norm = jd_skill.lower()
+                sid = self._vocab.get(jd_norm)
+                if sid is not None and (direct_bits | expanded_bits) >> sid & 1:
+                    matched.append(jd_skill)
+                elif any(cluster_bits >> cid & 1 for cid in self._clusters_of.get(jd_norm, ())):
+                    transferable.append(jd_skill)
+                else:
+                    missing.append(jd_skill)
+            results.append({
+                "candidate_id": self._ids[slot],
+                "match_percentage": float(scores[slot]),
+                "matching_hard": matched,
+                "transferable": transferable,
+                "missing_hard": missing,
+            })
+        return results
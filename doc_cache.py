@@ -0,0 +1,223 @@
+"""
+================================================================================
+CareerMatch AI - Parsed Document Cache
+================================================================================
+
+A single "Analyze" click used to run extract_skills_from_text on the same
+CV and JD several times (analyze_gap, analyze_gap_with_project,
+analyze_cover_letter, the CV builder suggestions). Extraction only depends
+on the text, the is_jd flag and the knowledge base, so the results are
+cached in a content-addressed LRU:
+
+    key = (sha256(text), is_jd, knowledge-base version)
+
+A ParsedDocument holds the extracted hard/soft skills (frozen, callers get
+copies via .skills()) and lazily computes seniority, language and domain.
+Analysis functions accept either a string or a ParsedDocument.
+
+The cache is shared by the Streamlit session threads, so every access to
+the store holds a lock; parsing a miss runs outside it.
+
+Public API:
+- ParsedDocument                 -> .skills(), .hard, .soft, .expanded, .signals, .seniority, .language, .domain
+- DocumentCache(maxsize)         -> .get(text, is_jd), .put(doc), .stats(), .clear()
+- parse_document(text, is_jd)    -> ParsedDocument from the shared cache
+- as_parsed(doc, is_jd)          -> ParsedDocument for a str or ParsedDocument
+================================================================================
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Optional, Set, Tuple, Union
+
+import skill_graph
+from kb_version import knowledge_base_version
+
+
+# Tables extraction and the derived fields read (part of the cache key):
+# skill automata and typo indexes, inference rules and domain boost, the
+# signal scanner (scoring_core.SIGNAL_TABLES), the JD cleaner
+# (JD_CLEANER_TABLES) and the role-title fallback with the skill graph it
+# expands on (ROLE_TITLE_TABLES). scoring_core imports this module, so the
+# names are listed here.
+EXTRACTION_TABLES = tuple(dict.fromkeys((
+    "HARD_SKILLS", "SOFT_SKILLS", "INFERENCE_RULES", "DOMAIN_EXTRACTION_RULES",
+    "SENIORITY_KEYWORDS", "CONTEXT_SIGNALS",
+    "NON_SKILL_PATTERNS",
+    "JOB_ARCHETYPES", "JOB_ARCHETYPES_EXTENDED",
+) + skill_graph.GRAPH_TABLES))
+
+# Shared cache size (documents, not bytes: a parsed CV is a few KB).
+DEFAULT_MAXSIZE = 256
+
+# "Not computed yet" for lazy fields whose value may be None (language)
+_UNSET = object()
+
+
+def text_digest(text: str) -> str:
+    """SHA-256 hex digest of a document text."""
+    return hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class ParsedDocument:
+    """Extraction results for one text (immutable; derived fields are lazy)."""
+
+    def __init__(self, text: str, is_jd: bool = False):
+        # scoring_core imports this module, so resolve it at call time.
+        import scoring_core
+
+        self.text = text
+        self.is_jd = is_jd
+        self.digest = text_digest(text)
+        hard, soft = scoring_core.extract_skills_from_text(text, is_jd=is_jd)
+        self.hard: FrozenSet[str] = frozenset(hard)
+        self.soft: FrozenSet[str] = frozenset(soft)
+        self._signals = None
+        self._seniority: Optional[Tuple[str, float]] = None
+        self._language = _UNSET
+        self._domain: Optional[str] = None
+        self._expanded: Optional[FrozenSet[str]] = None
+
+    def __repr__(self) -> str:
+        kind = "JD" if self.is_jd else "doc"
+        return f"ParsedDocument({kind} {self.digest[:10]}, {len(self.hard)} hard, {len(self.soft)} soft)"
+
+    def __bool__(self) -> bool:
+        return bool(self.text)
+
+    def __getstate__(self) -> Dict:
+        # Documents are shipped to worker processes: drop the scan (it
+        # references the compiled scanner); the derived fields travel.
+        state = dict(self.__dict__)
+        state["_signals"] = None
+        if state["_language"] is _UNSET:
+            del state["_language"]  # the sentinel does not survive pickling
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        self.__dict__.update(state)
+        self.__dict__.setdefault("_language", _UNSET)
+
+    def skills(self) -> Tuple[Set[str], Set[str]]:
+        """(hard, soft) as new mutable sets, like extract_skills_from_text."""
+        return set(self.hard), set(self.soft)
+
+    @property
+    def expanded(self) -> FrozenSet[str]:
+        """Lowercase hard skills after bidirectional expansion (hierarchy, clusters)."""
+        if self._expanded is None:
+            import scoring_core
+            self._expanded = frozenset(scoring_core.expand_skills_bidirectional({s.lower() for s in self.hard}))
+        return self._expanded
+
+    @property
+    def signals(self):
+        """TextSignals of one scan, shared by seniority and domain."""
+        if self._signals is None:
+            import scoring_core
+            self._signals = scoring_core.scan_text_signals(self.text)
+        return self._signals
+
+    @property
+    def seniority(self) -> Tuple[str, float]:
+        """detect_seniority(text) -> (level, confidence)."""
+        if self._seniority is None:
+            self._seniority = self.signals.seniority() if self.text else ("Mid Level", 0.0)
+        return self._seniority
+
+    @property
+    def language(self) -> Optional[str]:
+        """detect_language(text) (None when the text names no language)."""
+        if self._language is _UNSET:
+            import scoring_core
+            self._language = scoring_core.detect_language(self.text)
+        return self._language
+
+    @property
+    def domain(self) -> str:
+        """detect_domain_context(text)."""
+        if self._domain is None:
+            self._domain = self.signals.domain()
+        return self._domain
+
+
+class DocumentCache:
+    """Bounded, thread-safe LRU of ParsedDocument keyed by content hash + is_jd + KB version."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._docs: "OrderedDict[Tuple[str, bool, str], ParsedDocument]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._docs)
+
+    @staticmethod
+    def _key(digest: str, is_jd: bool) -> Tuple[str, bool, str]:
+        return (digest, bool(is_jd), knowledge_base_version(*EXTRACTION_TABLES))
+
+    def peek(self, text: str, is_jd: bool = False) -> Optional[ParsedDocument]:
+        """Cached document for text, without parsing or touching the counters."""
+        key = self._key(text_digest(text or ""), is_jd)
+        with self._lock:
+            return self._docs.get(key)
+
+    def put(self, doc: ParsedDocument) -> None:
+        """Insert a document parsed elsewhere (e.g. in a worker process)."""
+        key = self._key(doc.digest, doc.is_jd)
+        with self._lock:
+            self._docs[key] = doc
+            self._docs.move_to_end(key)
+            while len(self._docs) > self.maxsize:
+                self._docs.popitem(last=False)
+
+    def get(self, text: str, is_jd: bool = False) -> ParsedDocument:
+        text = text or ""
+        key = self._key(text_digest(text), is_jd)
+        with self._lock:
+            doc = self._docs.get(key)
+            if doc is not None:
+                self._docs.move_to_end(key)
+                self.hits += 1
+                return doc
+            self.misses += 1
+
+        doc = ParsedDocument(text, is_jd=bool(is_jd))
+        self.put(doc)
+        return doc
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._docs), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._docs.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# =============================================================================
+# SHARED CACHE
+# =============================================================================
+DOCUMENT_CACHE = DocumentCache()
+
+
+def parse_document(text: str, is_jd: bool = False) -> ParsedDocument:
+    """ParsedDocument for text from the shared cache."""
+    return DOCUMENT_CACHE.get(text, is_jd)
+
+
+def as_parsed(doc: Union[str, ParsedDocument], is_jd: bool = False) -> ParsedDocument:
+    """Accept either raw text or an already parsed document."""
+    if isinstance(doc, ParsedDocument):
+        if doc.is_jd == bool(is_jd):
+            return doc
+        doc = doc.text
+    return parse_document(doc, is_jd)
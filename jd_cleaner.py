@@ -0,0 +1,120 @@
+"""
+================================================================================
+CareerMatch AI - Precompiled JD Cleaning Pipeline
+================================================================================
+
+preprocess_jd_text used to run one re.sub per section header and one per
+NON_SKILL_PATTERNS entry on every call:
+
+- section removal: `(?:^|\\n)\\s*<header>[:\\s]*.*?(?=\\n\\s*[A-Z]|\\n\\n|\\Z)`
+  with DOTALL. On long runs of blank lines every start position rescans the
+  whole run, so a 50 KB paste of empty lines took minutes. The header
+  alternations were also ungrouped, so only the first alternative was
+  anchored to a line start and only the last one removed a section.
+- pattern removal: ~15 separate passes, with invalid patterns skipped by
+  a try/except on every call.
+
+The ungrouped alternations did one useful thing: a header word in running
+text ("great benefits and perks") was blanked as well. That is kept as an
+explicit inline pass.
+
+JDCleaner compiles the tables once (per knowledge-base version, see
+scoring_core.get_jd_cleaner):
+
+- the section headers become one alternation, matched against whole lines
+  by a line-oriented segmenter (linear time), and one word-bounded
+  alternation that blanks them inline
+- the non-skill patterns are compiled once and applied one after the
+  other in category order, as before: a later pattern sees the text left
+  by the earlier ones ("salary: €35,000" keeps "salary:" because the
+  amount is gone before the "salary <amount>" pattern runs)
+- an invalid pattern raises ValueError when the cleaner is built, naming
+  the category and the pattern
+
+Section rule: only a header-only line ("Benefits", "What we offer:")
+starts a section. A line that merely begins with a header word ("Benefits
+of this role include Terraform") is running text. The section runs until
+a blank line or a line that starts with a letter (the end condition of the
+old lookahead, \n\s*[A-Z] under IGNORECASE), so the bullet list under
+"What we offer:" goes with it and the next heading or paragraph stays.
+
+Public API:
+- FILTER_CATEGORIES                        -> NON_SKILL_PATTERNS categories applied
+- JDCleaner(non_skill_patterns, categories) -> .clean(text), .remove_sections(text)
+================================================================================
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Sequence
+
+# NON_SKILL_PATTERNS categories removed from a JD, in application order
+FILTER_CATEGORIES = (
+    "salary", "hours", "duration", "benefits", "contract",
+    "eligibility", "training", "agency", "freelance", "volunteering", "legal",
+)
+
+# A header-only line: header plus an optional colon
+_HEADER_TEMPLATE = r"\s*(?:{alternation})\s*:?\s*"
+# Header words in running text ("We offer great benefits and perks.")
+_INLINE_TEMPLATE = r"\b(?:{alternation})\b"
+
+
+def _compile(patterns: List[str], category: str, template: str = "{alternation}") -> re.Pattern:
+    """One case-insensitive alternation of patterns (each validated on its own)."""
+    for pattern in patterns:
+        try:
+            re.compile(pattern)
+        except re.error as exc:
+            raise ValueError(f"Invalid NON_SKILL_PATTERNS[{category!r}] pattern {pattern!r}: {exc}") from None
+    alternation = "|".join(f"(?:{p})" for p in patterns)
+    return re.compile(template.format(alternation=alternation), re.IGNORECASE)
+
+
+class JDCleaner:
+    """
+    Compiled NON_SKILL_PATTERNS.
+
+    non_skill_patterns: {"section_headers": [regex], <category>: [regex], ...}
+    categories:         categories whose patterns are removed (FILTER_CATEGORIES)
+    """
+
+    def __init__(self, non_skill_patterns: Dict[str, Sequence[str]], categories: Sequence[str] = FILTER_CATEGORIES):
+        headers = list(non_skill_patterns.get("section_headers", []))
+        self.header_regex = _compile(headers, "section_headers", _HEADER_TEMPLATE) if headers else None
+        self.inline_regex = _compile(headers, "section_headers", _INLINE_TEMPLATE) if headers else None
+        self.pattern_regexes: List[re.Pattern] = []
+        for category in categories:
+            for pattern in non_skill_patterns.get(category, []):
+                self.pattern_regexes.append(_compile([pattern], category))
+
+    def remove_sections(self, text: str) -> str:
+        """Drop the non-skill sections (header line + its content lines)."""
+        if self.header_regex is None:
+            return text
+        is_header = self.header_regex.fullmatch
+        kept = []
+        lines = text.split("\n")
+        i, n = 0, len(lines)
+        while i < n:
+            if is_header(lines[i]) is None:
+                kept.append(lines[i])
+                i += 1
+                continue
+            i += 1
+            while i < n:
+                stripped = lines[i].lstrip()
+                if not stripped or stripped[0].isalpha():
+                    break
+                i += 1
+        return "\n".join(kept)
+
+    def clean(self, text: str) -> str:
+        """Sections removed, header words and non-skill patterns blanked, whitespace collapsed."""
+        cleaned = self.remove_sections(text)
+        if self.inline_regex is not None:
+            cleaned = self.inline_regex.sub(" ", cleaned)
+        for regex in self.pattern_regexes:
+            cleaned = regex.sub(" ", cleaned)
+        return " ".join(cleaned.split())
@@ -0,0 +1,77 @@
+"""
+================================================================================
+CareerMatch AI - Knowledge Base Versioning
+================================================================================
+
+Several indexes (skill automaton, skill graph, archetype vectors, persisted
+models) are expensive to build but only depend on the static tables in
+knowledge_base.py / constants.py. They are built once and reused until the
+knowledge base changes. This module provides the version key they share.
+
+Public API:
+- fingerprint(*objects)               -> stable SHA-1 hex digest
+- knowledge_base_version(*table_names) -> fingerprint of the named tables
+
+The fingerprint is stable across processes (sets are sorted before hashing,
+so it does not depend on PYTHONHASHSEED) which makes it usable as an on-disk
+artifact key as well as an in-memory cache key.
+================================================================================
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Dict, Tuple
+
+import knowledge_base
+
+
+def _json_default(obj):
+    """Serialize sets deterministically (sorted) and anything else via repr."""
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=repr)
+    return repr(obj)
+
+
+def fingerprint(*objects) -> str:
+    """Stable SHA-1 of arbitrary JSON-like objects (dicts, lists, sets)."""
+    payload = json.dumps(objects, sort_keys=True, default=_json_default, ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+# Hashing the full tables costs ~0.5ms; callers check the version on every
+# request, so we memoize the digest on a cheap "shape" key (identity + size
+# of each table). Re-assigning a table or adding/removing entries changes
+# the shape and triggers a re-hash.
+_VERSION_CACHE: Dict[Tuple, str] = {}
+
+
+def _resolve_table(name: str):
+    if hasattr(knowledge_base, name):
+        return getattr(knowledge_base, name)
+    import constants
+    return getattr(constants, name, {})
+
+
+def knowledge_base_version(*table_names: str) -> str:
+    """
+    Version key for the given knowledge-base tables.
+
+    Tables are looked up in knowledge_base first, then constants (e.g.
+    DOMAIN_EXTRACTION_RULES only lives in constants).
+    """
+    tables = [_resolve_table(name) for name in table_names]
+    shape = tuple((name, id(t), len(t)) for name, t in zip(table_names, tables))
+    version = _VERSION_CACHE.get(shape)
+    if version is None:
+        version = fingerprint(*tables)
+        if len(_VERSION_CACHE) > 64:
+            _VERSION_CACHE.clear()
+        _VERSION_CACHE[shape] = version
+    return version
+
+
+def clear_version_cache() -> None:
+    """Force re-hashing on next call (after in-place edits of nested lists)."""
+    _VERSION_CACHE.clear()
@@ -0,0 +1,300 @@
+"""
+================================================================================
+CareerMatch AI - Character N-gram Language Identifier
+================================================================================
+
+One language-ID model for both paths that used to carry their own
+hand-rolled detector:
+
+- scoring_core.detect_language (CVs, cover letters): " marker " substring
+  tests, native language inferred from the CV language (the markers remain
+  its evidence gate: without them the result is None, see there why)
+- ml_utils._detect_chat_language (Ruben chat): word lists tested three
+  times per word per language
+
+The model is a multinomial naive Bayes over character 1-3 grams (words
+padded with spaces, digits and punctuation dropped). N-grams are hashed
+into N_BUCKETS columns, and the smoothed log-probabilities live in one
+(languages x buckets) float32 NumPy array. It is trained on first use from
+the short career-domain corpus below, in a few milliseconds. Chat messages
+are often just a greeting and the assistant's name, so the corpus has a
+line of short greetings per language and the name is dropped from every
+text (NEUTRAL_WORDS).
+
+Scoring is one vectorized pass. The text is encoded as code points, the
+n-gram bucket ids are computed with array arithmetic, and the
+log-probability columns are gathered and summed per language. Each
+character sits in up to three overlapping n-grams, so naive Bayes counts
+the same evidence three times and its posteriors are near 1 even for
+gibberish ("xyz123"). The confidence is the posterior of the best
+language with the log-likelihoods divided by TEMPERATURE to undo that.
+Results are cached in a result_cache.ResultCache (bounded LRU, no expiry)
+keyed by the SHA-256 of the text.
+
+Public API:
+- LANGUAGES / LANGUAGE_NAMES         -> supported codes (en, it, es, fr, de, pt) and names
+- identify(text)                     -> LanguageGuess(code, name, confidence, ngrams)
+- get_model()                        -> LanguageModel (.score(text), .log_probs)
+- IDENTIFY_CACHE                     -> shared ResultCache (.stats(), .clear())
+================================================================================
+"""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+from result_cache import ResultCache
+
+LANGUAGES = ("en", "it", "es", "fr", "de", "pt")
+LANGUAGE_NAMES = {
+    "en": "English", "it": "Italian", "es": "Spanish",
+    "fr": "French", "de": "German", "pt": "Portuguese",
+}
+
+# Hashed feature space (prime, so bucket ids spread evenly) and n-gram orders
+N_BUCKETS = 16381
+NGRAM_ORDERS = (1, 2, 3)
+# Add-alpha smoothing of the per-language n-gram counts
+SMOOTHING = 0.1
+# Log-likelihood divisor of the confidence (one per overlapping n-gram order)
+TEMPERATURE = float(len(NGRAM_ORDERS))
+
+# Shared cache size (texts)
+DEFAULT_MAXSIZE = 1024
+
+# Digits, punctuation and underscores separate words like spaces do
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+
+# Words that say nothing about the language. The assistant's name ends in
+# "-en" like most German verbs and plurals, so "hello Ruben" read as German.
+NEUTRAL_WORDS = frozenset({"ruben"})
+
+# Training corpus: career-domain prose, chat questions and greetings per
+# language. Loanwords common in every language's CVs (CV, data, Python,
+# manager) appear in all of them, so they carry little weight.
+TRAINING_TEXTS: Dict[str, str] = {
+    "en": """
+        hello hi hey good morning good afternoon thanks thank you please help
+        hello there hi there hey there hello again hi how are you hello thanks a lot
+        I am a data analyst with three years of experience in the team. I have worked
+        with Python, SQL and Tableau to build dashboards for the marketing and sales
+        managers. Previously I was an intern at a consulting company, where I developed
+        reports and managed the weekly data quality checks. Education: bachelor degree in
+        economics at the university, master in data science. Skills: communication,
+        teamwork, problem solving, leadership. Languages: English, Italian.
+        We are looking for a data scientist who will join our team and work with the
+        product managers. You will design models, analyse customer behaviour and present
+        the results to stakeholders. Requirements: strong statistics, machine learning,
+        cloud experience is a plus. What we offer: remote work, flexible hours, training.
+        How can I improve my CV? What should I write in a cover letter? How do I prepare
+        for the interview? Which skills should I learn to become a data engineer? Where
+        can I find jobs that are remote? How much does this role pay? Can you help me
+        with my career change? What is the best way to negotiate the salary offer?
+        the and of to in is was were been have has with that this for from which would
+        could should about their there what when where who how work experience education
+    """,
+    "it": """
+        ciao salve buongiorno buonasera grazie mille prego aiuto per favore
+        ciao a tutti ciao come stai salve ciao grazie tante buona giornata
+        Sono un data analyst con tre anni di esperienza lavorativa nel team. Ho lavorato
+        con Python, SQL e Tableau per costruire dashboard per i responsabili marketing e
+        vendite. In precedenza ho svolto un tirocinio presso una società di consulenza,
+        dove ho sviluppato report e gestito i controlli settimanali sulla qualità dei dati.
+        Istruzione: laurea in economia presso l'università, laurea magistrale in data
+        science. Competenze tecniche: comunicazione, lavoro di squadra, gestione dei
+        progetti, capacità di analisi. Lingue: italiano, inglese.
+        Cerchiamo un data scientist che entrerà nel nostro gruppo e lavorerà con i product
+        manager. Progetterai modelli, analizzerai il comportamento dei clienti e presenterai
+        i risultati. Requisiti: ottima conoscenza della statistica, machine learning,
+        l'esperienza cloud è un plus. Offriamo: lavoro da remoto, orario flessibile.
+        Come posso migliorare il mio curriculum? Cosa devo scrivere nella lettera di
+        presentazione? Come mi preparo al colloquio? Quali competenze devo imparare? Dove
+        trovo offerte di lavoro? Quanto è lo stipendio per questo ruolo? Puoi aiutarmi a
+        cambiare carriera? Vorrei sapere come usare questo strumento.
+        il lo la gli le di è per delle della nella sono che con una del nel alla dalla
+        questo quando dove chi cosa come posso vorrei perché anche molto sviluppo
+    """,
+    "es": """
+        hola buenos días buenas tardes gracias muchas gracias por favor ayuda
+        hola qué tal hola a todos buenas hola cómo estás saludos muchas gracias
+        Soy analista de datos con tres años de experiencia laboral en el equipo. He
+        trabajado con Python, SQL y Tableau para crear paneles para los responsables de
+        marketing y ventas. Anteriormente hice prácticas en una empresa de consultoría,
+        donde desarrollé informes y gestioné los controles semanales de calidad de los
+        datos. Educación: licenciatura en economía en la universidad, máster en ciencia de
+        datos. Habilidades: comunicación, trabajo en equipo, resolución de problemas,
+        liderazgo. Idiomas: español, inglés.
+        Buscamos un científico de datos que se unirá a nuestro equipo y trabajará con los
+        gerentes de producto. Diseñarás modelos, analizarás el comportamiento de los
+        clientes y presentarás los resultados. Requisitos: sólidos conocimientos de
+        estadística, aprendizaje automático, la experiencia en la nube es un plus.
+        Ofrecemos: trabajo remoto, horario flexible. ¿Cómo puedo mejorar mi currículum?
+        ¿Qué debo escribir en la carta de presentación? ¿Cómo me preparo para la
+        entrevista? ¿Qué habilidades necesito aprender? ¿Dónde busco ofertas de empleo?
+        ¿Cuánto se gana en este puesto? ¿Puedes ayudarme a cambiar de carrera? Necesito
+        saber cómo usar esta herramienta.
+        el la los las de en que y es para con una por como más del pero también muy
+        quiero puedo necesito cuando donde quien desarrollo trabajo experiencia
+    """,
+    "fr": """
+        bonjour bonsoir salut merci merci beaucoup s'il vous plaît aide
+        salut à tous bonjour à vous coucou ça va bonne journée merci bien
+        Je suis analyste de données avec trois ans d'expérience professionnelle dans
+        l'équipe. J'ai travaillé avec Python, SQL et Tableau pour créer des tableaux de
+        bord pour les responsables marketing et ventes. Auparavant, j'ai fait un stage
+        dans un cabinet de conseil, où j'ai développé des rapports et géré les contrôles
+        hebdomadaires de la qualité des données. Formation : licence en économie à
+        l'université, master en science des données. Compétences : communication, travail
+        en équipe, résolution de problèmes, leadership. Langues : français, anglais.
+        Nous recherchons un data scientist qui rejoindra notre équipe et travaillera avec
+        les chefs de produit. Vous concevrez des modèles, analyserez le comportement des
+        clients et présenterez les résultats. Profil : solides connaissances en
+        statistiques, apprentissage automatique, une expérience du cloud est un plus. Nous
+        offrons : télétravail, horaires flexibles. Comment puis-je améliorer mon CV ? Que
+        dois-je écrire dans la lettre de motivation ? Comment préparer mon entretien ?
+        Quelles compétences dois-je apprendre ? Où trouver des offres d'emploi ? Combien
+        gagne-t-on dans ce poste ? Pouvez-vous m'aider à changer de carrière ? Je voudrais
+        savoir comment utiliser cet outil.
+        le la les de du des et en est une un pour avec dans sur je vous nous mon mes
+        qui quoi quand où comment pourquoi aussi très développement travail
+    """,
+    "de": """
+        hallo guten tag guten morgen guten abend danke vielen dank bitte hilfe
+        hallo zusammen hallo wie geht es dir hallo servus moin hallo danke schön
+        Ich bin Datenanalyst mit drei Jahren Berufserfahrung im Team. Ich habe mit Python,
+        SQL und Tableau gearbeitet, um Dashboards für die Marketing- und Vertriebsleiter
+        zu erstellen. Zuvor habe ich ein Praktikum bei einer Beratungsfirma gemacht, wo
+        ich Berichte entwickelt und die wöchentlichen Prüfungen der Datenqualität
+        verwaltet habe. Ausbildung: Bachelor in Wirtschaftswissenschaften an der
+        Universität, Master in Data Science. Kenntnisse: Kommunikation, Teamarbeit,
+        Problemlösung, Führung. Sprachen: Deutsch, Englisch.
+        Wir suchen einen Data Scientist, der unser Team verstärkt und mit den
+        Produktmanagern zusammenarbeitet. Sie entwickeln Modelle, analysieren das
+        Kundenverhalten und präsentieren die Ergebnisse. Anforderungen: sehr gute
+        Kenntnisse in Statistik, maschinelles Lernen, Erfahrung mit der Cloud ist von
+        Vorteil. Wir bieten: Homeoffice, flexible Arbeitszeiten. Wie kann ich meinen
+        Lebenslauf verbessern? Was soll ich im Anschreiben schreiben? Wie bereite ich mich
+        auf das Vorstellungsgespräch vor? Welche Fähigkeiten soll ich lernen? Wo finde ich
+        Stellenangebote? Wie viel verdient man in dieser Position? Kannst du mir beim
+        Berufswechsel helfen? Ich möchte wissen, wie ich dieses Tool benutzen kann.
+        der die das und in ist mit für von zu auf bei eine einer eines nicht auch sehr
+        ich kann möchte wie was wo wann wer arbeit entwicklung erfahrung
+    """,
+    "pt": """
+        olá oi bom dia boa tarde boa noite obrigado obrigada muito obrigado ajuda
+        oi tudo bem olá a todos oi como vai você valeu obrigado pela ajuda
+        Sou analista de dados com três anos de experiência profissional na equipe.
+        Trabalhei com Python, SQL e Tableau para criar painéis para os gerentes de
+        marketing e vendas. Antes fiz um estágio numa empresa de consultoria, onde
+        desenvolvi relatórios e geri os controles semanais da qualidade dos dados.
+        Educação: licenciatura em economia na universidade, mestrado em ciência de dados.
+        Habilidades: comunicação, trabalho em equipe, resolução de problemas, liderança.
+        Idiomas: português, inglês.
+        Procuramos um cientista de dados que vai integrar a nossa equipe e trabalhar com
+        os gerentes de produto. Você vai projetar modelos, analisar o comportamento dos
+        clientes e apresentar os resultados. Requisitos: sólidos conhecimentos de
+        estatística, aprendizado de máquina, experiência em nuvem é um diferencial.
+        Oferecemos: trabalho remoto, horário flexível. Como posso melhorar meu currículo?
+        O que devo escrever na carta de apresentação? Como me preparo para a entrevista?
+        Quais habilidades devo aprender? Onde encontro vagas de emprego? Quanto ganha
+        quem trabalha nesta função? Você pode me ajudar a mudar de carreira? Preciso
+        saber como usar esta ferramenta.
+        o a os as de em que e é para com uma por como mais do da não também muito
+        quero posso preciso quando onde quem isso meu desenvolvimento trabalho
+    """,
+}
+
+
+class LanguageGuess(NamedTuple):
+    code: str            # "en", "it", ...
+    name: str            # "English", "Italian", ...
+    confidence: float    # tempered posterior of the best language (0-1)
+    ngrams: int          # evidence: n-grams scored (0 for texts without letters)
+
+
+# =============================================================================
+# FEATURES
+# =============================================================================
+def normalize(text: str) -> str:
+    """Lowercase letters only, words separated and padded by single spaces (NEUTRAL_WORDS dropped)."""
+    words = [w for w in _NON_LETTERS.sub(" ", text.lower()).split() if w not in NEUTRAL_WORDS]
+    return " " + " ".join(words) + " " if words else ""
+
+
+def ngram_ids(normalized: str) -> np.ndarray:
+    """Bucket ids of all 1-3 grams of a normalized text (vectorized)."""
+    if not normalized:
+        return np.zeros(0, dtype=np.intp)
+    codes = np.frombuffer(normalized.encode("utf-32-le"), dtype=np.uint32).astype(np.int64)
+    base = 0x110000  # code points are < base, so (c0, c1, c2) -> c0*base^2 + ... is exact
+    ids = []
+    for n in NGRAM_ORDERS:
+        if len(codes) < n:
+            break
+        h = codes[:len(codes) - n + 1].copy()
+        for k in range(1, n):
+            h = h * base + codes[k:len(codes) - n + 1 + k]
+        if n == 1:
+            h = h[h != 32]  # a lone space carries no information
+        ids.append((h % N_BUCKETS + n * 7919) % N_BUCKETS)
+    return np.concatenate(ids).astype(np.intp)
+
+
+# =============================================================================
+# MODEL
+# =============================================================================
+class LanguageModel:
+    """(languages x buckets) float32 log-probabilities of hashed char n-grams."""
+
+    def __init__(self, texts: Dict[str, str] = None, smoothing: float = SMOOTHING):
+        texts = TRAINING_TEXTS if texts is None else texts
+        self.languages = tuple(texts)
+        counts = np.zeros((len(self.languages), N_BUCKETS), dtype=np.float64)
+        for row, lang in enumerate(self.languages):
+            np.add.at(counts[row], ngram_ids(normalize(texts[lang])), 1.0)
+        counts += smoothing
+        self.log_probs = np.log(counts / counts.sum(axis=1, keepdims=True)).astype(np.float32)
+
+    def score(self, text: str) -> LanguageGuess:
+        ids = ngram_ids(normalize(text))
+        if not len(ids):
+            return LanguageGuess("en", LANGUAGE_NAMES["en"], 0.0, 0)
+        log_likelihood = self.log_probs[:, ids].sum(axis=1, dtype=np.float64) / TEMPERATURE
+        posterior = np.exp(log_likelihood - log_likelihood.max())
+        posterior /= posterior.sum()
+        best = int(posterior.argmax())
+        code = self.languages[best]
+        return LanguageGuess(code, LANGUAGE_NAMES.get(code, code), float(posterior[best]), int(len(ids)))
+
+
+_MODEL: Optional[LanguageModel] = None
+
+
+def get_model() -> LanguageModel:
+    """The shared model, trained on first use."""
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = LanguageModel()
+    return _MODEL
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+# LanguageGuess per SHA-256 of the text; guesses never go stale
+IDENTIFY_CACHE = ResultCache(maxsize=DEFAULT_MAXSIZE, ttl=float("inf"))
+
+
+def identify(text: str) -> LanguageGuess:
+    """Most likely language of text, with its posterior as confidence (cached)."""
+    text = text or ""
+    digest = hashlib.sha256(text.encode("utf-8", "surrogatepass")).hexdigest()
+    found, guess = IDENTIFY_CACHE.get(digest)
+    if not found:
+        guess = get_model().score(text)
+        IDENTIFY_CACHE.put(digest, guess)
+    return guess
@@ -64,10 +64,13 @@ L'applicazione segue il processo KDD classico:
 ================================================================================
 """
 
+import io
 import re
-import pandas as pd
-import streamlit as st
-from typing import Set, Dict, Tuple, List
+import functools
+import importlib
+import threading
+import numpy as np
+from typing import Set, Dict, Tuple, List, Optional
 import urllib.parse
 
 # =============================================================================
@@ -89,95 +92,78 @@ try:
     from sklearn.decomposition import PCA, TruncatedSVD
     from sklearn.metrics.pairwise import cosine_similarity
     from sklearn.model_selection import train_test_split
-    import scipy.cluster.hierarchy as sch
-    import matplotlib.pyplot as plt
-    from wordcloud import WordCloud
 except ImportError:
     # Fallback to None if not installed (though requirements.txt should cover it)
     RandomForestClassifier = None
     TfidfVectorizer = None
     Pipeline = None
     KMeans = None
-    WordCloud = None
     TruncatedSVD = None
 
-try:
-    from pypdf import PdfReader
-except ImportError:
-    PdfReader = None
+# =============================================================================
+# LIBRERIE OPZIONALI (import lazy)
+# =============================================================================
+# Visualizzazione (matplotlib, scipy.cluster.hierarchy, wordcloud), report
+# (fpdf), PDF (pypdf), NLP (nltk) e pandas vengono importati al primo uso:
+# chi usa solo lo scoring (scoring_core.py) non ne paga il costo di avvio.
+
+def _lazy_import(module: str, attr: str = None):
+    """Import module (or module.attr) on first use; None if not installed."""
+    try:
+        mod = importlib.import_module(module)
+    except ImportError:
+        return None
+    return getattr(mod, attr, None) if attr else mod
 
 # Smart Ruben intent classifier (M3)
 import ruben_intent
 
-try:
-    from fpdf import FPDF
-except ImportError:
-    FPDF = None
+# Character n-gram language identifier (chat language, shared with detect_language)
+import lang_id
 
-import nltk
-try:
-    nltk.data.find('tokenizers/punkt')
-except (LookupError, AttributeError):
-    pass # Managed in separate function if needed
+# Compiled skill automaton (Aho-Corasick over HARD_SKILLS / SOFT_SKILLS)
+import skill_matcher
 
-# =============================================================================
-import knowledge_base
-import constants
-# =============================================================================
-def detect_seniority(text: str) -> Tuple[str, float]:
-    """
-    Detects seniority level (Junior, Mid, Senior) from text.
-    Returns: (Level, Confidence)
-    """
-    if not text:
-        return "Mid Level", 0.0
-        
-    text_lower = text.lower()
-    
-    # 1. Regex for years of experience
-    import re
-    years_matches = re.findall(r'(\d+)\s*(?:\+|plus)?\s*(?:years|anni)', text_lower)
-    max_years = 0
-    if years_matches:
-        try:
-            max_years = max([int(y) for y in years_matches if int(y) < 50]) # Filter realistic
-        except ValueError:
-            max_years = 0
-    
-    # 2. Keyword counting with Regex Boundaries
-    seniority_map = getattr(knowledge_base, "SENIORITY_KEYWORDS", {})
-    scores = {"Entry Level": 0, "Mid Level": 0, "Senior Level": 0}
-    
-    for level, keywords in seniority_map.items():
-        for kw in keywords:
-            # Use regex to find whole words only (avoids "management" matching "manage")
-            # Escape keyword to handle special chars if any
-            if re.search(r'\b' + re.escape(kw) + r'\b', text_lower):
-                scores[level] += 1
-                
-    # Logic: Explicit years overrides keywords usually
-    if max_years >= 5:
-        return "Senior Level", 0.9
-        
-    # Student/Intern override (Strong signal for Entry Level)
-    if scores["Entry Level"] > 0 and max_years < 3:
-        return "Entry Level", 0.85
-
-    # Years check for Mid/Entry
-    if max_years >= 3:
-        return "Mid Level", 0.8
-    elif max_years >= 1:
-        return "Entry Level", 0.8
-        
-    # Keyword fallback
-    best_level = max(scores, key=scores.get)
-    if scores[best_level] > 0:
-        # If Senior is detected by keyword but no years, be skeptical?
-        if best_level == "Senior Level" and max_years == 0:
-             return "Mid Level", 0.5 # Downgrade to Mid if no years proof
-        return best_level, 0.7
-        
-    return "Mid Level", 0.3 # Default assumption
+# Precomputed skill expansion closure (cluster / hierarchy / implications)
+import skill_graph
+
+# Fit-once archetype vector index (TF-IDF + LSA over JOB_ARCHETYPES_EXTENDED)
+import role_index
+
+# Persisted, versioned model artifacts (joblib, memory-mapped)
+import model_store
+
+# Skill map fitted once on the vocabulary (TF-IDF vectors, PCA layout, K-Means clusters)
+import skill_embedding
+
+# Topic model pretrained on a reference JD corpus (transform-only LDA)
+import topic_model
+
+# Bounded LRU shared by sessions (clustering results)
+from result_cache import ResultCache
+from kb_version import fingerprint
+
+# Content-addressed cache of parsed documents (skills, seniority, language)
+import doc_cache
+from doc_cache import ParsedDocument, parse_document, as_parsed
+
+# PDF text extraction (SHA-256 cache, page caps, page-parallel)
+import pdf_text
+
+# Streamlit-free scoring core (skill extraction, gap analysis, role scoring),
+# re-exported here for backward compatibility
+import scoring_core
+from scoring_core import (
+    detect_seniority, detect_seniority_level, detect_domain_context, detect_language,
+    scan_text_signals, extract_generic_keywords, preprocess_jd_text, get_role_title_index, extract_skills_from_text, fuzz,
+    WEIGHT_DIRECT, WEIGHT_INFERRED, WEIGHT_TRANSFERABLE, WEIGHT_PROJECT_ONLY,
+    calculate_match_score, calculate_match_scores, _round_scores,
+    _calculate_composite_role_score, _calculate_composite_role_scores,
+    _jd_requirements, analyze_gap, _parse_jd_chunk, iter_gap_many, analyze_gap_many,
+    EDUCATION_TO_ROLES, _education_role_boosts, _expand_cv_skills,
+    recommend_roles, score_role, score_role_many,
+    expand_skills_bidirectional, expand_skills_with_clusters,
+)
 
 import knowledge_base
 import constants
@@ -200,7 +186,54 @@ import constants
 # Nel nostro caso: classifica frammenti di testo in categorie di skill
 # =============================================================================
 
-@st.cache_resource
+# Artifact persistito su disco (model_store.py): nome e tabelle che ne determinano la chiave
+RF_ARTIFACT_NAME = "rf_model"
+RF_TRAINING_TABLES = ("HARD_SKILLS", "SOFT_SKILLS")
+
+# -----------------------------------------------------------------
+# TF-IDF VECTORIZER (Text Mining - Feature Extraction)
+# -----------------------------------------------------------------
+# Riferimento corso: "Word Vector Representation", "Text Mining"
+#
+# Trasforma il testo in vettori numerici (Vector Space Model)
+# Ogni parola diventa una dimensione del vettore
+# Il valore è il peso TF-IDF della parola
+# -----------------------------------------------------------------
+RF_TFIDF_PARAMS = dict(
+    ngram_range=(1, 3),       # Unigram, bigram, trigram
+    max_features=3000,         # Dimensionalità del vocabolario
+    max_df=0.95,               # Ignora termini in >95% dei documenti
+    min_df=2,                  # Ignora termini in <2 documenti
+    sublinear_tf=True,         # Usa log(1 + tf) invece di tf
+    analyzer='word',
+    lowercase=True
+)
+
+# -----------------------------------------------------------------
+# RANDOM FOREST CLASSIFIER (Classification)
+# -----------------------------------------------------------------
+# Riferimento corso: "Classification and Regression"
+#
+# Ensemble di Decision Trees con voting a maggioranza
+# Ogni albero vede un subset casuale di dati e feature
+# -----------------------------------------------------------------
+RF_PARAMS = dict(
+    n_estimators=150,          # Reduced from 200 - still robust but less overfit
+    max_depth=15,              # Reduced from 30 - prevents overly complex trees
+    min_samples_split=5,       # Increased from 2 - requires more samples to split
+    min_samples_leaf=3,        # Increased from 1 - leaves must have 3+ samples
+    max_features='sqrt',       # Use sqrt(features) at each split for regularization
+    class_weight='balanced',   # Handle imbalanced skill frequencies
+    n_jobs=-1,                 # Parallel processing
+    random_state=42,
+    oob_score=True             # Out-of-bag error estimation
+)
+
+def rf_model_key() -> str:
+    """Artifact key: knowledge-base tables + hyperparameters + sklearn version."""
+    return model_store.artifact_key(RF_TRAINING_TABLES, {"tfidf": RF_TFIDF_PARAMS, "rf": RF_PARAMS})
+
+@functools.lru_cache(maxsize=None)
 def train_rf_model():
     """
     CLASSIFICAZIONE CON RANDOM FOREST
@@ -241,9 +274,29 @@ def train_rf_model():
     Per ogni skill, vengono create varianti comuni nei CV:
     - "python" → "used python", "experience with python", "proficient in python"
     
+    PERSISTENZA:
+    ------------
+    Il modello addestrato viene salvato su disco (model_store.py) con una
+    chiave che dipende da HARD_SKILLS/SOFT_SKILLS e dagli iperparametri:
+    i worker successivi lo caricano in memory-mapping invece di
+    riaddestrarlo. Prebuild al deploy: python model_store.py build
+    
     Returns:
         Tuple[Pipeline, DataFrame]: (modello addestrato, dati di training)
     """
+    # Carica l'artifact persistito (memory-mapped) se la chiave corrisponde
+    key = rf_model_key()
+    cached = model_store.load_artifact(RF_ARTIFACT_NAME, key)
+    if cached is not None:
+        return cached
+    
+    pipe, df = fit_rf_model()
+    if pipe is not None:
+        model_store.save_artifact(RF_ARTIFACT_NAME, key, (pipe, df))
+    return pipe, df
+
+def fit_rf_model():
+    """Builds the augmented dataset and fits the TF-IDF + Random Forest pipeline (no persistence)."""
     
     # =========================================================================
     # STEP 1: PREPARAZIONE DATI (Data Preparation - KDD Step 1-3)
@@ -273,6 +326,7 @@ def train_rf_model():
         for kw in keywords:
             data.append({"text": kw, "label": skill_name})
 
+    import pandas as pd
     df = pd.DataFrame(data)
 
     if df.empty:
@@ -288,44 +342,8 @@ def train_rf_model():
     
     try:
         pipe = Pipeline([
-            # -----------------------------------------------------------------
-            # TF-IDF VECTORIZER (Text Mining - Feature Extraction)
-            # -----------------------------------------------------------------
-            # Riferimento corso: "Word Vector Representation", "Text Mining"
-            #
-            # Trasforma il testo in vettori numerici (Vector Space Model)
-            # Ogni parola diventa una dimensione del vettore
-            # Il valore è il peso TF-IDF della parola
-            # -----------------------------------------------------------------
-            ('tfidf', TfidfVectorizer(
-                ngram_range=(1, 3),       # Unigram, bigram, trigram
-                max_features=3000,         # Dimensionalità del vocabolario
-                max_df=0.95,               # Ignora termini in >95% dei documenti
-                min_df=2,                  # Ignora termini in <2 documenti
-                sublinear_tf=True,         # Usa log(1 + tf) invece di tf
-                analyzer='word',
-                lowercase=True
-            )),
-            
-            # -----------------------------------------------------------------
-            # RANDOM FOREST CLASSIFIER (Classification)
-            # -----------------------------------------------------------------
-            # Riferimento corso: "Classification and Regression"
-            #
-            # Ensemble di Decision Trees con voting a maggioranza
-            # Ogni albero vede un subset casuale di dati e feature
-            # -----------------------------------------------------------------
-            ('rf', RandomForestClassifier(
-                n_estimators=150,          # Reduced from 200 - still robust but less overfit
-                max_depth=15,              # Reduced from 30 - prevents overly complex trees
-                min_samples_split=5,       # Increased from 2 - requires more samples to split
-                min_samples_leaf=3,        # Increased from 1 - leaves must have 3+ samples
-                max_features='sqrt',       # Use sqrt(features) at each split for regularization
-                class_weight='balanced',   # Handle imbalanced skill frequencies
-                n_jobs=-1,                 # Parallel processing
-                random_state=42,
-                oob_score=True             # Out-of-bag error estimation
-            ))
+            ('tfidf', TfidfVectorizer(**RF_TFIDF_PARAMS)),
+            ('rf', RandomForestClassifier(**RF_PARAMS))
         ])
         pipe.fit(df['text'], df['label'])
         return pipe, df
@@ -353,6 +371,62 @@ def train_rf_model():
 #    - I cluster più vicini vengono uniti progressivamente
 # =============================================================================
 
+# Risultati di perform_skill_clustering per hash dell'elenco di skill
+# (DataFrame, PNG del dendrogramma, cluster): sessioni diverse con le
+# stesse skill non rifanno clustering e rendering.
+CLUSTERING_CACHE = ResultCache(maxsize=64)
+
+DENDROGRAM_PALETTE = ['#00cc96', '#ef553b', '#636efa', '#ab63fa',
+                      '#ffa15a', '#19d3f3', '#ff6692', '#b6e880']
+
+# set_link_color_palette è stato globale di scipy: lo impostiamo solo
+# durante il calcolo di un dendrogramma, una sessione alla volta.
+_DENDROGRAM_LOCK = threading.Lock()
+
+
+def _render_dendrogram_png(sch, Figure, linkage_matrix, skills: List[str]) -> bytes:
+    """
+    Dendrogramma Ward come PNG (bytes).
+    
+    Usa una Figure matplotlib indipendente (API a oggetti, niente stato
+    globale di pyplot né rcParams): il rendering è thread-safe.
+    """
+    fig = Figure(figsize=(12, 8))
+    ax = fig.add_subplot()
+
+    # Threshold per colorazione: 70% dell'altezza massima
+    color_threshold = 0.7 * max(linkage_matrix[:, 2].max(), 0.1)
+
+    with _DENDROGRAM_LOCK:
+        sch.set_link_color_palette(DENDROGRAM_PALETTE)
+        try:
+            sch.dendrogram(
+                linkage_matrix,
+                labels=skills,
+                leaf_rotation=45,
+                leaf_font_size=12,
+                above_threshold_color='#dddddd', # Lighter gray for better visibility
+                color_threshold=color_threshold,
+                ax=ax,
+            )
+        finally:
+            sch.set_link_color_palette(None)
+
+    # Dark Mode Styling (sugli assi, non su rcParams)
+    ax.axhline(y=0, color='white', linewidth=1)
+    ax.set_title("Dendrogramma Skill (Ward Linkage)", color='white', fontsize=16)
+    ax.set_xlabel("Skills", color='white', fontsize=12)
+    ax.set_ylabel("Distanza (Ward)", color='white', fontsize=12)
+    ax.tick_params(colors='white')
+    for spine in ax.spines.values():
+        spine.set_edgecolor('white')
+    fig.tight_layout()
+
+    buffer = io.BytesIO()
+    fig.savefig(buffer, format="png", transparent=True)
+    return buffer.getvalue()
+
+
 def perform_skill_clustering(skills: List[str]):
     """
     CLUSTERING DELLE COMPETENZE
@@ -400,7 +474,7 @@ def perform_skill_clustering(skills: List[str]):
     4. Ripeti step 2-3 fino a convergenza
     
     Parametri:
-    - n_clusters: determinato euristicamente (sqrt(N/2))
+    - n_clusters: uno per nome in skill_embedding.CLUSTER_NAMES (5)
     - n_init=20: prova 20 inizializzazioni diverse
     - max_iter=500: massimo iterazioni per convergenza
     
@@ -411,15 +485,36 @@ def perform_skill_clustering(skills: List[str]):
     PCA (Principal Component Analysis) riduce lo spazio TF-IDF
     a 2 dimensioni per visualizzazione 2D dei cluster.
     
+    MAPPA PRECALCOLATA
+    ------------------
+    TF-IDF, K-Means e PCA sono addestrati una sola volta su tutte le skill
+    della knowledge base (skill_embedding.py, persistiti con model_store):
+    qui restano il lookup delle skill, la trasformazione di quelle fuori
+    vocabolario, il linkage di Ward e il rendering del dendrogramma.
+    
     Returns:
-        Tuple: (DataFrame per plot, path dendrogramma, dict cluster)
+        Tuple: (DataFrame per plot, PNG del dendrogramma in bytes, dict cluster)
+        
+    Il risultato è in cache (CLUSTERING_CACHE) per hash dell'elenco di skill.
     """
     
     # Validazione input
     if not skills or len(skills) < 3:
         return None, None, {}
 
-    if not TfidfVectorizer or not KMeans or not sch:
+    # Stesso elenco di skill -> stesso risultato (cache LRU condivisa)
+    key = fingerprint(list(skills))
+    found, cached = CLUSTERING_CACHE.get(key)
+    if found:
+        df_viz, dendro_png, skill_clusters = cached
+        return df_viz.copy(), dendro_png, {name: list(members) for name, members in skill_clusters.items()}
+
+    # Visualizzazione importata al primo uso
+    sch = _lazy_import("scipy.cluster.hierarchy")
+    Figure = _lazy_import("matplotlib.figure", "Figure")
+    pd = _lazy_import("pandas")
+    embedding = skill_embedding.get_skill_embedding()
+    if embedding is None or not sch or not Figure or not pd:
         return None, None, {}
 
     try:
@@ -431,15 +526,13 @@ def perform_skill_clustering(skills: List[str]):
         # Usiamo Character N-Grams per catturare similarità tra:
         # - "Python" e "PyTorch" (condividono "Py")
         # - "SQL", "MySQL", "PostgreSQL" (condividono "SQL")
+        #
+        # La mappa (TF-IDF, K-Means, PCA) è addestrata una volta su tutte le
+        # skill di HARD_SKILLS/SOFT_SKILLS (skill_embedding.py): le skill note
+        # sono lookup, solo quelle fuori vocabolario vengono trasformate.
         # =====================================================================
         
-        vectorizer = TfidfVectorizer(
-            stop_words='english',
-            analyzer='char_wb',      # Character n-grams within word boundaries
-            ngram_range=(2, 4),      # Bi-gram, tri-gram, 4-gram di caratteri
-            min_df=1
-        )
-        X = vectorizer.fit_transform(skills).toarray()
+        X, coords, labels = embedding.embed(list(skills))
 
         # =====================================================================
         # STEP 2: HIERARCHICAL CLUSTERING (Dendrogramma)
@@ -454,45 +547,8 @@ def perform_skill_clustering(skills: List[str]):
         
         linkage_matrix = sch.linkage(X, method='ward')  # Ward's linkage
         
-        # Visualizzazione dendrogramma
-        plt.figure(figsize=(12, 8))
-        
-        # Dark Mode Styling
-        plt.rcParams.update({
-            "text.color": "white",
-            "axes.labelcolor": "white",
-            "xtick.color": "white",
-            "ytick.color": "white",
-            "axes.edgecolor": "white",
-            "axes.titlecolor": "white"
-        })
-        
-        sch.set_link_color_palette([
-            '#00cc96', '#ef553b', '#636efa', '#ab63fa', 
-            '#ffa15a', '#19d3f3', '#ff6692', '#b6e880'
-        ])
-        
-        # Threshold per colorazione: 70% dell'altezza massima
-        color_threshold = 0.7 * max(linkage_matrix[:, 2].max(), 0.1)
-        
-        dendro = sch.dendrogram(
-            linkage_matrix,
-            labels=skills,
-            leaf_rotation=45,
-            leaf_font_size=12,
-            above_threshold_color='#dddddd', # Lighter gray for better visibility
-            color_threshold=color_threshold
-        )
-        
-        plt.axhline(y=0, color='white', linewidth=1)
-        plt.title("Dendrogramma Skill (Ward Linkage)", color='white', fontsize=16)
-        plt.xlabel("Skills", color='white', fontsize=12)
-        plt.ylabel("Distanza (Ward)", color='white', fontsize=12)
-        plt.tight_layout()
-        
-        dendro_path = "dendrogram_v2.png"
-        plt.savefig(dendro_path, transparent=True)
-        plt.close()
+        # Visualizzazione dendrogramma: PNG in memoria (nessun file condiviso)
+        dendro_png = _render_dendrogram_png(sch, Figure, linkage_matrix, skills)
 
         # =====================================================================
         # STEP 3: K-MEANS CLUSTERING
@@ -503,33 +559,15 @@ def perform_skill_clustering(skills: List[str]):
         # - Pro: Veloce, scalabile, semplice
         # - Contro: Richiede K predefinito, sensibile a inizializzazione
         #
-        # Euristica per K: max(2, min(N/3, 5))
+        # K = len(CLUSTER_NAMES), centroidi calcolati sull'intero vocabolario:
+        # ogni skill ha sempre lo stesso cluster (predict per quelle nuove).
         # =====================================================================
         
-        # Determina numero ottimale di cluster
-        n_clusters = max(2, min(len(skills) // 3, 5))
-        
-        kmeans = KMeans(
-            n_clusters=n_clusters,
-            random_state=42,        # Riproducibilità
-            n_init=20,              # 20 inizializzazioni per robustezza
-            max_iter=500,           # Max iterazioni per convergenza
-            algorithm='elkan'       # Algoritmo più veloce
-        )
-        labels = kmeans.fit_predict(X)
-
-        # Assegna nomi semantici ai cluster
-        cluster_names = [
-            "Data & Analytics",
-            "Development",
-            "Cloud & Tools",
-            "Business",
-            "Research"
-        ]
+        cluster_names = skill_embedding.CLUSTER_NAMES
         
         skill_clusters = {}
         for skill, label in zip(skills, labels):
-            cluster_name = cluster_names[label % len(cluster_names)]
+            cluster_name = cluster_names[label]
             if cluster_name not in skill_clusters:
                 skill_clusters[cluster_name] = []
             skill_clusters[cluster_name].append(skill)
@@ -541,21 +579,19 @@ def perform_skill_clustering(skills: List[str]):
         #
         # Lo spazio TF-IDF ha molte dimensioni (una per ogni n-gram).
         # PCA proietta tutto in 2D mantenendo la varianza massima.
-        # Questo permette di visualizzare i cluster in un grafico scatter.
+        # Le coordinate sono quelle della mappa globale (coords di embed).
         # =====================================================================
-        
-        pca = PCA(n_components=2)
-        coords = pca.fit_transform(X)
 
         # DataFrame per visualizzazione con Plotly
         df_viz = pd.DataFrame({
             'x': coords[:, 0],
             'y': coords[:, 1],
             'skill': skills,
-            'cluster': [cluster_names[l % len(cluster_names)] for l in labels]
+            'cluster': [cluster_names[l] for l in labels]
         })
 
-        return df_viz, dendro_path, skill_clusters
+        CLUSTERING_CACHE.put(key, (df_viz, dendro_png, skill_clusters))
+        return df_viz.copy(), dendro_png, {name: list(members) for name, members in skill_clusters.items()}
 
     except Exception as e:
         print(f"Clustering Error: {e}")
@@ -579,15 +615,27 @@ def perform_skill_clustering(skills: List[str]):
 # - Es: "Data Analysis", "Programming", "Business Communication"
 # =============================================================================
 
-# Import per Topic Modeling
-try:
-    from sklearn.decomposition import LatentDirichletAllocation
-    from sklearn.feature_extraction.text import CountVectorizer
-    from wordcloud import WordCloud
-except ImportError:
-    LatentDirichletAllocation = None
-    CountVectorizer = None
-    WordCloud = None
+# Word cloud PNG per hash del testo della JD (i rerun non la ridisegnano)
+WORDCLOUD_CACHE = ResultCache(maxsize=32)
+
+
+def render_topic_wordcloud(text: str, stopwords) -> Optional[bytes]:
+    """Word cloud of text as PNG bytes (None without wordcloud), cached per text hash."""
+    key = fingerprint(text)
+    found, png = WORDCLOUD_CACHE.get(key)
+    if found:
+        return png
+
+    WordCloud = _lazy_import("wordcloud", "WordCloud")  # imported on first use
+    if not WordCloud:
+        return None
+    wordcloud = WordCloud(width=800, height=400, background_color='white', stopwords=set(stopwords)).generate(text)
+    buffer = io.BytesIO()
+    wordcloud.to_image().save(buffer, format="PNG")
+    png = buffer.getvalue()
+    WORDCLOUD_CACHE.put(key, png)
+    return png
+
 
 def perform_topic_modeling(text_corpus: List[str], n_topics=3, n_words=5):
     """
@@ -625,274 +673,62 @@ def perform_topic_modeling(text_corpus: List[str], n_topics=3, n_words=5):
     - topics: lista di interpretazioni dei topic
     - summary: descrizione del lavoro
     - keywords: parole chiave principali
-    - wordcloud_path: visualizzazione word cloud
+    - wordcloud_png: word cloud (PNG in bytes, in cache per hash del testo)
+    
+    MODELLO PRE-ADDESTRATO:
+    -----------------------
+    CountVectorizer e LDA sono addestrati una volta su un corpus di JD di
+    riferimento (topic_model.py): per ogni richiesta solo transform.
+    n_topics è il numero di topic riportati (i più presenti nella JD).
     
     Returns:
-        Dict con topics, summary, keywords, wordcloud_path
+        Dict con topics, summary, keywords, wordcloud_png
     """
     
-    if not LatentDirichletAllocation or not CountVectorizer or not WordCloud:
+    model = topic_model.get_topic_model()
+    if model is None:
         return [], None
 
     try:
         # =================================================================
         # STEP 0: PRESERVE COMPOUND TOOL NAMES
         # =================================================================
-        # LDA splits "Google Analytics" into "google" + "analytics"
-        # We preserve compound names by replacing spaces with underscores
+        # LDA splits "Google Analytics" into "google" + "analytics":
+        # un'unica regex precompilata (topic_model.COMPOUND_TERMS)
         # =================================================================
-        import re
-        
-        compound_tools = {
-            # Analytics & BI
-            "Google Analytics": "Google_Analytics",
-            "Google Analytics 4": "Google_Analytics_4",
-            "Google Tag Manager": "Google_Tag_Manager",
-            "Looker Studio": "Looker_Studio",
-            "Power BI": "Power_BI",
-            "Tableau Desktop": "Tableau_Desktop",
-            "Data Studio": "Data_Studio",
-            # Cloud Platforms
-            "Google Cloud": "Google_Cloud",
-            "Google Cloud Platform": "Google_Cloud_Platform",
-            "Amazon Web Services": "Amazon_Web_Services",
-            "Microsoft Azure": "Microsoft_Azure",
-            # Programming & Data
-            "Machine Learning": "Machine_Learning",
-            "Deep Learning": "Deep_Learning",
-            "Natural Language Processing": "NLP",
-            "Data Visualization": "Data_Visualization",
-            "Data Analysis": "Data_Analysis",
-            "Data Science": "Data_Science",
-            "Big Data": "Big_Data",
-            "A/B Testing": "AB_Testing",
-            "Statistical Analysis": "Statistical_Analysis",
-            # Marketing
-            "Social Media": "Social_Media",
-            "Digital Marketing": "Digital_Marketing",
-            "Content Marketing": "Content_Marketing",
-            "Email Marketing": "Email_Marketing",
-            "SEO/SEM": "SEO_SEM",
-        }
-        
-        # Apply compound name preservation
-        processed_corpus = []
-        for doc in text_corpus:
-            processed_doc = doc
-            for original, replacement in compound_tools.items():
-                processed_doc = re.sub(re.escape(original), replacement, processed_doc, flags=re.IGNORECASE)
-            processed_corpus.append(processed_doc)
-        
-        text_corpus = processed_corpus
+        text_corpus = [topic_model.preserve_compound_terms(doc) for doc in text_corpus]
+        combined_text = " ".join(text_corpus)
 
         # =================================================================
         # STEP 1: PREPROCESSING - Stop Words
         # =================================================================
         # Riferimento corso: "Data Cleaning" (KDD Step 1)
         #
-        # Rimuoviamo parole non informative per topic modeling:
-        # - Stop words standard (the, a, is...)
-        # - Parole HR generiche (requirements, qualifications...)
-        # - Stop words multilingue (italiano, spagnolo, francese, tedesco)
+        # Stop words standard + HR + multilingue sono già escluse dal vocabolario del
+        # modello pre-addestrato; i nomi di azienda della JD (Corp, Inc,
+        # "| Company", "at Company") vengono esclusi qui.
         # =================================================================
-        
-        hr_stop_words = [
-            # Structural / Sections
-            'requirements', 'qualifications', 'responsibilities', 'duties', 'summary', 
-            'overview', 'description', 'profile', 'benefits', 'education', 'experience', 
-            'skills', 'background', 'about', 'us', 'team', 'company', 'role', 'job', 
-            'position', 'candidate', 'opportunity', 'location', 'category', 'status',
-            'salary', 'compensation', 'employment', 'type', 'industry', 'department',
-
-            # Common Adjectives / Qualifiers
-            'strong', 'excellent', 'good', 'great', 'proven', 'demonstrated', 'successful',
-            'ideal', 'passionate', 'motivated', 'proactive', 'hands-on', 'detail-oriented',
-            'dynamic', 'collaborative', 'fast-paced', 'global', 'international', 'leading',
-            'preferred', 'plus', 'advantage', 'bonus', 'desirable', 'essential', 'key',
-            'core', 'primary', 'required', 'proficient', 'proficiency', 'fluent',
-            'knowledge', 'understanding', 'familiarity', 'ability', 'capability', 
-
-            # Common Verbs / Actions
-            'work', 'working', 'join', 'apply', 'seeking', 'looking', 'ensure', 'provide',
-            'assist', 'support', 'help', 'manage', 'lead', 'coordinate', 'communicate',
-            'collaborate', 'participate', 'contribute', 'develop', 'create', 'maintain',
-            'deliver', 'drive', 'execute', 'perform', 'build', 'using', 'based',
-
-            # Time / Measure / Misc
-            'years', 'year', 'level', 'senior', 'junior', 'mid', 'associate',
-            'full-time', 'part-time', 'contract', 'permanent', 'temporary', 'remote', 'hybrid',
-            'degree', 'bachelor', 'master', 'phd', 'equivalent', 'related', 'relevant',
-            'including', 'include', 'includes', 'various', 'similar', 'etc', 'suite',
-            'must', 'will', 'can', 'may', 'should', 'would', 'tools', 'environment',
-            
-            # Company/Organization Names (should not be keywords)
-            'corp', 'corporation', 'inc', 'ltd', 'llc', 'gmbh', 'spa', 'srl',
-            'datadriven', 'techstart', 'startup', 'agency', 'group', 'italia',
-            
-            # Generic Qualifiers (noise)
-            'expert', 'expertise', 'skilled', 'specialist', 'professional',
-            'advanced', 'basic', 'intermediate', 'beginner', 'native', 'fluency',
-            'platform', 'platforms', 'solution', 'solutions', 'service', 'services',
-            'system', 'systems', 'technology', 'technologies', 'technique', 'techniques',
-            'method', 'methods', 'approach', 'approaches', 'strategy', 'strategies',
-            
-            # Action Verbs (Noise for Topic Modeling)
-            'programming', 'coding', 'developing', 'match', 'matching', 'gap', 'missing', 
-            'learn', 'learning', 'use', 'using', 'scikit', 'pandas', 'numpy', 'matplotlib', 'seaborn'
-        ]
-
-        # Italian Stop Words
-        it_stop_words = [
-            'di', 'a', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra',
-            'il', 'lo', 'la', 'i', 'gli', 'le', 'un', 'uno', 'una',
-            'e', 'ed', 'o', 'ma', 'se', 'che', 'non', 'si', 'chi',
-            'mi', 'ti', 'ci', 'vi', 'li', 'ne', 'lei', 'lui', 'noi', 'voi', 'loro',
-            'mio', 'tuo', 'suo', 'nostro', 'vostro', 'loro',
-            'mia', 'tua', 'sua', 'nostra', 'vostra',
-            'questo', 'quello', 'quella', 'questi', 'quelle',
-            'cui', 'c', 'è', 'sono', 'siete', 'siamo', 'hanno', 'ha', 'ho', 'hai', 'hanno',
-            'avuto', 'fatto', 'fare', 'essere', 'avere', 'stato', 'stata', 'stati', 'state',
-            'presso', 'durante', 'tramite', 'verso', 'contro', 'sulla', 'dello', 'degli', 'della', 'dei', 'dal', 'dalla',
-            'ai', 'agli', 'alla', 'alle', 'negli', 'nelle', 'nella', 'del', 'al', 
-            'come', 'dove', 'quando', 'perché', 'anche', 'più', 'meno',
-            'tutto', 'tutti', 'tutta', 'tut te', 'ogni', 'altro', 'altra', 'altri', 'altre',
-            'molto', 'poco', 'abbastanza', 'proprio', 'già', 'ancora', 
-            'ecc', 'eccetera', 'via', 'poi', 'solo', 'soltanto',
-            'dell', 'all', 'sull', 'dall', 'nell', 'quest', 'quant', 'tant'
-        ]
-
-        # Spanish Stop Words
-        es_stop_words = [
-            'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'se', 'las', 'por', 'un', 'para', 'con', 'no',
-            'una', 'su', 'al', 'es', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ya', 'o', 'fue', 'este', 'ha',
-            'si', 'porque', 'esta', 'son', 'entre', 'está', 'cuando', 'muy', 'sin', 'sobre', 'ser', 'tiene',
-            'también', 'me', 'hasta', 'hay', 'donde', 'han', 'quien', 'están', 'estado', 'desde', 'todos',
-            'durante', 'años', 'año', 'empresa', 'trabajo', 'experiencia', 'puesto', 'conocimientos'
-        ]
-
-        # French Stop Words
-        fr_stop_words = [
-            'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'en', 'à', 'au', 'aux', 'ce', 'cette',
-            'ces', 'que', 'qui', 'quoi', 'dont', 'où', 'pour', 'par', 'sur', 'avec', 'sans', 'sous', 'dans',
-            'entre', 'vers', 'chez', 'il', 'elle', 'on', 'nous', 'vous', 'ils', 'elles', 'leur', 'leurs',
-            'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'nos', 'votre', 'vos',
-            'est', 'sont', 'été', 'être', 'avoir', 'fait', 'faire', 'dit', 'dire', 'peut', 'pouvoir',
-            'plus', 'moins', 'très', 'bien', 'aussi', 'même', 'tout', 'tous', 'toute', 'toutes',
-            'entreprise', 'poste', 'expérience', 'années', 'année', 'travail', 'compétences'
-        ]
-
-        # German Stop Words
-        de_stop_words = [
-            'der', 'die', 'das', 'den', 'dem', 'des', 'ein', 'eine', 'einer', 'einem', 'einen', 'eines',
-            'und', 'in', 'zu', 'von', 'mit', 'ist', 'nicht', 'für', 'auf', 'sich', 'als', 'auch', 'an',
-            'es', 'bei', 'nach', 'aus', 'wenn', 'oder', 'aber', 'wie', 'noch', 'nur', 'durch', 'über',
-            'so', 'um', 'am', 'im', 'zum', 'zur', 'bis', 'seit', 'wir', 'sie', 'ihr', 'er', 'ich',
-            'werden', 'wurde', 'worden', 'wird', 'haben', 'hat', 'hatte', 'sein', 'seine', 'seiner',
-            'können', 'kann', 'sollen', 'soll', 'müssen', 'muss', 'dürfen', 'darf',
-            'jahre', 'jahr', 'unternehmen', 'erfahrung', 'stelle', 'position', 'kenntnisse'
-        ]
-
-        # =================================================================
-        # DYNAMIC COMPANY NAME EXTRACTION
-        # =================================================================
-        # Instead of hardcoding company names, we detect them dynamically
-        # using patterns common in job descriptions
-        # =================================================================
-        import re
-        
-        dynamic_company_words = set()
-        full_text = ' '.join(text_corpus)
-        
-        # Pattern 1: Extract words before corporate suffixes (Corp, Inc, Ltd, etc.)
-        corp_pattern = r'(\b[A-Z][a-zA-Z]+)\s+(?:Corp|Inc|Ltd|LLC|GmbH|S\.?p\.?A\.?|S\.?r\.?l\.?)\b'
-        for match in re.finditer(corp_pattern, full_text, re.IGNORECASE):
-            company_word = match.group(1).lower()
-            if len(company_word) > 2:
-                dynamic_company_words.add(company_word)
-        
-        # Pattern 2: Extract company names after pipe separator (Job Title | Company)
-        pipe_pattern = r'\|\s*([A-Z][A-Za-z]+)'
-        for match in re.finditer(pipe_pattern, full_text):
-            company_word = match.group(1).lower()
-            if len(company_word) > 2:
-                dynamic_company_words.add(company_word)
-        
-        # Pattern 3: Words right after "at" or "presso" (employment context)
-        at_pattern = r'(?:at|presso)\s+([A-Z][A-Za-z]+)\b'
-        for match in re.finditer(at_pattern, full_text, re.IGNORECASE):
-            company_word = match.group(1).lower()
-            if len(company_word) > 2 and company_word not in {'the', 'our', 'their'}:
-                dynamic_company_words.add(company_word)
-        
-        # =================================================================
-        # Combina tutte le stop words (including dynamic company names)
-        # =================================================================
-        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
-        all_stop_words = list(ENGLISH_STOP_WORDS) + hr_stop_words + it_stop_words + es_stop_words + fr_stop_words + de_stop_words + list(dynamic_company_words)
-
-        # =================================================================
-        # STEP 2: VECTORIZATION - Bag of Words
-        # =================================================================
-        # Riferimento corso: "Word Vector Representation"
-        #
-        # CountVectorizer crea una matrice termine-documento:
-        # - Righe: documenti
-        # - Colonne: termini (words/n-grams)
-        # - Valori: frequenze
-        # =================================================================
-        
-        tf_vectorizer = CountVectorizer(
-            max_df=0.90,              # Ignora termini in >90% dei doc
-            min_df=1,                 # Almeno 1 occorrenza
-            stop_words=all_stop_words,
-            ngram_range=(1, 1)        # Unigrams only (cleaner topics)
-        )
-        tf = tf_vectorizer.fit_transform(text_corpus)
+        company_words = topic_model.company_words(combined_text)
 
         # =================================================================
-        # STEP 3: LDA - Latent Dirichlet Allocation
+        # STEP 2-3: BAG OF WORDS + LDA (transform only)
         # =================================================================
-        # Riferimento corso: "Topic Model"
+        # Riferimento corso: "Word Vector Representation", "Topic Model"
         #
-        # LDA è un modello generativo bayesiano che:
-        # 1. Assume che ogni documento sia generato da K topic
-        # 2. Ogni topic è una distribuzione multinomiale sulle parole
-        # 3. Usa inferenza variazionale per apprendere le distribuzioni
+        # CountVectorizer e LDA sono addestrati una volta su un corpus di
+        # riferimento (topic_model.py, persistito con model_store): qui
+        # calcoliamo solo la mixture di topic della JD (lda.transform) e
+        # le parole della JD spiegate da ciascun topic.
         # =================================================================
-        
-        lda = LatentDirichletAllocation(
-            n_components=n_topics,    # Numero di topic da estrarre
-            max_iter=50,              # Iterazioni per convergenza
-            learning_method='batch',  # Più accurato per dataset piccoli
-            learning_decay=0.7,       # Decay rate per learning
-            random_state=42           # Riproducibilità
+        topics_raw, all_keywords = model.document_topics(
+            text_corpus, n_topics=n_topics, n_words=n_words, exclude=company_words
         )
-        lda.fit(tf)
+        if not topics_raw:
+            return None
 
-        feature_names = tf_vectorizer.get_feature_names_out()
-        topics_raw = []
-        topics_interpreted = []
+        # Generate user-friendly interpretation
+        topics_interpreted = [_interpret_topic_keywords(top_features) for top_features in topics_raw]
 
-        # Extract top words for each topic and interpret them
-        for topic_idx, topic in enumerate(lda.components_):
-            top_features_ind = topic.argsort()[:-n_words - 1:-1]
-            # Convert underscores back to spaces for compound names
-            top_features = [feature_names[i].replace('_', ' ') for i in top_features_ind]
-            
-            # Store raw for debugging
-            topics_raw.append(top_features)
-            
-            # Generate user-friendly interpretation
-            interpretation = _interpret_topic_keywords(top_features)
-            topics_interpreted.append(interpretation)
-
-        # Generate summary of the job
-        all_keywords = []
-        for topic in lda.components_:
-            top_ind = topic.argsort()[-10:][::-1]
-            # Convert underscores back to spaces for compound names
-            all_keywords.extend([feature_names[i].replace('_', ' ') for i in top_ind])
-        
         # Deduplicate and get most common
         from collections import Counter
         keyword_counts = Counter(all_keywords)
@@ -900,18 +736,15 @@ def perform_topic_modeling(text_corpus: List[str], n_topics=3, n_words=5):
         
         job_summary = _generate_job_summary(top_job_keywords)
 
-        # Generate Word Cloud
-        combined_text = " ".join(text_corpus)
-        wordcloud = WordCloud(width=800, height=400, background_color='white', stopwords=set(all_stop_words)).generate(combined_text)
-        
-        wc_path = "topic_wordcloud.png"
-        wordcloud.to_file(wc_path)
+        # Word Cloud: PNG in memoria, in cache per hash del testo
+        stopwords = topic_model.stop_words() | company_words
+        wordcloud_png = render_topic_wordcloud(combined_text, stopwords)
 
         return {
             'topics': topics_interpreted,
             'summary': job_summary,
             'keywords': top_job_keywords,
-            'wordcloud_path': wc_path
+            'wordcloud_png': wordcloud_png
         }
 
     except Exception as e:
@@ -1021,10 +854,49 @@ def _generate_job_summary(keywords: List[str]) -> str:
         return f"This position primarily seeks expertise in: {top3}."
 
 # --- NEW: NAMED ENTITY RECOGNITION (NER) ---
-try:
-    import nltk
-    import ssl
+# =============================================================================
+# NAMED ENTITY RECOGNITION (NER)
+# =============================================================================
+# Riferimento corso: "Information Extraction", "Named Entity Recognition"
+#
+# NER è una tecnica di Information Extraction che identifica e classifica
+# entità nominate nel testo in categorie predefinite:
+# - ORGANIZATION: aziende, università, istituzioni
+# - GPE (Geo-Political Entity): città, paesi, regioni
+# - PERSON: nomi di persone
+#
+# Algoritmo NLTK usato:
+# 1. Tokenizzazione: divide il testo in parole
+# 2. POS Tagging: assegna parti del discorso (noun, verb, ecc.)
+# 3. NE Chunking: raggruppa token in entità nominate
+#
+# Post-processing:
+# - Filtra parole comuni e skill (evita falsi positivi)
+# - Corregge entità note (es: "Milano" come Location, non Organization)
+#
+# NLTK e i suoi dati (probe + download) vengono caricati alla prima chiamata
+# di extract_entities_ner, non all'import del modulo.
+# =============================================================================
+
+_NLTK_DATA = (
+    'tokenizers/punkt',
+    'tokenizers/punkt_tab',
+    'chunkers/maxent_ne_chunker_tab',
+    'taggers/averaged_perceptron_tagger_eng',
+)
+_NLTK_DOWNLOADS = (
+    'punkt', 'punkt_tab', 'averaged_perceptron_tagger', 'maxent_ne_chunker',
+    'maxent_ne_chunker_tab', 'words', 'averaged_perceptron_tagger_eng',
+)
+
+@functools.lru_cache(maxsize=None)
+def _load_nltk():
+    """nltk with the NER data available, loaded once on first use (None if not installed)."""
+    nltk = _lazy_import("nltk")
+    if nltk is None:
+        return None
 
+    import ssl
     # Bypass SSL check for NLTK download (common issue on macOS)
     try:
         _create_unverified_https_context = ssl._create_unverified_context
@@ -1033,43 +905,14 @@ try:
     else:
         ssl._create_default_https_context = _create_unverified_https_context
 
-    # =============================================================================
-    # NAMED ENTITY RECOGNITION (NER)
-    # =============================================================================
-    # Riferimento corso: "Information Extraction", "Named Entity Recognition"
-    #
-    # NER è una tecnica di Information Extraction che identifica e classifica
-    # entità nominate nel testo in categorie predefinite:
-    # - ORGANIZATION: aziende, università, istituzioni
-    # - GPE (Geo-Political Entity): città, paesi, regioni
-    # - PERSON: nomi di persone
-    #
-    # Algoritmo NLTK usato:
-    # 1. Tokenizzazione: divide il testo in parole
-    # 2. POS Tagging: assegna parti del discorso (noun, verb, ecc.)
-    # 3. NE Chunking: raggruppa token in entità nominate
-    #
-    # Post-processing:
-    # - Filtra parole comuni e skill (evita falsi positivi)
-    # - Corregge entità note (es: "Milano" come Location, non Organization)
-    # =============================================================================
-
     # Download necessary NLTK data (cached)
     try:
-        nltk.data.find('tokenizers/punkt')
-        nltk.data.find('tokenizers/punkt_tab')
-        nltk.data.find('chunkers/maxent_ne_chunker_tab')
-        nltk.data.find('taggers/averaged_perceptron_tagger_eng')
+        for resource in _NLTK_DATA:
+            nltk.data.find(resource)
     except LookupError:
-        nltk.download('punkt')
-        nltk.download('punkt_tab')
-        nltk.download('averaged_perceptron_tagger')
-        nltk.download('maxent_ne_chunker')
-        nltk.download('maxent_ne_chunker_tab')
-        nltk.download('words')
-        nltk.download('averaged_perceptron_tagger_eng')
-except ImportError:
-    nltk = None
+        for package in _NLTK_DOWNLOADS:
+            nltk.download(package)
+    return nltk
 
 def extract_entities_ner(text: str) -> Dict[str, List[str]]:
     """
@@ -1104,6 +947,7 @@ def extract_entities_ner(text: str) -> Dict[str, List[str]]:
     Returns:
         Dict con liste di Organizations, Locations, Persons
     """
+    nltk = _load_nltk()
     if not nltk:
         return {}
 
@@ -1552,437 +1396,32 @@ def generate_cluster_insight(clusters: Dict[str, int], matching_skills: Set[str]
 
     return insight
 
-# =============================================================================
-def extract_generic_keywords(text: str, top_n=5) -> Set[str]:
-    """
-    Extracts top keywords from text using TF-IDF when no known skills are found.
-    """
-    if not TfidfVectorizer or not text or len(text.split()) < 10:
-        return set()
 
-    try:
-        vectorizer = TfidfVectorizer(stop_words='english', max_features=top_n)
-        vectorizer.fit_transform([text])
-        return set(vectorizer.get_feature_names_out())
-    except:
-        return set()
-
-# =============================================================================
-# TEXT MINING: SKILL EXTRACTION
 # =============================================================================
-# Riferimento corso: "Text Mining", "Information Extraction", "Feature Extraction"
-#
-# L'estrazione di skill è un task di INFORMATION EXTRACTION:
-# - Estrae entità specifiche (competenze) da testo non strutturato
-# - Combina multiple tecniche: regex, n-gram matching, fuzzy matching
-#
-# TECNICHE UTILIZZATE:
-# 1. N-gram Analysis: cattura skill composte ("machine learning")
-# 2. Regex Pattern Matching: gestisce varianti morfologiche
-# 3. Fuzzy Matching: tollera errori di battitura (85% threshold)
-# =============================================================================
-
-try:
-    from thefuzz import fuzz  # Fuzzy string matching
-except ImportError:
-    fuzz = None
-
-# =============================================================================
-def preprocess_jd_text(text: str) -> str:
+def extract_pdf_document(pdf_file) -> "pdf_text.PdfText":
     """
-    PREPROCESSING JOB DESCRIPTION
-    =============================
-    Riferimento KDD: Data Cleaning (Step 1)
-    
-    Rimuove sezioni non-skill (benefit, condizioni, salari, training) prima 
-    dell'estrazione competenze per evitare falsi positivi.
+    Extracted PDF (path, bytes or file-like object) with its page metadata.
     
-    APPROCCIO:
-    1. Rimuove intere sezioni per header (Benefits:, Condizioni:, ecc.)
-    2. Rimuove pattern individuali (€35,000, 40 ore/settimana, ecc.)
-    3. Preserva solo contenuto relativo alle competenze
-    
-    Args:
-        text: Job Description originale
-        
-    Returns:
-        str: JD preprocessata senza sezioni non-skill
-    """
-    non_skill_patterns = getattr(constants, "NON_SKILL_PATTERNS", {})
-    
-    if not non_skill_patterns:
-        return text
-    
-    cleaned = text
-    
-    # Step 1: Remove entire sections by header
-    # Pattern: header seguito da contenuto fino a prossima sezione o fine
-    for pattern in non_skill_patterns.get("section_headers", []):
-        section_regex = rf'(?:^|\n)\s*{pattern}[:\s]*.*?(?=\n\s*[A-Z]|\n\n|\Z)'
-        cleaned = re.sub(section_regex, '\n', cleaned, flags=re.IGNORECASE | re.DOTALL | re.MULTILINE)
-    
-    # Step 2: Remove individual non-skill patterns
-    categories_to_filter = [
-        "salary", "hours", "duration", "benefits", "contract", 
-        "eligibility", "training", "agency", "freelance", "volunteering", "legal"
-    ]
-    
-    for category in categories_to_filter:
-        for pattern in non_skill_patterns.get(category, []):
-            try:
-                cleaned = re.sub(pattern, ' ', cleaned, flags=re.IGNORECASE)
-            except re.error:
-                continue  # Skip invalid regex patterns
-    
-    # Step 3: Clean up whitespace
-    cleaned = re.sub(r'\s+', ' ', cleaned).strip()
-    
-    return cleaned
-
-
-# =============================================================================
-# =============================================================================
-# CONTEXT AWARENESS & DOMAIN INTELLIGENCE (NEW v2.0)
-# =============================================================================
-
-def detect_domain_context(text: str) -> str:
-    """
-    Identifies the specific industry domain (Energy, Biotech, Fashion, etc.) from text.
-    Uses DOMAIN_EXTRACTION_RULES from constants.
+    Cached by SHA-256 of the file bytes, capped in size and pages, and
+    page-parallel for large files (pdf_text.py). Check .truncated: only the
+    first pdf_text.MAX_PAGES pages are read.
     """
-    text_lower = text.lower()
-    domain_rules = getattr(constants, "DOMAIN_EXTRACTION_RULES", {})
-    
-    best_domain = "General"
-    max_score = 0
-    
-    for domain, rules in domain_rules.items():
-        score = 0
-        # Check context words
-        for word in rules.get("context_words", []):
-            if word.lower() in text_lower:
-                score += 1
-        
-        # Check specific must_extract terms
-        for term in rules.get("must_extract", []):
-            if term.lower() in text_lower:
-                score += 2
-                
-        if score > max_score and score >= 2: # Min threshold
-            max_score = score
-            best_domain = domain
-            
-    return best_domain
-
-def detect_seniority_level(text: str) -> str:
-    """
-    Infers the seniority level (Entry, Mid, Senior, Executive) from text signals.
-    Uses CONTEXT_SIGNALS from constants.
-    """
-    text_lower = text.lower()
-    signals = getattr(constants, "CONTEXT_SIGNALS", {}).get("seniority_from_jd", {})
-    
-    # Priority check: start from Executive down to Entry
-    if any(sig in text_lower for sig in signals.get("executive", [])):
-        return "Executive"
-    if any(sig in text_lower for sig in signals.get("senior", [])):
-        return "Senior"
-    if any(sig in text_lower for sig in signals.get("mid", [])):
-        return "Mid-Level"
-    if any(sig in text_lower for sig in signals.get("entry", [])):
-        return "Entry Level"
-        
-    return "Not Specified"
-
-def extract_skills_from_text(text: str, is_jd: bool = False) -> Tuple[Set[str], Set[str]]:
-    """
-    ESTRAZIONE COMPETENZE DA TESTO
-    ==============================
-    Riferimento corso: "Information Extraction", "Text Mining"
-    
-    Estrae hard skills e soft skills da testo non strutturato (CV, Job Description).
-    
-    METODOLOGIA (multi-step):
-    -------------------------
-    
-    STEP 0: JD PREPROCESSING (NEW)
-    Se is_jd=True, rimuove sezioni non-skill (benefit, salari, condizioni)
-    prima dell'estrazione per evitare falsi positivi.
-    
-    STEP 1: PREPROCESSING
-    - Conversione in lowercase
-    - Tokenizzazione in parole
-    - Generazione n-grams (bigram, trigram)
-    
-    STEP 2: N-GRAM MATCHING
-    Riferimento corso: "N-gram Analysis"
-    
-    - Unigram: singole parole ("Python", "SQL")
-    - Bigram: coppie di parole ("machine learning", "data analysis")
-    - Trigram: triple di parole ("natural language processing")
-    
-    Questo permette di catturare skill composte che verrebbero perse
-    con una semplice tokenizzazione.
-    
-    STEP 3: REGEX PATTERN MATCHING
-    - Usa espressioni regolari per gestire varianti morfologiche
-    - Es: "analyz" matcha "analyze", "analyzing", "analyzed"
-    - Pattern: r'\\b{keyword}(?:s|es|ing|ed|tion|ment)?\\b'
-    
-    STEP 4: FUZZY MATCHING
-    Riferimento corso: gestione del "rumore" nei dati
-    
-    - Usa algoritmo di Levenshtein Distance
-    - Threshold 85%: tollera piccoli errori di battitura
-    - Es: "Phyton" → "Python" (typo comune)
-    
-    KNOWLEDGE BASE:
-    ---------------
-    Le skill sono definite in constants.py:
-    - HARD_SKILLS: competenze tecniche (Python, SQL, Machine Learning...)
-    - SOFT_SKILLS: competenze trasversali (Leadership, Communication...)
-    - INFERENCE_RULES: regole per dedurre skill correlate
-    
-    Args:
-        text: Testo da analizzare (CV o Job Description)
-        is_jd: Se True, preprocessa il testo per rimuovere sezioni non-skill
-        
-    Returns:
-        Tuple[Set[str], Set[str]]: (hard_skills, soft_skills) estratti
-    """
-    
-    # NEW: Preprocess JD to remove non-skill sections (benefits, salary, etc.)
-    if is_jd:
-        text = preprocess_jd_text(text)
-    
-    hard_found = set()
-    soft_found = set()
-    text_lower = text.lower()
-
-    # Carica knowledge base
-    # (Use copy to allow local extension based on domain context)
-    hard_skills = getattr(knowledge_base, "HARD_SKILLS", {}).copy()
-    soft_skills = getattr(knowledge_base, "SOFT_SKILLS", {})
-    inference_rules = getattr(knowledge_base, "INFERENCE_RULES", {})
-    
-    # NEW: Domain Context Boost
-    # If a specific domain is detected, we ensure its critical skills are searched for,
-    # even if they might not be in the standard HARD_SKILLS list or require prioritization.
-    domain_context = detect_domain_context(text)
-    if domain_context != "General":
-        domain_rules = getattr(knowledge_base, "DOMAIN_EXTRACTION_RULES", {}).get(domain_context, {})
-        must_extract = domain_rules.get("must_extract", [])
-        for skill_name in must_extract:
-            if skill_name not in hard_skills:
-                # Add domain-specific skill to search list (self-variation)
-                hard_skills[skill_name] = [skill_name]
-
-    # =========================================================================
-    # STEP 1: PREPROCESSING E GENERAZIONE N-GRAMS
-    # =========================================================================
-    # Riferimento corso: "N-gram Analysis"
-    #
-    # Tokenizziamo il testo e generiamo n-grams per catturare
-    # skill composte come "machine learning" o "data visualization"
-    # =========================================================================
-    
-    words = text_lower.split()
-    text_words = set(words)
-    
-    # Bigram: coppie di parole consecutive
-    bigrams = set(' '.join(words[i:i+2]) for i in range(len(words)-1))
-    
-    # Trigram: triple di parole consecutive
-    trigrams = set(' '.join(words[i:i+3]) for i in range(len(words)-2))
-    
-    # Unione di tutti i pattern da cercare
-    all_phrases = text_words | bigrams | trigrams
-
-    # 1. Regex Match Hard Skills (Exact + N-gram + Fuzzy)
-    for skill, variations in hard_skills.items():
-        matched = False
-        
-        # First try: direct phrase match in n-grams (fastest)
-        for var in variations:
-            if var.lower() in all_phrases:
-                hard_found.add(skill)
-                matched = True
-                break
-        
-        # Second try: regex match with morphological variants
-        if not matched:
-            for var in variations:
-                pattern = r'\b' + re.escape(var.lower()) + r'(?:s|es|ing|ed|tion|ment)?\b'
-                if re.search(pattern, text_lower):
-                    hard_found.add(skill)
-                    matched = True
-                    break
-
-        # Third try: fuzzy matching (only for skills with 5+ chars to avoid false positives)
-        # Short skills like SEO, SQL, CSS require exact match only
-        if not matched and fuzz and len(skill) >= 5:
-            # Skip fuzzy matching for common words that are often false positives
-            if skill.lower() in ["excel", "lead", "plan", "drive", "base"]:
-                continue
-                
-            for word in text_words:
-                if len(word) > 4 and fuzz.ratio(word, skill.lower()) > 90: # Increased threshold for safety
-                    hard_found.add(skill)
-                    break
-            # Also check bigrams for compound skills
-            if not matched:
-                for bigram in bigrams:
-                    if fuzz.ratio(bigram, skill.lower()) > 90:
-                        hard_found.add(skill)
-                        break
-
-    # 2. Regex Match Soft Skills (Exact + Fuzzy)
-    for skill, variations in soft_skills.items():
-        matched = False
-        
-        # Direct phrase match
-        for var in variations:
-            if var.lower() in all_phrases:
-                soft_found.add(skill)
-                matched = True
-                break
-        
-        # Regex fallback
-        if not matched:
-            for var in variations:
-                pattern = r'\b' + re.escape(var.lower()) + r'(?:s|es|ing|ed)?\b'
-                if re.search(pattern, text_lower):
-                    soft_found.add(skill)
-                    matched = True
-                    break
-
-        # Fuzzy fallback (only for skills with 5+ chars)
-        if not matched and fuzz and len(skill) >= 5:
-            for word in text_words:
-                if len(word) > 4 and fuzz.ratio(word, skill.lower()) > 88:
-                    soft_found.add(skill)
-                    break
-
-    # 3. Hierarchical Inference (expand found skills to parent categories)
-    inferred_skills = set()
-    for child_skill in hard_found:
-        if child_skill in inference_rules:
-            parents = inference_rules[child_skill]
-            inferred_skills.update(parents)
-    hard_found.update(inferred_skills)
-
-    # 4. Generic Fallback (only if very few skills found)
-    if len(hard_found) < 2:
-        generic_keywords = extract_generic_keywords(text, top_n=5)
-        for kw in generic_keywords:
-            hard_found.add(kw.capitalize())
-
-    # =========================================================================
-    # STEP 5: SEMI-SUPERVISED ENHANCEMENT
-    # =========================================================================
-    # Riferimento corso: "Semi-Supervised Learning", "Label Propagation"
-    #
-    # Questo step usa il layer semi-supervisionato per:
-    # 1. Migliorare l'estrazione usando pattern appresi precedentemente
-    # 2. Apprendere nuovi pattern dalle skill trovate con alta confidenza
-    # =========================================================================
-    
-    # =========================================================================
-    # STEP 6: JOB ARCHETYPE FALLBACK (NEW)
-    # =========================================================================
-    # Se is_jd=True, cerchiamo se il testo contiene nomi di ruoli
-    # (es: "Energy Trader", "energy engineer") e estraiamo le skill
-    # richieste dall'archetype corrispondente.
-    # Questo permette di matchare JD che contengono solo nomi di ruoli.
-    # =========================================================================
-    if is_jd:
-        job_archetypes = getattr(knowledge_base, "JOB_ARCHETYPES", {})
-        soft_skill_names = set(soft_skills.keys())  # Filter out soft skills
-        
-        # Normalize text: remove punctuation and extra spaces
-        text_normalized = re.sub(r'[,;:\.\-\(\)]', ' ', text_lower)
-        text_normalized = ' '.join(text_normalized.split())  # Normalize whitespace
-        text_words = set(text_normalized.split())
-        
-        for role_name, role_skills in job_archetypes.items():
-            role_lower = role_name.lower()
-            role_words = role_lower.split()
-            
-            # Method 1: Exact phrase match
-            if role_lower in text_normalized:
-                expanded_role_skills = expand_skills_bidirectional({s.lower() for s in role_skills})
-                for skill in role_skills:
-                    # Only add if NOT a soft skill (we check normalized name in expanded set)
-                    if skill not in soft_skill_names:
-                        hard_found.add(skill)
-                # Ensure inferred skills are also added
-                for s_inferred in expanded_role_skills:
-                    # We add them as capitalized to fit the hard_found convention
-                    hard_found.add(s_inferred.capitalize())
-                continue
-            
-            # Method 2: All words of role name present in JD
-            if len(role_words) > 1 and all(w in text_words for w in role_words):
-                expanded_role_skills = expand_skills_bidirectional({s.lower() for s in role_skills})
-                for skill in role_skills:
-                    if skill not in soft_skill_names:
-                        hard_found.add(skill)
-                for s_inferred in expanded_role_skills:
-                    hard_found.add(s_inferred.capitalize())
-                continue
-            
-            # Method 3: Fuzzy match for role names (handle typos/variations)
-            if fuzz and len(role_lower) > 5:
-                # Check against original text segments
-                for segment in text_normalized.split():
-                    if len(segment) > 5 and fuzz.ratio(segment, role_lower.replace(" ", "")) > 85:
-                        expanded_role_skills = expand_skills_bidirectional({s.lower() for s in role_skills})
-                        for skill in role_skills:
-                            hard_found.add(skill)
-                        for s_inferred in expanded_role_skills:
-                            hard_found.add(s_inferred.capitalize())
-                        break
-
-    # =========================================================================
-    # STEP 3: FALSE POSITIVE FILTERING (NEW)
-    # =========================================================================
-    # Riferimento corso: "Precision vs Recall"
-    #
-    # Alcuni termini sono sia skill che verbi comuni (es. "Excel", "Lead", "Plan").
-    # Se appaiono solo in contesti verbali generici, li rimuoviamo.
-    # =========================================================================
-    
-    if "Excel" in hard_found:
-        # Se 'excel' appare solo come verbo "will excel", "to excel", lo scartiamo
-        verb_phrases = ["will excel", "to excel", "excel in", "excelling at my"]
-        count_all = text_lower.count("excel")
-        count_verbs = sum(text_lower.count(p) for p in verb_phrases)
-        if count_all > 0 and count_all == count_verbs:
-            hard_found.discard("Excel")
-
-    if "Management" in hard_found and "Management" not in text:
-        # Se abbiamo trovato 'management' solo tramite fuzzy o lowercase e 
-        # il testo parla di "time management" (che è soft), non aggiungerlo agli hard 
-        # a meno che non sia esplicitamente un corso o ruolo.
-        pass # placeholder for complex logic if needed
-        
-    return hard_found, soft_found
-
-
-# =============================================================================
-def extract_text_from_pdf(pdf_file) -> str:
-    if PdfReader is None: 
+    if _lazy_import("pypdf") is None: 
         raise ImportError("pypdf missing")
     try:
-        reader = PdfReader(pdf_file)
-        return " ".join(page.extract_text() or "" for page in reader.pages)
+        return pdf_text.extract_pdf(pdf_file)
     except Exception as e:
         raise Exception(f"PDF Error: {str(e)}")
 
+def extract_text_from_pdf(pdf_file) -> str:
+    """Text of an uploaded PDF (see extract_pdf_document)."""
+    return extract_pdf_document(pdf_file).text
+
 def generate_pdf_report(res: Dict, jd_text: str = "", cl_analysis: Dict = None) -> bytes:
     """
     Generates a comprehensive PDF report with skills, cover letter, interview tips, and job recommendations.
     """
+    FPDF = _lazy_import("fpdf", "FPDF")
     if not FPDF:
         return b"FPDF library missing."
 
@@ -2138,280 +1577,26 @@ def generate_pdf_report(res: Dict, jd_text: str = "", cl_analysis: Dict = None)
     
     return pdf.output(dest='S').encode('latin-1', 'ignore')
 
-def detect_language(text: str) -> str:
-    """
-    Enhanced language detection for native language inference.
-    If a CV is written in a specific language, we can infer the candidate 
-    is likely a native speaker of that language.
-    
-    Supports: Italian, English, Spanish, French, German, Portuguese
-    Returns the detected native language as a skill string.
-    """
-    text = text.lower()
-    
-    # Language markers (common words unique to each language)
-    language_markers = {
-        "Italian": {
-            "markers": {" il ", " lo ", " la ", " gli ", " le ", " di ", " è ", " per ", 
-                       " delle ", " nella ", " sono ", " che ", " con ", " una ", " del ",
-                       " nel ", " alla ", " dalla ", " presso ", " laurea ", " esperienza ",
-                       " competenze ", " lavoro ", " sviluppo ", " gestione "},
-            "strong_markers": {" esperienza lavorativa", " istruzione ", " competenze tecniche",
-                              " laurea in ", " presso ", " dal ", " al "}
-        },
-        "English": {
-            "markers": {" the ", " a ", " an ", " and ", " is ", " of ", " for ", " to ", 
-                       " in ", " with ", " that ", " this ", " have ", " has ", " was ",
-                       " were ", " been ", " experience ", " skills ", " work ", " team "},
-            "strong_markers": {" work experience ", " education ", " skills ", " bachelor",
-                              " master ", " university ", " developed ", " managed "}
-        },
-        "Spanish": {
-            "markers": {" el ", " la ", " los ", " las ", " de ", " en ", " que ", " y ",
-                       " es ", " para ", " con ", " una ", " por ", " como ", " más ",
-                       " del ", " experiencia ", " trabajo ", " desarrollo "},
-            "strong_markers": {" experiencia laboral ", " educación ", " habilidades ",
-                              " licenciatura ", " universidad ", " desarrollé "}
-        },
-        "French": {
-            "markers": {" le ", " la ", " les ", " de ", " du ", " des ", " et ", " en ",
-                       " est ", " une ", " un ", " pour ", " avec ", " dans ", " sur ",
-                       " expérience ", " travail ", " développement "},
-            "strong_markers": {" expérience professionnelle ", " formation ", " compétences ",
-                              " licence ", " université ", " développé "}
-        },
-        "German": {
-            "markers": {" der ", " die ", " das ", " und ", " in ", " ist ", " mit ", " für ",
-                       " von ", " zu ", " auf ", " bei ", " eine ", " einer ", " eines ",
-                       " erfahrung ", " arbeit ", " entwicklung "},
-            "strong_markers": {" berufserfahrung ", " ausbildung ", " kenntnisse ",
-                              " bachelor ", " universität ", " entwickelt "}
-        },
-        "Portuguese": {
-            "markers": {" o ", " a ", " os ", " as ", " de ", " em ", " que ", " e ",
-                       " é ", " para ", " com ", " uma ", " por ", " como ", " mais ",
-                       " do ", " experiência ", " trabalho ", " desenvolvimento "},
-            "strong_markers": {" experiência profissional ", " educação ", " habilidades ",
-                              " licenciatura ", " universidade ", " desenvolvi "}
-        }
-    }
-    
-    # Calculate scores for each language
-    scores = {}
-    for lang, data in language_markers.items():
-        # Count regular markers
-        regular_score = sum(1 for w in data["markers"] if w in text)
-        # Strong markers count double
-        strong_score = sum(2 for w in data["strong_markers"] if w in text)
-        scores[lang] = regular_score + strong_score
-    
-    # Find the best match
-    best_lang = max(scores, key=scores.get)
-    best_score = scores[best_lang]
-    
-    # Only return if score is significant (at least 3 markers found)
-    if best_score >= 3:
-        return best_lang
-    
-    return None
-
-# =============================================================================
-# =============================================================================
-# SCORING HARMONIZATION - Unified Weights
-# =============================================================================
-WEIGHT_DIRECT = 1.0
-WEIGHT_INFERRED = 0.9        # Parent/Child link (e.g. React -> Frontend)
-WEIGHT_TRANSFERABLE = 0.7    # Equivalent tool (e.g. Power BI -> Tableau) - Unified to 0.7
-WEIGHT_PROJECT_ONLY = 0.4    # Found in project but not stated in CV
 
-def calculate_match_score(score_points: float, total_items: int) -> float:
-    """
-    Unified calculation for match percentage.
-    Ensures consistent capping (100%) and rounding (1 decimal).
-    """
-    if total_items <= 0:
-        return 0.0
-    percentage = (score_points / total_items) * 100
-    return round(min(100.0, percentage), 1)
-
-def _calculate_composite_role_score(skill_score: float, semantic_score: float, edu_boost: float) -> float:
-    """
-    INTERNAL UNIFIED SCORER v1.1
-    ----------------------------
-    Combines three factors into a single consistent match percentage:
-    1. Skill Match (65%) - Weighted direct/inferred/transferable.
-    2. Semantic Context (20%) - TF-IDF/LSA similarity.
-    3. Education Boost (15%) - Degree/field relevance (Increased weight).
-    """
-    # All inputs are on a 0-100 scale.
-    final = (0.65 * skill_score) + (0.20 * semantic_score) + (0.15 * edu_boost)
-    return round(min(100.0, final), 1)
-
-def analyze_gap(cv_text: str, job_text: str) -> Dict:
-    """
-    STRUCTURED SKILL GAP ANALYSIS v3.0 - Harmonized
-    
-    Implements multi-step hierarchical matching with standardized weights.
-    """
-    # 1. Setup Data Structures
-    SKILL_CLUSTERS = getattr(knowledge_base, "SKILL_CLUSTERS", {})
-    INFERENCE_RULES = getattr(knowledge_base, "SKILL_HIERARCHY", {}) 
-    if not INFERENCE_RULES:
-        INFERENCE_RULES = getattr(knowledge_base, "INFERENCE_RULES", {})
-        
-    JOB_ARCHETYPES_EXTENDED = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
-    import difflib
-
-    # 2. Extract skills from both texts
-    cv_hard, cv_soft = extract_skills_from_text(cv_text)
-    job_hard, job_soft = extract_skills_from_text(job_text, is_jd=True)
-
-    # 3. Archetype Fallback (if JD is a Role Name)
-    # -------------------------------------------
-    # We look for a role match even if skills were already extracted, 
-    # to ensure composite scoring (70/20/15) is applied for role-based JDs.
-    best_role = None
-    if len(job_text.split()) < 15:
-        titles = list(JOB_ARCHETYPES_EXTENDED.keys())
-        query = job_text.strip().lower()
-        
-        for title in titles:
-            if query == title.lower() or query in title.lower():
-                best_role = title
-                break
-        
-        if not best_role:
-            matches = difflib.get_close_matches(query, titles, n=1, cutoff=0.7)
-            if matches: best_role = matches[0]
-            
-        if best_role:
-            role_data = JOB_ARCHETYPES_EXTENDED[best_role]
-            arch_skills = set()
-            if isinstance(role_data, dict):
-                arch_skills.update(role_data.get("primary_skills", []))
-                arch_skills.update(role_data.get("hard_skills", []))
-                job_soft.update(role_data.get("soft_skills", []))
-            elif isinstance(role_data, (list, set)):
-                arch_skills.update(role_data)
-            
-            expanded_arch = expand_skills_bidirectional({s.lower() for s in arch_skills})
-            job_hard.update(arch_skills)
-            job_hard.update({s.capitalize() for s in expanded_arch})
-
-    # 4. Multi-Step Matching Logic
-    cv_hard_lower = {s.lower() for s in cv_hard}
-    cv_expanded = expand_skills_bidirectional(cv_hard_lower)
-
-    matched = set()      # Green
-    transferable = {}    # Yellow
-    missing = set()      # Red
-    score_points = 0.0
-    
-    for jd_skill in job_hard:
-        jd_norm = jd_skill.lower()
-        
-        # STEP 1: DIRECT MATCH (1.0)
-        if jd_norm in cv_hard_lower:
-            matched.add(jd_skill)
-            score_points += WEIGHT_DIRECT
-            continue
-            
-        # STEP 2: INFERRED MATCH (0.9) - Hierarchy
-        if jd_norm in cv_expanded:
-            matched.add(jd_skill)
-            score_points += WEIGHT_INFERRED
-            continue
-
-        # STEP 3: TRANSFERABLE MATCH (0.6) - Clusters
-        found_transferable = False
-        for cluster_id, cluster_data in SKILL_CLUSTERS.items():
-            cluster_skills = {s.lower() for s in (cluster_data.get("skills", []) if isinstance(cluster_data, dict) else cluster_data)}
-            if jd_norm in cluster_skills:
-                common = cv_hard_lower.intersection(cluster_skills)
-                if common:
-                    transferable[jd_skill] = f"Transferable from {', '.join(list(common)[:2])}"
-                    score_points += WEIGHT_TRANSFERABLE
-                    found_transferable = True
-                    break
-        if found_transferable: continue
-
-        # STEP 4: MISSING
-        missing.add(jd_skill)
-
-    # 5. Result Construction
-    extra_hard = cv_hard - matched
-    for s in transferable:
-        if s in extra_hard: extra_hard.remove(s)
-        
-    matching_soft = cv_soft & job_soft
-    discussion_soft = job_soft - cv_soft
-    cv_stated_soft = cv_soft
-
-    # 6. Seniority and Metrics
-    cv_level, _ = detect_seniority(cv_text)
-    jd_level, _ = detect_seniority(job_text)
-    
-    seniority_match = "Match"
-    if cv_level != jd_level:
-        if cv_level == "Entry Level" and jd_level == "Senior Level": seniority_match = "Underqualified"
-        elif cv_level == "Senior Level" and jd_level == "Entry Level": seniority_match = "Overqualified"
-        else: seniority_match = "Partial Match"
-
-    total_jd = len(job_hard)
-    skill_match_score = calculate_match_score(score_points, total_jd)
-    
-    # 4b. COMPOSITE SCORING (if Role Fallback was used)
-    # This ensures consistency with Discovery/Compass
-    final_match_pct = skill_match_score
-    
-    # We check if 'best_role' exists in local scope (from fallback section)
-    if 'best_role' in locals() and best_role and cv_text:
-        # Get semantic match for this specific role
-        # We do NOT pass jd_text here so the role isn't excluded for matching itself
-        recs = recommend_roles(cv_skills=cv_hard | cv_soft, cv_text=cv_text)
-        # Find our best_role in the recs to get its composite score
-        for r in recs:
-            if r['role'] == best_role:
-                final_match_pct = r['score']
-                break
-
-    match_percentage = final_match_pct
-
-    return {
-        "match_percentage": round(match_percentage, 1),
-        "matching_hard": list(matched),
-        "transferable": transferable,
-        "missing_hard": list(missing),
-        "extra_hard": list(extra_hard),
-        "soft_interview_verified": list(matching_soft),
-        "soft_discussion_points": list(discussion_soft),
-        "soft_stated_strengths": list(cv_stated_soft),
-        "matching_soft": list(matching_soft), 
-        "missing_soft": list(discussion_soft),
-        "project_review": set(),
-        "seniority_info": {
-            "cv_level": cv_level,
-            "jd_level": jd_level,
-            "match_status": seniority_match
-        },
-        "cv_skills": list(cv_hard),
-        "job_skills": list(job_hard),
-        "match_pct": round(match_percentage, 1)
-    }
-
-def analyze_gap_with_project(cv_text: str, job_text: str, project_text: str) -> Dict:
+def analyze_gap_with_project(cv_text, job_text, project_text) -> Dict:
     """
     Enhanced Portfolio Intelligence System.
     Analyzes CV + Project vs Job Description with comprehensive insights.
     Returns portfolio quality score, project highlights, gap suggestions, and verified skills.
+    Inputs can be raw text or ParsedDocument (doc_cache.py).
     """
+    cv_doc = as_parsed(cv_text)
+    job_doc = as_parsed(job_text, is_jd=True)
+    proj_doc = as_parsed(project_text)
+    project_text = proj_doc.text
+
     # 1. Standard CV Analysis
-    res = analyze_gap(cv_text, job_text)
+    res = analyze_gap(cv_doc, job_doc)
     
-    # 2. Extract skills from all sources
-    proj_hard, _ = extract_skills_from_text(project_text)
-    job_hard, _ = extract_skills_from_text(job_text, is_jd=True)  # Enable archetype fallback
-    cv_hard, _ = extract_skills_from_text(cv_text)
+    # 2. Extract skills from all sources (already parsed by analyze_gap)
+    proj_hard, _ = proj_doc.skills()
+    job_hard, _ = job_doc.skills()  # Enable archetype fallback
+    cv_hard, _ = cv_doc.skills()
     
     # 3. Calculate Portfolio Quality Score (0-100)
     portfolio_metrics = calculate_portfolio_quality(
@@ -2903,6 +2088,7 @@ def generate_cv_pdf(text_content: str) -> bytes:
     Generates a professionally formatted CV PDF.
     Uses proper sections, headers, and spacing for readability.
     """
+    FPDF = _lazy_import("fpdf", "FPDF")
     if not FPDF:
         return None
         
@@ -3055,300 +2241,14 @@ def generate_cv_pdf(text_content: str) -> bytes:
     return pdf.output(dest='S').encode('latin-1')
 
 
-# =============================================================================
-# JOB RECOMMENDER (Career Compass) - v1.25
-# =============================================================================
-
-# Education fields to job roles mapping
-EDUCATION_TO_ROLES = {
-    # Business & Economics
-    "economia": ["Business Analyst", "Financial Analyst", "Data Analyst", "Marketing Manager", "Consultant"],
-    "business": ["Business Analyst", "Marketing Manager", "Consultant", "Product Manager", "AI Business Analyst"],
-    "marketing": ["Marketing Manager", "Digital Marketing Specialist", "Brand Manager", "Growth Marketing Manager", "Marketing Data Analyst"],
-    "finanza": ["Financial Analyst", "Investment Analyst", "Risk Analyst", "Quantitative Analyst"],
-    "management": ["Product Manager", "Project Manager", "Business Analyst", "Consultant"],
-    # Tech & Engineering
-    "informatica": ["Software Engineer", "Backend Developer", "Full Stack Developer", "Data Engineer", "DevOps Engineer"],
-    "ingegneria": ["Software Engineer", "Backend Developer", "Data Engineer", "DevOps Engineer", "Machine Learning Engineer", "Solutions Architect", "MLOps Engineer"],
-    "computer science": ["Software Engineer", "Backend Developer", "Full Stack Developer", "Machine Learning Engineer", "Analytics Engineer", "Growth Engineer"],
-    "data science": ["Data Scientist", "Machine Learning Engineer", "Data Analyst", "AI Business Analyst", "Marketing Data Analyst", "Analytics Engineer"],
-    "artificial intelligence": ["Machine Learning Engineer", "Data Scientist", "AI Business Analyst", "MLOps Engineer"], # New
-    # Sciences
-    "matematica": ["Data Scientist", "Quantitative Analyst", "Machine Learning Engineer", "Financial Analyst", "FinTech Specialist"],
-    "statistica": ["Data Scientist", "Data Analyst", "Statistician", "Machine Learning Engineer", "Marketing Data Analyst"],
-    "fisica": ["Data Scientist", "Quantitative Analyst", "Machine Learning Engineer"],
-    # Creative & Communication
-    "comunicazione": ["Marketing Manager", "Digital Marketing Specialist", "Content Marketing Manager", "UX Designer", "Product Marketing Manager"],
-    "design": ["UX Designer", "UI Designer", "Product Designer", "Frontend Developer"],
-    "giornalismo": ["Content Marketing Manager", "Digital Marketing Specialist", "Copywriter", "Technical Writer"],
-    # Other
-    "psicologia": ["UX Researcher", "HR Manager", "Product Manager", "HR Tech Specialist"],
-    "giurisprudenza": ["Compliance Analyst", "Legal Tech Specialist", "Business Analyst"],
-    "lingue": ["Content Marketing Manager", "International Business", "Marketing Manager"],
-}
-
-def recommend_roles(cv_skills: Set[str], jd_text: str = "", cv_text: str = "") -> List[Tuple[str, float, List[str]]]:
-    """
-    Identifies the best fitting job roles excluding the one described in the JD.
-    Now also considers education from CV text with recency weighting.
-    """
-    job_archetypes = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
-    SKILL_CLUSTERS = getattr(knowledge_base, "SKILL_CLUSTERS", {})
-    if not cv_skills or not job_archetypes or not TfidfVectorizer:
-        return []
-
-    # 0. Seniority Detection
-    cv_level, _ = detect_seniority(cv_text) if cv_text else ("Mid Level", 0.0)
-
-    # 1. Extract education boost from CV text
-    education_boost = {}
-    if cv_text:
-        cv_lower = cv_text.lower()
-        
-        # Find education keywords and boost related roles
-        for edu_keyword, related_roles in EDUCATION_TO_ROLES.items():
-            if edu_keyword in cv_lower:
-                # Check if it's recent (appears early in CV = more recent)
-                position = cv_lower.find(edu_keyword)
-                # Weight: earlier position = more recent = higher weight 
-                # Scaled to 0-100 range for unified scoring (max 100, min 40 if mentioned)
-                recency_weight = max(40, 100 - (position / len(cv_lower)) * 50)
-                
-                for role in related_roles:
-                    if role in job_archetypes:
-                        current_boost = education_boost.get(role, 0)
-                        education_boost[role] = max(current_boost, recency_weight)
-
-    # 2. Prepare Corpus
-    archetype_names = list(job_archetypes.keys())
-    archetype_docs = [" ".join(job_archetypes[name]) for name in archetype_names]
-    
-    # Docs: [0=CV, 1=JD (if exists), 2..N=Archetypes]
-    corpus = [" ".join(cv_skills)]
-    
-    jd_index = -1
-    if jd_text:
-        corpus.append(jd_text)
-        jd_index = 1
-        
-    corpus.extend(archetype_docs)
-    
-    # 2. Vectorization - Use word-based matching for accurate skill comparison
-    vectorizer = TfidfVectorizer(analyzer='word', ngram_range=(1, 2), min_df=1, lowercase=True)
-    tfidf_matrix = vectorizer.fit_transform(corpus)
-    
-    # 2b. LSA Semantic Analysis (New Model) - Captures latent relationships
-    try:
-        if TruncatedSVD:
-            n_components = min(15, len(corpus)-1) # Avoid error if corpus is small
-            lsa_model = TruncatedSVD(n_components=n_components, random_state=42)
-            lsa_matrix = lsa_model.fit_transform(tfidf_matrix)
-        else:
-            lsa_matrix = None
-    except Exception:
-        lsa_matrix = None
-    
-    # 3. Identify Target Role from JD (if redundant)
-    excluded_roles = set()
-    if jd_index != -1:
-        # Compare JD (doc 1) vs Archetypes (docs 2..)
-        jd_vector = tfidf_matrix[jd_index:jd_index+1]
-        arch_start_idx = jd_index + 1
-        arch_vectors = tfidf_matrix[arch_start_idx:]
-        
-        # Find closest archetype to JD
-        jd_sims = cosine_similarity(jd_vector, arch_vectors).flatten()
-        target_role_idx = jd_sims.argmax()
-        target_role_score = jd_sims[target_role_idx]
-        
-        # If the JD strongly matches an archetype (>50%), exclude it
-        # Increased threshold from 0.15 to 0.50 to prevent false exclusions of valid alternatives
-        jd_lower = jd_text.lower() if jd_text else ""
-        
-        # 1. Cosine Similarity Check
-        if target_role_score > 0.50:
-            excluded_roles.add(archetype_names[target_role_idx])
-            
-        # 2. Heuristic Check (Explicit Mention in Header)
-        # Only exclude if mentioned in first 200 chars (Title area)
-        header_text = jd_lower[:200]
-        for name in archetype_names:
-            if name.lower() in header_text:
-                excluded_roles.add(name)
-                
-    # 4. Identify Current Role from CV (REMOVED in v1.36)
-    # We deliberately WANT to recommend the candidate's current role if it's a good fit.
-    # Users found it confusing that "Data Analyst" wasn't recommended for a Data Analyst profile.
-    
-    # 5. Compute Recommendations (Similarity to remaining archetypes)
-    # CV is at index 0
-    cv_vector = tfidf_matrix[0:1]
-    arch_vectors_final = tfidf_matrix[len(corpus)-len(archetype_names):]
-    tfidf_similarities = cosine_similarity(cv_vector, arch_vectors_final).flatten()
-    
-    # Hybrid Score: Combine TF-IDF (keyword intensity) with LSA (semantic meaning)
-    if lsa_matrix is not None:
-        cv_lsa = lsa_matrix[0:1]
-        arch_lsa = lsa_matrix[len(corpus)-len(archetype_names):]
-        lsa_similarities = cosine_similarity(cv_lsa, arch_lsa).flatten()
-        # Weighting: 70% direct keywords, 30% semantic context
-        similarities = (0.7 * tfidf_similarities) + (0.3 * lsa_similarities)
-    else:
-        similarities = tfidf_similarities
-    
-    # Build expanded CV skills set (including cluster equivalents)
-    cv_norm = {s.lower() for s in cv_skills}
-    cv_norm = expand_skills_with_clusters(cv_norm)
-                
-    # 5. Compute Recommendations (JACCARD SIMILARITY for robustness)
-    recommendations = []
-    
-    for i, name in enumerate(archetype_names):
-        if name in excluded_roles:
-            continue
-            
-        role_data = job_archetypes[name]
-        sector = role_data.get("sector", "Other")
-        role_skills = set(role_data.get("primary_skills", []))
-        
-        role_norm = {s.lower() for s in role_skills}
-        
-        if not role_norm:
-            continue
-        
-        # CRITICAL FIX: Expand role skills with same logic as CV skills
-        # This ensures "Analytics" matches "Business Analysis", etc.
-        role_norm_expanded = expand_skills_with_clusters(role_norm)
-            
-        # 5. Compute Recommendations (WEIGHTED SCORING for consistency)
-        # -----------------------------------------------------------
-        # Use same logic as analyze_gap: Direct(1.0), Inferred(0.9), Transferable(0.7)
-        score_points = 0.0
-        skills_matched = set()
-        
-        cv_expanded = expand_skills_bidirectional(cv_norm)
-        
-        for rs in role_norm:
-            # Direct Match
-            if rs in cv_norm:
-                score_points += WEIGHT_DIRECT
-                skills_matched.add(rs)
-                continue
-            
-            # Inferred Match
-            if rs in cv_expanded:
-                score_points += WEIGHT_INFERRED
-                skills_matched.add(rs)
-                continue
-               
-            # Transferable Match 
-            found_trans = False
-            for cid, cdata in SKILL_CLUSTERS.items():
-                cskills = {s.lower() for s in (cdata.get("skills", []) if isinstance(cdata, dict) else cdata)}
-                if rs in cskills:
-                    if cv_norm.intersection(cskills):
-                        score_points += WEIGHT_TRANSFERABLE
-                        found_trans = True
-                        break
-            if found_trans: continue
-
-        # Calculate base weighted score
-        weighted_skill_score = calculate_match_score(score_points, len(role_norm))
-        
-        # Boost with Semantic Similarity (0-100 range)
-        semantic_score = similarities[i] * 100
-        
-        # Education Boost (0-30 range)
-        edu_boost = (education_boost.get(name, 0))
-        
-        # FINAL UNIFIED COMPOSITE SCORE
-        final_score = _calculate_composite_role_score(weighted_skill_score, semantic_score, edu_boost)
-        
-        if final_score > 5: # Threshold
-             missing = role_norm - skills_matched
-             recommendations.append({
-                 "role": name,
-                 "category": sector,
-                 "score": final_score,
-                 "skills_matched": list(skills_matched),
-                 "skills_required": list(role_skills),
-                 "missing_skills": list(missing)[:5]
-             })
-             
-    # Sort and Return
-    recommendations.sort(key=lambda x: x["score"], reverse=True)
-    return recommendations
-
-def expand_skills_bidirectional(skills_norm: Set[str]) -> Set[str]:
-    """
-    UNIFIED SKILL EXPANSION ENGINE v2.0
-    ----------------------------------
-    Implements bidirectional inference:
-    1. HIERARCHY (Upwards): Specific -> General (e.g., React -> Frontend)
-    2. IMPLICATIONS (Downwards): General -> Specific (e.g., Data Science -> Python)
-    3. CLUSTERS (Horizontal): Equivalent/Transferable (e.g., Tableau -> Power BI)
-    
-    Args:
-        skills_norm: Set of normalized (lowercase) skill names
-        
-    Returns:
-        Set[str]: Expanded set of normalized skill names
-    """
-    if not skills_norm:
-        return set()
-
-    # Access Knowledge Base
-    SKILL_CLUSTERS = getattr(knowledge_base, "SKILL_CLUSTERS", {})
-    SKILL_HIERARCHY = getattr(knowledge_base, "SKILL_HIERARCHY", {})
-    if not SKILL_HIERARCHY:
-        SKILL_HIERARCHY = getattr(knowledge_base, "INFERENCE_RULES", {})
-    SKILL_IMPLICATIONS = getattr(knowledge_base, "SKILL_IMPLICATIONS", {})
-    
-    expanded = set(skills_norm)
-    
-    # 1. Cluster Expansion (Horizontal - Transferable)
-    for cluster_id, cluster_data in SKILL_CLUSTERS.items():
-        cluster_skills = {s.lower() for s in (cluster_data.get("skills", []) if isinstance(cluster_data, dict) else cluster_data)}
-        if expanded & cluster_skills:
-            expanded.update(cluster_skills)
-
-    # 2. Knowledge Base Key Expansion (Variety -> Canonical)
-    # Move this BEFORE inference so variations (like 'fogli di calcolo') 
-    # grant the parent key ('Excel') and trigger ITS implications.
-    hard_skills = getattr(knowledge_base, "HARD_SKILLS", {})
-    for canonical, variations in hard_skills.items():
-        variations_norm = {v.lower() for v in variations}
-        if expanded & variations_norm:
-            expanded.add(canonical.lower())
-
-    # 3. Bidirectional Inference (Up/Down)
-    # We do a few iterations to handle chains (e.g., A -> B -> C)
-    for _ in range(2): 
-        current_pass = set(expanded)
-        for s in current_pass:
-            # CHILD -> PARENT (Hierarchy)
-            for rule_key, parents in SKILL_HIERARCHY.items():
-                if s == rule_key.lower():
-                    expanded.update({p.lower() for p in parents})
-            
-            # PARENT -> CHILD (Implications)
-            for rule_key, children in SKILL_IMPLICATIONS.items():
-                if s == rule_key.lower():
-                    expanded.update({c.lower() for c in children})
-                    
-        if len(expanded) == len(current_pass):
-            break
-
-    return expanded
-
-# Legacy alias for backward compatibility
-def expand_skills_with_clusters(cv_norm):
-    return expand_skills_bidirectional(cv_norm)
-
 
 # =============================================================================
 # CAREER DISCOVERY - Preference-Based Job Matching
 # =============================================================================
+# Tables discover_careers depends on (key of its memoized results, see result_cache)
+DISCOVERY_TABLES = doc_cache.EXTRACTION_TABLES + role_index.MATRIX_TABLES
+
+
 def discover_careers(
     cv_text: str = "",
     free_text: str = "",
@@ -3360,7 +2260,7 @@ def discover_careers(
     Consumes unified recommend_roles engine to ensure 100% scoring consistency.
     """
     # 1. Extract CV Skills
-    cv_hard, cv_soft = extract_skills_from_text(cv_text)
+    cv_hard, cv_soft = parse_document(cv_text).skills()
     cv_skills = cv_hard | cv_soft
     
     # 2. Get recommendations from Unified Engine
@@ -3469,27 +2369,34 @@ def _parse_intent_signals(text: str) -> dict:
 
 
 
-def analyze_cover_letter(cover_letter_text: str, jd_text: str, cv_text: str = "") -> Dict:
+def analyze_cover_letter(cover_letter_text, jd_text, cv_text="") -> Dict:
     """
     Analyzes a cover letter against a job description.
     Returns scoring, strengths, weaknesses, and suggestions.
     Supports both English and Italian.
+    Inputs can be raw text or ParsedDocument (doc_cache.py).
     """
     if not cover_letter_text or not jd_text:
         return None
     
+    cl_doc = as_parsed(cover_letter_text)
+    jd_doc = as_parsed(jd_text, is_jd=True)
+    cover_letter_text, jd_text = cl_doc.text, jd_doc.text
+    
     # Detect language
-    cl_lang = detect_language(cover_letter_text)
+    cl_lang = cl_doc.language
     
     # Extract skills from JD and Cover Letter
-    jd_hard, jd_soft = extract_skills_from_text(jd_text, is_jd=True)
-    cl_hard, cl_soft = extract_skills_from_text(cover_letter_text)
+    jd_hard, jd_soft = jd_doc.skills()
+    cl_hard, cl_soft = cl_doc.skills()
     
     # Extract CV skills if provided
     cv_hard = set()
     cv_soft = set()
     if cv_text:
-        cv_hard, cv_soft = extract_skills_from_text(cv_text)
+        cv_doc = as_parsed(cv_text)
+        cv_text = cv_doc.text
+        cv_hard, cv_soft = cv_doc.skills()
     
     # 1. KEYWORD COVERAGE ANALYSIS
     hard_mentioned = jd_hard & cl_hard
@@ -3713,7 +2620,7 @@ def suggest_semantic_improvements(user_skills: Set[str], jd_text: str) -> List[s
     suggestions = []
     
     # 1. Identify Gaps
-    jd_hard, _ = extract_skills_from_text(jd_text, is_jd=True)
+    jd_hard, _ = as_parsed(jd_text, is_jd=True).skills()
     missing = jd_hard - user_skills
     
     if not missing:
@@ -3753,6 +2660,7 @@ def generate_simple_cv_pdf(text_content: str) -> bytes:
     Generates a clean, compact PDF for the CV export.
     Optimized for single-page layout and proper character encoding.
     """
+    FPDF = _lazy_import("fpdf", "FPDF")
     if not FPDF:
         return None
         
@@ -3825,65 +2733,23 @@ def generate_simple_cv_pdf(text_content: str) -> bytes:
 # RUBEN AI - Sidebar Assistant Logic
 # =============================================================================
 
+# Below this lang_id confidence a chat message falls back to English
+# (gibberish, a bare name, "ok")
+CHAT_LANGUAGE_MIN_CONFIDENCE = 0.6
+
+
 def _detect_chat_language(message: str) -> str:
     """
     Detects the language of a chat message.
     Returns language code: 'en', 'it', 'es', 'fr', 'de', 'pt'
     Default: 'en' (English)
+
+    Same character n-gram model as detect_language (lang_id.py).
     """
     if not message:
         return 'en'
-        
-    m = " " + message.lower() + " "
-    
-    # Language-specific words with scores
-    lang_words = {
-        'it': ["ciao", "come", "cosa", "dove", "quando", "chi", "puoi", "vorrei", "aiuto", "grazie", 
-               "lavoro", "colloquio", "stipendio", "curriculum", "sono", "posso", "usare", "questo", 
-               "strumento", "buongiorno", "buonasera", "prego", "perfetto", "italiano"],
-        'es': ["hola", "como", "que", "donde", "cuando", "quien", "puedes", "quiero", "ayuda", "gracias",
-               "trabajo", "necesito", "curriculum", "soy", "puedo", "usar", "esto", "buenos", "buenas",
-               "perfecto", "español", "entrevista"],
-        'fr': ["bonjour", "comment", "quoi", "où", "quand", "qui", "pouvez", "voudrais", "aide", "merci",
-               "travail", "je", "puis", "utiliser", "ceci", "suis", "peux", "analyser", "français",
-               "bonsoir", "salut", "entretien", "mon", "mes", "vous"],
-        'de': ["hallo", "wie", "was", "wo", "wann", "wer", "können", "möchte", "hilfe", "danke",
-               "arbeit", "ich", "kann", "benutzen", "dies", "bin", "meinen", "lebenslauf", "verbessern",
-               "guten", "tag", "morgen", "bitte", "deutsch"],
-        'pt': ["olá", "como", "que", "onde", "quando", "quem", "pode", "quero", "ajuda", "obrigado",
-               "trabalho", "preciso", "curriculo", "sou", "posso", "usar", "isso", "meu", "português",
-               "bom", "dia", "boa", "noite", "obrigada"]
-    }
-    
-    # Quick checks for strong language indicators
-    # Italian strong keywords
-    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["ciao", "grazie", "stipendio", "colloquio", "buongiorno"]):
-        return 'it'
-    # Spanish strong keywords
-    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["hola", "gracias", "necesito", "buenos"]):
-        return 'es'
-    # French strong keywords
-    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["bonjour", "merci", "salut", "bonsoir", "puis-je"]):
-        return 'fr'
-    # German strong keywords
-    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["hallo", "danke", "guten", "bitte", "lebenslauf"]):
-        return 'de'
-    # Portuguese strong keywords (note: "olá" with accent)
-    if any(f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}") for w in ["olá", "ola", "obrigado", "obrigada", "preciso"]):
-        return 'pt'
-    
-    # Score-based detection
-    scores = {}
-    for lang, words in lang_words.items():
-        scores[lang] = sum(1 for w in words if f" {w} " in m or m.startswith(f"{w} ") or m.endswith(f" {w}"))
-    
-    # Find best match
-    max_score = max(scores.values()) if scores else 0
-    if max_score > 0:
-        best_lang = max(scores, key=scores.get)
-        return best_lang
-    
-    return 'en'
+    guess = lang_id.identify(message)
+    return guess.code if guess.confidence >= CHAT_LANGUAGE_MIN_CONFIDENCE else 'en'
 
 _RUBEN_RESPONSES = {
     'en': {
@@ -0,0 +1,187 @@
+"""
+================================================================================
+CareerMatch AI - Model Artifact Store
+================================================================================
+
+train_rf_model rebuilds the augmented dataset and fits a 150-tree Random
+Forest on every cold start of every Streamlit worker; st.cache_resource
+only helps inside one process. Trained artifacts are therefore persisted
+to a local directory:
+
+    <ARTIFACT_DIR>/<name>-<key>.joblib
+
+The key is a fingerprint of the knowledge-base tables the model is trained
+on, its hyperparameters and the sklearn version (pickles are not portable
+across sklearn releases), so a stale artifact is never loaded. Files are
+written uncompressed and loaded with joblib memory-mapping: the large
+NumPy arrays inside the trees are mapped read-only and shared by all the
+workers on the host through the page cache.
+
+Public API:
+- artifact_key(tables, params)       -> version key for an artifact
+- load_artifact(name, key)           -> object or None
+- save_artifact(name, key, obj)      -> path (atomic write, old versions pruned)
+- load_or_build(name, key, builder)  -> load, or build + save
+- CLI: python model_store.py build | list | clear
+
+The directory defaults to ./.artifacts next to this file and can be moved
+with the CAREERMATCH_ARTIFACT_DIR environment variable.
+================================================================================
+"""
+
+from __future__ import annotations
+
+import argparse
+import glob
+import os
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+from kb_version import fingerprint, knowledge_base_version
+
+try:
+    import joblib
+except ImportError:  # joblib ships with scikit-learn
+    joblib = None
+
+try:
+    import sklearn
+    SKLEARN_VERSION = sklearn.__version__
+except ImportError:
+    SKLEARN_VERSION = None
+
+
+ARTIFACT_DIR = os.environ.get(
+    "CAREERMATCH_ARTIFACT_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".artifacts"),
+)
+
+# Bump to invalidate every artifact after a change in the training code.
+ARTIFACT_FORMAT = 1
+
+
+def artifact_key(tables: Sequence[str], params: Dict) -> str:
+    """Fingerprint of the training tables, hyperparameters and library version."""
+    return fingerprint(ARTIFACT_FORMAT, knowledge_base_version(*tables), params, SKLEARN_VERSION)[:16]
+
+
+def artifact_path(name: str, key: str, directory: str = None) -> str:
+    return os.path.join(directory or ARTIFACT_DIR, f"{name}-{key}.joblib")
+
+
+def list_artifacts(directory: str = None) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory or ARTIFACT_DIR, "*.joblib")))
+
+
+def load_artifact(name: str, key: str, directory: str = None, mmap_mode: Optional[str] = "r"):
+    """Load an artifact (memory-mapped by default); None if missing or unreadable."""
+    path = artifact_path(name, key, directory)
+    if joblib is None or not os.path.exists(path):
+        return None
+    try:
+        return joblib.load(path, mmap_mode=mmap_mode)
+    except Exception as e:
+        print(f"Artifact load error ({path}): {e}")
+        return None
+
+
+def save_artifact(name: str, key: str, obj, directory: str = None) -> Optional[str]:
+    """
+    Persist an artifact atomically and remove older versions of the same name.
+
+    Written to a temp file in the same directory and renamed, so concurrent
+    workers never read a half-written file. Returns None if the directory
+    is not writable (read-only deploys just keep training in memory).
+    """
+    if joblib is None:
+        return None
+    directory = directory or ARTIFACT_DIR
+    path = artifact_path(name, key, directory)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{name}-", suffix=".tmp", dir=directory)
+        os.close(fd)
+        joblib.dump(obj, tmp_path)  # uncompressed: required for mmap loading
+        os.replace(tmp_path, path)
+    except OSError as e:
+        print(f"Artifact save error ({path}): {e}")
+        return None
+
+    for old in glob.glob(os.path.join(directory, f"{name}-*.joblib")):
+        if old != path:
+            try:
+                os.remove(old)
+            except OSError:
+                pass
+    return path
+
+
+def load_or_build(name: str, key: str, builder: Callable[[], object], directory: str = None):
+    """Load the artifact for key, or build it with builder() and persist it."""
+    obj = load_artifact(name, key, directory)
+    if obj is None:
+        obj = builder()
+        save_artifact(name, key, obj, directory)
+    return obj
+
+
+# =============================================================================
+# CLI (prebuild artifacts at deploy time)
+# =============================================================================
+def _build_all(directory: str) -> int:
+    import ml_utils
+    import skill_embedding
+    import topic_model
+
+    start = time.perf_counter()
+    key = ml_utils.rf_model_key()
+    pipe, df = ml_utils.fit_rf_model()
+    if pipe is None:
+        print("rf_model: training failed (is scikit-learn installed?)")
+        return 1
+    path = save_artifact(ml_utils.RF_ARTIFACT_NAME, key, (pipe, df), directory)
+    if path is None:
+        return 1
+    size_mb = os.path.getsize(path) / 1e6
+    print(f"rf_model: {len(df)} samples, key {key}, {size_mb:.1f} MB, {time.perf_counter() - start:.1f}s -> {path}")
+
+    for name, key_fn, builder, unit in (
+        (skill_embedding.SKILL_EMBEDDING_ARTIFACT, skill_embedding.skill_embedding_key,
+         skill_embedding.build_skill_embedding, "skills"),
+        (topic_model.TOPIC_MODEL_ARTIFACT, topic_model.topic_model_key, topic_model.build_topic_model, "topics"),
+    ):
+        start = time.perf_counter()
+        key = key_fn()
+        obj = builder()
+        path = save_artifact(name, key, obj, directory)
+        if path is None:
+            return 1
+        size_mb = os.path.getsize(path) / 1e6
+        print(f"{name}: {len(obj)} {unit}, key {key}, {size_mb:.1f} MB, "
+              f"{time.perf_counter() - start:.1f}s -> {path}")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Build and inspect CareerMatch AI model artifacts.")
+    parser.add_argument("command", choices=["build", "list", "clear"])
+    parser.add_argument("--dir", default=None, help=f"artifact directory (default: {ARTIFACT_DIR})")
+    args = parser.parse_args(argv)
+    directory = args.dir or ARTIFACT_DIR
+
+    if args.command == "build":
+        return _build_all(directory)
+    if args.command == "list":
+        for path in list_artifacts(directory):
+            print(f"{os.path.getsize(path) / 1e6:8.1f} MB  {path}")
+        return 0
+    for path in list_artifacts(directory):
+        os.remove(path)
+        print(f"removed {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
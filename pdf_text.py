@@ -0,0 +1,253 @@
+"""
+================================================================================
+CareerMatch AI - PDF Text Extraction (cache + page-parallel)
+================================================================================
+
+extract_text_from_pdf ran PdfReader over every page serially, and the same
+CV was extracted again each time it was uploaded (Career Discovery, CV
+Evaluation, Dev Console). Here:
+
+- Extracted text is cached in a bounded LRU keyed by the SHA-256 of the
+  file bytes plus the page cap, so a re-upload costs one hash.
+- Uploads above MAX_BYTES are rejected, and only the first MAX_PAGES pages
+  are extracted (the result is marked truncated), so a 200-page upload
+  cannot stall a worker.
+- PDFs with at least PARALLEL_MIN_PAGES pages are split into page ranges
+  extracted on a process pool; smaller ones stay in-process (a pool round
+  trip costs more than a CV page).
+- Every extraction records the time spent on each page.
+
+The cache and the pool are shared by the Streamlit session threads, so
+both are guarded by locks.
+
+Public API:
+- PdfText                             -> .text, .pages, .total_pages, .truncated, .page_seconds
+- extract_pdf(pdf_file, ...)          -> PdfText (path, bytes or file-like object)
+- PDF_TEXT_CACHE                      -> shared PdfTextCache (.stats(), .clear())
+- recent_extractions()                -> timings of the latest extractions (Dev Console)
+================================================================================
+"""
+
+from __future__ import annotations
+
+import hashlib
+import io
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+# Caps (overridable per call or via environment)
+MAX_BYTES = int(os.environ.get("CAREERMATCH_PDF_MAX_BYTES", 20 * 1024 * 1024))
+MAX_PAGES = int(os.environ.get("CAREERMATCH_PDF_MAX_PAGES", 30))
+
+# Page-parallel extraction: threshold, pages per task and pool size
+PARALLEL_MIN_PAGES = 12
+PAGES_PER_TASK = 4
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Shared cache size (extracted texts, a few KB each)
+DEFAULT_MAXSIZE = 128
+
+
+class PdfTooLargeError(ValueError):
+    """Upload above the byte cap."""
+
+
+class PdfText:
+    """Text of one PDF plus extraction metadata."""
+
+    def __init__(self, text: str, digest: str, total_pages: int, page_seconds: List[float]):
+        self.text = text
+        self.digest = digest
+        self.total_pages = total_pages
+        self.page_seconds = page_seconds
+        self.pages = len(page_seconds)
+        self.truncated = self.pages < total_pages
+
+    def __repr__(self) -> str:
+        cut = f" of {self.total_pages}" if self.truncated else ""
+        return f"PdfText({self.digest[:10]}, {self.pages}{cut} pages, {len(self.text)} chars)"
+
+    @property
+    def seconds(self) -> float:
+        return sum(self.page_seconds)
+
+
+# =============================================================================
+# INPUT
+# =============================================================================
+def read_pdf_bytes(pdf_file) -> bytes:
+    """Bytes of a path, bytes object or file-like object (Streamlit UploadedFile)."""
+    if isinstance(pdf_file, (bytes, bytearray, memoryview)):
+        return bytes(pdf_file)
+    if isinstance(pdf_file, (str, os.PathLike)):
+        with open(pdf_file, "rb") as f:
+            return f.read()
+    if hasattr(pdf_file, "getvalue"):
+        return pdf_file.getvalue()
+    position = pdf_file.tell() if hasattr(pdf_file, "tell") else None
+    data = pdf_file.read()
+    if position is not None and hasattr(pdf_file, "seek"):
+        pdf_file.seek(position)  # leave the stream where it was for other readers
+    return data
+
+
+# =============================================================================
+# EXTRACTION
+# =============================================================================
+def _reader(data: bytes):
+    from pypdf import PdfReader  # imported on first use
+    return PdfReader(io.BytesIO(data))
+
+
+def _extract_pages(data: bytes, start: int, stop: int) -> List[Tuple[str, float]]:
+    """(text, seconds) for pages [start, stop); also the pool task."""
+    reader = _reader(data)
+    out = []
+    for i in range(start, stop):
+        t = time.perf_counter()
+        text = reader.pages[i].extract_text() or ""
+        out.append((text, time.perf_counter() - t))
+    return out
+
+
+_POOL = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool(workers: int):
+    """Process pool for page ranges, created on first use and reused."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or _POOL._max_workers != workers:
+            import multiprocessing
+            from concurrent.futures import ProcessPoolExecutor
+            if _POOL is not None:
+                _POOL.shutdown(wait=False)
+            _POOL = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        return _POOL
+
+
+def _drop_pool(pool) -> None:
+    """Shut down a broken pool and forget it (unless another thread already replaced it)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is pool:
+            _POOL = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract(data: bytes, max_pages: int, workers: int) -> Tuple[List[Tuple[str, float]], int]:
+    """Per-page (text, seconds) for the first max_pages pages, and the page count."""
+    total_pages = len(_reader(data).pages)
+    n_pages = min(total_pages, max_pages)
+    if workers <= 1 or n_pages < PARALLEL_MIN_PAGES:
+        return _extract_pages(data, 0, n_pages), total_pages
+
+    from concurrent.futures.process import BrokenProcessPool
+
+    ranges = [(k, min(k + PAGES_PER_TASK, n_pages)) for k in range(0, n_pages, PAGES_PER_TASK)]
+    pool = _get_pool(workers)
+    try:
+        futures = [pool.submit(_extract_pages, data, start, stop) for start, stop in ranges]
+        pages = []
+        for future in futures:  # in page order
+            pages.extend(future.result())
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory): drop the pool, finish in-process
+        _drop_pool(pool)
+        pages = _extract_pages(data, 0, n_pages)
+    return pages, total_pages
+
+
+# =============================================================================
+# CACHE
+# =============================================================================
+class PdfTextCache:
+    """Bounded, thread-safe LRU of PdfText keyed by (sha256 of the bytes, page cap)."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE):
+        self.maxsize = maxsize
+        self._items: "OrderedDict[Tuple[str, int], PdfText]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key: Tuple[str, int]) -> Optional[PdfText]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item
+
+    def put(self, key: Tuple[str, int], item: PdfText) -> None:
+        with self._lock:
+            self._items[key] = item
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._items), "maxsize": self.maxsize, "hits": self.hits, "misses": self.misses}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+PDF_TEXT_CACHE = PdfTextCache()
+
+# Latest extractions (newest last), shown in the Dev Console
+_RECENT: Deque[Dict] = deque(maxlen=20)
+
+
+def recent_extractions() -> List[Dict]:
+    return list(_RECENT)
+
+
+def extract_pdf(pdf_file, max_pages: int = None, max_bytes: int = None, workers: int = None) -> PdfText:
+    """
+    Extract (or fetch from cache) the text of a PDF.
+
+    Raises PdfTooLargeError above max_bytes; extracts at most max_pages
+    pages. Large PDFs are split across `workers` processes.
+    """
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    workers = DEFAULT_WORKERS if workers is None else workers
+
+    data = read_pdf_bytes(pdf_file)
+    if len(data) > max_bytes:
+        raise PdfTooLargeError(f"file is {len(data) / 1e6:.1f} MB, limit is {max_bytes / 1e6:.1f} MB")
+
+    digest = hashlib.sha256(data).hexdigest()
+    key = (digest, max_pages)
+    result = PDF_TEXT_CACHE.get(key)
+    from_cache = result is not None
+    if result is None:
+        pages, total_pages = _extract(data, max_pages, workers)
+        result = PdfText(" ".join(text for text, _ in pages), digest, total_pages, [s for _, s in pages])
+        PDF_TEXT_CACHE.put(key, result)
+
+    _RECENT.append({
+        "digest": digest[:10],
+        "pages": result.pages,
+        "total_pages": result.total_pages,
+        "truncated": result.truncated,
+        "cached": from_cache,
+        "ms": round(result.seconds * 1000, 1),
+        "ms_per_page": [round(s * 1000, 1) for s in result.page_seconds],
+    })
+    return result
@@ -0,0 +1,128 @@
+"""
+================================================================================
+CareerMatch AI - Analysis Result Memoization
+================================================================================
+
+Streamlit reruns app.py on every widget interaction, so render_results ran
+perform_topic_modeling on the JD and discover_careers on the CV again each
+time the user moved a radio button, even though neither input had changed.
+
+This module memoizes those calls in a process-wide store:
+
+    key = (function name, fingerprint of the arguments, knowledge-base version)
+
+- The store lives at module level, so sessions analysing the same texts
+  share the cached result (Streamlit serves every session from one process).
+- Entries expire after a TTL and the store is bounded: the least recently
+  used entry is evicted once maxsize is reached.
+- A call that returns None (the analysis failed) is not cached.
+- Callers get a deep copy, so mutating a result (discover_careers output is
+  filtered and annotated by the UI) never corrupts the cached value.
+- Every access to the store holds a lock: Streamlit sessions run on
+  separate threads, and an unguarded get could race an eviction or an
+  expiry in another thread. The memoized function itself runs unlocked.
+
+Public API:
+- ResultCache(maxsize, ttl, clock)          -> .get(key), .put(key, value), .stats(), .clear()
+- call_key(name, args, kwargs, tables)      -> cache key for one call
+- memoized_call(fn, *args, tables=(), ...)  -> fn(*args, **kwargs), cached
+- RESULT_CACHE                              -> shared ResultCache
+================================================================================
+"""
+
+from __future__ import annotations
+
+import copy
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from kb_version import fingerprint, knowledge_base_version
+
+# Shared store defaults: a topic model or career list is a few KB
+DEFAULT_MAXSIZE = 256
+DEFAULT_TTL = 30 * 60  # seconds
+
+
+class ResultCache:
+    """Bounded, thread-safe LRU with per-entry expiry (clock is injectable for tests)."""
+
+    def __init__(self, maxsize: int = DEFAULT_MAXSIZE, ttl: float = DEFAULT_TTL,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.clock = clock
+        self._items: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._items)
+
+    def get(self, key: Tuple) -> Tuple[bool, Any]:
+        """(found, value); expired entries count as misses and are dropped."""
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is not None and entry[0] <= self.clock():
+                del self._items[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return False, None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return True, entry[1]
+
+    def put(self, key: Tuple, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        with self._lock:
+            self._items[key] = (self.clock() + ttl, value)
+            self._items.move_to_end(key)
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"size": len(self._items), "maxsize": self.maxsize, "hits": self.hits,
+                    "misses": self.misses, "expired": self.expired}
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.expired = 0
+
+
+RESULT_CACHE = ResultCache()
+
+
+def call_key(name: str, args: Sequence = (), kwargs: Optional[Dict] = None,
+             tables: Sequence[str] = ()) -> Tuple[str, str, str]:
+    """(name, fingerprint of the arguments, version of the knowledge-base tables)."""
+    version = knowledge_base_version(*tables) if tables else ""
+    return name, fingerprint(list(args), kwargs or {}), version
+
+
+def memoized_call(fn: Callable, *args, tables: Sequence[str] = (), ttl: Optional[float] = None,
+                  cache: Optional[ResultCache] = None, **kwargs) -> Any:
+    """
+    fn(*args, **kwargs) through the shared cache.
+
+    tables names the knowledge-base tables the result depends on; editing
+    one of them changes the key, so stale results are never served.
+    Returns a deep copy of the cached value.
+    """
+    cache = RESULT_CACHE if cache is None else cache
+    key = call_key(f"{fn.__module__}.{fn.__qualname__}", args, kwargs, tables)
+    found, value = cache.get(key)
+    if not found:
+        value = fn(*args, **kwargs)
+        if value is not None:
+            cache.put(key, value, ttl)
+    return copy.deepcopy(value)
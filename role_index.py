@@ -0,0 +1,322 @@
+"""
+================================================================================
+CareerMatch AI - Role Index (fit-once archetype vectors)
+================================================================================
+
+recommend_roles used to build a corpus [CV, JD, archetypes...] on every call,
+fit a fresh TfidfVectorizer + TruncatedSVD on it and then compute cosine
+similarities. The archetypes are static, so their term counts and document
+frequencies are collected once on JOB_ARCHETYPES_EXTENDED. A request only
+tokenizes its own documents and reweights the archetype counts with the
+smooth IDF of the joint corpus:
+
+    df(t)      = df_archetypes(t) + df_request(t)
+    idf(t)     = ln((1 + n) / (1 + df(t))) + 1        (n = corpus size)
+    tfidf_sims = normalize(A . idf) . normalize(q . idf)
+
+which is exactly the TF-IDF cosine of the per-call fit. The LSA step adds
+nothing on top: the corpus has rank <= rank(A) + len(request docs), and
+when that fits in the SVD components, the LSA projection preserves every
+inner product, so lsa_sims == tfidf_sims. For the current dict entries
+(" ".join(data) is the metadata keys, rank(A) = 3) this always holds; a
+knowledge base with more distinct archetype texts falls back to the
+per-call fit. Scores are identical to the per-call fit either way.
+
+The weighted skill scoring (Direct 1.0 / Inferred 0.9 / Transferable 0.7)
+is vectorized the same way: a role x skill incidence matrix R and a
+skill x cluster map C are built once, and for a candidate
+
+    direct[j]       = skill j in the (expanded) CV skills
+    inferred[j]     = skill j in the twice-expanded CV skills, not direct
+    transferable[j] = some cluster of skill j touches the CV, not above
+    counts          = R . [direct, inferred, transferable]
+
+gives the matches of every role with one sparse product.
+
+scikit-learn and scipy.sparse are imported when an index is first built,
+so importing this module (and the scoring core) stays cheap.
+
+Public API:
+- archetype_document(name, data) -> text used to represent an archetype
+- ArchetypeIndex                 -> .similarities(docs, joint), .hybrid(...)
+- get_archetype_index()          -> ArchetypeIndex for the current KB version
+- RoleSkillMatrix                -> .match_counts(...), .role_match_counts(i, ...)
+- get_role_skill_matrix()        -> RoleSkillMatrix for the current KB version
+================================================================================
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+import knowledge_base
+from kb_version import knowledge_base_version
+
+
+# Tables the indexes are derived from (used as the rebuild keys).
+INDEX_TABLES = ("JOB_ARCHETYPES_EXTENDED",)
+MATRIX_TABLES = ("JOB_ARCHETYPES_EXTENDED", "SKILL_CLUSTERS")
+
+# LSA dimensionality (capped by the corpus size) and hybrid weighting:
+# 70% direct keywords, 30% semantic context.
+LSA_COMPONENTS = 15
+TFIDF_WEIGHT = 0.7
+LSA_WEIGHT = 0.3
+
+
+def archetype_document(name: str, data) -> str:
+    """
+    Text representation of an archetype, as recommend_roles built it:
+    " ".join(data). For the current dict entries this is the metadata keys.
+    """
+    return " ".join(data)
+
+
+class ArchetypeIndex:
+    """Archetype term counts and document frequencies, collected once."""
+
+    def __init__(self, archetypes: Dict):
+        # Imported on first build (ImportError without scikit-learn)
+        from sklearn.feature_extraction.text import CountVectorizer
+        from sklearn.preprocessing import normalize
+        self._normalize = normalize
+
+        self.names: List[str] = list(archetypes.keys())
+        self.positions: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.documents: List[str] = [archetype_document(name, archetypes[name]) for name in self.names]
+
+        # Same analyzer as the per-call TfidfVectorizer (word 1-2 grams, lowercase)
+        counter = CountVectorizer(analyzer='word', ngram_range=(1, 2), min_df=1, lowercase=True)
+        self.counts: np.ndarray = counter.fit_transform(self.documents).toarray().astype(float)
+        self.analyzer = counter.build_analyzer()
+        self.vocabulary: Dict[str, int] = counter.vocabulary_
+        self.doc_freq: np.ndarray = (self.counts > 0).sum(axis=0).astype(float)
+        self.rank = int(np.linalg.matrix_rank(self.counts))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def similarities(self, docs: Sequence[str], joint: bool = True) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Cosine similarities of the query docs against every archetype.
+
+        Returns (tfidf_sims, lsa_sims), each of shape (len(docs), n_roles),
+        with the values the per-call fit on [docs..., archetypes] gave.
+        joint=True scores the docs as one corpus (the CV and JD of one
+        request), joint=False each doc on its own (a batch of CVs).
+        """
+        docs = list(docs)
+        groups = [list(range(len(docs)))] if joint else [[i] for i in range(len(docs))]
+        tfidf_sims = np.zeros((len(docs), len(self.names)))
+        lsa_sims = np.zeros_like(tfidf_sims)
+        for rows in groups:
+            group = [docs[i] for i in rows]
+            if self.rank + len(group) <= min(LSA_COMPONENTS, len(group) + len(self.names) - 1):
+                tfidf_rows = self._joint_tfidf(group)
+                lsa_rows = tfidf_rows
+            else:
+                tfidf_rows, lsa_rows = self._fit_per_call(group)
+            tfidf_sims[rows] = tfidf_rows
+            lsa_sims[rows] = lsa_rows
+        return tfidf_sims, lsa_sims
+
+    def _joint_tfidf(self, docs: List[str]) -> np.ndarray:
+        """TF-IDF cosines of docs vs archetypes with the IDF of [docs..., archetypes]."""
+        sims = np.zeros((len(docs), len(self.names)))
+        vocabulary = self.vocabulary
+        terms = [Counter(self.analyzer(doc)) for doc in docs]
+        request_df = Counter(term for counts in terms for term in counts)
+        if not any(term in vocabulary for term in request_df):
+            return sims  # no shared term: orthogonal to every archetype
+
+        n = len(docs) + len(self.names)
+        doc_freq = self.doc_freq.copy()
+        for term, df in request_df.items():
+            j = vocabulary.get(term)
+            if j is not None:
+                doc_freq[j] += df
+        idf = np.log((1 + n) / (1 + doc_freq)) + 1
+        archetype_vectors = self._normalize(self.counts * idf)
+
+        for row, counts in enumerate(terms):
+            query = np.zeros(len(vocabulary))
+            norm = 0.0
+            for term, tf in counts.items():
+                j = vocabulary.get(term)
+                weight = tf * (idf[j] if j is not None else np.log((1 + n) / (1 + request_df[term])) + 1)
+                norm += weight * weight
+                if j is not None:
+                    query[j] = weight
+            if norm:
+                sims[row] = archetype_vectors @ query / np.sqrt(norm)
+        return sims
+
+    def _fit_per_call(self, docs: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """TF-IDF and LSA similarities fitted on [docs..., archetypes], as recommend_roles did."""
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.metrics.pairwise import cosine_similarity
+
+        corpus = docs + self.documents
+        n = len(docs)
+        tfidf = TfidfVectorizer(analyzer='word', ngram_range=(1, 2), min_df=1, lowercase=True).fit_transform(corpus)
+        tfidf_sims = cosine_similarity(tfidf[:n], tfidf[n:])
+        try:
+            lsa = TruncatedSVD(n_components=min(LSA_COMPONENTS, len(corpus) - 1), random_state=42).fit_transform(tfidf)
+        except Exception:
+            return tfidf_sims, tfidf_sims  # no LSA: the hybrid is the TF-IDF score
+        return tfidf_sims, cosine_similarity(lsa[:n], lsa[n:])
+
+    def hybrid(self, tfidf_sims: np.ndarray, lsa_sims: Optional[np.ndarray]) -> np.ndarray:
+        """Hybrid score: keyword intensity (TF-IDF) + semantic meaning (LSA)."""
+        if lsa_sims is None:
+            return tfidf_sims
+        return TFIDF_WEIGHT * tfidf_sims + LSA_WEIGHT * lsa_sims
+
+
+class RoleSkillMatrix:
+    """Role x skill incidence matrix plus the skill -> cluster map."""
+
+    def __init__(self, archetypes: Dict, clusters: Dict):
+        from scipy import sparse
+
+        self.names: List[str] = list(archetypes.keys())
+        self.positions: Dict[str, int] = {name: i for i, name in enumerate(self.names)}
+        self.sectors: List[str] = []
+        # Per-role skill sets, built exactly as recommend_roles did so that
+        # list(...) of derived sets keeps the same element order.
+        self.role_skills: List[Set[str]] = []
+        self.role_norms: List[Set[str]] = []
+
+        self.vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for i, name in enumerate(self.names):
+            data = archetypes[name]
+            self.sectors.append(data.get("sector", "Other"))
+            role_skills = set(data.get("primary_skills", []))
+            role_norm = {s.lower() for s in role_skills}
+            self.role_skills.append(role_skills)
+            self.role_norms.append(role_norm)
+            for skill in role_norm:
+                rows.append(i)
+                cols.append(self.vocabulary.setdefault(skill, len(self.vocabulary)))
+
+        n_roles, n_skills = len(self.names), len(self.vocabulary)
+        self.incidence = sparse.csr_matrix(
+            (np.ones(len(rows)), (rows, cols)), shape=(n_roles, n_skills))
+        self.sizes = np.diff(self.incidence.indptr)
+
+        # Cluster membership: every member name -> cluster ids, and the
+        # (role skill) x cluster map used for the transferable step.
+        self.clusters_of: Dict[str, List[int]] = {}
+        s_rows, s_cols = [], []
+        for cid, cdata in enumerate(clusters.values()):
+            members = {s.lower() for s in (cdata.get("skills", []) if isinstance(cdata, dict) else cdata)}
+            for member in members:
+                self.clusters_of.setdefault(member, []).append(cid)
+                j = self.vocabulary.get(member)
+                if j is not None:
+                    s_rows.append(j)
+                    s_cols.append(cid)
+        self.skill_clusters = sparse.csr_matrix(
+            (np.ones(len(s_rows)), (s_rows, s_cols)), shape=(n_skills, len(clusters)))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _indicator(self, skills: Set[str]) -> np.ndarray:
+        vector = np.zeros(len(self.vocabulary), dtype=bool)
+        vocabulary = self.vocabulary
+        cols = [vocabulary[s] for s in skills if s in vocabulary]
+        vector[cols] = True
+        return vector
+
+    def match_counts(self, cv_norm: Set[str], cv_expanded: Set[str]) -> np.ndarray:
+        """
+        Per-role counts of direct, inferred and transferable skill matches.
+
+        cv_norm is the expanded lowercase CV skill set, cv_expanded its
+        second expansion. Returns an int array of shape (n_roles, 3).
+        """
+        direct = self._indicator(cv_norm)
+        inferred = self._indicator(cv_expanded) & ~direct
+
+        touched = np.zeros(self.skill_clusters.shape[1])
+        for skill in cv_norm:
+            for cid in self.clusters_of.get(skill, ()):
+                touched[cid] = 1.0
+        transferable = (self.skill_clusters @ touched > 0) & ~direct & ~inferred
+
+        kinds = np.column_stack([direct, inferred, transferable]).astype(float)
+        return np.rint(self.incidence @ kinds).astype(int)
+
+    def role_match_counts(self, i: int, cv_norm: Set[str], cv_expanded: Set[str]) -> Tuple[int, int, int]:
+        """Row i of match_counts, computed for that role alone."""
+        direct = inferred = transferable = 0
+        touched = None
+        for skill in self.role_norms[i]:
+            if skill in cv_norm:
+                direct += 1
+            elif skill in cv_expanded:
+                inferred += 1
+            else:
+                if touched is None:
+                    touched = {cid for s in cv_norm for cid in self.clusters_of.get(s, ())}
+                if any(cid in touched for cid in self.clusters_of.get(skill, ())):
+                    transferable += 1
+        return direct, inferred, transferable
+
+    @staticmethod
+    def _weighted(direct, inferred, transferable, weights: Tuple[float, float, float]):
+        w_direct, w_inferred, w_transferable = weights
+        return direct * w_direct + inferred * w_inferred + transferable * w_transferable
+
+    def match_points(self, cv_norm: Set[str], cv_expanded: Set[str], weights: Tuple[float, float, float]) -> np.ndarray:
+        """Weighted match points per role: counts . (direct, inferred, transferable)."""
+        counts = self.match_counts(cv_norm, cv_expanded)
+        return self._weighted(counts[:, 0], counts[:, 1], counts[:, 2], weights)
+
+    def role_match_points(self, i: int, cv_norm: Set[str], cv_expanded: Set[str], weights: Tuple[float, float, float]) -> float:
+        """match_points for role i only (same float result)."""
+        return float(self._weighted(*self.role_match_counts(i, cv_norm, cv_expanded), weights))
+
+
+# =============================================================================
+# CACHED INDEXES (one per knowledge-base version)
+# =============================================================================
+_INDEXES: Dict[str, ArchetypeIndex] = {}
+_MATRICES: Dict[str, RoleSkillMatrix] = {}
+
+
+def get_archetype_index() -> Optional[ArchetypeIndex]:
+    """ArchetypeIndex for the current archetypes (None without sklearn)."""
+    archetypes = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
+    if not archetypes:
+        return None
+    version = knowledge_base_version(*INDEX_TABLES)
+    index = _INDEXES.get(version)
+    if index is None:
+        try:
+            index = ArchetypeIndex(archetypes)
+        except ImportError:
+            return None
+        _INDEXES.clear()
+        _INDEXES[version] = index
+    return index
+
+
+def get_role_skill_matrix() -> Optional[RoleSkillMatrix]:
+    """RoleSkillMatrix for the current archetypes and clusters."""
+    archetypes = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
+    if not archetypes:
+        return None
+    version = knowledge_base_version(*MATRIX_TABLES)
+    matrix = _MATRICES.get(version)
+    if matrix is None:
+        matrix = RoleSkillMatrix(archetypes, getattr(knowledge_base, "SKILL_CLUSTERS", {}))
+        _MATRICES.clear()
+        _MATRICES[version] = matrix
+    return matrix
@@ -17,13 +17,14 @@ Why this is better than keyword matching:
 
 Public API:
 - classify_intent(message)          -> (intent, confidence) or (None, 0.0)
+- classify_intents(messages)        -> [(intent, confidence), ...] (batch, offline evaluation)
 - get_intent_response(intent, lang) -> str or None
 - CONFIDENCE_THRESHOLD              -> module-level constant
 - INTENT_RESPONSES                  -> {intent: {lang: str}}
 
-Caching: the underlying vectorizer + prototype matrix are built once via
-streamlit.cache_resource (with a graceful no-op fallback when imported
-outside a Streamlit context, e.g. in the pytest suite).
+Caching: the underlying vectorizer + prototype matrix are built once per
+process by a small memoizing decorator (no Streamlit import, so the module
+loads the same way in the app, the pytest suite and headless workers).
 ================================================================================
 """
 
@@ -33,32 +34,27 @@ from typing import Optional, Tuple
 
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.preprocessing import normalize
+from sklearn.utils.extmath import safe_sparse_dot
 
 
 # =============================================================================
 # CACHING SHIM
 # =============================================================================
-# We want @st.cache_resource in production (so the vectorizer is built once),
-# but also tolerate the module being imported in a plain Python context
-# (pytest, ad-hoc scripts) where Streamlit isn't running.
+# st.cache_resource is process-wide as well, so a plain per-process memo
+# gives the same "built once" behaviour without importing Streamlit (which
+# would add its start-up cost to every batch worker and test run).
 
-try:
-    import streamlit as _st
+def _cache_resource(fn):
+    cached = {}
 
-    def _cache_resource(fn):
-        return _st.cache_resource(show_spinner=False)(fn)
-except Exception:  # pragma: no cover -- streamlit always installed in prod
-    def _cache_resource(fn):
-        cached = {}
+    def wrapper(*args, **kwargs):
+        key = (args, tuple(sorted(kwargs.items())))
+        if key not in cached:
+            cached[key] = fn(*args, **kwargs)
+        return cached[key]
 
-        def wrapper(*args, **kwargs):
-            key = (args, tuple(sorted(kwargs.items())))
-            if key not in cached:
-                cached[key] = fn(*args, **kwargs)
-            return cached[key]
-
-        return wrapper
+    return wrapper
 
 
 CONFIDENCE_THRESHOLD = 0.40
@@ -235,7 +231,15 @@ def _build_classifier():
         norm="l2",
     )
     matrix = vectorizer.fit_transform(texts)
-    return vectorizer, matrix, intents
+    # cosine_similarity(query, matrix) re-normalizes and transposes the
+    # prototypes on every call; do that part once.
+    prototypes_t = normalize(matrix, copy=True).T
+
+    # Prototypes of one intent are contiguous rows: keep the first row of
+    # each run so per-intent maxima are a single np.maximum.reduceat.
+    starts = [i for i in range(len(intents)) if i == 0 or intents[i] != intents[i - 1]]
+    names = [intents[i] for i in starts]
+    return vectorizer, prototypes_t, names, np.asarray(starts, dtype=np.intp)
 
 
 # Greeting / thanks short-circuit. When the message opens with one of these
@@ -258,14 +262,8 @@ _THANKS_PREFIXES = (
 )
 
 
-def classify_intent(message: str) -> Tuple[Optional[str], float]:
-    """
-    Classify a free-form user message into one of INTENT_PROTOTYPES.
-
-    Returns (intent_name, max_aggregate_similarity). When no intent reaches
-    CONFIDENCE_THRESHOLD the caller is expected to fall back to a generic
-    page-based response.
-    """
+def _shortcut(message: str) -> Optional[Tuple[Optional[str], float]]:
+    """Result for empty / greeting / thanks messages, None if the classifier is needed."""
     if not message or not message.strip():
         return None, 0.0
 
@@ -274,24 +272,56 @@ def classify_intent(message: str) -> Tuple[Optional[str], float]:
         return "greeting", 1.0
     if any(msg_lower.startswith(p) for p in _THANKS_PREFIXES):
         return "thanks", 1.0
+    return None
 
-    vectorizer, matrix, intents = _build_classifier()
-    query_vec = vectorizer.transform([message.lower()])
-    sims = cosine_similarity(query_vec, matrix).ravel()  # shape: (n_prototypes,)
+
+def _score_intents(messages: list[str]) -> list[Tuple[Optional[str], float]]:
+    """Best (intent, similarity) per message, one vectorizer/cosine pass for all."""
+    vectorizer, prototypes_t, names, starts = _build_classifier()
+    query_vecs = normalize(vectorizer.transform([m.lower() for m in messages]), copy=True)
+    # Same arithmetic as cosine_similarity(query_vecs, matrix)
+    sims = safe_sparse_dot(query_vecs, prototypes_t, dense_output=True)  # (n_messages, n_prototypes)
 
     # Aggregate similarities per intent. We use the *max* over an intent's
     # prototypes -- a single strong match should win, but multiple weak
     # matches shouldn't accumulate falsely.
-    best_intent = None
-    best_score = 0.0
-    for intent in set(intents):
-        idx = [i for i, x in enumerate(intents) if x == intent]
-        score = float(np.max(sims[idx]))
-        if score > best_score:
-            best_score = score
-            best_intent = intent
-
-    return best_intent, best_score
+    maxima = np.maximum.reduceat(sims, starts, axis=1)  # shape: (n_messages, n_intents)
+    best = maxima.argmax(axis=1)
+    results = []
+    for row, col in enumerate(best):
+        score = float(maxima[row, col])
+        results.append((names[col], score) if score > 0.0 else (None, 0.0))
+    return results
+
+
+def classify_intent(message: str) -> Tuple[Optional[str], float]:
+    """
+    Classify a free-form user message into one of INTENT_PROTOTYPES.
+
+    Returns (intent_name, max_aggregate_similarity). When no intent reaches
+    CONFIDENCE_THRESHOLD the caller is expected to fall back to a generic
+    page-based response. Exact ties go to the intent listed first in
+    INTENT_PROTOTYPES.
+    """
+    shortcut = _shortcut(message)
+    if shortcut is not None:
+        return shortcut
+    return _score_intents([message])[0]
+
+
+def classify_intents(messages: list[str]) -> list[Tuple[Optional[str], float]]:
+    """
+    classify_intent for many messages at once (offline evaluation).
+
+    Messages that need the classifier are vectorized and scored together;
+    each result equals classify_intent(message).
+    """
+    results: list = [_shortcut(m) for m in messages]
+    todo = [i for i, r in enumerate(results) if r is None]
+    if todo:
+        for i, result in zip(todo, _score_intents([messages[i] for i in todo])):
+            results[i] = result
+    return results
 
 
 # =============================================================================
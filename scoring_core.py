@@ -0,0 +1,1056 @@
+"""
+================================================================================
+CareerMatch AI - Scoring Core (headless)
+================================================================================
+
+Skill extraction, gap analysis and role scoring without Streamlit or any
+visualization / report library. ml_utils re-exports everything defined
+here, so existing callers are unchanged; batch workers, the test suite and
+other headless users can import this module directly and skip the
+Streamlit, matplotlib, wordcloud, NLTK, pypdf and fpdf start-up cost.
+
+Only the standard library, NumPy, thefuzz and the knowledge base are
+imported at module level. scikit-learn is loaded on first use (archetype
+index, generic keyword fallback).
+
+Public API:
+- extract_skills_from_text(text, is_jd) -> (hard, soft)
+- preprocess_jd_text(text), get_jd_cleaner() -> JD without non-skill sections / patterns
+- detect_seniority / detect_seniority_level / detect_domain_context / detect_language
+- scan_text_signals(text)               -> seniority / domain signals from one pass (TextSignals)
+- calculate_match_score(points, total), calculate_match_scores(...)
+- analyze_gap(cv, jd), analyze_gap_many(cv, jds, workers, progress, stream)
+- recommend_roles(cv_skills, jd_text, cv_text), score_role(...), score_role_many(...)
+- expand_skills_bidirectional(skills_norm)
+================================================================================
+"""
+
+import re
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+import knowledge_base
+import constants
+
+# Compiled skill automaton (Aho-Corasick over HARD_SKILLS / SOFT_SKILLS)
+import skill_matcher
+
+# Precomputed skill expansion closure (cluster / hierarchy / implications)
+import skill_graph
+
+# Fit-once archetype vector index (TF-IDF + LSA over JOB_ARCHETYPES_EXTENDED)
+import role_index
+
+# Content-addressed cache of parsed documents (skills, seniority, language)
+import doc_cache
+from doc_cache import ParsedDocument, parse_document, as_parsed
+
+# Single-pass marker scanner (seniority, domain, education)
+from text_signals import SignalScanner, TextSignals
+from kb_version import knowledge_base_version
+
+# Character n-gram language identifier (CV and chat paths)
+import lang_id
+
+# Precompiled JD cleaning (non-skill sections and patterns)
+from jd_cleaner import JDCleaner
+
+# Job-title matching (JD archetype fallback, short-JD title lookup)
+from title_index import RoleTitleIndex
+
+
+# =============================================================================
+# TEXT SIGNALS (one automaton over every marker vocabulary)
+# =============================================================================
+# Knowledge-base tables compiled into the scanner (EDUCATION_TO_ROLES is a
+# module constant below).
+SIGNAL_TABLES = ("SENIORITY_KEYWORDS", "CONTEXT_SIGNALS", "DOMAIN_EXTRACTION_RULES")
+
+_SIGNAL_SCANNERS: Dict[str, SignalScanner] = {}
+
+
+def get_signal_scanner() -> SignalScanner:
+    """Compiled SignalScanner for the current knowledge base."""
+    version = knowledge_base_version(*SIGNAL_TABLES)
+    scanner = _SIGNAL_SCANNERS.get(version)
+    if scanner is None:
+        scanner = SignalScanner(
+            getattr(knowledge_base, "SENIORITY_KEYWORDS", {}),
+            getattr(constants, "CONTEXT_SIGNALS", {}).get("seniority_from_jd", {}),
+            getattr(constants, "DOMAIN_EXTRACTION_RULES", {}),
+            list(EDUCATION_TO_ROLES),
+        )
+        _SIGNAL_SCANNERS.clear()  # only the current version is worth keeping
+        _SIGNAL_SCANNERS[version] = scanner
+    return scanner
+
+
+def scan_text_signals(text: str) -> TextSignals:
+    """One pass over text: .seniority(), .seniority_level(), .domain(), .education_positions()."""
+    return get_signal_scanner().scan(text)
+
+
+# =============================================================================
+# SENIORITY DETECTION
+# =============================================================================
+def detect_seniority(text: str) -> Tuple[str, float]:
+    """
+    Detects seniority level (Junior, Mid, Senior) from text.
+    Returns: (Level, Confidence)
+
+    Explicit years of experience override the SENIORITY_KEYWORDS
+    whole-word counts (rules in TextSignals.seniority).
+    """
+    if not text:
+        return "Mid Level", 0.0
+    return scan_text_signals(text).seniority()
+
+# =============================================================================
+def extract_generic_keywords(text: str, top_n=5) -> Set[str]:
+    """
+    Extracts top keywords from text using TF-IDF when no known skills are found.
+    """
+    if not text or len(text.split()) < 10:
+        return set()
+
+    try:
+        from sklearn.feature_extraction.text import TfidfVectorizer  # loaded on first use
+        vectorizer = TfidfVectorizer(stop_words='english', max_features=top_n)
+        vectorizer.fit_transform([text])
+        return set(vectorizer.get_feature_names_out())
+    except:
+        return set()
+
+# =============================================================================
+# TEXT MINING: SKILL EXTRACTION
+# =============================================================================
+# Riferimento corso: "Text Mining", "Information Extraction", "Feature Extraction"
+#
+# L'estrazione di skill è un task di INFORMATION EXTRACTION:
+# - Estrae entità specifiche (competenze) da testo non strutturato
+# - Combina multiple tecniche: regex, n-gram matching, fuzzy matching
+#
+# TECNICHE UTILIZZATE:
+# 1. N-gram Analysis: cattura skill composte ("machine learning")
+# 2. Regex Pattern Matching: gestisce varianti morfologiche
+# 3. Fuzzy Matching: tollera errori di battitura (85% threshold)
+# =============================================================================
+
+try:
+    from thefuzz import fuzz  # Fuzzy string matching
+except ImportError:
+    fuzz = None
+
+# =============================================================================
+# Compiled NON_SKILL_PATTERNS (section segmenter + one pattern alternation)
+JD_CLEANER_TABLES = ("NON_SKILL_PATTERNS",)
+
+_JD_CLEANERS: Dict[str, JDCleaner] = {}
+
+
+def get_jd_cleaner() -> JDCleaner:
+    """JDCleaner for the current knowledge base (ValueError on an invalid pattern)."""
+    version = knowledge_base_version(*JD_CLEANER_TABLES)
+    cleaner = _JD_CLEANERS.get(version)
+    if cleaner is None:
+        cleaner = JDCleaner(getattr(constants, "NON_SKILL_PATTERNS", {}))
+        _JD_CLEANERS.clear()
+        _JD_CLEANERS[version] = cleaner
+    return cleaner
+
+
+# Role-title index of the JD archetype fallback and the short-JD title lookup
+ROLE_TITLE_TABLES = ("JOB_ARCHETYPES", "JOB_ARCHETYPES_EXTENDED", "SOFT_SKILLS") + skill_graph.GRAPH_TABLES
+
+_ROLE_TITLE_INDEXES: Dict[str, RoleTitleIndex] = {}
+
+
+def get_role_title_index() -> RoleTitleIndex:
+    """RoleTitleIndex over JOB_ARCHETYPES for the current knowledge base."""
+    version = knowledge_base_version(*ROLE_TITLE_TABLES)
+    index = _ROLE_TITLE_INDEXES.get(version)
+    if index is None:
+        index = RoleTitleIndex(
+            getattr(knowledge_base, "JOB_ARCHETYPES", {}),
+            getattr(knowledge_base, "SOFT_SKILLS", {}),
+            expand_skills_bidirectional,
+        )
+        _ROLE_TITLE_INDEXES.clear()
+        _ROLE_TITLE_INDEXES[version] = index
+    return index
+
+
+def preprocess_jd_text(text: str) -> str:
+    """
+    PREPROCESSING JOB DESCRIPTION
+    =============================
+    Riferimento KDD: Data Cleaning (Step 1)
+    
+    Rimuove sezioni non-skill (benefit, condizioni, salari, training) prima 
+    dell'estrazione competenze per evitare falsi positivi.
+    
+    APPROCCIO (pattern compilati una volta, vedi jd_cleaner.py):
+    1. Rimuove intere sezioni per header (Benefits:, Condizioni:, ecc.)
+       con un segmentatore per righe (tempo lineare)
+    2. Rimuove pattern individuali (€35,000, 40 ore/settimana, ecc.)
+       nello stesso ordine di prima
+    3. Preserva solo contenuto relativo alle competenze
+    
+    Args:
+        text: Job Description originale
+        
+    Returns:
+        str: JD preprocessata senza sezioni non-skill
+    """
+    if not getattr(constants, "NON_SKILL_PATTERNS", {}):
+        return text
+    return get_jd_cleaner().clean(text)
+
+
+# =============================================================================
+# =============================================================================
+# CONTEXT AWARENESS & DOMAIN INTELLIGENCE (NEW v2.0)
+# =============================================================================
+
+def detect_domain_context(text: str) -> str:
+    """
+    Identifies the specific industry domain (Energy, Biotech, Fashion, etc.) from text.
+    Uses DOMAIN_EXTRACTION_RULES from constants.
+    """
+    return scan_text_signals(text).domain()
+
+def detect_seniority_level(text: str) -> str:
+    """
+    Infers the seniority level (Entry, Mid, Senior, Executive) from text signals.
+    Uses CONTEXT_SIGNALS from constants.
+    """
+    return scan_text_signals(text).seniority_level()
+
+def extract_skills_from_text(text: str, is_jd: bool = False) -> Tuple[Set[str], Set[str]]:
+    """
+    ESTRAZIONE COMPETENZE DA TESTO
+    ==============================
+    Riferimento corso: "Information Extraction", "Text Mining"
+    
+    Estrae hard skills e soft skills da testo non strutturato (CV, Job Description).
+    
+    METODOLOGIA (multi-step):
+    -------------------------
+    
+    STEP 0: JD PREPROCESSING (NEW)
+    Se is_jd=True, rimuove sezioni non-skill (benefit, salari, condizioni)
+    prima dell'estrazione per evitare falsi positivi.
+    
+    STEP 1: PREPROCESSING
+    - Conversione in lowercase
+    - Tokenizzazione in parole
+    - Generazione n-grams (bigram, trigram)
+    
+    STEP 2: N-GRAM MATCHING
+    Riferimento corso: "N-gram Analysis"
+    
+    - Unigram: singole parole ("Python", "SQL")
+    - Bigram: coppie di parole ("machine learning", "data analysis")
+    - Trigram: triple di parole ("natural language processing")
+    
+    Questo permette di catturare skill composte che verrebbero perse
+    con una semplice tokenizzazione.
+    
+    STEP 3: REGEX PATTERN MATCHING
+    - Usa espressioni regolari per gestire varianti morfologiche
+    - Es: "analyz" matcha "analyze", "analyzing", "analyzed"
+    - Pattern: r'\\b{keyword}(?:s|es|ing|ed|tion|ment)?\\b'
+    - Step 2 e 3 sono compilati una sola volta (per versione della knowledge
+      base) in un automa Aho-Corasick (skill_matcher.py): un solo passaggio
+      lineare sul testo invece di una regex per ogni variante
+    
+    STEP 4: FUZZY MATCHING
+    Riferimento corso: gestione del "rumore" nei dati
+    
+    - Usa algoritmo di Levenshtein Distance
+    - Threshold 85%: tollera piccoli errori di battitura
+    - Es: "Phyton" → "Python" (typo comune)
+    
+    KNOWLEDGE BASE:
+    ---------------
+    Le skill sono definite in constants.py:
+    - HARD_SKILLS: competenze tecniche (Python, SQL, Machine Learning...)
+    - SOFT_SKILLS: competenze trasversali (Leadership, Communication...)
+    - INFERENCE_RULES: regole per dedurre skill correlate
+    
+    Args:
+        text: Testo da analizzare (CV o Job Description)
+        is_jd: Se True, preprocessa il testo per rimuovere sezioni non-skill
+        
+    Returns:
+        Tuple[Set[str], Set[str]]: (hard_skills, soft_skills) estratti
+    """
+    
+    # NEW: Preprocess JD to remove non-skill sections (benefits, salary, etc.)
+    if is_jd:
+        text = preprocess_jd_text(text)
+    
+    text_lower = text.lower()
+
+    # Carica knowledge base
+    # (Use copy to allow local extension based on domain context)
+    hard_skills = getattr(knowledge_base, "HARD_SKILLS", {}).copy()
+    inference_rules = getattr(knowledge_base, "INFERENCE_RULES", {})
+    
+    # NEW: Domain Context Boost
+    # If a specific domain is detected, we ensure its critical skills are searched for,
+    # even if they might not be in the standard HARD_SKILLS list or require prioritization.
+    domain_skills = {}
+    domain_context = detect_domain_context(text)
+    if domain_context != "General":
+        domain_rules = getattr(knowledge_base, "DOMAIN_EXTRACTION_RULES", {}).get(domain_context, {})
+        must_extract = domain_rules.get("must_extract", [])
+        for skill_name in must_extract:
+            if skill_name not in hard_skills:
+                # Add domain-specific skill to search list (self-variation)
+                hard_skills[skill_name] = [skill_name]
+                domain_skills[skill_name] = [skill_name]
+
+    # =========================================================================
+    # STEP 1: PREPROCESSING E GENERAZIONE N-GRAMS
+    # =========================================================================
+    # Riferimento corso: "N-gram Analysis"
+    #
+    # Tokenizziamo il testo e generiamo n-grams per catturare
+    # skill composte come "machine learning" o "data visualization"
+    # =========================================================================
+    
+    words = text_lower.split()
+    text_words = set(words)
+    
+    # Bigram: coppie di parole consecutive (fuzzy matching di skill composte)
+    # Unigram/bigram/trigram lookup for exact matches lives in the automaton
+    bigrams = set(' '.join(words[i:i+2]) for i in range(len(words)-1))
+
+    # 1-2. Exact Match Hard + Soft Skills (N-gram + Regex, one pass)
+    # Compiled Aho-Corasick automaton (skill_matcher.py): phrase lookup on the
+    # n-grams plus morphological variants (s/es/ing/ed/tion/ment) with word
+    # boundaries, built once per knowledge-base version.
+    hard_matcher, soft_matcher = skill_matcher.get_skill_matchers()
+    hard_found = hard_matcher.match(text_lower, words)
+    soft_found = soft_matcher.match(text_lower, words)
+
+    # Domain-specific skills not in HARD_SKILLS get a small ad-hoc automaton
+    if domain_skills:
+        domain_matcher = skill_matcher.SkillAutomaton(domain_skills, skill_matcher.HARD_SUFFIXES)
+        hard_found |= domain_matcher.match(text_lower, words)
+
+    # Fuzzy fallback for skills without an exact match
+    # (only for skills with 5+ chars to avoid false positives)
+    # Short skills like SEO, SQL, CSS require exact match only.
+    # Typo index (skill_matcher.TypoIndex): each word/bigram is verified
+    # with fuzz.ratio only against the few names that can pass the threshold.
+    if fuzz:
+        hard_typo_index, soft_typo_index = skill_matcher.get_typo_indexes()
+        if domain_skills:
+            domain_typo_index = skill_matcher.build_typo_index(
+                domain_skills, skill_matcher.FUZZY_HARD_THRESHOLD, skill_matcher.FUZZY_EXCLUDED_SKILLS
+            )
+            hard_indexes = (hard_typo_index, domain_typo_index)
+        else:
+            hard_indexes = (hard_typo_index,)
+
+        for word in text_words:
+            if len(word) >= skill_matcher.FUZZY_MIN_WORD_LEN:
+                for index in hard_indexes:
+                    hard_found |= index.lookup(word)
+                soft_found |= soft_typo_index.lookup(word)
+        # Also check bigrams for compound skills
+        for bigram in bigrams:
+            for index in hard_indexes:
+                hard_found |= index.lookup(bigram)
+
+    # 3. Hierarchical Inference (expand found skills to parent categories)
+    inferred_skills = set()
+    for child_skill in hard_found:
+        if child_skill in inference_rules:
+            parents = inference_rules[child_skill]
+            inferred_skills.update(parents)
+    hard_found.update(inferred_skills)
+
+    # 4. Generic Fallback (only if very few skills found)
+    if len(hard_found) < 2:
+        generic_keywords = extract_generic_keywords(text, top_n=5)
+        for kw in generic_keywords:
+            hard_found.add(kw.capitalize())
+
+    # =========================================================================
+    # STEP 5: SEMI-SUPERVISED ENHANCEMENT
+    # =========================================================================
+    # Riferimento corso: "Semi-Supervised Learning", "Label Propagation"
+    #
+    # Questo step usa il layer semi-supervisionato per:
+    # 1. Migliorare l'estrazione usando pattern appresi precedentemente
+    # 2. Apprendere nuovi pattern dalle skill trovate con alta confidenza
+    # =========================================================================
+    
+    # =========================================================================
+    # STEP 6: JOB ARCHETYPE FALLBACK (NEW)
+    # =========================================================================
+    # Se is_jd=True, cerchiamo se il testo contiene nomi di ruoli
+    # (es: "Energy Trader", "energy engineer") e estraiamo le skill
+    # richieste dall'archetype corrispondente.
+    # Questo permette di matchare JD che contengono solo nomi di ruoli.
+    #
+    # Role-title index (title_index.py): phrase automaton, all-words
+    # postings and a trigram typo index over the titles, with each role's
+    # skill contribution precomputed.
+    # =========================================================================
+    if is_jd:
+        # Normalize text: remove punctuation and extra spaces
+        text_normalized = re.sub(r'[,;:\.\-\(\)]', ' ', text_lower)
+        text_normalized = ' '.join(text_normalized.split())  # Normalize whitespace
+        hard_found |= get_role_title_index().role_skills(text_normalized)
+
+    # =========================================================================
+    # STEP 3: FALSE POSITIVE FILTERING (NEW)
+    # =========================================================================
+    # Riferimento corso: "Precision vs Recall"
+    #
+    # Alcuni termini sono sia skill che verbi comuni (es. "Excel", "Lead", "Plan").
+    # Se appaiono solo in contesti verbali generici, li rimuoviamo.
+    # =========================================================================
+    
+    if "Excel" in hard_found:
+        # Se 'excel' appare solo come verbo "will excel", "to excel", lo scartiamo
+        verb_phrases = ["will excel", "to excel", "excel in", "excelling at my"]
+        count_all = text_lower.count("excel")
+        count_verbs = sum(text_lower.count(p) for p in verb_phrases)
+        if count_all > 0 and count_all == count_verbs:
+            hard_found.discard("Excel")
+
+    if "Management" in hard_found and "Management" not in text:
+        # Se abbiamo trovato 'management' solo tramite fuzzy o lowercase e 
+        # il testo parla di "time management" (che è soft), non aggiungerlo agli hard 
+        # a meno che non sia esplicitamente un corso o ruolo.
+        pass # placeholder for complex logic if needed
+        
+    return hard_found, soft_found
+
+
+# =============================================================================
+# LANGUAGE DETECTION
+# =============================================================================
+# Character n-gram model shared with the Ruben chat (lang_id.py). A CV or
+# cover letter names a native language only on the evidence the marker
+# detector required: LANGUAGE_MIN_EVIDENCE marker hits for one language
+# (strong markers count double). Skill lists and short fragments have
+# none and stay None; the n-gram model then picks the language.
+LANGUAGE_MIN_EVIDENCE = 3
+
+# language -> (markers, strong markers), matched as substrings of the lowercased text
+LANGUAGE_MARKERS = {
+    "Italian": ((" il ", " lo ", " la ", " gli ", " le ", " di ", " è ", " per ", " delle ", " nella ",
+                 " sono ", " che ", " con ", " una ", " del ", " nel ", " alla ", " dalla ", " presso ",
+                 " laurea ", " esperienza ", " competenze ", " lavoro ", " sviluppo ", " gestione "),
+                (" esperienza lavorativa", " istruzione ", " competenze tecniche", " laurea in ",
+                 " presso ", " dal ", " al ")),
+    "English": ((" the ", " a ", " an ", " and ", " is ", " of ", " for ", " to ", " in ", " with ",
+                 " that ", " this ", " have ", " has ", " was ", " were ", " been ", " experience ",
+                 " skills ", " work ", " team "),
+                (" work experience ", " education ", " skills ", " bachelor", " master ", " university ",
+                 " developed ", " managed ")),
+    "Spanish": ((" el ", " la ", " los ", " las ", " de ", " en ", " que ", " y ", " es ", " para ",
+                 " con ", " una ", " por ", " como ", " más ", " del ", " experiencia ", " trabajo ",
+                 " desarrollo "),
+                (" experiencia laboral ", " educación ", " habilidades ", " licenciatura ",
+                 " universidad ", " desarrollé ")),
+    "French": ((" le ", " la ", " les ", " de ", " du ", " des ", " et ", " en ", " est ", " une ",
+                " un ", " pour ", " avec ", " dans ", " sur ", " expérience ", " travail ",
+                " développement "),
+               (" expérience professionnelle ", " formation ", " compétences ", " licence ",
+                " université ", " développé ")),
+    "German": ((" der ", " die ", " das ", " und ", " in ", " ist ", " mit ", " für ", " von ", " zu ",
+                " auf ", " bei ", " eine ", " einer ", " eines ", " erfahrung ", " arbeit ",
+                " entwicklung "),
+               (" berufserfahrung ", " ausbildung ", " kenntnisse ", " bachelor ", " universität ",
+                " entwickelt ")),
+    "Portuguese": ((" o ", " a ", " os ", " as ", " de ", " em ", " que ", " e ", " é ", " para ",
+                    " com ", " uma ", " por ", " como ", " mais ", " do ", " experiência ", " trabalho ",
+                    " desenvolvimento "),
+                   (" experiência profissional ", " educação ", " habilidades ", " licenciatura ",
+                    " universidade ", " desenvolvi ")),
+}
+
+
+def has_language_evidence(text: str) -> bool:
+    """True when one language has LANGUAGE_MIN_EVIDENCE marker hits (strong markers count 2)."""
+    text = text.lower()
+    for markers, strong_markers in LANGUAGE_MARKERS.values():
+        evidence = 0
+        for marker in strong_markers:
+            if marker in text:
+                evidence += 2
+                if evidence >= LANGUAGE_MIN_EVIDENCE:
+                    return True
+        for marker in markers:
+            if marker in text:
+                evidence += 1
+                if evidence >= LANGUAGE_MIN_EVIDENCE:
+                    return True
+    return False
+
+
+def detect_language(text: str) -> Optional[str]:
+    """
+    Enhanced language detection for native language inference.
+    If a CV is written in a specific language, we can infer the candidate 
+    is likely a native speaker of that language.
+    
+    Supports: Italian, English, Spanish, French, German, Portuguese
+    Returns the detected native language as a skill string, or None when
+    the text has no language evidence (has_language_evidence).
+
+    The marker gate stays in front of lang_id on purpose: the model names
+    a language for any text with letters, and a skill list ("Python SQL
+    Excel Tableau ...") is English words to it, with a confidence as high
+    as real prose. Only the markers (function words, CV section words)
+    tell a written CV from a keyword list, and a keyword list must not add
+    a native language. The gate exits on the first language that reaches
+    LANGUAGE_MIN_EVIDENCE, so it costs a fraction of the model's scoring.
+    """
+    if not text or not has_language_evidence(text):
+        return None
+    return lang_id.identify(text).name
+
+# =============================================================================
+# =============================================================================
+# SCORING HARMONIZATION - Unified Weights
+# =============================================================================
+WEIGHT_DIRECT = 1.0
+WEIGHT_INFERRED = 0.9        # Parent/Child link (e.g. React -> Frontend)
+WEIGHT_TRANSFERABLE = 0.7    # Equivalent tool (e.g. Power BI -> Tableau) - Unified to 0.7
+WEIGHT_PROJECT_ONLY = 0.4    # Found in project but not stated in CV
+
+def calculate_match_score(score_points: float, total_items: int) -> float:
+    """
+    Unified calculation for match percentage.
+    Ensures consistent capping (100%) and rounding (1 decimal).
+    """
+    if total_items <= 0:
+        return 0.0
+    percentage = (score_points / total_items) * 100
+    return round(min(100.0, percentage), 1)
+
+def _calculate_composite_role_score(skill_score: float, semantic_score: float, edu_boost: float) -> float:
+    """
+    INTERNAL UNIFIED SCORER v1.1
+    ----------------------------
+    Combines three factors into a single consistent match percentage:
+    1. Skill Match (65%) - Weighted direct/inferred/transferable.
+    2. Semantic Context (20%) - TF-IDF/LSA similarity.
+    3. Education Boost (15%) - Degree/field relevance (Increased weight).
+    """
+    # All inputs are on a 0-100 scale.
+    final = (0.65 * skill_score) + (0.20 * semantic_score) + (0.15 * edu_boost)
+    return round(min(100.0, final), 1)
+
+def _round_scores(values) -> List[float]:
+    """Python round(v, 1) per element (np.round differs on float ties)."""
+    return [round(v, 1) for v in values.tolist()]
+
+def calculate_match_scores(score_points, total_items):
+    """Vectorized calculate_match_score over NumPy arrays (same floats, same rounding)."""
+    totals = np.asarray(total_items)
+    percentage = (score_points / np.maximum(totals, 1)) * 100
+    scores = np.array(_round_scores(np.minimum(100.0, percentage)))
+    scores[totals <= 0] = 0.0
+    return scores
+
+def _calculate_composite_role_scores(skill_scores, semantic_scores, edu_boosts):
+    """Vectorized _calculate_composite_role_score over NumPy arrays."""
+    final = (0.65 * skill_scores) + (0.20 * semantic_scores) + (0.15 * edu_boosts)
+    return np.array(_round_scores(np.minimum(100.0, final)))
+
+def _jd_requirements(job_doc: ParsedDocument) -> Tuple[Set[str], Set[str], Optional[str]]:
+    """
+    (job_hard, job_soft, best_role) for a parsed JD.
+    
+    Extracted skills, plus the archetype skills when the JD is just a role
+    name (best_role). Shared by analyze_gap and the candidate index.
+    """
+    JOB_ARCHETYPES_EXTENDED = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
+
+    # 3. Archetype Fallback (if JD is a Role Name)
+    # -------------------------------------------
+    # We look for a role match even if skills were already extracted, 
+    # to ensure composite scoring (70/20/15) is applied for role-based JDs.
+    job_text = job_doc.text
+    job_hard, job_soft = job_doc.skills()
+    best_role = None
+    if len(job_text.split()) < 15:
+        query = job_text.strip().lower()
+        # First title containing the query, else the closest (difflib) title
+        best_role = get_role_title_index().find_title(query)
+            
+        if best_role in JOB_ARCHETYPES_EXTENDED:
+            role_data = JOB_ARCHETYPES_EXTENDED[best_role]
+            arch_skills = set()
+            if isinstance(role_data, dict):
+                arch_skills.update(role_data.get("primary_skills", []))
+                arch_skills.update(role_data.get("hard_skills", []))
+                job_soft.update(role_data.get("soft_skills", []))
+            elif isinstance(role_data, (list, set)):
+                arch_skills.update(role_data)
+            
+            expanded_arch = expand_skills_bidirectional({s.lower() for s in arch_skills})
+            job_hard.update(arch_skills)
+            job_hard.update({s.capitalize() for s in expanded_arch})
+
+    return job_hard, job_soft, best_role
+
+def analyze_gap(cv_text, job_text) -> Dict:
+    """
+    STRUCTURED SKILL GAP ANALYSIS v3.0 - Harmonized
+    
+    Implements multi-step hierarchical matching with standardized weights.
+    cv_text / job_text can be raw text or ParsedDocument (doc_cache.py).
+    """
+    # 1. Setup Data Structures
+    SKILL_CLUSTERS = getattr(knowledge_base, "SKILL_CLUSTERS", {})
+    INFERENCE_RULES = getattr(knowledge_base, "SKILL_HIERARCHY", {}) 
+    if not INFERENCE_RULES:
+        INFERENCE_RULES = getattr(knowledge_base, "INFERENCE_RULES", {})
+
+    # 2. Extract skills from both texts (cached per document content)
+    cv_doc = as_parsed(cv_text)
+    job_doc = as_parsed(job_text, is_jd=True)
+    cv_text, job_text = cv_doc.text, job_doc.text
+    cv_hard, cv_soft = cv_doc.skills()
+
+    # 3. Archetype Fallback (if JD is a Role Name)
+    job_hard, job_soft, best_role = _jd_requirements(job_doc)
+
+    # 4. Multi-Step Matching Logic
+    cv_hard_lower = {s.lower() for s in cv_hard}
+    cv_expanded = cv_doc.expanded  # expanded once per CV (doc_cache.py)
+
+    matched = set()      # Green
+    transferable = {}    # Yellow
+    missing = set()      # Red
+    score_points = 0.0
+    
+    for jd_skill in job_hard:
+        jd_norm = jd_skill.lower()
+        
+        # STEP 1: DIRECT MATCH (1.0)
+        if jd_norm in cv_hard_lower:
+            matched.add(jd_skill)
+            score_points += WEIGHT_DIRECT
+            continue
+            
+        # STEP 2: INFERRED MATCH (0.9) - Hierarchy
+        if jd_norm in cv_expanded:
+            matched.add(jd_skill)
+            score_points += WEIGHT_INFERRED
+            continue
+
+        # STEP 3: TRANSFERABLE MATCH (0.6) - Clusters
+        found_transferable = False
+        for cluster_id, cluster_data in SKILL_CLUSTERS.items():
+            cluster_skills = {s.lower() for s in (cluster_data.get("skills", []) if isinstance(cluster_data, dict) else cluster_data)}
+            if jd_norm in cluster_skills:
+                common = cv_hard_lower.intersection(cluster_skills)
+                if common:
+                    transferable[jd_skill] = f"Transferable from {', '.join(list(common)[:2])}"
+                    score_points += WEIGHT_TRANSFERABLE
+                    found_transferable = True
+                    break
+        if found_transferable: continue
+
+        # STEP 4: MISSING
+        missing.add(jd_skill)
+
+    # 5. Result Construction
+    extra_hard = cv_hard - matched
+    for s in transferable:
+        if s in extra_hard: extra_hard.remove(s)
+        
+    matching_soft = cv_soft & job_soft
+    discussion_soft = job_soft - cv_soft
+    cv_stated_soft = cv_soft
+
+    # 6. Seniority and Metrics
+    cv_level, _ = cv_doc.seniority
+    jd_level, _ = job_doc.seniority
+    
+    seniority_match = "Match"
+    if cv_level != jd_level:
+        if cv_level == "Entry Level" and jd_level == "Senior Level": seniority_match = "Underqualified"
+        elif cv_level == "Senior Level" and jd_level == "Entry Level": seniority_match = "Overqualified"
+        else: seniority_match = "Partial Match"
+
+    total_jd = len(job_hard)
+    skill_match_score = calculate_match_score(score_points, total_jd)
+    
+    # 4b. COMPOSITE SCORING (if Role Fallback was used)
+    # This ensures consistency with Discovery/Compass
+    final_match_pct = skill_match_score
+    
+    # We check if 'best_role' exists in local scope (from fallback section)
+    if 'best_role' in locals() and best_role and cv_text:
+        # Composite score of this specific role (same value recommend_roles would rank it with)
+        # We do NOT pass jd_text here so the role isn't excluded for matching itself
+        role_score = score_role(cv_hard | cv_soft, cv_text, best_role)
+        if role_score is not None and role_score > 5: # recommend_roles threshold
+            final_match_pct = role_score
+
+    match_percentage = final_match_pct
+
+    return {
+        "match_percentage": round(match_percentage, 1),
+        "matching_hard": list(matched),
+        "transferable": transferable,
+        "missing_hard": list(missing),
+        "extra_hard": list(extra_hard),
+        "soft_interview_verified": list(matching_soft),
+        "soft_discussion_points": list(discussion_soft),
+        "soft_stated_strengths": list(cv_stated_soft),
+        "matching_soft": list(matching_soft), 
+        "missing_soft": list(discussion_soft),
+        "project_review": set(),
+        "seniority_info": {
+            "cv_level": cv_level,
+            "jd_level": jd_level,
+            "match_status": seniority_match
+        },
+        "cv_skills": list(cv_hard),
+        "job_skills": list(job_hard),
+        "match_pct": round(match_percentage, 1)
+    }
+
+# =============================================================================
+# BATCH ANALYSIS - One CV vs many JDs
+# =============================================================================
+def _parse_jd_chunk(texts: List[str]) -> List[ParsedDocument]:
+    """Worker: parse a chunk of JD texts in a child process."""
+    return [ParsedDocument(text, is_jd=True) for text in texts]
+
+def iter_gap_many(cv_text, jd_texts: List[str], workers: int = None, progress=None):
+    """
+    Streaming variant of analyze_gap_many: yields (index, result) as each JD completes.
+    
+    The CV is parsed and expanded once; JD extraction is fanned out over a
+    ProcessPoolExecutor (workers > 1) in chunks. JDs already in the document
+    cache, and duplicates, are not re-parsed.
+    progress(done, total) is called after each result.
+    """
+    cv_doc = as_parsed(cv_text)
+    cv_doc.expanded  # expand once, before fanning out
+    jd_texts = list(jd_texts)
+    total = len(jd_texts)
+    done = 0
+    
+    def _emit(i, jd_doc):
+        nonlocal done
+        done += 1
+        if progress:
+            progress(done, total)
+        return i, analyze_gap(cv_doc, jd_doc)
+    
+    # 1. Cached JDs are analysed immediately, the rest is grouped by text
+    pending: Dict[str, List[int]] = {}
+    cache = doc_cache.DOCUMENT_CACHE
+    for i, text in enumerate(jd_texts):
+        text = text or ""
+        cached = cache.peek(text, is_jd=True)
+        if cached is not None:
+            yield _emit(i, cached)
+        else:
+            pending.setdefault(text, []).append(i)
+    if not pending:
+        return
+    
+    # 2. Parse the remaining JDs (in-process for small batches / workers <= 1)
+    unique = list(pending)
+    if not workers or workers <= 1 or len(unique) < 2:
+        for text in unique:
+            jd_doc = parse_document(text, is_jd=True)
+            for j in pending[text]:
+                yield _emit(j, jd_doc)
+        return
+    
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    chunksize = max(1, len(unique) // (workers * 4))
+    chunks = [unique[k:k + chunksize] for k in range(0, len(unique), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_parse_jd_chunk, chunk) for chunk in chunks]
+        for future in as_completed(futures):
+            for jd_doc in future.result():
+                cache.put(jd_doc)
+                for j in pending[jd_doc.text]:
+                    yield _emit(j, jd_doc)
+
+def analyze_gap_many(cv_text, jd_texts: List[str], workers: int = None, progress=None, stream: bool = False):
+    """
+    Rank one CV against many job descriptions.
+    
+    Equivalent to [analyze_gap(cv_text, jd) for jd in jd_texts], but the CV
+    is extracted and expanded once and JD extraction runs on `workers`
+    processes. Returns the results in input order, or - with stream=True -
+    an iterator of (index, result) in completion order.
+    progress(done, total) is called after each JD (e.g. to drive st.progress).
+    """
+    jd_texts = list(jd_texts)
+    results = iter_gap_many(cv_text, jd_texts, workers=workers, progress=progress)
+    if stream:
+        return results
+    ordered = [None] * len(jd_texts)
+    for i, res in results:
+        ordered[i] = res
+    return ordered
+
+
+# =============================================================================
+# JOB RECOMMENDER (Career Compass) - v1.25
+# =============================================================================
+
+# Education fields to job roles mapping
+EDUCATION_TO_ROLES = {
+    # Business & Economics
+    "economia": ["Business Analyst", "Financial Analyst", "Data Analyst", "Marketing Manager", "Consultant"],
+    "business": ["Business Analyst", "Marketing Manager", "Consultant", "Product Manager", "AI Business Analyst"],
+    "marketing": ["Marketing Manager", "Digital Marketing Specialist", "Brand Manager", "Growth Marketing Manager", "Marketing Data Analyst"],
+    "finanza": ["Financial Analyst", "Investment Analyst", "Risk Analyst", "Quantitative Analyst"],
+    "management": ["Product Manager", "Project Manager", "Business Analyst", "Consultant"],
+    # Tech & Engineering
+    "informatica": ["Software Engineer", "Backend Developer", "Full Stack Developer", "Data Engineer", "DevOps Engineer"],
+    "ingegneria": ["Software Engineer", "Backend Developer", "Data Engineer", "DevOps Engineer", "Machine Learning Engineer", "Solutions Architect", "MLOps Engineer"],
+    "computer science": ["Software Engineer", "Backend Developer", "Full Stack Developer", "Machine Learning Engineer", "Analytics Engineer", "Growth Engineer"],
+    "data science": ["Data Scientist", "Machine Learning Engineer", "Data Analyst", "AI Business Analyst", "Marketing Data Analyst", "Analytics Engineer"],
+    "artificial intelligence": ["Machine Learning Engineer", "Data Scientist", "AI Business Analyst", "MLOps Engineer"], # New
+    # Sciences
+    "matematica": ["Data Scientist", "Quantitative Analyst", "Machine Learning Engineer", "Financial Analyst", "FinTech Specialist"],
+    "statistica": ["Data Scientist", "Data Analyst", "Statistician", "Machine Learning Engineer", "Marketing Data Analyst"],
+    "fisica": ["Data Scientist", "Quantitative Analyst", "Machine Learning Engineer"],
+    # Creative & Communication
+    "comunicazione": ["Marketing Manager", "Digital Marketing Specialist", "Content Marketing Manager", "UX Designer", "Product Marketing Manager"],
+    "design": ["UX Designer", "UI Designer", "Product Designer", "Frontend Developer"],
+    "giornalismo": ["Content Marketing Manager", "Digital Marketing Specialist", "Copywriter", "Technical Writer"],
+    # Other
+    "psicologia": ["UX Researcher", "HR Manager", "Product Manager", "HR Tech Specialist"],
+    "giurisprudenza": ["Compliance Analyst", "Legal Tech Specialist", "Business Analyst"],
+    "lingue": ["Content Marketing Manager", "International Business", "Marketing Manager"],
+}
+
+def _education_role_boosts(cv_text: str, job_archetypes: Dict, signals: TextSignals = None) -> Dict[str, float]:
+    """Education boost per role (0-100) from degree keywords in the CV, weighted by recency."""
+    education_boost = {}
+    if cv_text:
+        signals = signals or scan_text_signals(cv_text)
+        text_len = len(signals.text_lower)
+        
+        # Education keywords found in the CV, with their first position
+        for edu_keyword, position in signals.education_positions().items():
+            # Weight: earlier position = more recent = higher weight 
+            # Scaled to 0-100 range for unified scoring (max 100, min 40 if mentioned)
+            recency_weight = max(40, 100 - (position / text_len) * 50)
+            
+            for role in EDUCATION_TO_ROLES[edu_keyword]:
+                if role in job_archetypes:
+                    current_boost = education_boost.get(role, 0)
+                    education_boost[role] = max(current_boost, recency_weight)
+    return education_boost
+
+def _expand_cv_skills(cv_skills: Set[str]) -> Tuple[Set[str], Set[str]]:
+    """(cv_norm, cv_expanded): CV skills expanded once and twice, as used by role scoring."""
+    cv_norm = {s.lower() for s in cv_skills}
+    cv_norm = expand_skills_with_clusters(cv_norm)
+    cv_expanded = expand_skills_bidirectional(cv_norm)
+    return cv_norm, cv_expanded
+
+def recommend_roles(cv_skills: Set[str], jd_text: str = "", cv_text: str = "") -> List[Tuple[str, float, List[str]]]:
+    """
+    Identifies the best fitting job roles excluding the one described in the JD.
+    Now also considers education from CV text with recency weighting.
+    """
+    job_archetypes = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
+    if not cv_skills or not job_archetypes:
+        return []
+
+    # Archetype vector space (None without scikit-learn)
+    index = role_index.get_archetype_index()
+    if index is None:
+        return []
+
+    # 0. Seniority Detection (one scan of the CV also gives the education keywords)
+    signals = scan_text_signals(cv_text) if cv_text else None
+    cv_level, _ = signals.seniority() if signals else ("Mid Level", 0.0)
+
+    # 1. Extract education boost from CV text
+    education_boost = _education_role_boosts(cv_text, job_archetypes, signals)
+
+    # 2. Vectorization - TF-IDF + LSA fitted once on the archetypes (role_index.py)
+    # Docs: [0=CV, 1=JD (if exists)], transformed into the cached vector space
+    archetype_names = index.names
+    query_docs = [" ".join(sorted(cv_skills))]  # sorted: bigram features must not depend on set order
+    if jd_text:
+        query_docs.append(jd_text)
+    tfidf_sims, lsa_sims = index.similarities(query_docs)
+    
+    # 3. Identify Target Role from JD (if redundant)
+    excluded_roles = set()
+    if jd_text:
+        # Find closest archetype to JD
+        jd_sims = tfidf_sims[1]
+        target_role_idx = jd_sims.argmax()
+        target_role_score = jd_sims[target_role_idx]
+        
+        # If the JD strongly matches an archetype (>50%), exclude it
+        # Increased threshold from 0.15 to 0.50 to prevent false exclusions of valid alternatives
+        jd_lower = jd_text.lower() if jd_text else ""
+        
+        # 1. Cosine Similarity Check
+        if target_role_score > 0.50:
+            excluded_roles.add(archetype_names[target_role_idx])
+            
+        # 2. Heuristic Check (Explicit Mention in Header)
+        # Only exclude if mentioned in first 200 chars (Title area)
+        header_text = jd_lower[:200]
+        for name in archetype_names:
+            if name.lower() in header_text:
+                excluded_roles.add(name)
+                
+    # 4. Identify Current Role from CV (REMOVED in v1.36)
+    # We deliberately WANT to recommend the candidate's current role if it's a good fit.
+    # Users found it confusing that "Data Analyst" wasn't recommended for a Data Analyst profile.
+    
+    # 5. Compute Recommendations (Similarity to remaining archetypes)
+    # Hybrid Score: Combine TF-IDF (keyword intensity) with LSA (semantic meaning)
+    # Weighting: 70% direct keywords, 30% semantic context
+    similarities = index.hybrid(tfidf_sims[0], None if lsa_sims is None else lsa_sims[0])
+    
+    # Build expanded CV skills set (including cluster equivalents)
+    cv_norm, cv_expanded = _expand_cv_skills(cv_skills)
+                
+    # 5. Compute Recommendations (WEIGHTED SCORING for consistency)
+    # -----------------------------------------------------------
+    # Use same logic as analyze_gap: Direct(1.0), Inferred(0.9), Transferable(0.7)
+    # All roles at once: role x skill incidence matrix (role_index.py)
+    matrix = role_index.get_role_skill_matrix()
+    score_points = matrix.match_points(cv_norm, cv_expanded, (WEIGHT_DIRECT, WEIGHT_INFERRED, WEIGHT_TRANSFERABLE))
+    
+    # Calculate base weighted score
+    weighted_skill_scores = calculate_match_scores(score_points, matrix.sizes)
+    
+    # Boost with Semantic Similarity (0-100 range)
+    semantic_scores = similarities * 100
+    
+    # Education Boost (0-30 range)
+    edu_boosts = np.array([education_boost.get(name, 0) for name in matrix.names], dtype=float)
+    
+    # FINAL UNIFIED COMPOSITE SCORE
+    final_scores = _calculate_composite_role_scores(weighted_skill_scores, semantic_scores, edu_boosts)
+    
+    recommendations = []
+    for i in np.flatnonzero((final_scores > 5) & (matrix.sizes > 0)): # Threshold
+        name = matrix.names[i]
+        if name in excluded_roles:
+            continue
+        role_norm = matrix.role_norms[i]
+        skills_matched = {rs for rs in role_norm if rs in cv_expanded}
+        missing = role_norm - skills_matched
+        recommendations.append({
+            "role": name,
+            "category": matrix.sectors[i],
+            "score": float(final_scores[i]),
+            "skills_matched": list(skills_matched),
+            "skills_required": list(matrix.role_skills[i]),
+            "missing_skills": list(missing)[:5]
+        })
+             
+    # Sort and Return
+    recommendations.sort(key=lambda x: x["score"], reverse=True)
+    return recommendations
+
+def score_role(cv_skills: Set[str], cv_text: str, role_name: str) -> Optional[float]:
+    """
+    Composite score of a single archetype for a CV.
+
+    Same skill (65%), semantic (20%) and education (15%) components as
+    recommend_roles, computed for one role only against the cached
+    archetype vectors. Returns the score recommend_roles would assign to
+    role_name (before its > 5 threshold), or None if the role cannot be
+    scored (unknown role, no primary skills, no CV skills).
+    """
+    return score_role_many([(cv_skills, cv_text)], role_name)[0]
+
+def score_role_many(profiles: List[Tuple[Set[str], str]], role_name: str) -> List[Optional[float]]:
+    """
+    score_role for many (cv_skills, cv_text) profiles against one archetype.
+
+    The semantic component of all profiles comes from a single transform
+    of the archetype index; every value equals the single-profile call.
+    """
+    job_archetypes = getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {})
+    results: List[Optional[float]] = [None] * len(profiles)
+    if role_name not in job_archetypes:
+        return results
+
+    index = role_index.get_archetype_index()
+    if index is None:
+        return results
+
+    matrix = role_index.get_role_skill_matrix()
+    i = matrix.positions[role_name]
+    if not matrix.sizes[i]:
+        return results
+
+    active = [k for k, (cv_skills, _) in enumerate(profiles) if cv_skills]
+    if not active:
+        return results
+
+    # Semantic component (transform-only against the fitted archetype space)
+    col = index.positions[role_name]
+    tfidf_sims, lsa_sims = index.similarities([" ".join(sorted(profiles[k][0])) for k in active], joint=False)
+    similarities = index.hybrid(tfidf_sims[:, col], None if lsa_sims is None else lsa_sims[:, col])
+
+    weights = (WEIGHT_DIRECT, WEIGHT_INFERRED, WEIGHT_TRANSFERABLE)
+    for row, k in enumerate(active):
+        cv_skills, cv_text = profiles[k]
+        # Skill component (Direct / Inferred / Transferable) for this role only
+        cv_norm, cv_expanded = _expand_cv_skills(cv_skills)
+        score_points = matrix.role_match_points(i, cv_norm, cv_expanded, weights)
+        weighted_skill_score = calculate_match_score(score_points, int(matrix.sizes[i]))
+
+        semantic_score = similarities[row] * 100
+
+        # Education component
+        edu_boost = _education_role_boosts(cv_text, job_archetypes).get(role_name, 0)
+
+        results[k] = _calculate_composite_role_score(weighted_skill_score, semantic_score, edu_boost)
+    return results
+
+def expand_skills_bidirectional(skills_norm: Set[str]) -> Set[str]:
+    """
+    UNIFIED SKILL EXPANSION ENGINE v2.0
+    ----------------------------------
+    Implements bidirectional inference:
+    1. HIERARCHY (Upwards): Specific -> General (e.g., React -> Frontend)
+    2. IMPLICATIONS (Downwards): General -> Specific (e.g., Data Science -> Python)
+    3. CLUSTERS (Horizontal): Equivalent/Transferable (e.g., Tableau -> Power BI)
+    
+    The closure of every knowledge-base skill is precomputed once as a
+    bitset row (skill_graph.py); an expansion is the union of the rows of
+    the input skills, cached on the frozen input set.
+    
+    Args:
+        skills_norm: Set of normalized (lowercase) skill names
+        
+    Returns:
+        Set[str]: Expanded set of normalized skill names
+    """
+    if not skills_norm:
+        return set()
+
+    return skill_graph.get_skill_graph().expand(skills_norm)
+
+# Legacy alias for backward compatibility
+def expand_skills_with_clusters(cv_norm):
+    return expand_skills_bidirectional(cv_norm)
@@ -0,0 +1,553 @@
+"""
+================================================================================
+CareerMatch AI - Headless Scoring Service (HTTP/JSON)
+================================================================================
+
+Exposes the engine to other internal systems without the Streamlit UI. A
+small asyncio HTTP/1.1 server (standard library only) accepts JSON POSTs
+and dispatches the CPU-bound work to a process pool:
+
+    POST /analyze_gap            {"cv_text", "jd_text"}
+    POST /recommend_roles        {"cv_text" | "cv_skills", "jd_text"?}
+    POST /discover_careers       {"cv_text"?, "free_text"?, "preferences"?}
+    POST /analyze_cover_letter   {"cover_letter_text", "jd_text", "cv_text"?}
+    POST /get_chatbot_response   {"message", "current_page"?, "lang"?}
+    GET  /health                 -> {"status": "ok" | "restarting", ...}
+    GET  /metrics                -> Prometheus text format
+
+Responses are {"result": ...} (sets become sorted lists) or {"error": ...}.
+
+- Pre-warmed pool: every worker imports ml_utils and builds the skill
+  automata, skill graph, archetype index, role matrix and the Ruben intent
+  classifier in its initializer; start() waits for all of them, so the
+  first request does not pay the cold start.
+- Back-pressure: at most max_queue jobs are admitted (running + waiting
+  for a worker); beyond that the server answers 503 with Retry-After
+  instead of queueing without bound. Request bodies above max_body get 413.
+- Timeouts: a job that does not finish within `timeout` seconds gets 504
+  (a job still waiting for a worker is cancelled; a running one finishes
+  in the background and its result is discarded). A job keeps its
+  admission slot until the pool future is done, so stale jobs still count
+  against max_queue. Slow or idle clients are disconnected after
+  idle_timeout.
+- Broken pool: if a worker process dies, the request gets 503 with
+  Retry-After and a replacement pool is started and warmed the same way
+  in the background. Requests get 503 until it is warm, so none of them
+  pays the cold start against the timeout.
+- Metrics: request latency histogram and status counters per endpoint,
+  worker compute-time histogram, in-flight and stale-job gauges,
+  rejections, timeouts and pool restarts.
+
+Public API:
+- ScoringService(workers, timeout, max_queue, ...) -> .start(host, port), .stop()
+- serve(host, port, **options)                     -> run until interrupted
+- CLI: python scoring_service.py --port 8765 --workers 4
+================================================================================
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, Dict, List, Optional, Sequence, Set, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_TIMEOUT = 30.0          # seconds per job
+DEFAULT_IDLE_TIMEOUT = 15.0     # seconds to receive a request on a connection
+DEFAULT_MAX_QUEUE = 64          # admitted jobs (running + waiting)
+DEFAULT_MAX_BODY = 2 * 1024 * 1024
+
+# Latency histogram buckets (seconds)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+HTTP_REASONS = {
+    200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+    408: "Request Timeout", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+    500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout",
+}
+
+
+class PayloadError(ValueError):
+    """Malformed request payload (answered with 400)."""
+
+
+# =============================================================================
+# WORKER SIDE (runs in the pool processes)
+# =============================================================================
+def _init_worker() -> None:
+    """Load the knowledge base and build every cached index once per worker."""
+    import ml_utils
+    import role_index
+    import ruben_intent
+    import skill_graph
+    import skill_matcher
+
+    skill_matcher.get_skill_matchers()
+    skill_matcher.get_typo_indexes()
+    skill_graph.get_skill_graph()
+    role_index.get_archetype_index()
+    role_index.get_role_skill_matrix()
+    ruben_intent.classify_intent("hello")
+    ml_utils.analyze_gap("Python SQL", "Data Analyst")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+def _analyze_gap(cv_text: str, jd_text: str):
+    import scoring_core
+    return scoring_core.analyze_gap(cv_text, jd_text)
+
+
+def _recommend_roles(cv_text: str = "", jd_text: str = "", cv_skills: List[str] = None):
+    import scoring_core
+    if cv_skills is None:
+        if not cv_text:
+            raise PayloadError("cv_text or cv_skills is required")
+        hard, soft = scoring_core.parse_document(cv_text).skills()
+        cv_skills = hard | soft
+    return scoring_core.recommend_roles(set(cv_skills), jd_text=jd_text, cv_text=cv_text)
+
+
+def _discover_careers(cv_text: str = "", free_text: str = "", preferences: Dict = None):
+    import ml_utils
+    return ml_utils.discover_careers(cv_text=cv_text, free_text=free_text, preferences=preferences)
+
+
+def _analyze_cover_letter(cover_letter_text: str, jd_text: str, cv_text: str = ""):
+    import ml_utils
+    return ml_utils.analyze_cover_letter(cover_letter_text, jd_text, cv_text)
+
+
+def _get_chatbot_response(message: str, current_page: str = "Landing", lang: str = None):
+    import ml_utils
+    return ml_utils.get_chatbot_response(message, current_page, lang=lang)
+
+
+# endpoint -> (function, required fields, optional fields)
+ENDPOINTS: Dict[str, Tuple[Callable, Tuple[str, ...], Tuple[str, ...]]] = {
+    "analyze_gap": (_analyze_gap, ("cv_text", "jd_text"), ()),
+    "recommend_roles": (_recommend_roles, (), ("cv_text", "jd_text", "cv_skills")),
+    "discover_careers": (_discover_careers, (), ("cv_text", "free_text", "preferences")),
+    "analyze_cover_letter": (_analyze_cover_letter, ("cover_letter_text", "jd_text"), ("cv_text",)),
+    "get_chatbot_response": (_get_chatbot_response, ("message",), ("current_page", "lang")),
+}
+
+# Expected JSON type of every request field
+FIELD_TYPES = {
+    "cv_text": str, "jd_text": str, "free_text": str, "cover_letter_text": str,
+    "message": str, "current_page": str, "lang": (str, type(None)),
+    "cv_skills": list, "preferences": (dict, type(None)),
+}
+
+
+def _run_job(endpoint: str, kwargs: Dict) -> Tuple[str, float]:
+    """Worker entry point: run one endpoint, return (JSON result, compute seconds)."""
+    start = time.perf_counter()
+    result = ENDPOINTS[endpoint][0](**kwargs)
+    return to_json({"result": result}), time.perf_counter() - start
+
+
+def _json_default(obj):
+    if isinstance(obj, (set, frozenset)):
+        return sorted(obj, key=str)
+    if hasattr(obj, "tolist"):  # NumPy scalars and arrays
+        return obj.tolist()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def to_json(obj) -> str:
+    return json.dumps(obj, default=_json_default, ensure_ascii=False)
+
+
+def validate_payload(endpoint: str, payload) -> Dict:
+    """Keyword arguments for an endpoint; PayloadError on a malformed payload."""
+    if not isinstance(payload, dict):
+        raise PayloadError("request body must be a JSON object")
+    _, required, optional = ENDPOINTS[endpoint]
+    missing = [field for field in required if field not in payload]
+    if missing:
+        raise PayloadError(f"missing field(s): {', '.join(missing)}")
+    unknown = sorted(set(payload) - set(required) - set(optional))
+    if unknown:
+        raise PayloadError(f"unknown field(s): {', '.join(unknown)}")
+    for field, value in payload.items():
+        if not isinstance(value, FIELD_TYPES[field]):
+            raise PayloadError(f"field '{field}' has the wrong type")
+    if "cv_skills" in payload and not all(isinstance(s, str) for s in payload["cv_skills"]):
+        raise PayloadError("field 'cv_skills' must be a list of strings")
+    return dict(payload)
+
+
+# =============================================================================
+# METRICS
+# =============================================================================
+class LatencyHistogram:
+    """Cumulative histogram in the Prometheus layout (le buckets + sum + count)."""
+
+    def __init__(self, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # last slot: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-quantile (inf if beyond the last)."""
+        if not self.count:
+            return 0.0
+        target, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + (float("inf"),), self.counts):
+            seen += n
+            if seen >= target:
+                return bound
+        return float("inf")
+
+    def render(self, name: str, labels: str) -> List[str]:
+        lines, cumulative = [], 0
+        for bound, n in zip(self.buckets, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {self.count}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class ServiceMetrics:
+    """Per-endpoint latency histograms and counters, rendered for /metrics."""
+
+    def __init__(self):
+        self.latency: Dict[str, LatencyHistogram] = {}
+        self.compute: Dict[str, LatencyHistogram] = {}
+        self.responses: Dict[Tuple[str, int], int] = {}
+        self.rejected = 0
+        self.timeouts = 0
+        self.pool_restarts = 0
+        self.inflight = 0   # admitted jobs whose pool future is not done yet
+        self.stale = 0      # of which: timed out (504 sent) but still running
+
+    def observe(self, endpoint: str, status: int, seconds: float) -> None:
+        self.latency.setdefault(endpoint, LatencyHistogram()).observe(seconds)
+        self.responses[(endpoint, status)] = self.responses.get((endpoint, status), 0) + 1
+
+    def observe_compute(self, endpoint: str, seconds: float) -> None:
+        self.compute.setdefault(endpoint, LatencyHistogram()).observe(seconds)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP careermatch_request_seconds Request latency (admission to response).",
+            "# TYPE careermatch_request_seconds histogram",
+        ]
+        for endpoint in sorted(self.latency):
+            lines += self.latency[endpoint].render("careermatch_request_seconds", f'endpoint="{endpoint}"')
+        lines += [
+            "# HELP careermatch_worker_seconds Compute time inside the worker process.",
+            "# TYPE careermatch_worker_seconds histogram",
+        ]
+        for endpoint in sorted(self.compute):
+            lines += self.compute[endpoint].render("careermatch_worker_seconds", f'endpoint="{endpoint}"')
+        lines += ["# HELP careermatch_responses_total Responses by endpoint and status.",
+                  "# TYPE careermatch_responses_total counter"]
+        for (endpoint, status), n in sorted(self.responses.items()):
+            lines.append(f'careermatch_responses_total{{endpoint="{endpoint}",status="{status}"}} {n}')
+        lines += [
+            "# TYPE careermatch_rejected_total counter", f"careermatch_rejected_total {self.rejected}",
+            "# TYPE careermatch_timeouts_total counter", f"careermatch_timeouts_total {self.timeouts}",
+            "# TYPE careermatch_pool_restarts_total counter", f"careermatch_pool_restarts_total {self.pool_restarts}",
+            "# TYPE careermatch_inflight gauge", f"careermatch_inflight {self.inflight}",
+            "# TYPE careermatch_stale_jobs gauge", f"careermatch_stale_jobs {self.stale}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# =============================================================================
+# SERVER
+# =============================================================================
+class ScoringService:
+    """asyncio HTTP front-end over a pre-warmed pool of scoring workers."""
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT,
+                 max_queue: int = DEFAULT_MAX_QUEUE, max_body: int = DEFAULT_MAX_BODY,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT):
+        # workers=0 runs the jobs on one in-process thread (debugging, tests)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.timeout = timeout
+        self.max_queue = max_queue
+        self.max_body = max_body
+        self.idle_timeout = idle_timeout
+        self.metrics = ServiceMetrics()
+        self.executor: Optional[Executor] = None
+        self._stale: Set[Future] = set()
+        self._replacing: Optional[asyncio.Task] = None
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.port: Optional[int] = None
+
+    # -------------------------------------------------------------------------
+    # LIFECYCLE
+    # -------------------------------------------------------------------------
+    def _create_executor(self) -> Executor:
+        if self.workers > 0:
+            # spawn: clean workers that only import what the jobs need
+            return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                       initializer=_init_worker)
+        return ThreadPoolExecutor(max_workers=1, initializer=_init_worker)
+
+    async def _warm(self, executor: Executor) -> None:
+        """Wait until every worker of executor has run _init_worker."""
+        loop = asyncio.get_running_loop()
+        # One task per worker: each submit spawns a process while none is idle
+        await asyncio.gather(*[loop.run_in_executor(executor, _ping) for _ in range(max(self.workers, 1))])
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+        """Start and warm the pool, then listen (port 0 picks a free port)."""
+        executor = self._create_executor()
+        await self._warm(executor)
+        self.executor = executor
+
+        self.server = await asyncio.start_server(self._handle_connection, host, port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._replacing is not None:
+            self._replacing.cancel()
+            self._replacing = None
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _restart_pool(self, broken: Executor) -> None:
+        """Replace a broken pool (once, however many requests saw it break)."""
+        if self.executor is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self.executor = None  # nothing is routed until the replacement is warm
+        self.metrics.pool_restarts += 1
+        self._replacing = asyncio.ensure_future(self._replace_pool())
+
+    async def _replace_pool(self) -> None:
+        """Create and warm a new pool, then route to it."""
+        executor = self._create_executor()
+        try:
+            await self._warm(executor)
+        except asyncio.CancelledError:
+            executor.shutdown(wait=False, cancel_futures=True)
+            raise
+        except Exception:
+            pass  # a pool that broke while warming fails the next submit and is replaced again
+        self.executor = executor
+        self._replacing = None
+
+    # -------------------------------------------------------------------------
+    # DISPATCH
+    # -------------------------------------------------------------------------
+    def _release(self, future: Future) -> None:
+        """Free the admission slot of a job whose pool future is done (event loop thread)."""
+        self.metrics.inflight -= 1
+        if future in self._stale:
+            self._stale.discard(future)
+            self.metrics.stale -= 1
+
+    async def dispatch(self, endpoint: str, payload) -> Tuple[int, str]:
+        """Validate, admit and run one job; returns (status, JSON body)."""
+        try:
+            kwargs = validate_payload(endpoint, payload)
+        except PayloadError as e:
+            return 400, to_json({"error": str(e)})
+
+        # Back-pressure: bounded number of admitted jobs
+        if self.metrics.inflight >= self.max_queue:
+            self.metrics.rejected += 1
+            return 503, to_json({"error": "server busy, retry later"})
+
+        loop = asyncio.get_running_loop()
+        executor = self.executor
+        if executor is None:
+            return 503, to_json({"error": "worker pool restarting, retry later"})
+        try:
+            future = executor.submit(_run_job, endpoint, kwargs)
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            return 503, to_json({"error": "worker pool restarted, retry later"})
+        # The slot is held until the job is really done, not until we stop waiting
+        self.metrics.inflight += 1
+        future.add_done_callback(lambda f: _call_soon(loop, self._release, f))
+        try:
+            body, compute = await asyncio.wait_for(asyncio.wrap_future(future, loop=loop), self.timeout)
+        except asyncio.TimeoutError:
+            if not future.cancel():  # only effective while still queued
+                self._stale.add(future)
+                self.metrics.stale += 1
+            self.metrics.timeouts += 1
+            return 504, to_json({"error": f"timed out after {self.timeout:g}s"})
+        except BrokenProcessPool:
+            self._restart_pool(executor)
+            return 503, to_json({"error": "worker pool restarted, retry later"})
+        except PayloadError as e:
+            return 400, to_json({"error": str(e)})
+        except Exception as e:
+            return 500, to_json({"error": f"{type(e).__name__}: {e}"})
+        self.metrics.observe_compute(endpoint, compute)
+        return 200, body
+
+    async def _route(self, method: str, path: str, body: bytes) -> Tuple[int, str, str]:
+        """(status, content type, body) for one request."""
+        path = path.split("?", 1)[0].rstrip("/") or "/"
+        if path == "/health":
+            info = {"status": "ok" if self.executor is not None else "restarting", "workers": self.workers,
+                    "inflight": self.metrics.inflight, "stale": self.metrics.stale}
+            return 200, "application/json", to_json(info)
+        if path == "/metrics":
+            return 200, "text/plain; version=0.0.4", self.metrics.render()
+
+        endpoint = path.lstrip("/")
+        if endpoint not in ENDPOINTS:
+            return 404, "application/json", to_json({"error": f"unknown endpoint {path}"})
+        if method != "POST":
+            return 405, "application/json", to_json({"error": "use POST"})
+        try:
+            payload = json.loads(body or b"{}")
+        except ValueError:
+            return 400, "application/json", to_json({"error": "invalid JSON"})
+        status, text = await self.dispatch(endpoint, payload)
+        return status, "application/json", text
+
+    # -------------------------------------------------------------------------
+    # HTTP/1.1
+    # -------------------------------------------------------------------------
+    async def _read_request(self, reader: asyncio.StreamReader):
+        """(method, path, headers, body) or an int status for a malformed request."""
+        head = await reader.readuntil(b"\r\n\r\n")
+        lines = head.decode("latin-1").split("\r\n")
+        parts = lines[0].split()
+        if len(parts) != 3:
+            return 400
+        method, path, _ = parts
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        try:
+            length = int(headers.get("content-length", 0))
+        except ValueError:
+            return 400
+        if length > self.max_body:
+            return 413
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path, headers, body
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, content_type: str, body: str, keep_alive: bool,
+                       extra: Dict[str, str] = None) -> None:
+        data = body.encode("utf-8")
+        headers = {
+            "Content-Type": f"{content_type}; charset=utf-8" if "charset" not in content_type else content_type,
+            "Content-Length": str(len(data)),
+            "Connection": "keep-alive" if keep_alive else "close",
+            **(extra or {}),
+        }
+        head = f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1") + data)
+        await writer.drain()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    request = await asyncio.wait_for(self._read_request(reader), self.idle_timeout)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self._respond(writer, 431, "application/json", to_json({"error": "headers too large"}), False)
+                    break
+
+                if isinstance(request, int):
+                    await self._respond(writer, request, "application/json",
+                                        to_json({"error": HTTP_REASONS[request]}), False)
+                    break
+
+                method, path, headers, body = request
+                start = time.perf_counter()
+                status, content_type, text = await self._route(method, path, body)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                extra = {"Retry-After": "1"} if status == 503 else None
+                await self._respond(writer, status, content_type, text, keep_alive, extra)
+
+                endpoint = path.split("?", 1)[0].strip("/")
+                if endpoint in ENDPOINTS:
+                    self.metrics.observe(endpoint, status, time.perf_counter() - start)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+
+def _call_soon(loop: asyncio.AbstractEventLoop, callback: Callable, *args) -> None:
+    """Schedule callback on loop from a pool thread (no-op once the loop is closed)."""
+    try:
+        loop.call_soon_threadsafe(callback, *args)
+    except RuntimeError:
+        pass
+
+
+async def _serve_forever(host: str, port: int, **options) -> None:
+    service = ScoringService(**options)
+    await service.start(host, port)
+    print(f"CareerMatch scoring service on http://{host}:{service.port} ({service.workers} workers)")
+    try:
+        await service.server.serve_forever()
+    finally:
+        await service.stop()
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, **options) -> None:
+    """Run the service until interrupted (options: workers, timeout, max_queue, ...)."""
+    try:
+        asyncio.run(_serve_forever(host, port, **options))
+    except KeyboardInterrupt:
+        pass
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="CareerMatch AI headless scoring service.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--workers", type=int, default=None, help="pool processes (default: CPU count)")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="seconds per job")
+    parser.add_argument("--max-queue", type=int, default=DEFAULT_MAX_QUEUE, help="admitted jobs before 503")
+    parser.add_argument("--max-body", type=int, default=DEFAULT_MAX_BODY, help="request body limit (bytes)")
+    args = parser.parse_args(argv)
+    serve(args.host, args.port, workers=args.workers, timeout=args.timeout,
+          max_queue=args.max_queue, max_body=args.max_body)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
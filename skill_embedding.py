@@ -0,0 +1,165 @@
+"""
+================================================================================
+CareerMatch AI - Skill Embedding Map (precomputed layout and clusters)
+================================================================================
+
+perform_skill_clustering refitted a char_wb TF-IDF, K-Means (n_init=20,
+max_iter=500) and PCA on every skill list, although the lists are almost
+always drawn from the same few hundred HARD_SKILLS / SOFT_SKILLS keys.
+
+SkillEmbedding fits the three models once on the whole skill vocabulary:
+
+- VECTORS: char_wb TF-IDF (2-4 character n-grams) of every skill name,
+  rows L2-normalized
+- LAYOUT:  PCA coordinates (2D) of every skill
+- CLUSTERS: K-Means assignment of every skill to one of CLUSTER_NAMES
+
+Embedding a user's skill list is then a row lookup. Skills outside the
+vocabulary (free-text JD keywords) are the only incremental work: one
+vectorizer.transform, pca.transform and kmeans.predict for the batch.
+
+Because the map is global, a skill keeps its position and cluster across
+analyses, and two skill lists are laid out in the same space.
+
+The fitted map is persisted with model_store (key: HARD_SKILLS / SOFT_SKILLS
+fingerprint, parameters, sklearn version) and prebuilt by
+`python model_store.py build`.
+
+Public API:
+- CLUSTER_NAMES, SKILL_EMBEDDING_TABLES
+- SkillEmbedding(skills) -> .embed(skills), .position(skill)
+- skill_vocabulary()      -> HARD_SKILLS + SOFT_SKILLS names
+- skill_embedding_key()   -> model_store artifact key
+- get_skill_embedding()   -> SkillEmbedding for the current KB version (None without sklearn)
+================================================================================
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+import knowledge_base
+import model_store
+from kb_version import knowledge_base_version
+
+
+SKILL_EMBEDDING_ARTIFACT = "skill_embedding"
+SKILL_EMBEDDING_TABLES = ("HARD_SKILLS", "SOFT_SKILLS")
+
+# Cluster labels of the skill map (K-Means label i -> CLUSTER_NAMES[i])
+CLUSTER_NAMES = (
+    "Data & Analytics",
+    "Development",
+    "Cloud & Tools",
+    "Business",
+    "Research",
+)
+
+TFIDF_PARAMS = dict(analyzer='char_wb', ngram_range=(2, 4), min_df=1)
+KMEANS_PARAMS = dict(n_clusters=len(CLUSTER_NAMES), random_state=42, n_init=20,
+                     max_iter=500, algorithm='elkan')
+PCA_PARAMS = dict(n_components=2, random_state=42)
+
+
+def skill_vocabulary() -> List[str]:
+    """HARD_SKILLS then SOFT_SKILLS names, without case-insensitive duplicates."""
+    names: Dict[str, str] = {}
+    for table in SKILL_EMBEDDING_TABLES:
+        for name in getattr(knowledge_base, table, {}):
+            names.setdefault(name.lower(), name)
+    return list(names.values())
+
+
+class SkillEmbedding:
+    """TF-IDF vectors, PCA layout and K-Means clusters fitted once on a skill vocabulary."""
+
+    def __init__(self, skills: Iterable[str]):
+        # Imported on first build (ImportError without scikit-learn)
+        from sklearn.cluster import KMeans
+        from sklearn.decomposition import PCA
+        from sklearn.feature_extraction.text import TfidfVectorizer
+
+        self.names: List[str] = []
+        self.positions: Dict[str, int] = {}
+        for name in skills:
+            if name.lower() not in self.positions:
+                self.positions[name.lower()] = len(self.names)
+                self.names.append(name)
+        if len(self.names) < len(CLUSTER_NAMES):
+            raise ValueError(f"SkillEmbedding needs at least {len(CLUSTER_NAMES)} skills, got {len(self.names)}")
+
+        self.vectorizer = TfidfVectorizer(dtype=np.float32, **TFIDF_PARAMS)
+        self.vectors: np.ndarray = self.vectorizer.fit_transform(self.names).toarray()
+
+        self.pca = PCA(**PCA_PARAMS)
+        self.coords: np.ndarray = self.pca.fit_transform(self.vectors)
+
+        self.kmeans = KMeans(**KMEANS_PARAMS)
+        self.labels: np.ndarray = self.kmeans.fit_predict(self.vectors)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def position(self, skill: str) -> Optional[int]:
+        """Row of skill in the vocabulary (case-insensitive), None if unknown."""
+        return self.positions.get(skill.lower())
+
+    def embed(self, skills: List[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        (vectors, 2D coordinates, cluster labels) of skills, one row each.
+
+        Known skills are looked up; unknown ones are transformed into the
+        fitted space and assigned to the nearest cluster centre.
+        """
+        rows = [self.position(skill) for skill in skills]
+        known = [i for i, row in enumerate(rows) if row is not None]
+        unknown = [i for i, row in enumerate(rows) if row is None]
+
+        vectors = np.zeros((len(skills), self.vectors.shape[1]), dtype=self.vectors.dtype)
+        coords = np.zeros((len(skills), 2), dtype=self.coords.dtype)
+        labels = np.zeros(len(skills), dtype=self.labels.dtype)
+        if known:
+            vocab_rows = [rows[i] for i in known]
+            vectors[known] = self.vectors[vocab_rows]
+            coords[known] = self.coords[vocab_rows]
+            labels[known] = self.labels[vocab_rows]
+        if unknown:
+            new = self.vectorizer.transform([skills[i] for i in unknown]).toarray()
+            vectors[unknown] = new
+            coords[unknown] = self.pca.transform(new)
+            labels[unknown] = self.kmeans.predict(new)
+        return vectors, coords, labels
+
+
+# =============================================================================
+# CACHED EMBEDDING (one per knowledge-base version, persisted by model_store)
+# =============================================================================
+_EMBEDDINGS: Dict[str, SkillEmbedding] = {}
+
+
+def skill_embedding_key() -> str:
+    """Artifact key: skill tables + model parameters + sklearn version."""
+    return model_store.artifact_key(SKILL_EMBEDDING_TABLES,
+                                    {"tfidf": TFIDF_PARAMS, "kmeans": KMEANS_PARAMS, "pca": PCA_PARAMS})
+
+
+def build_skill_embedding() -> SkillEmbedding:
+    """Fit the skill map on the current vocabulary (no persistence)."""
+    return SkillEmbedding(skill_vocabulary())
+
+
+def get_skill_embedding() -> Optional[SkillEmbedding]:
+    """SkillEmbedding for the current skill tables, loaded from disk or fitted once."""
+    version = knowledge_base_version(*SKILL_EMBEDDING_TABLES)
+    embedding = _EMBEDDINGS.get(version)
+    if embedding is None:
+        try:
+            embedding = model_store.load_or_build(SKILL_EMBEDDING_ARTIFACT, skill_embedding_key(),
+                                                  build_skill_embedding)
+        except (ImportError, ValueError):
+            return None
+        _EMBEDDINGS.clear()
+        _EMBEDDINGS[version] = embedding
+    return embedding
@@ -0,0 +1,217 @@
+"""
+================================================================================
+CareerMatch AI - Skill Graph (precomputed expansion closure)
+================================================================================
+
+ml_utils.expand_skills_bidirectional used to rescan SKILL_CLUSTERS, every
+HARD_SKILLS variation, SKILL_HIERARCHY and SKILL_IMPLICATIONS for each call,
+and it is called inside per-role loops. The expansion is a composition of
+three passes:
+
+1. CLUSTERS (horizontal):  if the set touches a cluster, add the cluster
+2. VARIATIONS -> CANONICAL: if the set contains a variation, add its key
+3. HIERARCHY / IMPLICATIONS: add parents and children (2 rounds)
+
+Each pass has the form "if X touches A then X |= B", which distributes over
+set union. The whole expansion therefore satisfies
+
+    expand(S) = union(expand({s}) for s in S)
+
+so we assign an integer ID to every skill name in the knowledge base,
+precompute expand({s}) once per skill as a bitset (Python int), and an
+expansion becomes the OR of a few precomputed rows. Names outside the
+knowledge base expand to themselves, exactly as before.
+
+Public API:
+- SkillGraph            -> .expand(skills), .to_bits(skills), .names(bits)
+- get_skill_graph()     -> SkillGraph for the current knowledge-base version
+================================================================================
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
+
+import knowledge_base
+from kb_version import knowledge_base_version
+
+
+# Tables the graph is derived from (used as the rebuild key).
+GRAPH_TABLES = ("SKILL_CLUSTERS", "SKILL_HIERARCHY", "INFERENCE_RULES", "SKILL_IMPLICATIONS", "HARD_SKILLS")
+
+# Bounded LRU of expansions keyed by the frozen input set.
+EXPANSION_CACHE_SIZE = 4096
+
+
+def _cluster_members(cluster_data) -> Iterable[str]:
+    return cluster_data.get("skills", []) if isinstance(cluster_data, dict) else cluster_data
+
+
+def iter_bits(bits: int):
+    """Yield the indices of the set bits of an int bitset."""
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class SkillGraph:
+    """Integer-ID skill vocabulary with precomputed expansion rows."""
+
+    def __init__(self, clusters: Dict, hierarchy: Dict, implications: Dict, hard_skills: Dict):
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+
+        # --- Vocabulary (every lowercase name that can take part in a rule)
+        cluster_sets = [[self._intern(s.lower()) for s in _cluster_members(c)] for c in clusters.values()]
+        canonical_rules = []
+        for canonical, variations in hard_skills.items():
+            variation_ids = [self._intern(v.lower()) for v in variations]
+            canonical_rules.append((variation_ids, self._intern(canonical.lower())))
+        neighbours: Dict[int, Set[int]] = {}
+        for rules in (hierarchy, implications):
+            for key, targets in rules.items():
+                kid = self._intern(key.lower())
+                neighbours.setdefault(kid, set()).update(self._intern(t.lower()) for t in targets)
+
+        # --- Adjacency bitsets
+        cluster_bits = [self._bits(ids) for ids in cluster_sets]
+        canonical_bits = [(self._bits(ids), 1 << cid) for ids, cid in canonical_rules]
+        self._neighbour_bits: Dict[int, int] = {k: self._bits(v) for k, v in neighbours.items()}
+
+        # --- Closure rows: expand({s}) for every skill s
+        self._rows: List[int] = []
+        for sid in range(len(self._names)):
+            bits = 1 << sid
+            # 1. Cluster expansion (sequential, in dict order)
+            for c_bits in cluster_bits:
+                if bits & c_bits:
+                    bits |= c_bits
+            # 2. Variation -> canonical
+            for v_bits, c_bit in canonical_bits:
+                if bits & v_bits:
+                    bits |= c_bit
+            # 3. Bidirectional inference, two rounds (chains A -> B -> C)
+            for _ in range(2):
+                grown = bits
+                for member in iter_bits(bits):
+                    grown |= self._neighbour_bits.get(member, 0)
+                if grown == bits:
+                    break
+                bits = grown
+            self._rows.append(bits)
+
+        self._cache: "OrderedDict[FrozenSet[str], FrozenSet[str]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+    # -------------------------------------------------------------------------
+    # VOCABULARY
+    # -------------------------------------------------------------------------
+    def _intern(self, name: str) -> int:
+        sid = self._ids.get(name)
+        if sid is None:
+            sid = len(self._names)
+            self._ids[name] = sid
+            self._names.append(name)
+        return sid
+
+    @staticmethod
+    def _bits(ids: Iterable[int]) -> int:
+        bits = 0
+        for i in ids:
+            bits |= 1 << i
+        return bits
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._ids
+
+    def id_of(self, name: str) -> int:
+        """Integer ID of a normalized skill name (-1 if unknown)."""
+        return self._ids.get(name, -1)
+
+    def name_of(self, sid: int) -> str:
+        return self._names[sid]
+
+    def to_bits(self, skills: Iterable[str]) -> Tuple[int, Set[str]]:
+        """Bitset of the known skills, plus the set of unknown names."""
+        bits = 0
+        unknown = set()
+        ids = self._ids
+        for skill in skills:
+            sid = ids.get(skill)
+            if sid is None:
+                unknown.add(skill)
+            else:
+                bits |= 1 << sid
+        return bits, unknown
+
+    def names(self, bits: int) -> Set[str]:
+        return {self._names[i] for i in iter_bits(bits)}
+
+    # -------------------------------------------------------------------------
+    # EXPANSION
+    # -------------------------------------------------------------------------
+    def row(self, sid: int) -> int:
+        """Precomputed expand({skill}) bitset."""
+        return self._rows[sid]
+
+    def expand_bits(self, bits: int) -> int:
+        rows = self._rows
+        expanded = 0
+        for sid in iter_bits(bits):
+            expanded |= rows[sid]
+        return expanded
+
+    def expand(self, skills_norm: Iterable[str]) -> Set[str]:
+        """Same result as the legacy expand_skills_bidirectional (new set)."""
+        key = skills_norm if isinstance(skills_norm, frozenset) else frozenset(skills_norm)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+        if cached is not None:
+            return set(cached)
+
+        bits, unknown = self.to_bits(key)
+        result = frozenset(self.names(self.expand_bits(bits)) | unknown)
+        with self._cache_lock:
+            self._cache[key] = result
+            self._cache.move_to_end(key)
+            while len(self._cache) > EXPANSION_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return set(result)
+
+
+# =============================================================================
+# CACHED GRAPH (one per knowledge-base version)
+# =============================================================================
+_GRAPHS: Dict[str, SkillGraph] = {}
+
+
+def get_skill_graph() -> SkillGraph:
+    """SkillGraph built from the current knowledge base (rebuilt on change)."""
+    version = knowledge_base_version(*GRAPH_TABLES)
+    graph = _GRAPHS.get(version)
+    if graph is None:
+        hierarchy = getattr(knowledge_base, "SKILL_HIERARCHY", {})
+        if not hierarchy:
+            hierarchy = getattr(knowledge_base, "INFERENCE_RULES", {})
+        graph = SkillGraph(
+            clusters=getattr(knowledge_base, "SKILL_CLUSTERS", {}),
+            hierarchy=hierarchy,
+            implications=getattr(knowledge_base, "SKILL_IMPLICATIONS", {}),
+            hard_skills=getattr(knowledge_base, "HARD_SKILLS", {}),
+        )
+        _GRAPHS.clear()
+        _GRAPHS[version] = graph
+    return graph
@@ -0,0 +1,414 @@
+"""
+================================================================================
+CareerMatch AI - Compiled Skill Matcher (Aho-Corasick)
+================================================================================
+
+Replaces the per-variation loop of ml_utils.extract_skills_from_text, which
+ran one `re.search(r'\\b<var>(?:s|es|ing|ed|tion|ment)?\\b', text)` per
+keyword (950+ patterns, overflowing Python's regex cache so most of them were
+recompiled on every call).
+
+Two exact-match strategies are compiled once per knowledge-base version:
+
+1. PHRASE INDEX: every variation of 1-3 words is stored in a dict, and the
+   whitespace-token unigrams/bigrams/trigrams of the text are looked up in it.
+   This is the "direct phrase match in n-grams" step (e.g. "c++" as a token).
+
+2. AHO-CORASICK AUTOMATON: a trie over all lowercased variations with failure
+   links. A single left-to-right pass over the text reports every occurrence
+   of every variation; each occurrence is then verified against the same
+   rules the regex used: a word boundary before the match, and an optional
+   morphological suffix followed by a word boundary.
+
+Both strategies reproduce the legacy semantics exactly, so the returned
+skill sets are identical while per-document cost becomes O(len(text)).
+
+The fuzzy fallback ("Phyton" -> Python) uses a TypoIndex: a bigram
+posting list over canonical skill names with length and q-gram count
+filters, so each text token is verified against a few candidates instead of
+every skill.
+
+Public API:
+- SkillAutomaton(skill_table, suffixes) -> .match(text_lower, words=None)
+- TypoIndex(names, threshold, q=2)      -> .lookup(token), .candidates(token)
+- get_skill_matchers()                  -> (hard_matcher, soft_matcher)
+- get_typo_indexes()                    -> (hard_typo_index, soft_typo_index)
+- HARD_SUFFIXES / SOFT_SUFFIXES, FUZZY_* thresholds
+================================================================================
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import knowledge_base
+from kb_version import knowledge_base_version
+
+
+# Morphological suffixes accepted after a variation (same as the legacy regex).
+HARD_SUFFIXES: Tuple[str, ...] = ("s", "es", "ing", "ed", "tion", "ment")
+SOFT_SUFFIXES: Tuple[str, ...] = ("s", "es", "ing", "ed")
+
+# Longest phrase (in whitespace tokens) produced by the n-gram step.
+MAX_PHRASE_WORDS = 3
+
+
+def _is_word(ch: str) -> bool:
+    """Same definition of a word character as `\\w` in a str regex."""
+    return ch.isalnum() or ch == "_"
+
+
+class SkillAutomaton:
+    """
+    Multi-pattern matcher over the variations of a skill table.
+
+    `skill_table` maps a canonical skill name to its list of variations
+    (the HARD_SKILLS / SOFT_SKILLS format).
+    """
+
+    def __init__(self, skill_table: Dict[str, Iterable[str]], suffixes: Tuple[str, ...] = HARD_SUFFIXES):
+        # Suffixes are tried like the regex alternation, then "no suffix".
+        self.suffixes: Tuple[str, ...] = tuple(suffixes) + ("",)
+
+        pattern_ids: Dict[str, int] = {}
+        self._patterns: List[str] = []
+        self._pattern_skills: List[Set[str]] = []
+        self._phrases: Dict[str, Set[str]] = {}
+        self._empty_skills: Set[str] = set()
+
+        for skill, variations in skill_table.items():
+            for var in variations:
+                var_norm = var.lower()
+                if not var_norm:
+                    # r'\b(?:s|...)?\b' matches wherever the text has a word char
+                    self._empty_skills.add(skill)
+                    continue
+                # Phrase index: only strings that can equal a joined n-gram
+                tokens = var_norm.split()
+                if 0 < len(tokens) <= MAX_PHRASE_WORDS and " ".join(tokens) == var_norm:
+                    self._phrases.setdefault(var_norm, set()).add(skill)
+                pid = pattern_ids.get(var_norm)
+                if pid is None:
+                    pid = len(self._patterns)
+                    pattern_ids[var_norm] = pid
+                    self._patterns.append(var_norm)
+                    self._pattern_skills.append(set())
+                self._pattern_skills[pid].add(skill)
+
+        self._pattern_len = [len(p) for p in self._patterns]
+        self._first_is_word = [_is_word(p[0]) for p in self._patterns]
+        self._last_is_word = [_is_word(p[-1]) for p in self._patterns]
+        self._suffix_is_word = {s: _is_word(s[-1]) for s in self.suffixes if s}
+        self._build_automaton()
+
+    # -------------------------------------------------------------------------
+    # CONSTRUCTION
+    # -------------------------------------------------------------------------
+    def _build_automaton(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+
+        for pid, pattern in enumerate(self._patterns):
+            state = 0
+            for ch in pattern:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(pid)
+
+        # Breadth-first construction of failure links; outputs of the
+        # failure state are merged so that every state reports all patterns
+        # ending at the current position.
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                candidate = goto[f].get(ch, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    @property
+    def n_patterns(self) -> int:
+        return len(self._patterns)
+
+    @property
+    def n_states(self) -> int:
+        return len(self._goto)
+
+    # -------------------------------------------------------------------------
+    # MATCHING
+    # -------------------------------------------------------------------------
+    def _verify(self, text: str, n: int, pid: int, end: int) -> bool:
+        """Check word boundaries (and optional suffix) around an occurrence."""
+        start = end - self._pattern_len[pid]
+        left_is_word = _is_word(text[start - 1]) if start > 0 else False
+        if left_is_word == self._first_is_word[pid]:
+            return False
+        for suffix in self.suffixes:
+            if suffix:
+                if not text.startswith(suffix, end):
+                    continue
+                last_is_word = self._suffix_is_word[suffix]
+                pos = end + len(suffix)
+            else:
+                last_is_word = self._last_is_word[pid]
+                pos = end
+            right_is_word = _is_word(text[pos]) if pos < n else False
+            if right_is_word != last_is_word:
+                return True
+        return False
+
+    def match_phrases(self, words: List[str]) -> Set[str]:
+        """Skills whose variation equals a whitespace-token n-gram of the text."""
+        found: Set[str] = set()
+        phrases = self._phrases
+        n_words = len(words)
+        for i in range(n_words):
+            for size in range(1, MAX_PHRASE_WORDS + 1):
+                if i + size > n_words:
+                    break
+                phrase = words[i] if size == 1 else " ".join(words[i:i + size])
+                skills = phrases.get(phrase)
+                if skills:
+                    found.update(skills)
+        return found
+
+    def match(self, text_lower: str, words: Optional[List[str]] = None) -> Set[str]:
+        """
+        Return every skill with a variation present in `text_lower`.
+
+        `words` is `text_lower.split()`; pass it when the caller already has
+        it to avoid splitting twice.
+        """
+        if words is None:
+            words = text_lower.split()
+        found = self.match_phrases(words)
+
+        if self._empty_skills and any(_is_word(ch) for ch in text_lower):
+            found.update(self._empty_skills)
+
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        pattern_skills = self._pattern_skills
+        n = len(text_lower)
+        state = 0
+        for i, ch in enumerate(text_lower):
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            outputs = out[state]
+            if not outputs:
+                continue
+            for pid in outputs:
+                skills = pattern_skills[pid]
+                if skills <= found:
+                    continue
+                if self._verify(text_lower, n, pid, i + 1):
+                    found.update(skills)
+        return found
+
+
+# =============================================================================
+# TYPO-TOLERANT LOOKUP (fuzzy fallback)
+# =============================================================================
+# The legacy fuzzy step compared every unmatched skill name against every
+# word and bigram of the text with fuzz.ratio (O(skills x tokens)). The index
+# below only verifies the handful of names that can possibly pass the
+# threshold, using two filters derived from the ratio definition:
+#
+#   ratio = 100 * (1 - d / L)   d = Indel distance, L = len(a) + len(b)
+#
+# - LENGTH FILTER: |len(a) - len(b)| <= d_max
+# - BIGRAM COUNT FILTER: every deletion breaks at most one adjacent pair of
+#   the common subsequence, so the strings share at least
+#   (L - d_max) / 2 - 1 - d_max character bigrams.
+#   For q-grams in general: (L - d_max) / 2 - (q - 1) * (1 + d_max).
+#
+# Candidates passing both filters are verified with fuzz.ratio itself, so the
+# ">90" / ">88" semantics (including thefuzz's integer rounding) are exact.
+
+# Fuzzy thresholds and guards used by extract_skills_from_text
+FUZZY_HARD_THRESHOLD = 90
+FUZZY_SOFT_THRESHOLD = 88
+FUZZY_MIN_SKILL_LEN = 5
+FUZZY_MIN_WORD_LEN = 5
+# Common words that are also skill names: fuzzy matching them is mostly noise
+FUZZY_EXCLUDED_SKILLS = frozenset({"excel", "lead", "plan", "drive", "base"})
+
+try:
+    from thefuzz import fuzz
+except ImportError:
+    fuzz = None
+
+
+def _char_qgrams(text: str, q: int = 2) -> Dict[str, int]:
+    """{character q-gram: count} (bigrams by default)."""
+    grams: Dict[str, int] = {}
+    for i in range(len(text) - q + 1):
+        g = text[i:i + q]
+        grams[g] = grams.get(g, 0) + 1
+    return grams
+
+
+class TypoIndex:
+    """
+    Bigram posting-list index over canonical skill names for fuzzy lookup.
+
+    `lookup(token)` returns the canonical names whose lowercase form has
+    `fuzz.ratio(token, name) > threshold`. q sets the q-gram size of the
+    postings (longer names, e.g. job titles, filter better with trigrams).
+    """
+
+    def __init__(self, skill_names: Iterable[str], threshold: int, q: int = 2):
+        self.threshold = threshold
+        self.q = q
+        # Max Indel distance as a fraction of L that can still round above
+        # the threshold (e.g. ratio > 90 needs 100 * (1 - d/L) >= 90.5).
+        self._max_dist_ratio = (100 - threshold - 0.5) / 100
+
+        names: Dict[str, Set[str]] = {}
+        for skill in skill_names:
+            names.setdefault(skill.lower(), set()).add(skill)
+        self._names: List[str] = list(names)
+        self._skills: List[Set[str]] = [names[n] for n in self._names]
+        self._lengths: List[int] = [len(n) for n in self._names]
+        self._distinct_lengths: List[int] = sorted(set(self._lengths))
+
+        # Postings are bucketed by name length so a probe only touches the
+        # names that survive the length filter.
+        self._postings: Dict[str, Dict[int, List[Tuple[int, int]]]] = {}
+        for eid, name in enumerate(self._names):
+            for gram, count in _char_qgrams(name, q).items():
+                by_len = self._postings.setdefault(gram, {})
+                by_len.setdefault(len(name), []).append((eid, count))
+        self._plans: Dict[int, Tuple[Dict[int, float], bool]] = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _max_distance(self, total_len: int) -> int:
+        return int(total_len * self._max_dist_ratio + 1e-9)
+
+    def _min_shared(self, total_len: int) -> float:
+        """Lower bound on shared q-grams for any pair within d_max."""
+        d_max = self._max_distance(total_len)
+        return (total_len - d_max) / 2 - (self.q - 1) * (1 + d_max)
+
+    def _plan(self, token_len: int) -> Tuple[Dict[int, float], bool]:
+        """
+        Per token length: {name_length: min_shared_bigrams} for the lengths
+        passing the length filter, and whether the bigram filter is usable.
+        """
+        plan = self._plans.get(token_len)
+        if plan is None:
+            feasible = {}
+            for n in self._distinct_lengths:
+                total_len = token_len + n
+                if abs(token_len - n) <= self._max_distance(total_len):
+                    feasible[n] = self._min_shared(total_len)
+            # Very short strings (or very loose thresholds) can pass with
+            # zero shared bigrams: then every feasible name is a candidate.
+            exhaustive = any(bound <= 0 for bound in feasible.values())
+            plan = (feasible, exhaustive)
+            self._plans[token_len] = plan
+        return plan
+
+    def candidates(self, token: str) -> List[int]:
+        """Entry ids that pass the length and bigram count filters."""
+        feasible, exhaustive = self._plan(len(token))
+        if not feasible:
+            return []
+        if exhaustive:
+            lengths = self._lengths
+            return [eid for eid in range(len(self._names)) if lengths[eid] in feasible]
+
+        shared: Dict[int, int] = {}
+        postings = self._postings
+        for gram, count in _char_qgrams(token, self.q).items():
+            by_len = postings.get(gram)
+            if not by_len:
+                continue
+            for n in feasible:
+                for eid, entry_count in by_len.get(n, ()):
+                    shared[eid] = shared.get(eid, 0) + (count if count < entry_count else entry_count)
+
+        lengths = self._lengths
+        return [eid for eid, common in shared.items() if common >= feasible[lengths[eid]]]
+
+    def lookup(self, token: str) -> Set[str]:
+        """Canonical skills whose name is a near-exact (typo) match of token."""
+        found: Set[str] = set()
+        if fuzz is None:
+            return found
+        for eid in self.candidates(token):
+            if fuzz.ratio(token, self._names[eid]) > self.threshold:
+                found.update(self._skills[eid])
+        return found
+
+
+def build_typo_index(skill_table: Dict[str, Iterable[str]], threshold: int,
+                     excluded: Iterable[str] = ()) -> TypoIndex:
+    """Typo index over the fuzzy-eligible canonical names of a skill table."""
+    excluded = set(excluded)
+    names = [
+        skill for skill in skill_table
+        if len(skill) >= FUZZY_MIN_SKILL_LEN and skill.lower() not in excluded
+    ]
+    return TypoIndex(names, threshold)
+
+
+# =============================================================================
+# CACHED MATCHERS (one pair per knowledge-base version)
+# =============================================================================
+_MATCHERS: Dict[str, Tuple[SkillAutomaton, SkillAutomaton]] = {}
+
+
+def get_skill_matchers() -> Tuple[SkillAutomaton, SkillAutomaton]:
+    """Compiled (hard, soft) matchers for the current HARD_SKILLS/SOFT_SKILLS."""
+    version = knowledge_base_version("HARD_SKILLS", "SOFT_SKILLS")
+    matchers = _MATCHERS.get(version)
+    if matchers is None:
+        matchers = (
+            SkillAutomaton(getattr(knowledge_base, "HARD_SKILLS", {}), HARD_SUFFIXES),
+            SkillAutomaton(getattr(knowledge_base, "SOFT_SKILLS", {}), SOFT_SUFFIXES),
+        )
+        _MATCHERS.clear()  # only the current version is worth keeping
+        _MATCHERS[version] = matchers
+    return matchers
+
+
+_TYPO_INDEXES: Dict[str, Tuple[TypoIndex, TypoIndex]] = {}
+
+
+def get_typo_indexes() -> Tuple[TypoIndex, TypoIndex]:
+    """Typo indexes (hard > 90, soft > 88) for the current knowledge base."""
+    version = knowledge_base_version("HARD_SKILLS", "SOFT_SKILLS")
+    indexes = _TYPO_INDEXES.get(version)
+    if indexes is None:
+        indexes = (
+            build_typo_index(getattr(knowledge_base, "HARD_SKILLS", {}),
+                             FUZZY_HARD_THRESHOLD, FUZZY_EXCLUDED_SKILLS),
+            build_typo_index(getattr(knowledge_base, "SOFT_SKILLS", {}),
+                             FUZZY_SOFT_THRESHOLD),
+        )
+        _TYPO_INDEXES.clear()
+        _TYPO_INDEXES[version] = indexes
+    return indexes
@@ -9,6 +9,7 @@ import sys
 import os
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+import knowledge_base
 import ml_utils
 
 def print_header(title):
@@ -71,6 +72,14 @@ def test_language_detection():
     if print_test(f"English detected: {lang}", passed):
         tests_passed += 1
     
+    # Greetings addressed to the assistant
+    for message, expected in (("hello Ruben", 'en'), ("hi Ruben", 'en'), ("ciao Ruben", 'it')):
+        total_tests += 1
+        lang = ml_utils._detect_chat_language(message)
+        passed = lang == expected
+        if print_test(f"Greeting {message!r} detected: {lang}", passed):
+            tests_passed += 1
+
     # Test ambiguous falls to English
     total_tests += 1
     lang = ml_utils._detect_chat_language("xyz123")
@@ -82,6 +91,51 @@ def test_language_detection():
     assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
 
 
+def test_language_model():
+    print_header("LANGUAGE MODEL TESTS (lang_id)")
+
+    import lang_id
+
+    tests_passed = 0
+    total_tests = 0
+
+    total_tests += 1
+    model = lang_id.get_model()
+    passed = model.log_probs.shape == (len(lang_id.LANGUAGES), lang_id.N_BUCKETS) and model.log_probs.dtype.name == "float32"
+    if print_test(f"Log-probabilities precomputed: {model.log_probs.shape}", passed):
+        tests_passed += 1
+
+    # Both call sites read the same guess
+    total_tests += 1
+    cv = ("Sono un ingegnere del software con cinque anni di esperienza nello sviluppo di servizi "
+          "backend. Ho guidato la migrazione della piattaforma e seguito due sviluppatori junior.")
+    guess = lang_id.identify(cv)
+    passed = (guess.code == "it" and ml_utils.detect_language(cv) == "Italian"
+              and ml_utils._detect_chat_language(cv) == "it" and 0.0 <= guess.confidence <= 1.0)
+    if print_test(f"CV and chat paths agree: {guess.name} ({guess.confidence:.3f})", passed):
+        tests_passed += 1
+
+    # A skill list or a one-word message is no evidence of a native language
+    total_tests += 1
+    lang = ml_utils.detect_language("Python, SQL, Tableau, Power BI, Docker, Kubernetes, AWS, Git")
+    long_list = " ".join(list(knowledge_base.HARD_SKILLS)[:60])  # 200+ n-grams, all English words
+    passed = lang is None and ml_utils.detect_language("") is None and ml_utils.detect_language(long_list) is None
+    if print_test(f"Skill list has no native language: {lang}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    lang_id.IDENTIFY_CACHE.clear()
+    first = lang_id.identify("Bonjour, comment puis-je analyser mon CV?")
+    second = lang_id.identify("Bonjour, comment puis-je analyser mon CV?")
+    stats = lang_id.IDENTIFY_CACHE.stats()
+    passed = first == second and stats["hits"] == 1 and stats["misses"] == 1
+    if print_test(f"Guesses cached per text hash: {stats}", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+
 def test_multilingual_responses():
     print_header("MULTILINGUAL RESPONSE TESTS")
     
@@ -169,6 +223,7 @@ def show_demo_conversations():
 
 if __name__ == "__main__":
     success1 = test_language_detection()
+    test_language_model()
     success2 = test_multilingual_responses()
     
     show_demo_conversations()
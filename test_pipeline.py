@@ -0,0 +1,766 @@
+"""
+================================================================================
+Test: Analysis Pipeline
+================================================================================
+Verifica il livello di cache dei documenti (ParsedDocument) condiviso tra
+analyze_gap, analyze_gap_with_project e analyze_cover_letter, l'analisi
+batch di un CV contro molte job description, l'indice dei candidati, lo
+screening batch di CV in PDF, la cache del testo estratto dai PDF e la
+memoizzazione dei risultati di analisi tra i rerun di Streamlit.
+"""
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ml_utils
+import doc_cache
+import sample_data
+
+def print_header(title):
+    print("\n" + "=" * 70)
+    print(f" {title}")
+    print("=" * 70)
+
+def print_test(name, passed, details=""):
+    status = "[PASS]" if passed else "[FAIL]"
+    print(f"  {status}: {name}")
+    if details and not passed:
+        print(f"         Details: {details}")
+    return passed
+
+def _comparable(res):
+    """analyze_gap output with lists turned into sets (order is not part of the contract)."""
+    return {k: set(v) if isinstance(v, (list, set)) else v for k, v in res.items()}
+
+# =============================================================================
+# TEST 1: Parsed document cache
+# =============================================================================
+def test_document_cache():
+    print_header("TEST 1: Parsed Document Cache")
+
+    tests_passed = 0
+    total_tests = 0
+
+    cv, jd = sample_data.SAMPLE_CV, sample_data.SAMPLE_JD
+
+    # Same results as direct extraction
+    total_tests += 1
+    doc = ml_utils.parse_document(jd, is_jd=True)
+    passed = doc.skills() == ml_utils.extract_skills_from_text(jd, is_jd=True)
+    if print_test("ParsedDocument skills equal extract_skills_from_text", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = doc.seniority == ml_utils.detect_seniority(jd) and doc.language == ml_utils.detect_language(jd)
+    if print_test(f"Seniority / language derived lazily: {doc.seniority[0]}, {doc.language}", passed):
+        tests_passed += 1
+
+    # A computed None is cached too (and survives pickling as "not computed")
+    total_tests += 1
+    import pickle
+    import scoring_core
+    skill_list = doc_cache.ParsedDocument("Python SQL Excel Tableau")
+    fresh = pickle.loads(pickle.dumps(doc_cache.ParsedDocument("Python SQL Excel Tableau")))
+    calls = []
+    original = scoring_core.detect_language
+    scoring_core.detect_language = lambda text: calls.append(text) or original(text)
+    try:
+        languages = [skill_list.language, skill_list.language, fresh.language]
+    finally:
+        scoring_core.detect_language = original
+    passed = languages == [None, None, None] and len(calls) == 2
+    if print_test("Language None is computed once per document", passed, f"{languages} {len(calls)} calls"):
+        tests_passed += 1
+
+    # Callers get independent copies
+    total_tests += 1
+    hard, _ = doc.skills()
+    hard.add("Mutated Skill")
+    passed = "Mutated Skill" not in doc.skills()[0]
+    if print_test("skills() returns mutable copies", passed):
+        tests_passed += 1
+
+    # is_jd is part of the key
+    total_tests += 1
+    passed = ml_utils.parse_document(jd) is not doc and ml_utils.parse_document(jd, is_jd=True) is doc
+    if print_test("Cache key includes the is_jd flag", passed):
+        tests_passed += 1
+
+    # One analysis click: gap + project + cover letter extract each text once
+    cache = doc_cache.DOCUMENT_CACHE
+    cache.clear()
+    ml_utils.analyze_gap_with_project(cv, jd, "Built a churn model in Python with scikit-learn")
+    ml_utils.analyze_cover_letter(sample_data.SAMPLE_COVER_LETTER, jd, cv)
+    total_tests += 1
+    passed = cache.misses == 4 and cache.hits > 0
+    if print_test(f"Each text extracted once per click: {cache.stats()}", passed):
+        tests_passed += 1
+
+    # Strings and ParsedDocument inputs give identical analyses
+    total_tests += 1
+    from_text = ml_utils.analyze_gap(cv, jd)
+    from_docs = ml_utils.analyze_gap(ml_utils.parse_document(cv), ml_utils.parse_document(jd, is_jd=True))
+    passed = _comparable(from_text) == _comparable(from_docs)
+    if print_test("analyze_gap accepts ParsedDocument inputs", passed):
+        tests_passed += 1
+
+    # Every table extraction reads is part of the key
+    total_tests += 1
+    import knowledge_base
+    import scoring_core
+    import skill_graph
+    read = (scoring_core.SIGNAL_TABLES + scoring_core.JD_CLEANER_TABLES + scoring_core.ROLE_TITLE_TABLES
+            + skill_graph.GRAPH_TABLES + ("HARD_SKILLS", "SOFT_SKILLS", "INFERENCE_RULES", "DOMAIN_EXTRACTION_RULES"))
+    missing = set(read) - set(doc_cache.EXTRACTION_TABLES)
+    if print_test("Cache key covers the cleaner, signal and role-title tables", not missing, f"{missing}"):
+        tests_passed += 1
+
+    total_tests += 1
+    original = knowledge_base.NON_SKILL_PATTERNS
+    before = ml_utils.parse_document(jd, is_jd=True)
+    try:
+        knowledge_base.NON_SKILL_PATTERNS = {**original, "section_headers": []}
+        after = ml_utils.parse_document(jd, is_jd=True)
+    finally:
+        knowledge_base.NON_SKILL_PATTERNS = original
+    passed = after is not before and ml_utils.parse_document(jd, is_jd=True) is before
+    if print_test("Editing NON_SKILL_PATTERNS re-parses cached JDs", passed):
+        tests_passed += 1
+
+    # Bounded LRU
+    total_tests += 1
+    small = doc_cache.DocumentCache(maxsize=2)
+    for text in ["python", "sql", "tableau", "python"]:
+        small.get(text)
+    passed = len(small) == 2 and small.misses == 4 and small.hits == 0
+    if print_test("LRU evicts least recently used entries", passed, f"{small.stats()}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 2: Batch analysis (one CV vs many JDs)
+# =============================================================================
+def test_analyze_gap_many():
+    print_header("TEST 2: Batch Gap Analysis")
+
+    tests_passed = 0
+    total_tests = 0
+
+    cv = sample_data.SAMPLE_CV
+    jds = [
+        sample_data.SAMPLE_JD,
+        "Data Scientist",
+        "Looking for a Frontend Developer with React, TypeScript and CSS.",
+        "Marketing Manager: SEO, Google Analytics, branding and team leadership.",
+        sample_data.SAMPLE_JD,  # duplicate
+        "",
+    ]
+    expected = [_comparable(ml_utils.analyze_gap(cv, jd)) for jd in jds]
+
+    for workers in (None, 2):
+        doc_cache.DOCUMENT_CACHE.clear()
+        calls = []
+        results = ml_utils.analyze_gap_many(cv, jds, workers=workers, progress=lambda done, total: calls.append((done, total)))
+        total_tests += 1
+        passed = [_comparable(r) for r in results] == expected
+        if print_test(f"Ordered results equal the analyze_gap loop (workers={workers})", passed):
+            tests_passed += 1
+
+        total_tests += 1
+        passed = calls[-1] == (len(jds), len(jds)) and len(calls) == len(jds)
+        if print_test("Progress callback reports every JD", passed, f"{calls}"):
+            tests_passed += 1
+
+    total_tests += 1
+    doc_cache.DOCUMENT_CACHE.clear()
+    streamed = dict(ml_utils.analyze_gap_many(cv, jds, workers=2, stream=True))
+    passed = sorted(streamed) == list(range(len(jds))) and all(_comparable(streamed[i]) == expected[i] for i in streamed)
+    if print_test("Streaming yields (index, result) for every JD", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 3: Candidate index (many CVs vs one JD)
+# =============================================================================
+def test_candidate_index():
+    print_header("TEST 3: Recruiter Candidate Index")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import random
+    import knowledge_base
+    from candidate_index import CandidateIndex
+
+    rng = random.Random(11)
+    names = list(knowledge_base.HARD_SKILLS) + list(knowledge_base.SOFT_SKILLS)
+    filler = sample_data.SAMPLE_CV.split()
+    cvs = {f"cand-{i}": " ".join(rng.sample(names, rng.randint(2, 15)) + rng.sample(filler, 40)) for i in range(25)}
+    cvs["sample"] = sample_data.SAMPLE_CV
+
+    index = CandidateIndex()
+    for cid, cv in cvs.items():
+        index.add(cid, cv)
+
+    for cid in ["cand-3", "cand-7"]:
+        index.remove(cid)
+        del cvs[cid]
+    index.add("late", "Python SQL Tableau dashboards and machine learning")
+    cvs["late"] = "Python SQL Tableau dashboards and machine learning"
+
+    total_tests += 1
+    passed = len(index) == len(cvs) and "cand-3" not in index and not index.remove("cand-3")
+    if print_test(f"Incremental add/remove ({len(index)} candidates)", passed):
+        tests_passed += 1
+
+    for jd in [sample_data.SAMPLE_JD, "Data Scientist", "Frontend Developer with React, TypeScript and CSS"]:
+        scores = index.scores(jd)
+        expected = {cid: ml_utils.analyze_gap(cv, jd)["match_percentage"] for cid, cv in cvs.items()}
+        mismatches = [cid for cid in cvs if scores[cid] != expected[cid]]
+        total_tests += 1
+        if print_test(f"match_percentage equals analyze_gap: {jd[:30]!r}", not mismatches, f"{mismatches}"):
+            tests_passed += 1
+
+    total_tests += 1
+    top = index.query(sample_data.SAMPLE_JD, top_k=5)
+    values = [r["match_percentage"] for r in top]
+    best = ml_utils.analyze_gap(cvs[top[0]["candidate_id"]], sample_data.SAMPLE_JD)
+    passed = (len(top) == 5 and values == sorted(values, reverse=True)
+              and set(top[0]["matching_hard"]) == set(best["matching_hard"])
+              and set(top[0]["missing_hard"]) == set(best["missing_hard"]))
+    if print_test(f"Top-k sorted with analyze_gap skill breakdown: {values}", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 4: Persisted model artifacts
+# =============================================================================
+def test_model_store():
+    print_header("TEST 4: Model Artifact Store")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import tempfile
+    import numpy as np
+    import model_store
+
+    with tempfile.TemporaryDirectory() as directory:
+        key = model_store.artifact_key(("HARD_SKILLS", "SOFT_SKILLS"), {"n_estimators": 150})
+        obj = {"weights": np.arange(10000, dtype=float), "labels": ["Python", "SQL"]}
+
+        total_tests += 1
+        passed = model_store.load_artifact("toy", key, directory) is None
+        if print_test("Missing artifact loads as None", passed):
+            tests_passed += 1
+
+        model_store.save_artifact("toy", key, obj, directory)
+        loaded = model_store.load_artifact("toy", key, directory)
+        total_tests += 1
+        passed = loaded["labels"] == obj["labels"] and isinstance(loaded["weights"], np.memmap)
+        if print_test("Round trip with memory-mapped arrays", passed, f"{type(loaded['weights'])}"):
+            tests_passed += 1
+
+        total_tests += 1
+        other = model_store.artifact_key(("HARD_SKILLS", "SOFT_SKILLS"), {"n_estimators": 200})
+        passed = other != key and model_store.load_artifact("toy", other, directory) is None
+        if print_test("Hyperparameters are part of the key", passed):
+            tests_passed += 1
+
+        total_tests += 1
+        built = []
+        model_store.load_or_build("toy", other, lambda: built.append(1) or {"v": 2}, directory)
+        model_store.load_or_build("toy", other, lambda: built.append(1) or {"v": 2}, directory)
+        passed = len(built) == 1 and len(model_store.list_artifacts(directory)) == 1
+        if print_test("Built once, older versions pruned", passed, f"{model_store.list_artifacts(directory)}"):
+            tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 5: Batch PDF screening (JSONL + checkpoint)
+# =============================================================================
+def test_batch_screen():
+    print_header("TEST 5: Batch PDF Screening")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import json
+    import tempfile
+    import batch_screen
+    from fpdf import FPDF
+
+    cv_texts = {
+        "a.pdf": "Data Analyst with Python, SQL, Tableau and Excel. Team leadership and communication.",
+        "b.pdf": "Marketing specialist: SEO, Google Analytics, branding and copywriting.",
+        "nested/c.pdf": "Software engineer with Java, Docker, Kubernetes and AWS. 6 years of experience.",
+    }
+    with tempfile.TemporaryDirectory() as root:
+        cv_dir = os.path.join(root, "cvs")
+        os.makedirs(os.path.join(cv_dir, "nested"))
+        for rel, text in cv_texts.items():
+            pdf = FPDF()
+            pdf.add_page()
+            pdf.set_font("Helvetica", size=10)
+            pdf.multi_cell(0, 5, text)
+            pdf.output(os.path.join(cv_dir, rel))
+        with open(os.path.join(cv_dir, "broken.pdf"), "w") as f:
+            f.write("not a pdf")
+        jd_paths = []
+        for name, text in [("analyst", sample_data.SAMPLE_JD), ("scientist", "Data Scientist")]:
+            jd_paths.append(os.path.join(root, name + ".txt"))
+            with open(jd_paths[-1], "w", encoding="utf-8") as f:
+                f.write(text)
+        out = os.path.join(root, "results.jsonl")
+
+        # Interrupted run (2 CVs), then resume from the checkpoint
+        first = batch_screen.run_batch(cv_dir, jd_paths, out, workers=1, limit=2)
+        second = batch_screen.run_batch(cv_dir, jd_paths, out, workers=2)
+        with open(out, encoding="utf-8") as f:
+            records = [json.loads(line) for line in f]
+
+        total_tests += 1
+        pairs = [(r["cv"], r.get("jd")) for r in records]
+        passed = (first["cvs"] == 2 and second["cvs"] == 2 and second["skipped"] == 2
+                  and len(pairs) == len(set(pairs)) == 1 + 3 * 2)
+        if print_test(f"Resume processes each CV once: {first['cvs']} + {second['cvs']} CVs, {len(records)} lines", passed, f"{pairs}"):
+            tests_passed += 1
+
+        total_tests += 1
+        errors = [r for r in records if "error" in r]
+        passed = [r["cv"] for r in errors] == ["broken.pdf"] and first["errors"] + second["errors"] == 1
+        if print_test("Unreadable PDF gives an error line, not a crash", passed, f"{errors}"):
+            tests_passed += 1
+
+        total_tests += 1
+        by_pair = {(r["cv"], r["jd"]): r["result"]["match_percentage"] for r in records if "result" in r}
+        mismatches = []
+        for rel in cv_texts:
+            text = ml_utils.extract_text_from_pdf(os.path.join(cv_dir, rel))
+            for path in jd_paths:
+                name = os.path.splitext(os.path.basename(path))[0]
+                with open(path, encoding="utf-8") as f:
+                    expected = ml_utils.analyze_gap(text, f.read())["match_percentage"]
+                if by_pair[(rel, name)] != expected:
+                    mismatches.append((rel, name))
+        if print_test("match_percentage equals analyze_gap on the extracted text", not mismatches, f"{mismatches}"):
+            tests_passed += 1
+
+        total_tests += 1
+        passed = second["docs_per_s"] > 0 and 0 < second["p50_ms"] <= second["p95_ms"]
+        if print_test(f"Throughput {second['docs_per_s']} docs/s, p50 {second['p50_ms']} ms, p95 {second['p95_ms']} ms", passed):
+            tests_passed += 1
+
+        # An analysis failure is reported per CV, like an extraction failure
+        import scoring_core
+        jds = batch_screen.load_jds(jd_paths)
+        analyze_gap = scoring_core.analyze_gap
+
+        def _failing_analyze_gap(cv, jd):
+            raise RuntimeError("analysis failed")
+
+        scoring_core.analyze_gap = _failing_analyze_gap
+        try:
+            rel_path, lines, _, failed = batch_screen.screen_cv(cv_dir, "a.pdf", jds)
+        finally:
+            scoring_core.analyze_gap = analyze_gap
+        total_tests += 1
+        passed = failed and [json.loads(line) for line in lines] == [{"cv": "a.pdf", "error": "analysis failed"}]
+        if print_test("Failed analysis gives an error line, not a crash", passed, f"{lines}"):
+            tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 6: PDF text cache and page-parallel extraction
+# =============================================================================
+def test_pdf_text():
+    print_header("TEST 6: PDF Text Extraction")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import io
+    import tempfile
+    import pdf_text
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    for page in range(16):
+        pdf.add_page()
+        pdf.set_font("Helvetica", size=10)
+        pdf.multi_cell(0, 5, f"Page {page}: Python, SQL and Tableau dashboards. " * 20)
+    out = pdf.output(dest="S")
+    data = out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+    cache = pdf_text.PDF_TEXT_CACHE
+    cache.clear()
+    serial = pdf_text.extract_pdf(data, max_pages=100, workers=1)
+
+    total_tests += 1
+    passed = serial.pages == serial.total_pages == 16 and len(serial.page_seconds) == 16 and "Page 15" in serial.text
+    if print_test(f"Per-page timings recorded: {serial}", passed):
+        tests_passed += 1
+
+    # Same bytes as a path and as a file-like object -> cache hits
+    with tempfile.TemporaryDirectory() as root:
+        path = os.path.join(root, "cv.pdf")
+        with open(path, "wb") as f:
+            f.write(data)
+        stream = io.BytesIO(data)
+        total_tests += 1
+        passed = (pdf_text.extract_pdf(path, max_pages=100) is serial
+                  and pdf_text.extract_pdf(stream, max_pages=100) is serial
+                  and cache.hits == 2 and cache.misses == 1)
+        if print_test(f"Keyed by SHA-256 of the bytes: {cache.stats()}", passed):
+            tests_passed += 1
+
+    total_tests += 1
+    capped = pdf_text.extract_pdf(data, max_pages=3)
+    passed = capped.truncated and capped.pages == 3 and "Page 3" not in capped.text
+    if print_test(f"Page cap truncates: {capped}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    try:
+        pdf_text.extract_pdf(data, max_bytes=len(data) - 1)
+        passed = False
+    except pdf_text.PdfTooLargeError:
+        passed = True
+    if print_test("Size cap rejects large uploads", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    cache.clear()
+    parallel = pdf_text.extract_pdf(data, max_pages=100, workers=2)
+    passed = parallel.text == serial.text and parallel.pages == 16
+    if print_test("Page-parallel extraction equals serial text", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = ml_utils.extract_text_from_pdf(io.BytesIO(data)) == pdf_text.extract_pdf(data).text
+    if print_test("extract_text_from_pdf goes through the cache", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    default_cap, pdf_text.MAX_PAGES = pdf_text.MAX_PAGES, 3
+    try:
+        doc = ml_utils.extract_pdf_document(io.BytesIO(data))
+    finally:
+        pdf_text.MAX_PAGES = default_cap
+    passed = doc.truncated and (doc.pages, doc.total_pages) == (3, 16)
+    if print_test("Truncation reaches the caller", passed, repr(doc)):
+        tests_passed += 1
+
+    # A broken pool is shut down and dropped; the pages are read in-process
+    from concurrent.futures.process import BrokenProcessPool
+
+    class _BrokenPool:
+        _max_workers = 2
+        shut_down = False
+
+        def submit(self, *args, **kwargs):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True, cancel_futures=False):
+            self.shut_down = True
+
+    total_tests += 1
+    broken = _BrokenPool()
+    if pdf_text._POOL is not None:
+        pdf_text._POOL.shutdown()
+    pdf_text._POOL = broken
+    pages, total_pages = pdf_text._extract(data, 100, workers=2)
+    passed = (broken.shut_down and pdf_text._POOL is None
+              and " ".join(text for text, _ in pages) == serial.text and total_pages == 16)
+    if print_test("Broken pool is shut down and extraction finishes in-process", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 7: Analysis result memoization
+# =============================================================================
+def test_result_cache():
+    print_header("TEST 7: Analysis Result Memoization")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import knowledge_base
+    import kb_version
+    import result_cache
+
+    now = [0.0]
+    cache = result_cache.ResultCache(maxsize=2, ttl=10, clock=lambda: now[0])
+    calls = []
+
+    def analyse(text, n=1):
+        calls.append(text)
+        return {"text": text, "items": [n]}
+
+    first = result_cache.memoized_call(analyse, "cv a", cache=cache)
+    first["items"].append(99)  # callers may mutate their copy
+    second = result_cache.memoized_call(analyse, "cv a", cache=cache)
+    total_tests += 1
+    passed = len(calls) == 1 and second == {"text": "cv a", "items": [1]} and cache.hits == 1
+    if print_test("Same inputs hit the cache and return a copy", passed, f"{calls} {second}"):
+        tests_passed += 1
+
+    total_tests += 1
+    result_cache.memoized_call(analyse, "cv a", n=2, cache=cache)
+    passed = len(calls) == 2
+    if print_test("Different arguments miss", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    now[0] = 11
+    result_cache.memoized_call(analyse, "cv a", cache=cache)
+    passed = len(calls) == 3 and cache.expired == 1
+    if print_test(f"Entries expire after the TTL: {cache.stats()}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    result_cache.memoized_call(analyse, "cv b", cache=cache)
+    result_cache.memoized_call(analyse, "cv c", cache=cache)
+    result_cache.memoized_call(analyse, "cv a", cache=cache)  # evicted (LRU)
+    passed = len(cache) == 2 and calls[-1] == "cv a" and len(calls) == 6
+    if print_test("Max entries evicts the least recently used", passed, f"{calls}"):
+        tests_passed += 1
+
+    # Concurrent gets/puts racing evictions and expiries
+    import threading
+    import time
+
+    def yielding_clock():
+        time.sleep(0)  # give up the GIL between the lookup and the delete
+        return time.monotonic()
+
+    shared = result_cache.ResultCache(maxsize=4, ttl=0.0005, clock=yielding_clock)
+    errors = []
+
+    def hammer(seed):
+        try:
+            for i in range(1000):
+                key = ("k", (seed + i) % 7)
+                shared.get(key)
+                shared.put(key, i)
+        except Exception as exc:  # KeyError without the lock
+            errors.append(exc)
+
+    threads = [threading.Thread(target=hammer, args=(s,)) for s in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    total_tests += 1
+    passed = not errors and len(shared) <= 4
+    if print_test(f"Thread-safe under concurrent eviction and expiry: {shared.stats()}", passed, f"{errors[:3]}"):
+        tests_passed += 1
+
+    # The knowledge-base version is part of the key
+    key = result_cache.call_key("f", ["cv"], {}, ("HARD_SKILLS",))
+    original = knowledge_base.HARD_SKILLS
+    try:
+        knowledge_base.HARD_SKILLS = dict(original, **{"zz_test_skill": ["zz_test_skill"]})
+        edited = result_cache.call_key("f", ["cv"], {}, ("HARD_SKILLS",))
+    finally:
+        knowledge_base.HARD_SKILLS = original
+        kb_version.clear_version_cache()
+    total_tests += 1
+    passed = key != edited and key == result_cache.call_key("f", ["cv"], {}, ("HARD_SKILLS",))
+    if print_test("Editing a knowledge-base table changes the key", passed):
+        tests_passed += 1
+
+    # Real entry points: the shared store serves every session
+    result_cache.RESULT_CACHE.clear()
+    cv = sample_data.SAMPLE_CV
+    recs = result_cache.memoized_call(ml_utils.discover_careers, cv_text=cv, tables=ml_utils.DISCOVERY_TABLES)
+    again = result_cache.memoized_call(ml_utils.discover_careers, cv_text=cv, tables=ml_utils.DISCOVERY_TABLES)
+    total_tests += 1
+    passed = recs == again == ml_utils.discover_careers(cv_text=cv) and result_cache.RESULT_CACHE.hits == 1
+    if print_test(f"discover_careers memoized ({len(recs)} roles)", passed, f"{result_cache.RESULT_CACHE.stats()}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+def test_skill_clustering():
+    print_header("TEST 8: In-Memory Skill Clustering")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import matplotlib
+    import ml_utils
+
+    skills = ["Python", "PyTorch", "SQL", "MySQL", "PostgreSQL", "Docker", "Kubernetes", "AWS"]
+    rc_before = dict(matplotlib.rcParams)
+    existed = os.path.exists("dendrogram_v2.png")
+    ml_utils.CLUSTERING_CACHE.clear()
+
+    df_viz, dendro_png, clusters = ml_utils.perform_skill_clustering(skills)
+    total_tests += 1
+    passed = isinstance(dendro_png, bytes) and dendro_png.startswith(b"\x89PNG") and len(df_viz) == len(skills)
+    if print_test("Dendrogram returned as PNG bytes", passed, f"{type(dendro_png)}"):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = os.path.exists("dendrogram_v2.png") == existed and dict(matplotlib.rcParams) == rc_before
+    if print_test("No shared file written, rcParams untouched", passed):
+        tests_passed += 1
+
+    df_viz["skill"] = "mutated"  # callers may mutate their copy
+    again = ml_utils.perform_skill_clustering(list(skills))
+    total_tests += 1
+    passed = (ml_utils.CLUSTERING_CACHE.hits == 1 and again[1] == dendro_png
+              and again[2] == clusters and "mutated" not in set(again[0]["skill"]))
+    if print_test(f"Same skill list served from cache: {ml_utils.CLUSTERING_CACHE.stats()}", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+def test_skill_embedding():
+    print_header("TEST 9: Precomputed Skill Map")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import numpy as np
+    import skill_embedding
+
+    embedding = skill_embedding.get_skill_embedding()
+    vocabulary = skill_embedding.skill_vocabulary()
+    total_tests += 1
+    passed = embedding is not None and len(embedding) == len(vocabulary) and embedding is skill_embedding.get_skill_embedding()
+    if print_test(f"Map fitted once on the vocabulary ({len(vocabulary)} skills)", passed):
+        tests_passed += 1
+
+    # Known skills are rows of the map, whatever the list and the case
+    vectors, coords, labels = embedding.embed(["python", "Docker", "SQL"])
+    row = embedding.position("Python")
+    _, coords_b, labels_b = embedding.embed(["Kubernetes", "PYTHON"])
+    total_tests += 1
+    passed = (row is not None and np.array_equal(vectors[0], embedding.vectors[row])
+              and np.array_equal(coords[0], coords_b[1]) and labels[0] == labels_b[1] == embedding.labels[row])
+    if print_test("Known skills keep position and cluster across lists", passed):
+        tests_passed += 1
+
+    # Unknown skills are projected into the same space
+    _, coords_u, labels_u = embedding.embed(["Python", "Zq Framework 9"])
+    total_tests += 1
+    passed = (embedding.position("Zq Framework 9") is None and np.all(np.isfinite(coords_u))
+              and 0 <= labels_u[1] < len(skill_embedding.CLUSTER_NAMES))
+    if print_test(f"Unknown skill projected (cluster {labels_u[1]})", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    try:
+        skill_embedding.SkillEmbedding(["Python", "SQL"])
+        passed = False
+    except ValueError:
+        passed = True
+    if print_test("Too small a vocabulary raises ValueError", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+def test_topic_model():
+    print_header("TEST 10: Pretrained Topic Model")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import topic_model
+
+    total_tests += 1
+    text = topic_model.preserve_compound_terms("GOOGLE ANALYTICS 4, Google Cloud Platform and big data")
+    passed = text == "Google_Analytics_4, Google_Cloud_Platform and Big_Data"
+    if print_test("One regex, longest compound name first", passed, text):
+        tests_passed += 1
+
+    total_tests += 1
+    words = topic_model.company_words("Data Analyst | Fintechly\nJoin us at Acme, part of Globex Corp.")
+    passed = words == {"fintechly", "acme", "globex"}
+    if print_test(f"Company names detected: {sorted(words)}", passed):
+        tests_passed += 1
+
+    model = topic_model.get_topic_model()
+    total_tests += 1
+    passed = model is not None and model is topic_model.get_topic_model() and len(model) == topic_model.TOPIC_MODEL_TOPICS
+    if print_test(f"Model fitted once on {len(topic_model.reference_corpus())} reference documents", passed):
+        tests_passed += 1
+
+    jd_corpus = [line for line in sample_data.SAMPLE_JD.split("\n") if len(line.split()) > 3]
+    wc_file = "topic_wordcloud.png"
+    wc_mtime = os.path.getmtime(wc_file) if os.path.exists(wc_file) else None
+    ml_utils.WORDCLOUD_CACHE.clear()
+    result = ml_utils.perform_topic_modeling(jd_corpus)
+    total_tests += 1
+    passed = (bool(result) and 0 < len(result["topics"]) <= 3 and result["keywords"]
+              and result["wordcloud_png"].startswith(b"\x89PNG"))
+    if print_test(f"Topics from transform only: {result and result['keywords'][:4]}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    topics, _ = model.document_topics(jd_corpus, n_topics=3, n_words=5)
+    flat = [word for topic in topics for word in topic]
+    passed = len(flat) == len(set(flat)) and all(len(topic) <= 5 for topic in topics)
+    if print_test("A word belongs to one topic only", passed, f"{topics}"):
+        tests_passed += 1
+
+    # Ordinary JD words outside the knowledge-base vocabulary still reach the keywords
+    total_tests += 1
+    marketing_jd = [
+        "We are looking for a Marketing Analyst to own campaign performance reporting.",
+        "Build funnel analysis and customer segmentation for our retention programs.",
+        "Run attribution modelling across paid channels and forecasting of demand.",
+        "Track cohort behaviour and build dashboards in Looker Studio and Google Analytics 4.",
+    ]
+    topics, keywords = model.document_topics([topic_model.preserve_compound_terms(line) for line in marketing_jd])
+    expected = {"campaign", "funnel", "segmentation", "attribution", "retention", "cohort", "dashboards", "looker studio"}
+    passed = expected <= set(keywords) and len(topics) == 3
+    if print_test("JD words outside the reference vocabulary are kept", passed, f"{sorted(expected - set(keywords))}"):
+        tests_passed += 1
+
+    again = ml_utils.perform_topic_modeling(jd_corpus)
+    total_tests += 1
+    passed = (again == result and ml_utils.WORDCLOUD_CACHE.hits == 1
+              and (os.path.getmtime(wc_file) if os.path.exists(wc_file) else None) == wc_mtime)
+    if print_test(f"Word cloud cached per text, no file written: {ml_utils.WORDCLOUD_CACHE.stats()}", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# MAIN TEST RUNNER
+# =============================================================================
+def run_all_tests():
+    test_document_cache()
+    test_analyze_gap_many()
+    test_candidate_index()
+    test_model_store()
+    test_batch_screen()
+    test_pdf_text()
+    test_result_cache()
+    test_skill_clustering()
+    test_skill_embedding()
+    test_topic_model()
+    print("\n  >>> ALL PIPELINE TESTS PASSED!")
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -2,7 +2,8 @@
 ================================================================================
 Test: Ruben AI Assistant
 ================================================================================
-Verifica del sistema chatbot Ruben AI.
+Verifica del sistema chatbot Ruben AI e del classificatore di intent
+(singolo messaggio e batch).
 """
 
 import sys
@@ -117,6 +118,55 @@ def test_ruben_ai():
     
     assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
 
+def test_intent_batch():
+    print_header("RUBEN INTENT CLASSIFIER (BATCH)")
+
+    import numpy as np
+    import ruben_intent
+    from sklearn.base import clone
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    tests_passed = 0
+    total_tests = 0
+
+    messages = [p for prototypes in ruben_intent.INTENT_PROTOTYPES.values() for p in prototypes[:3]]
+    messages += ["", "Hello, can you help me?", "grazie mille", "how does it work",
+                 "come posso negoziare lo stipendio", "qwrtp zzkx"]
+
+    # Reference: the original loop (cosine similarity against every
+    # prototype, then a max over each intent's indices)
+    vectorizer = clone(ruben_intent._build_classifier()[0])
+    labels = [i for i, ps in ruben_intent.INTENT_PROTOTYPES.items() for _ in ps]
+    matrix = vectorizer.fit_transform([p.lower() for ps in ruben_intent.INTENT_PROTOTYPES.values() for p in ps])
+
+    def reference(message):
+        shortcut = ruben_intent._shortcut(message)
+        if shortcut is not None:
+            return shortcut
+        sims = cosine_similarity(vectorizer.transform([message.lower()]), matrix).ravel()
+        best_intent, best_score = None, 0.0
+        for intent in ruben_intent.INTENT_PROTOTYPES:
+            score = float(np.max(sims[[k for k, x in enumerate(labels) if x == intent]]))
+            if score > best_score:
+                best_intent, best_score = intent, score
+        return best_intent, best_score
+
+    expected = [reference(m) for m in messages]
+
+    total_tests += 1
+    single = [ruben_intent.classify_intent(m) for m in messages]
+    mismatches = [m for m, a, b in zip(messages, single, expected) if a != b]
+    if print_test(f"classify_intent bit-identical to per-intent max ({len(messages)} messages)", not mismatches, f"{mismatches[:3]}"):
+        tests_passed += 1
+
+    total_tests += 1
+    batch = ruben_intent.classify_intents(messages)
+    if print_test("classify_intents equals classify_intent", batch == single):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
 if __name__ == "__main__":
     success = test_ruben_ai()
     
@@ -0,0 +1,223 @@
+"""
+================================================================================
+Test: Headless Scoring Service
+================================================================================
+Verifica il server HTTP/JSON (scoring_service.py): risultati identici alle
+chiamate dirette, errori di validazione, timeout, back-pressure e /metrics.
+"""
+
+import sys
+import os
+import json
+import asyncio
+import threading
+import time
+import urllib.request
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ml_utils
+import sample_data
+import scoring_service
+
+def print_header(title):
+    print("\n" + "=" * 70)
+    print(f" {title}")
+    print("=" * 70)
+
+def print_test(name, passed, details=""):
+    status = "[PASS]" if passed else "[FAIL]"
+    print(f"  {status}: {name}")
+    if details and not passed:
+        print(f"         Details: {details}")
+    return passed
+
+class _BrokenExecutor(ThreadPoolExecutor):
+    """Executor whose workers have died (submit fails like a broken process pool)."""
+
+    def submit(self, *args, **kwargs):
+        raise BrokenProcessPool("a worker process terminated abruptly")
+
+class _RunningService:
+    """ScoringService on a background event loop (port chosen by the OS)."""
+
+    def __init__(self, **options):
+        self.service = scoring_service.ScoringService(**options)
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        asyncio.run_coroutine_threadsafe(self.service.start("127.0.0.1", 0), self.loop).result(120)
+        return self
+
+    def __exit__(self, *exc):
+        asyncio.run_coroutine_threadsafe(self.service.stop(), self.loop).result(30)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(5)
+
+    def request(self, path, payload=None, raw=None):
+        url = f"http://127.0.0.1:{self.service.port}{path}"
+        data = raw if raw is not None else (None if payload is None else json.dumps(payload).encode())
+        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with urllib.request.urlopen(req, timeout=60) as resp:
+                return resp.status, resp.read().decode()
+        except urllib.error.HTTPError as e:
+            return e.code, e.read().decode()
+
+# =============================================================================
+# TEST 1: Endpoints
+# =============================================================================
+def test_endpoints():
+    print_header("TEST 1: Service Endpoints")
+
+    tests_passed = 0
+    total_tests = 0
+
+    cv, jd = sample_data.SAMPLE_CV, sample_data.SAMPLE_JD
+    with _RunningService(workers=1, timeout=60) as srv:
+        total_tests += 1
+        status, body = srv.request("/health")
+        passed = status == 200 and json.loads(body)["status"] == "ok"
+        if print_test("GET /health", passed, body):
+            tests_passed += 1
+
+        total_tests += 1
+        status, body = srv.request("/analyze_gap", {"cv_text": cv, "jd_text": jd})
+        expected = json.loads(scoring_service.to_json(ml_utils.analyze_gap(cv, jd)))
+        result = json.loads(body)["result"]
+        passed = status == 200 and result["match_percentage"] == expected["match_percentage"] \
+            and sorted(result["missing_hard"]) == sorted(expected["missing_hard"])
+        if print_test(f"POST /analyze_gap matches analyze_gap ({result['match_percentage']}%)", passed, body[:200]):
+            tests_passed += 1
+
+        total_tests += 1
+        status, body = srv.request("/recommend_roles", {"cv_text": cv})
+        hard, soft = ml_utils.extract_skills_from_text(cv)
+        expected = [r["role"] for r in ml_utils.recommend_roles(hard | soft, cv_text=cv)]
+        passed = status == 200 and [r["role"] for r in json.loads(body)["result"]] == expected
+        if print_test("POST /recommend_roles matches recommend_roles", passed, body[:200]):
+            tests_passed += 1
+
+        total_tests += 1
+        ok = [srv.request("/discover_careers", {"cv_text": cv})[0],
+              srv.request("/analyze_cover_letter", {"cover_letter_text": sample_data.SAMPLE_COVER_LETTER, "jd_text": jd})[0],
+              srv.request("/get_chatbot_response", {"message": "How do I prepare for an interview?"})[0]]
+        if print_test(f"discover_careers / analyze_cover_letter / get_chatbot_response: {ok}", ok == [200] * 3):
+            tests_passed += 1
+
+        total_tests += 1
+        codes = [srv.request("/analyze_gap", {"cv_text": cv})[0],
+                 srv.request("/analyze_gap", raw=b"{not json")[0],
+                 srv.request("/analyze_gap", {"cv_text": 1, "jd_text": jd})[0],
+                 srv.request("/recommend_roles", {})[0],
+                 srv.request("/nope", {})[0],
+                 srv.request("/analyze_gap")[0]]
+        if print_test(f"Validation errors: {codes}", codes == [400, 400, 400, 400, 404, 405]):
+            tests_passed += 1
+
+        total_tests += 1
+        status, body = srv.request("/metrics")
+        passed = (status == 200 and 'careermatch_request_seconds_bucket{endpoint="analyze_gap",le="+Inf"}' in body
+                  and 'careermatch_responses_total{endpoint="analyze_gap",status="400"} 3' in body)
+        if print_test("GET /metrics exposes latency histograms and status counters", passed, body[:300]):
+            tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 2: Timeouts and back-pressure
+# =============================================================================
+def test_limits():
+    print_header("TEST 2: Timeouts and Back-pressure")
+
+    tests_passed = 0
+    total_tests = 0
+
+    payload = {"cv_text": "Python, SQL and Tableau", "jd_text": "Data Analyst with Python"}
+    with _RunningService(workers=0, timeout=60, max_queue=1, max_body=1000) as srv:
+        # Admission limit reached -> 503 with Retry-After
+        total_tests += 1
+        srv.service.metrics.inflight = 1
+        status, _ = srv.request("/analyze_gap", payload)
+        srv.service.metrics.inflight = 0
+        passed = status == 503 and srv.service.metrics.rejected == 1
+        if print_test("Full queue answers 503", passed, f"{status}"):
+            tests_passed += 1
+
+        total_tests += 1
+        status, _ = srv.request("/analyze_gap", {"cv_text": "x" * 2000, "jd_text": ""})
+        if print_test("Oversized body answers 413", status == 413, f"{status}"):
+            tests_passed += 1
+
+        # A running job keeps its slot after the 504 until it has really finished
+        total_tests += 1
+        release = threading.Event()
+        scoring_service.ENDPOINTS["blocking"] = (lambda: release.wait(10), (), ())
+        srv.service.timeout = 0.05
+        try:
+            status, _ = srv.request("/blocking", {})
+            metrics = srv.service.metrics
+            held = (metrics.inflight, metrics.stale)
+            release.set()
+            deadline = time.monotonic() + 5
+            while metrics.inflight and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            release.set()
+            del scoring_service.ENDPOINTS["blocking"]
+        passed = (status == 504 and metrics.timeouts == 1 and held == (1, 1)
+                  and metrics.inflight == 0 and metrics.stale == 0)
+        if print_test("Slow job answers 504 and holds its slot until done", passed, f"{status} {held}"):
+            tests_passed += 1
+
+        # A broken pool is replaced; nothing is routed to it before it is warm
+        total_tests += 1
+        srv.service.timeout = 60
+        srv.service.executor.shutdown()
+        srv.service.executor = _BrokenExecutor(max_workers=1)
+        warmed = threading.Event()
+        ping = scoring_service._ping
+        scoring_service._ping = lambda: warmed.wait(10) and ping()
+        try:
+            first, _ = srv.request("/analyze_gap", payload)
+            during, _ = srv.request("/analyze_gap", payload)
+            _, health = srv.request("/health")
+            warmed.set()
+            deadline = time.monotonic() + 10
+            while srv.service.executor is None and time.monotonic() < deadline:
+                time.sleep(0.01)
+        finally:
+            warmed.set()
+            scoring_service._ping = ping
+        second, _ = srv.request("/analyze_gap", payload)
+        passed = ((first, during, second) == (503, 503, 200) and json.loads(health)["status"] == "restarting"
+                  and srv.service.metrics.pool_restarts == 1)
+        if print_test("Broken pool is rebuilt and warmed before use", passed, f"{first} {during} {second} {health}"):
+            tests_passed += 1
+
+    total_tests += 1
+    hist = scoring_service.LatencyHistogram(buckets=(0.1, 1.0))
+    for seconds in (0.05, 0.05, 0.5, 3.0):
+        hist.observe(seconds)
+    passed = hist.counts == [2, 1, 1] and hist.quantile(0.5) == 0.1 and hist.quantile(0.95) == float("inf")
+    if print_test("LatencyHistogram buckets and quantiles", passed, f"{hist.counts}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# MAIN TEST RUNNER
+# =============================================================================
+def run_all_tests():
+    test_endpoints()
+    test_limits()
+    print("\n  >>> ALL SERVICE TESTS PASSED!")
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,673 @@
+"""
+================================================================================
+Test: Skill Engine Indexes
+================================================================================
+Verifica che gli indici precompilati (automa, grafo skill, indici archetipi,
+scanner dei segnali di testo, pulizia JD, indice dei titoli) producano gli stessi risultati della logica
+originale.
+"""
+
+import sys
+import os
+import re
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import ml_utils
+import knowledge_base
+import skill_matcher
+
+def print_header(title):
+    print("\n" + "=" * 70)
+    print(f" {title}")
+    print("=" * 70)
+
+def print_test(name, passed, details=""):
+    status = "[PASS]" if passed else "[FAIL]"
+    print(f"  {status}: {name}")
+    if details and not passed:
+        print(f"         Details: {details}")
+    return passed
+
+SAMPLE_TEXTS = [
+    "Senior Data Scientist with Python, SQL and machine-learning experience. Built dashboards in Power BI.",
+    "Skills: C++, C#, .NET, Node.js; reporting, forecasting and testing. Team leadership.",
+    "Esperienza in analisi dati, fogli di calcolo e programmazione (python_scripts, sql-based ETL).",
+    "python\nsql\ntableau desktop\n\nmachine\nlearning",
+    "",
+]
+
+def _legacy_regex_match(text_lower, table, suffixes):
+    """Reference implementation of the original n-gram + regex loop."""
+    words = text_lower.split()
+    phrases = set(words)
+    phrases |= {' '.join(words[i:i+2]) for i in range(len(words)-1)}
+    phrases |= {' '.join(words[i:i+3]) for i in range(len(words)-2)}
+    found = set()
+    for skill, variations in table.items():
+        if any(v.lower() in phrases for v in variations):
+            found.add(skill)
+            continue
+        for v in variations:
+            pattern = r'\b' + re.escape(v.lower()) + r'(?:' + '|'.join(suffixes) + r')?\b'
+            if re.search(pattern, text_lower):
+                found.add(skill)
+                break
+    return found
+
+# =============================================================================
+# TEST 1: Aho-Corasick skill automaton
+# =============================================================================
+def test_skill_automaton():
+    print_header("TEST 1: Compiled Skill Automaton")
+
+    tests_passed = 0
+    total_tests = 0
+
+    hard_matcher, soft_matcher = skill_matcher.get_skill_matchers()
+
+    for text in SAMPLE_TEXTS:
+        text_lower = text.lower()
+        total_tests += 1
+        expected = _legacy_regex_match(text_lower, knowledge_base.HARD_SKILLS, skill_matcher.HARD_SUFFIXES)
+        got = hard_matcher.match(text_lower)
+        if print_test(f"Hard skills identical to regex loop: {text[:40]!r}", got == expected, f"diff={got ^ expected}"):
+            tests_passed += 1
+
+        total_tests += 1
+        expected = _legacy_regex_match(text_lower, knowledge_base.SOFT_SKILLS, skill_matcher.SOFT_SUFFIXES)
+        got = soft_matcher.match(text_lower)
+        if print_test(f"Soft skills identical to regex loop: {text[:40]!r}", got == expected, f"diff={got ^ expected}"):
+            tests_passed += 1
+
+    # Word boundaries and suffixes
+    toy = skill_matcher.SkillAutomaton({"R": ["r"], "Test": ["test"], "C++": ["c++"]})
+    total_tests += 1
+    got = toy.match("tests in r and c++ no rust")
+    passed = got == {"R", "Test", "C++"}
+    if print_test("Suffix + boundary rules on toy automaton", passed, f"Got {got}"):
+        tests_passed += 1
+
+    total_tests += 1
+    got = toy.match("contested rust")
+    passed = got == set()
+    if print_test("No match inside other words", passed, f"Got {got}"):
+        tests_passed += 1
+
+    # Built once per knowledge-base version
+    total_tests += 1
+    passed = skill_matcher.get_skill_matchers()[0] is hard_matcher
+    if print_test("Matchers are cached per knowledge-base version", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 2: Typo index (fuzzy fallback)
+# =============================================================================
+def test_typo_index():
+    print_header("TEST 2: Typo-Tolerant Skill Index")
+
+    tests_passed = 0
+    total_tests = 0
+
+    from thefuzz import fuzz
+    hard_index, soft_index = skill_matcher.get_typo_indexes()
+
+    tokens = ["phyton", "javscript", "kubernets", "leadrship", "comunication",
+              "machine learnig", "data analysys", "tableau", "xyz", "team"]
+    for token in tokens:
+        total_tests += 1
+        expected = {
+            skill for skill in knowledge_base.HARD_SKILLS
+            if len(skill) >= 5 and skill.lower() not in skill_matcher.FUZZY_EXCLUDED_SKILLS
+            and fuzz.ratio(token, skill.lower()) > 90
+        }
+        got = hard_index.lookup(token)
+        if print_test(f"Hard lookup equals brute force: {token!r}", got == expected, f"got={got} expected={expected}"):
+            tests_passed += 1
+
+        total_tests += 1
+        expected = {
+            skill for skill in knowledge_base.SOFT_SKILLS
+            if len(skill) >= 5 and fuzz.ratio(token, skill.lower()) > 88
+        }
+        got = soft_index.lookup(token)
+        if print_test(f"Soft lookup equals brute force: {token!r}", got == expected, f"got={got} expected={expected}"):
+            tests_passed += 1
+
+    total_tests += 1
+    hard, _ = ml_utils.extract_skills_from_text("Senior developer fluent in Javascrpt and Kubernets")
+    passed = "JavaScript" in hard or "Kubernetes" in hard
+    if print_test("Typos recovered by extract_skills_from_text", passed, f"Got {hard}"):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = "Excel" not in hard_index.lookup("excell")
+    if print_test("Excluded common words are not fuzzy-matched", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 3: Skill graph (precomputed expansion closure)
+# =============================================================================
+def _legacy_expand(skills_norm):
+    """Reference implementation of the original rescanning expansion."""
+    clusters = knowledge_base.SKILL_CLUSTERS
+    hierarchy = knowledge_base.SKILL_HIERARCHY
+    implications = knowledge_base.SKILL_IMPLICATIONS
+    expanded = set(skills_norm)
+    for data in clusters.values():
+        members = {s.lower() for s in (data.get("skills", []) if isinstance(data, dict) else data)}
+        if expanded & members:
+            expanded.update(members)
+    for canonical, variations in knowledge_base.HARD_SKILLS.items():
+        if expanded & {v.lower() for v in variations}:
+            expanded.add(canonical.lower())
+    for _ in range(2):
+        current = set(expanded)
+        for s in current:
+            for key, parents in hierarchy.items():
+                if s == key.lower():
+                    expanded.update(p.lower() for p in parents)
+            for key, children in implications.items():
+                if s == key.lower():
+                    expanded.update(c.lower() for c in children)
+        if len(expanded) == len(current):
+            break
+    return expanded
+
+def test_skill_graph():
+    print_header("TEST 3: Skill Graph Expansion")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import skill_graph
+    graph = skill_graph.get_skill_graph()
+
+    inputs = [
+        {"python"}, {"tableau"}, {"fogli di calcolo"}, {"data science"},
+        {"react", "sql", "power bi"}, {"unknown skill"}, {"Python"},
+        {"machine learning", "aws", "leadership"},
+    ]
+    for skills in inputs:
+        total_tests += 1
+        expected = _legacy_expand(skills)
+        got = ml_utils.expand_skills_bidirectional(skills)
+        if print_test(f"Expansion identical to legacy: {sorted(skills)}", got == expected, f"diff={got ^ expected}"):
+            tests_passed += 1
+
+    total_tests += 1
+    passed = ml_utils.expand_skills_bidirectional(set()) == set()
+    if print_test("Empty input expands to empty set", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    hits_before = graph.cache_hits
+    result = ml_utils.expand_skills_bidirectional({"python", "sql"})
+    result.add("mutated")
+    again = ml_utils.expand_skills_bidirectional({"python", "sql"})
+    passed = graph.cache_hits > hits_before and "mutated" not in again
+    if print_test("Cache hit returns an independent copy", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 4: Archetype vector index (fit once, transform only)
+# =============================================================================
+def test_archetype_index():
+    print_header("TEST 4: Fit-Once Archetype Index")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import numpy as np
+    import role_index
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    index = role_index.get_archetype_index()
+    archetypes = knowledge_base.JOB_ARCHETYPES_EXTENDED
+
+    total_tests += 1
+    passed = index.names == list(archetypes.keys())
+    if print_test(f"One vector per archetype ({len(index)})", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = all(role_index.archetype_document(n, d) == " ".join(d) for n, d in archetypes.items())
+    if print_test("Archetype documents are the original text", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = index.rank + 2 <= role_index.LSA_COMPONENTS
+    if print_test("CV + JD corpus fits in the LSA components", passed, f"archetype rank {index.rank}"):
+        tests_passed += 1
+
+    total_tests += 1
+    tfidf_sims, lsa_sims = index.similarities(["zzz qqq"])
+    passed = not tfidf_sims.any() and not lsa_sims.any()
+    if print_test("Out-of-vocabulary query has zero similarity", passed):
+        tests_passed += 1
+
+    # Queries sharing archetype terms: same values as the per-call fit
+    from sklearn.decomposition import TruncatedSVD
+    from sklearn.feature_extraction.text import TfidfVectorizer
+
+    def per_call(docs):
+        corpus = docs + [" ".join(d) for d in archetypes.values()]
+        matrix = TfidfVectorizer(analyzer='word', ngram_range=(1, 2), min_df=1, lowercase=True).fit_transform(corpus)
+        lsa = TruncatedSVD(n_components=min(15, len(corpus) - 1), random_state=42).fit_transform(matrix)
+        n = len(docs)
+        return cosine_similarity(matrix[:n], matrix[n:]), cosine_similarity(lsa[:n], lsa[n:])
+
+    queries = ["Leadership International Python", "international sector sales"]
+    total_tests += 1
+    tfidf_sims, lsa_sims = index.similarities(queries)
+    expected_tfidf, expected_lsa = per_call(queries)
+    passed = np.allclose(tfidf_sims, expected_tfidf) and np.allclose(lsa_sims, expected_lsa) and tfidf_sims.any()
+    if print_test("Overlapping queries equal the per-call fit (joint)", passed, f"max {tfidf_sims.max():.3f}"):
+        tests_passed += 1
+
+    total_tests += 1
+    tfidf_sims, lsa_sims = index.similarities(queries + ["zzz qqq"], joint=False)
+    expected = [per_call([q]) for q in queries]
+    passed = (all(np.allclose(tfidf_sims[i], expected[i][0]) and np.allclose(lsa_sims[i], expected[i][1])
+                  for i in range(len(queries)))
+              and not tfidf_sims[2].any())
+    if print_test("Overlapping queries equal the per-call fit (per doc)", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = role_index.get_archetype_index() is index
+    if print_test("Index is cached per knowledge-base version", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 5: Vectorized role scoring (incidence matrix)
+# =============================================================================
+def _legacy_role_scores(cv_skills, cv_text=""):
+    """Reference implementation of the original per-role scoring loop."""
+    import role_index
+    archetypes = knowledge_base.JOB_ARCHETYPES_EXTENDED
+    clusters = knowledge_base.SKILL_CLUSTERS
+    index = role_index.get_archetype_index()
+    tfidf_sims, lsa_sims = index.similarities([" ".join(sorted(cv_skills))])
+    similarities = index.hybrid(tfidf_sims[0], lsa_sims[0])
+
+    education_boost = {}
+    cv_lower = cv_text.lower()
+    for keyword, roles in ml_utils.EDUCATION_TO_ROLES.items():
+        if cv_lower and keyword in cv_lower:
+            weight = max(40, 100 - (cv_lower.find(keyword) / len(cv_lower)) * 50)
+            for role in roles:
+                if role in archetypes:
+                    education_boost[role] = max(education_boost.get(role, 0), weight)
+
+    cv_norm = ml_utils.expand_skills_with_clusters({s.lower() for s in cv_skills})
+    cv_expanded = ml_utils.expand_skills_bidirectional(cv_norm)
+    results = []
+    for i, name in enumerate(archetypes):
+        role_norm = {s.lower() for s in set(archetypes[name].get("primary_skills", []))}
+        if not role_norm:
+            continue
+        points, matched = 0.0, set()
+        for rs in role_norm:
+            if rs in cv_norm:
+                points += ml_utils.WEIGHT_DIRECT
+                matched.add(rs)
+            elif rs in cv_expanded:
+                points += ml_utils.WEIGHT_INFERRED
+                matched.add(rs)
+            else:
+                for cdata in clusters.values():
+                    members = {s.lower() for s in (cdata.get("skills", []) if isinstance(cdata, dict) else cdata)}
+                    if rs in members and cv_norm & members:
+                        points += ml_utils.WEIGHT_TRANSFERABLE
+                        break
+        score = ml_utils._calculate_composite_role_score(
+            ml_utils.calculate_match_score(points, len(role_norm)), similarities[i] * 100, education_boost.get(name, 0))
+        if score > 5:
+            results.append((name, score, list(matched), list(role_norm - matched)[:5]))
+    results.sort(key=lambda x: x[1], reverse=True)
+    return results
+
+def test_role_skill_matrix():
+    print_header("TEST 5: Vectorized Role Scoring")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import random
+    import role_index
+    import sample_data
+
+    rng = random.Random(7)
+    names = list(knowledge_base.HARD_SKILLS) + list(knowledge_base.SOFT_SKILLS)
+    profiles = [set(rng.sample(names, rng.randint(1, 25))) for _ in range(20)]
+    hard, soft = ml_utils.extract_skills_from_text(sample_data.SAMPLE_CV)
+    profiles.append(hard | soft)
+
+    mismatches = 0
+    for i, skills in enumerate(profiles):
+        cv_text = sample_data.SAMPLE_CV if i % 2 else ""
+        expected = _legacy_role_scores(skills, cv_text)
+        got = [(r["role"], r["score"], r["skills_matched"], r["missing_skills"])
+               for r in ml_utils.recommend_roles(skills, cv_text=cv_text)]
+        mismatches += got != expected
+    total_tests += 1
+    if print_test(f"recommend_roles identical to per-role loop ({len(profiles)} profiles)", mismatches == 0, f"{mismatches} mismatches"):
+        tests_passed += 1
+
+    matrix = role_index.get_role_skill_matrix()
+    total_tests += 1
+    passed = matrix.incidence.shape == (len(knowledge_base.JOB_ARCHETYPES_EXTENDED), len(matrix.vocabulary))
+    if print_test(f"Incidence matrix shape {matrix.incidence.shape}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    counts = matrix.match_counts(set(), set())
+    passed = not counts.any()
+    if print_test("Empty CV has no matches", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = role_index.get_role_skill_matrix() is matrix
+    if print_test("Matrix is cached per knowledge-base version", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 6: Single-role scoring (score_role)
+# =============================================================================
+def test_score_role():
+    print_header("TEST 6: Single-Role Scoring")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import sample_data
+
+    hard, soft = ml_utils.extract_skills_from_text(sample_data.SAMPLE_CV)
+    profiles = [
+        (hard | soft, sample_data.SAMPLE_CV),
+        ({"Python", "SQL", "Tableau"}, "Laurea in economia"),
+        ({"SEO", "Branding", "Communication"}, ""),
+    ]
+    for skills, cv_text in profiles:
+        recs = {r["role"]: r["score"] for r in ml_utils.recommend_roles(skills, cv_text=cv_text)}
+        mismatches = [
+            role for role in recs
+            if ml_utils.score_role(skills, cv_text, role) != recs[role]
+        ]
+        total_tests += 1
+        if print_test(f"score_role equals ranked score for {len(recs)} roles", not mismatches, f"{mismatches}"):
+            tests_passed += 1
+
+    total_tests += 1
+    passed = ml_utils.score_role({"Python"}, "", "Astronaut") is None and ml_utils.score_role(set(), "", "Data Scientist") is None
+    if print_test("Unknown role / empty CV return None", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    result = ml_utils.analyze_gap(sample_data.SAMPLE_CV, "Data Scientist")
+    expected = ml_utils.score_role(hard | soft, sample_data.SAMPLE_CV, "Data Scientist")
+    passed = result["match_percentage"] == expected
+    if print_test(f"analyze_gap role-name JD uses composite score: {result['match_percentage']}", passed, f"Expected {expected}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 7: Single-pass text signal scanner
+# =============================================================================
+def _legacy_seniority_counts(text_lower):
+    """Reference: one \\b<kw>\\b regex per SENIORITY_KEYWORDS entry."""
+    return {level: sum(1 for kw in kws if re.search(r'\b' + re.escape(kw) + r'\b', text_lower))
+            for level, kws in knowledge_base.SENIORITY_KEYWORDS.items()}
+
+def test_text_signals():
+    print_header("TEST 7: Text Signal Scanner")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import random
+    import constants
+    import sample_data
+
+    vocab = [kw for kws in knowledge_base.SENIORITY_KEYWORDS.values() for kw in kws]
+    vocab += [w for rules in constants.DOMAIN_EXTRACTION_RULES.values() for w in rules.get("context_words", [])]
+    vocab += list(ml_utils.EDUCATION_TO_ROLES)
+    filler = sample_data.SAMPLE_CV.split()
+    rng = random.Random(11)
+    texts = SAMPLE_TEXTS + [sample_data.SAMPLE_CV, sample_data.SAMPLE_JD, "Head of Data, 7+ years", "management"]
+    for _ in range(200):
+        words = [rng.choice(vocab) if rng.random() < 0.4 else rng.choice(filler) for _ in range(rng.randint(1, 40))]
+        words = [w + rng.choice(["s", "-", "_", ""]) if rng.random() < 0.2 else w for w in words]
+        texts.append(rng.choice([" ", "", "\n"]).join(words))
+
+    counts_ok, find_ok = 0, 0
+    archetypes = knowledge_base.JOB_ARCHETYPES_EXTENDED
+    for text in texts:
+        signals = ml_utils.scan_text_signals(text)
+        text_lower = text.lower()
+        counts = {level: sum(1 for kw in kws if signals.has_word(kw))
+                  for level, kws in knowledge_base.SENIORITY_KEYWORDS.items()}
+        counts_ok += counts == _legacy_seniority_counts(text_lower)
+        find_ok += all(signals.find(kw) == text_lower.find(kw) for kw in ml_utils.EDUCATION_TO_ROLES)
+
+    total_tests += 1
+    if print_test(f"Whole-word seniority hits equal the per-keyword regexes ({len(texts)} texts)", counts_ok == len(texts), f"{counts_ok}/{len(texts)}"):
+        tests_passed += 1
+
+    total_tests += 1
+    if print_test("Education keyword positions equal str.find", find_ok == len(texts), f"{find_ok}/{len(texts)}"):
+        tests_passed += 1
+
+    total_tests += 1
+    signals = ml_utils.scan_text_signals(sample_data.SAMPLE_CV)
+    passed = (signals.seniority() == ml_utils.detect_seniority(sample_data.SAMPLE_CV)
+              and signals.domain() == ml_utils.detect_domain_context(sample_data.SAMPLE_CV)
+              and ml_utils.detect_seniority("") == ("Mid Level", 0.0)
+              and ml_utils.detect_seniority("Data analyst, 6 years") == ("Senior Level", 0.9)
+              and ml_utils.detect_seniority_level("We hire a Head of Data") == "Executive"
+              and ml_utils._education_role_boosts("Laurea in economia", archetypes)
+                  == ml_utils._education_role_boosts("Laurea in economia", archetypes, ml_utils.scan_text_signals("Laurea in economia")))
+    if print_test(f"detect_* wrappers agree with one scan: {signals.seniority()}, {signals.domain()}", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 8: Precompiled JD cleaner
+# =============================================================================
+def test_jd_cleaner():
+    print_header("TEST 8: JD Cleaner")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import time
+    import sample_data
+    from jd_cleaner import JDCleaner
+
+    jd = ("Backend Developer\nRequirements:\n- Python, Django, PostgreSQL\n"
+          "What we offer:\n- Meal vouchers, gym membership\n- Yoga classes\n\n"
+          "Chi siamo\nUna scale-up che usa Kubernetes.\n\n"
+          "Competenze richieste\nJava, Docker. RAL 35.000, 40 ore/settimana.")
+    cleaned = ml_utils.preprocess_jd_text(jd)
+    hard, _ = ml_utils.extract_skills_from_text(jd, is_jd=True)
+
+    total_tests += 1
+    passed = (cleaned.startswith("Backend Developer Requirements: - Python, Django, PostgreSQL Una scale-up che usa Kubernetes.")
+              and "gym" not in cleaned and "Chi siamo" not in cleaned and "35.000" not in cleaned)
+    if print_test("Header sections and non-skill patterns removed", passed, cleaned):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = {"Python", "Django", "Java", "Docker", "Kubernetes"} <= hard
+    if print_test(f"Skill sections kept for extraction: {len(hard)} hard skills", passed, sorted(hard)):
+        tests_passed += 1
+
+    total_tests += 1
+    hard, _ = ml_utils.extract_skills_from_text("We offer a competitive salary, great benefits and perks.", is_jd=True)
+    passed = "Benefits" not in hard
+    if print_test("Inline benefits/perks phrases removed", passed, sorted(hard)):
+        tests_passed += 1
+
+    # A line that only starts with a header word is running text (baseline output)
+    text = "Benefits of this role include working with Kubernetes and Terraform daily."
+    hard, _ = ml_utils.extract_skills_from_text(text, is_jd=True)
+    total_tests += 1
+    passed = (ml_utils.preprocess_jd_text(text) == "of this role include working with Kubernetes and Terraform daily."
+              and {"Kubernetes", "Terraform", "Infrastructure as Code"} <= hard)
+    if print_test("Header word at a line start does not drop the line", passed, sorted(hard)):
+        tests_passed += 1
+
+    # Every line after a header-only line is treated alike (baseline kept both)
+    total_tests += 1
+    cleaned = ml_utils.preprocess_jd_text("Benefits:\nfree lunch\ngym")
+    passed = cleaned == "free lunch gym"
+    if print_test("Header-only line does not swallow the next line", passed, cleaned):
+        tests_passed += 1
+
+    # Patterns run one after the other: the amount goes first, "Salary:" stays (baseline output)
+    total_tests += 1
+    cleaned = ml_utils.preprocess_jd_text("Salary: €35,000")
+    passed = cleaned == "Salary:"
+    if print_test("Non-skill patterns applied in order", passed, cleaned):
+        tests_passed += 1
+
+    # Sample JD has no matching header: same text as the per-pattern subs
+    total_tests += 1
+    legacy = sample_data.SAMPLE_JD
+    for category in ("salary", "hours", "duration", "benefits", "contract", "eligibility"):
+        for pattern in knowledge_base.NON_SKILL_PATTERNS.get(category, []):
+            legacy = re.sub(pattern, " ", legacy, flags=re.IGNORECASE)
+    passed = ml_utils.preprocess_jd_text(sample_data.SAMPLE_JD) == " ".join(legacy.split())
+    if print_test("Precompiled patterns equal the per-pattern substitutions", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    start = time.perf_counter()
+    ml_utils.preprocess_jd_text("\n" * 50_000 + "Python")
+    elapsed = time.perf_counter() - start
+    if print_test(f"50 KB of blank lines cleaned in {elapsed * 1000:.1f} ms", elapsed < 1.0):
+        tests_passed += 1
+
+    total_tests += 1
+    try:
+        JDCleaner({"salary": [r"[\d+"]})
+        passed = False
+    except ValueError as exc:
+        passed = "salary" in str(exc)
+    if print_test("Invalid pattern rejected when the cleaner is built", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 9: Role-title index
+# =============================================================================
+def _legacy_archetype_fallback(text_normalized):
+    """Reference: step 6 of extract_skills_from_text, one role at a time."""
+    from thefuzz import fuzz
+    found = set()
+    soft_names = set(knowledge_base.SOFT_SKILLS)
+    text_words = set(text_normalized.split())
+    for role_name, role_skills in knowledge_base.JOB_ARCHETYPES.items():
+        role_lower = role_name.lower()
+        expanded = {s.capitalize() for s in ml_utils.expand_skills_bidirectional({s.lower() for s in role_skills})}
+        if role_lower in text_normalized or (len(role_lower.split()) > 1 and all(w in text_words for w in role_lower.split())):
+            found |= {s for s in role_skills if s not in soft_names} | expanded
+        elif len(role_lower) > 5 and any(len(seg) > 5 and fuzz.ratio(seg, role_lower.replace(" ", "")) > 85
+                                         for seg in text_normalized.split()):
+            found |= set(role_skills) | expanded
+    return found
+
+def _legacy_find_title(query):
+    """Reference: substring scan, then difflib over every title."""
+    import difflib
+    titles = list(knowledge_base.JOB_ARCHETYPES_EXTENDED)
+    for title in titles:
+        if query in title.lower():
+            return title
+    matches = difflib.get_close_matches(query, titles, n=1, cutoff=0.7)
+    return matches[0] if matches else None
+
+def test_role_title_index():
+    print_header("TEST 9: Role-Title Index")
+
+    tests_passed = 0
+    total_tests = 0
+
+    import random
+    import sample_data
+
+    index = ml_utils.get_role_title_index()
+    titles = list(knowledge_base.JOB_ARCHETYPES)
+    vocab = sample_data.SAMPLE_JD.lower().split() + [w for t in titles for w in t.lower().split()]
+    rng = random.Random(5)
+
+    def typo(word):
+        i = rng.randrange(len(word))
+        return word[:i] + word[i + 1:] if rng.random() < 0.5 else word[:i] + rng.choice("aeinorst") + word[i:]
+
+    texts = ["", "energy trader", "we need a dataanalyst", "engineer data for our team", sample_data.SAMPLE_JD.lower()]
+    for _ in range(150):
+        words = [rng.choice(vocab) for _ in range(rng.randint(1, 25))]
+        if rng.random() < 0.5:
+            words.append(rng.choice(titles).lower().replace(" ", rng.choice(["", " "])))
+        texts.append(" ".join(typo(w) if len(w) > 3 and rng.random() < 0.2 else w for w in words))
+
+    total_tests += 1
+    same = sum(index.role_skills(t) == _legacy_archetype_fallback(t) for t in texts)
+    if print_test(f"Archetype fallback equals the per-role loop ({len(texts)} texts)", same == len(texts), f"{same}/{len(texts)}"):
+        tests_passed += 1
+
+    total_tests += 1
+    methods = dict(index.match("we need a dataanalyst and a data engineer"))
+    passed = methods.get("Data Engineer") == "phrase" and methods.get("Data Analyst") == "fuzzy"
+    if print_test(f"Match methods reported: {methods}", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    queries = ["", "da", "data", "data scientst", "frontend dev", "xyzzy", "senior data analyst"]
+    queries += [t.lower() for t in titles] + [typo(t.lower()) for t in titles]
+    same = sum(index.find_title(q) == _legacy_find_title(q) for q in queries)
+    if print_test(f"Title lookup equals substring scan + difflib ({len(queries)} queries)", same == len(queries), f"{same}/{len(queries)}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# MAIN TEST RUNNER
+# =============================================================================
+def run_all_tests():
+    test_skill_automaton()
+    test_typo_index()
+    test_skill_graph()
+    test_archetype_index()
+    test_role_skill_matrix()
+    test_score_role()
+    test_text_signals()
+    test_jd_cleaner()
+    test_role_title_index()
+    print("\n  >>> ALL SKILL ENGINE TESTS PASSED!")
+
+if __name__ == "__main__":
+    run_all_tests()
@@ -0,0 +1,141 @@
+"""
+================================================================================
+Test: Start-up Cost
+================================================================================
+Verifica che il core di scoring (scoring_core) si importi senza Streamlit
+e senza le librerie di visualizzazione/report, e che il tempo di import
+resti entro il budget. Le misure girano in un interprete separato, così
+i moduli già caricati dagli altri test non falsano il risultato.
+"""
+
+import sys
+import os
+import json
+import subprocess
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# Budget (seconds) for `import scoring_core` in a fresh interpreter
+# (~0.1s measured; the margin covers slow CI disks).
+CORE_IMPORT_BUDGET = 1.0
+
+# Modules that must not be loaded by the headless core
+HEAVY_MODULES = ["streamlit", "matplotlib", "wordcloud", "nltk", "pypdf", "fpdf", "pandas", "sklearn"]
+
+# Modules ml_utils itself now loads only on first use
+LAZY_MODULES = ["streamlit", "matplotlib", "wordcloud", "nltk", "pypdf", "fpdf", "scipy.cluster"]
+
+def print_header(title):
+    print("\n" + "=" * 70)
+    print(f" {title}")
+    print("=" * 70)
+
+def print_test(name, passed, details=""):
+    status = "[PASS]" if passed else "[FAIL]"
+    print(f"  {status}: {name}")
+    if details and not passed:
+        print(f"         Details: {details}")
+    return passed
+
+def _probe(module, code=""):
+    """Import module in a fresh interpreter; returns (seconds, loaded top-level modules)."""
+    script = (
+        "import json, sys, time\n"
+        "t = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - t\n"
+        f"{code}\n"
+        "print(json.dumps([elapsed, sorted(sys.modules)]))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", script], cwd=HERE, capture_output=True, text=True, check=True)
+    elapsed, modules = json.loads(out.stdout.strip().splitlines()[-1])
+    return elapsed, set(modules)
+
+def _loaded(modules, names):
+    return [name for name in names if name in modules]
+
+# =============================================================================
+# TEST 1: Headless scoring core
+# =============================================================================
+def test_core_import():
+    print_header("TEST 1: Scoring Core Import")
+
+    tests_passed = 0
+    total_tests = 0
+
+    # Best of 3 (the first run may also compile the bytecode)
+    timings = []
+    for _ in range(3):
+        elapsed, modules = _probe("scoring_core")
+        timings.append(elapsed)
+    best = min(timings)
+
+    total_tests += 1
+    heavy = _loaded(modules, HEAVY_MODULES)
+    if print_test("scoring_core loads no Streamlit / visualization / report libraries", not heavy, f"{heavy}"):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = best < CORE_IMPORT_BUDGET
+    if print_test(f"Import time {best * 1000:.0f} ms within budget ({CORE_IMPORT_BUDGET * 1000:.0f} ms)", passed, f"{timings}"):
+        tests_passed += 1
+
+    # Scoring entry points run headless: sklearn may load, Streamlit may not
+    # (inline texts: sample_data imports Streamlit)
+    _, modules = _probe("scoring_core", (
+        "cv = 'Data Analyst with 3 years of Python, SQL and Tableau. Team player.'\n"
+        "scoring_core.extract_skills_from_text(cv)\n"
+        "scoring_core.calculate_match_score(3.6, 5)\n"
+        "scoring_core.analyze_gap(cv, 'Looking for a Data Scientist: Python, machine learning, SQL.')\n"
+        "scoring_core.analyze_gap(cv, 'Data Scientist')\n"
+    ))
+    total_tests += 1
+    loaded = _loaded(modules, ["streamlit", "matplotlib", "wordcloud", "nltk"])
+    if print_test("extract_skills_from_text / analyze_gap stay headless", not loaded, f"{loaded}"):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# TEST 2: Lazy imports in ml_utils
+# =============================================================================
+def test_lazy_imports():
+    print_header("TEST 2: Lazy Heavy Imports")
+
+    tests_passed = 0
+    total_tests = 0
+
+    elapsed, modules = _probe("ml_utils")
+    total_tests += 1
+    loaded = _loaded(modules, LAZY_MODULES)
+    if print_test(f"ml_utils import ({elapsed * 1000:.0f} ms) defers heavy libraries", not loaded, f"{loaded}"):
+        tests_passed += 1
+
+    import ml_utils
+    import scoring_core
+
+    total_tests += 1
+    passed = ml_utils.analyze_gap is scoring_core.analyze_gap and ml_utils.WEIGHT_INFERRED == scoring_core.WEIGHT_INFERRED
+    if print_test("ml_utils re-exports the scoring core", passed):
+        tests_passed += 1
+
+    total_tests += 1
+    passed = ml_utils._lazy_import("no_such_module_xyz") is None and ml_utils._lazy_import("json", "dumps") is json.dumps
+    if print_test("_lazy_import returns None for missing libraries", passed):
+        tests_passed += 1
+
+    print(f"\n  Summary: {tests_passed}/{total_tests} tests passed")
+    assert tests_passed == total_tests, f"Failed {total_tests - tests_passed} tests"
+
+# =============================================================================
+# MAIN TEST RUNNER
+# =============================================================================
+def run_all_tests():
+    test_core_import()
+    test_lazy_imports()
+    print("\n  >>> ALL START-UP TESTS PASSED!")
+
+if __name__ == "__main__":
+    run_all_tests()
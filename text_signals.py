@@ -0,0 +1,270 @@
+"""
+================================================================================
+CareerMatch AI - Single-Pass Text Signal Scanner
+================================================================================
+
+Each analysis used to scan the raw text once per marker:
+
+- detect_seniority: one `\\b<kw>\\b` regex per SENIORITY_KEYWORDS entry
+- detect_seniority_level: substring tests over CONTEXT_SIGNALS
+- detect_domain_context: substring tests for every DOMAIN_EXTRACTION_RULES word
+- recommend_roles: `in` + `find` for every EDUCATION_TO_ROLES keyword
+
+All these vocabularies are compiled into one Aho-Corasick automaton. A
+single pass over the lowercased text records, for every marker, the
+position of its first occurrence and whether some occurrence sits on word
+boundaries (the `\\b...\\b` regex semantics). The signals are then derived
+from those hits with the same rules, thresholds and tie-breaking as the
+original functions, so the outputs are identical.
+
+The years-of-experience pattern ("5+ years", "3 anni") is numeric and stays
+a single precompiled regex.
+
+Public API:
+- SignalScanner(seniority_keywords, context_signals, domain_rules,
+                education_keywords) -> .scan(text)
+- TextSignals -> .seniority(), .seniority_level(), .domain(),
+                 .education_positions(), .contains(m), .find(m), .has_word(m)
+================================================================================
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+# Same pattern detect_seniority used for explicit years of experience
+YEARS_PATTERN = re.compile(r'(\d+)\s*(?:\+|plus)?\s*(?:years|anni)')
+
+
+def _is_word(ch: str) -> bool:
+    """Same definition of a word character as `\\w` in a str regex."""
+    return ch.isalnum() or ch == "_"
+
+
+# =============================================================================
+# AUTOMATON
+# =============================================================================
+class MarkerAutomaton:
+    """Aho-Corasick over a set of literal markers (first position + word-boundary hits)."""
+
+    def __init__(self, markers: Iterable[str], word_markers: Iterable[str] = ()):
+        self.markers: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for marker in markers:
+            if marker and marker not in self.ids:
+                self.ids[marker] = len(self.markers)
+                self.markers.append(marker)
+        # Markers whose word-boundary occurrences are needed (\b<kw>\b)
+        self._word_ids = frozenset(self.ids[m] for m in word_markers if m in self.ids)
+        self._len = [len(m) for m in self.markers]
+        self._first_is_word = [_is_word(m[0]) for m in self.markers]
+        self._last_is_word = [_is_word(m[-1]) for m in self.markers]
+        self._build()
+
+    def _build(self) -> None:
+        goto: List[Dict[str, int]] = [{}]
+        out: List[List[int]] = [[]]
+        for mid, marker in enumerate(self.markers):
+            state = 0
+            for ch in marker:
+                nxt = goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[state][ch] = nxt
+                    goto.append({})
+                    out.append([])
+                state = nxt
+            out[state].append(mid)
+
+        # Breadth-first failure links; outputs of the failure state are merged
+        fail = [0] * len(goto)
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            for ch, nxt in goto[state].items():
+                queue.append(nxt)
+                f = fail[state]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                candidate = goto[f].get(ch, 0)
+                fail[nxt] = candidate if candidate != nxt else 0
+                out[nxt].extend(out[fail[nxt]])
+
+        self._goto = goto
+        self._fail = fail
+        self._out = [tuple(o) for o in out]
+
+    def scan(self, text: str) -> Tuple[Dict[int, int], Set[int]]:
+        """({marker id: first start}, {marker ids with a word-bounded occurrence})."""
+        goto = self._goto
+        fail = self._fail
+        out = self._out
+        lengths = self._len
+        word_ids = self._word_ids
+        first: Dict[int, int] = {}
+        bounded: Set[int] = set()
+        n = len(text)
+        state = 0
+        for i, ch in enumerate(text):
+            nxt = goto[state].get(ch)
+            while nxt is None and state:
+                state = fail[state]
+                nxt = goto[state].get(ch)
+            state = nxt or 0
+            outputs = out[state]
+            if not outputs:
+                continue
+            end = i + 1
+            for mid in outputs:
+                start = end - lengths[mid]
+                if mid not in first:
+                    first[mid] = start
+                if mid in word_ids and mid not in bounded:
+                    left = _is_word(text[start - 1]) if start > 0 else False
+                    right = _is_word(text[end]) if end < n else False
+                    if left != self._first_is_word[mid] and right != self._last_is_word[mid]:
+                        bounded.add(mid)
+        return first, bounded
+
+
+# =============================================================================
+# SCANNER
+# =============================================================================
+class SignalScanner:
+    """
+    Compiled marker vocabularies of the text-signal detectors.
+
+    seniority_keywords: {level: [keyword]} (SENIORITY_KEYWORDS, whole words)
+    context_signals:    {"entry"/"mid"/"senior"/"executive": [signal]} (substrings)
+    domain_rules:       {domain: {"context_words": [...], "must_extract": [...]}}
+    education_keywords: education keywords in boost order (EDUCATION_TO_ROLES)
+    """
+
+    def __init__(self, seniority_keywords: Dict[str, Sequence[str]], context_signals: Dict[str, Sequence[str]],
+                 domain_rules: Dict[str, Dict], education_keywords: Sequence[str]):
+        self.seniority_keywords = {level: list(kws) for level, kws in seniority_keywords.items()}
+        self.context_signals = {level: list(sigs) for level, sigs in context_signals.items()}
+        self.domain_rules = {
+            domain: ([w.lower() for w in rules.get("context_words", [])],
+                     [t.lower() for t in rules.get("must_extract", [])])
+            for domain, rules in domain_rules.items()
+        }
+        self.education_keywords = list(education_keywords)
+
+        word_markers = [kw for kws in self.seniority_keywords.values() for kw in kws]
+        markers = list(word_markers)
+        markers += [s for sigs in self.context_signals.values() for s in sigs]
+        for context_words, must_extract in self.domain_rules.values():
+            markers += context_words + must_extract
+        markers += self.education_keywords
+        self.automaton = MarkerAutomaton(markers, word_markers)
+
+    def scan(self, text: str) -> "TextSignals":
+        text_lower = text.lower()
+        first, bounded = self.automaton.scan(text_lower)
+        return TextSignals(self, text_lower, first, bounded)
+
+
+class TextSignals:
+    """Marker hits of one text and the signals derived from them."""
+
+    def __init__(self, scanner: SignalScanner, text_lower: str, first: Dict[int, int], bounded: Set[int]):
+        self.scanner = scanner
+        self.text_lower = text_lower
+        self._first = first
+        self._bounded = bounded
+
+    # -------------------------------------------------------------------------
+    # RAW HITS
+    # -------------------------------------------------------------------------
+    def find(self, marker: str) -> int:
+        """text_lower.find(marker) for a compiled marker."""
+        if not marker:
+            return 0
+        mid = self.scanner.automaton.ids.get(marker)
+        return self._first.get(mid, -1) if mid is not None else -1
+
+    def contains(self, marker: str) -> bool:
+        """marker in text_lower."""
+        return self.find(marker) >= 0
+
+    def has_word(self, keyword: str) -> bool:
+        """re.search(r'\\b' + re.escape(keyword) + r'\\b', text_lower)."""
+        if not keyword:
+            return any(_is_word(ch) for ch in self.text_lower)
+        mid = self.scanner.automaton.ids.get(keyword)
+        return mid in self._bounded
+
+    # -------------------------------------------------------------------------
+    # DERIVED SIGNALS
+    # -------------------------------------------------------------------------
+    def seniority(self) -> Tuple[str, float]:
+        """detect_seniority: (level, confidence) from years and keywords."""
+        if not self.text_lower:
+            return "Mid Level", 0.0
+
+        years_matches = YEARS_PATTERN.findall(self.text_lower)
+        max_years = 0
+        if years_matches:
+            try:
+                max_years = max([int(y) for y in years_matches if int(y) < 50])  # Filter realistic
+            except ValueError:
+                max_years = 0
+
+        scores = {"Entry Level": 0, "Mid Level": 0, "Senior Level": 0}
+        for level, keywords in self.scanner.seniority_keywords.items():
+            for kw in keywords:
+                if self.has_word(kw):
+                    scores[level] += 1
+
+        # Explicit years override keywords
+        if max_years >= 5:
+            return "Senior Level", 0.9
+        # Student/Intern override (strong signal for Entry Level)
+        if scores["Entry Level"] > 0 and max_years < 3:
+            return "Entry Level", 0.85
+        if max_years >= 3:
+            return "Mid Level", 0.8
+        elif max_years >= 1:
+            return "Entry Level", 0.8
+
+        # Keyword fallback
+        best_level = max(scores, key=scores.get)
+        if scores[best_level] > 0:
+            if best_level == "Senior Level" and max_years == 0:
+                return "Mid Level", 0.5  # Downgrade to Mid if no years proof
+            return best_level, 0.7
+        return "Mid Level", 0.3  # Default assumption
+
+    def seniority_level(self) -> str:
+        """detect_seniority_level: first CONTEXT_SIGNALS level (Executive -> Entry) present."""
+        signals = self.scanner.context_signals
+        for key, label in (("executive", "Executive"), ("senior", "Senior"),
+                           ("mid", "Mid-Level"), ("entry", "Entry Level")):
+            if any(self.contains(sig) for sig in signals.get(key, [])):
+                return label
+        return "Not Specified"
+
+    def domain(self) -> str:
+        """detect_domain_context: best domain (context word +1, must_extract term +2, min 2)."""
+        best_domain = "General"
+        max_score = 0
+        for domain, (context_words, must_extract) in self.scanner.domain_rules.items():
+            score = sum(1 for w in context_words if self.contains(w))
+            score += sum(2 for t in must_extract if self.contains(t))
+            if score > max_score and score >= 2:
+                max_score = score
+                best_domain = domain
+        return best_domain
+
+    def education_positions(self) -> Dict[str, int]:
+        """{education keyword: first position} for the keywords present, in table order."""
+        positions = {}
+        for kw in self.scanner.education_keywords:
+            pos = self.find(kw)
+            if pos >= 0:
+                positions[kw] = pos
+        return positions
@@ -0,0 +1,201 @@
+"""
+================================================================================
+CareerMatch AI - Role-Title Index
+================================================================================
+
+Two paths matched free text against job titles by brute force:
+
+- extract_skills_from_text (JD, step 6 "archetype fallback") looped every
+  JOB_ARCHETYPES role: substring test, all-words test, then fuzz.ratio of
+  the title (spaces removed) against every text segment, expanding the
+  role's skills again on every hit.
+- _jd_requirements (analyze_gap, short JDs) scanned every title for the
+  query as a substring, then ran difflib.get_close_matches over all titles.
+
+RoleTitleIndex answers both with a few verifications per document:
+
+- PHRASE AUTOMATON: Aho-Corasick over the lowercase titles (text_signals.
+  MarkerAutomaton); one pass finds every title contained in the text.
+- POSTINGS: token -> multi-word titles; a title whose distinct words are
+  all present in the text's token set passes the all-words rule.
+- TRIGRAM INDEX: skill_matcher.TypoIndex with q=3 over the space-less
+  titles; only candidates passing the length and trigram count filters are
+  verified with fuzz.ratio.
+- TITLE LOOKUP: substring candidates come from the trigram postings of the
+  titles, close-match candidates from a (titles x characters) count matrix
+  that computes difflib's quick_ratio for all titles at once. Only those
+  reach difflib.
+
+Each role's skill contribution (archetype skills plus their bidirectional
+expansion) is precomputed when the index is built. Matching rules,
+thresholds and tie-breaking are the original ones, so results are
+identical.
+
+Public API:
+- RoleTitleIndex(archetypes, soft_skills, expand) -> .match(text_normalized),
+      .role_skills(text_normalized), .find_title(query, cutoff)
+- ROLE_FUZZY_THRESHOLD, ROLE_TITLE_CUTOFF
+================================================================================
+"""
+
+from __future__ import annotations
+
+import difflib
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from skill_matcher import TypoIndex, fuzz
+from text_signals import MarkerAutomaton
+
+# fuzz.ratio(segment, title without spaces) > threshold, for titles and
+# segments longer than ROLE_FUZZY_MIN_LEN characters
+ROLE_FUZZY_THRESHOLD = 85
+ROLE_FUZZY_MIN_LEN = 5
+# difflib.get_close_matches cutoff of the short-JD title lookup
+ROLE_TITLE_CUTOFF = 0.7
+
+# Match methods, in the order they are tried for each role
+METHOD_PHRASE = "phrase"
+METHOD_ALL_WORDS = "all_words"
+METHOD_FUZZY = "fuzzy"
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class RoleTitleIndex:
+    """
+    Title matchers over JOB_ARCHETYPES (title -> skills).
+
+    soft_skills: skill names the phrase / all-words rules leave out
+    expand:      skills_norm -> expanded lowercase skills (expand_skills_bidirectional)
+    """
+
+    def __init__(self, archetypes: Dict[str, Iterable[str]], soft_skills: Iterable[str] = (),
+                 expand: Optional[Callable[[Set[str]], Set[str]]] = None):
+        self.titles: List[str] = list(archetypes)
+        self.lower: List[str] = [t.lower() for t in self.titles]
+        soft_skills = set(soft_skills)
+
+        # Precomputed contributions: phrase / all-words drop soft skills,
+        # the fuzzy rule keeps them (as the original loop did)
+        self._phrase_skills: List[FrozenSet[str]] = []
+        self._fuzzy_skills: List[FrozenSet[str]] = []
+        for title in self.titles:
+            skills = set(archetypes[title])
+            expanded = {s.capitalize() for s in expand({s.lower() for s in skills})} if expand else set()
+            self._phrase_skills.append(frozenset({s for s in skills if s not in soft_skills} | expanded))
+            self._fuzzy_skills.append(frozenset(skills | expanded))
+
+        # Exact phrase automaton (titles sharing a lowercase form share a marker)
+        self._automaton = MarkerAutomaton(self.lower)
+        self._marker_roles: Dict[int, List[int]] = {}
+        for rid, lower in enumerate(self.lower):
+            self._marker_roles.setdefault(self._automaton.ids[lower], []).append(rid)
+
+        # Token postings of multi-word titles
+        self._postings: Dict[str, List[int]] = {}
+        self._word_counts: List[int] = []
+        for rid, lower in enumerate(self.lower):
+            words = set(lower.split())
+            self._word_counts.append(len(words) if len(lower.split()) > 1 else 0)
+            if len(lower.split()) > 1:
+                for word in words:
+                    self._postings.setdefault(word, []).append(rid)
+
+        # Trigram typo index over space-less titles (fuzzy rule)
+        self._fuzzy_roles: Dict[str, List[int]] = {}
+        for rid, lower in enumerate(self.lower):
+            if len(lower) > ROLE_FUZZY_MIN_LEN:
+                self._fuzzy_roles.setdefault(lower.replace(" ", ""), []).append(rid)
+        self._typo_index = TypoIndex(self._fuzzy_roles, ROLE_FUZZY_THRESHOLD, q=3)
+
+        # Title lookup: trigram postings and character counts of the raw titles
+        self._title_trigrams: Dict[str, Set[int]] = {}
+        for rid, lower in enumerate(self.lower):
+            for gram in _trigrams(lower):
+                self._title_trigrams.setdefault(gram, set()).add(rid)
+        alphabet = sorted({ch for title in self.titles for ch in title})
+        self._char_ids = {ch: i for i, ch in enumerate(alphabet)}
+        self._char_counts = np.zeros((len(self.titles), len(alphabet)), dtype=np.int32)
+        for rid, title in enumerate(self.titles):
+            for ch in title:
+                self._char_counts[rid, self._char_ids[ch]] += 1
+        self._title_lengths = np.array([len(t) for t in self.titles], dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.titles)
+
+    # -------------------------------------------------------------------------
+    # JD ARCHETYPE FALLBACK
+    # -------------------------------------------------------------------------
+    def _match_ids(self, text_normalized: str) -> Dict[int, str]:
+        """{role id: first rule that matched (phrase > all words > fuzzy)}."""
+        methods: Dict[int, str] = {}
+        first, _ = self._automaton.scan(text_normalized)
+        for mid in first:
+            for rid in self._marker_roles[mid]:
+                methods[rid] = METHOD_PHRASE
+
+        tokens = text_normalized.split()
+        hits: Dict[int, int] = {}
+        for word in set(tokens):
+            for rid in self._postings.get(word, ()):
+                hits[rid] = hits.get(rid, 0) + 1
+        for rid, count in hits.items():
+            if count == self._word_counts[rid] and rid not in methods:
+                methods[rid] = METHOD_ALL_WORDS
+
+        if fuzz is not None:
+            for segment in set(tokens):
+                if len(segment) > ROLE_FUZZY_MIN_LEN:
+                    for name in self._typo_index.lookup(segment):
+                        for rid in self._fuzzy_roles[name]:
+                            methods.setdefault(rid, METHOD_FUZZY)
+        return methods
+
+    def match(self, text_normalized: str) -> List[Tuple[str, str]]:
+        """[(title, method)] of the roles matched in a normalized JD, in table order."""
+        methods = self._match_ids(text_normalized)
+        return [(self.titles[rid], methods[rid]) for rid in sorted(methods)]
+
+    def role_skills(self, text_normalized: str) -> Set[str]:
+        """Skills contributed by every role matched in a normalized JD."""
+        found: Set[str] = set()
+        for rid, method in self._match_ids(text_normalized).items():
+            found |= self._fuzzy_skills[rid] if method == METHOD_FUZZY else self._phrase_skills[rid]
+        return found
+
+    # -------------------------------------------------------------------------
+    # SHORT-JD TITLE LOOKUP
+    # -------------------------------------------------------------------------
+    def find_title(self, query: str, cutoff: float = ROLE_TITLE_CUTOFF) -> Optional[str]:
+        """
+        First title equal to / containing query (lowercase), else the
+        difflib.get_close_matches(query, titles, n=1, cutoff) result.
+        """
+        if len(query) < 3:
+            candidates = range(len(self.titles))
+        else:
+            grams = _trigrams(query)
+            postings = [self._title_trigrams.get(g, set()) for g in grams]
+            candidates = sorted(set.intersection(*postings)) if all(postings) else []
+        for rid in candidates:
+            if query in self.lower[rid]:
+                return self.titles[rid]
+
+        if not self.titles:
+            return None
+        query_counts = np.zeros(len(self._char_ids), dtype=np.int32)
+        for ch in query:
+            cid = self._char_ids.get(ch)
+            if cid is not None:
+                query_counts[cid] += 1
+        common = np.minimum(self._char_counts, query_counts).sum(axis=1)
+        # difflib's quick_ratio (an upper bound of ratio) for every title
+        quick = 2.0 * common / (self._title_lengths + len(query))
+        shortlist = [self.titles[rid] for rid in np.flatnonzero(quick >= cutoff)]
+        matches = difflib.get_close_matches(query, shortlist, n=1, cutoff=cutoff)
+        return matches[0] if matches else None
@@ -0,0 +1,407 @@
+"""
+================================================================================
+CareerMatch AI - Pretrained Topic Model (transform-only LDA)
+================================================================================
+
+perform_topic_modeling used to do all of this on every rerun of the results
+page:
+
+- one case-insensitive re.sub per compound tool name per JD line
+- build ~400 stop words (EN + HR + IT/ES/FR/DE) into a new CountVectorizer
+- fit LDA (50 batch iterations) from scratch on the lines of one JD
+- render a WordCloud
+
+TopicModel fits the CountVectorizer and LDA once on a reference JD corpus
+derived from the knowledge base (one document per JOB_ARCHETYPES_EXTENDED
+role: title, sector, skills and their HARD_SKILLS / SOFT_SKILLS
+variations). A request then only does:
+
+    counts = vectorizer.transform(lines).sum(axis=0)   (bag of words of the JD)
+    theta  = lda.transform(counts)                     (topic mixture of the JD)
+
+and reports the n_topics topics with the largest weight in theta. The
+keywords of a topic are the JD words it explains: each word goes to the
+reported topic with the largest responsibility theta_k * phi_k[w] and words are
+ranked by count * responsibility, so the same word is not repeated across
+topics.
+
+The reference corpus only knows knowledge-base terms, and ordinary JD
+words (campaign, funnel, retention, dashboards, ...) are not in it. They
+are not dropped: such a word is placed by the lines it occurs in. Each
+line gets its own mixture theta_l = lda.transform(line) from its known
+words (the JD mixture if it has none), and the word's responsibility is
+sum_l count(w, l) * theta_l. Every JD word the old per-request fit could
+report can therefore still reach the topics and keywords.
+
+Compound tool names ("Google Analytics 4" -> "Google_Analytics_4") are
+preserved with one compiled alternation, longest name first. Company names
+found in the JD (suffixes, "| Company", "at Company") are left out of the
+keywords, as before.
+
+The fitted model is persisted with model_store (key: archetype and skill
+tables, parameters, stop words, sklearn version) and prebuilt by
+`python model_store.py build`.
+
+Public API:
+- COMPOUND_TERMS, TOPIC_MODEL_TABLES
+- preserve_compound_terms(text)  -> text with compound names joined by "_"
+- company_words(text)            -> lowercase company names found in a JD
+- stop_words()                   -> EN + HR + IT/ES/FR/DE stop words
+- reference_corpus()             -> documents the model is fitted on
+- TopicModel(corpus)             -> .document_topics(docs, n_topics, n_words, exclude)
+- get_topic_model()              -> TopicModel for the current KB version (None without sklearn)
+================================================================================
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+import knowledge_base
+import model_store
+from kb_version import fingerprint, knowledge_base_version
+
+
+TOPIC_MODEL_ARTIFACT = "topic_model"
+TOPIC_MODEL_TABLES = ("JOB_ARCHETYPES_EXTENDED", "JOB_ARCHETYPES", "HARD_SKILLS", "SOFT_SKILLS")
+
+# Topics of the pretrained model; a request reports the n_topics strongest
+TOPIC_MODEL_TOPICS = 12
+
+VECTORIZER_PARAMS = dict(
+    max_df=0.90,              # Ignora termini in >90% dei doc
+    min_df=1,                 # Almeno 1 occorrenza
+    ngram_range=(1, 1),       # Unigrams only (cleaner topics)
+)
+LDA_PARAMS = dict(
+    n_components=TOPIC_MODEL_TOPICS,
+    max_iter=50,              # Iterazioni per convergenza
+    learning_method='batch',  # Più accurato per dataset piccoli
+    learning_decay=0.7,       # Decay rate per learning
+    random_state=42,          # Riproducibilità
+)
+
+
+# =============================================================================
+# COMPOUND TOOL NAMES
+# =============================================================================
+# LDA splits "Google Analytics" into "google" + "analytics"
+# We preserve compound names by replacing spaces with underscores
+COMPOUND_TERMS = {
+    # Analytics & BI
+    "Google Analytics": "Google_Analytics",
+    "Google Analytics 4": "Google_Analytics_4",
+    "Google Tag Manager": "Google_Tag_Manager",
+    "Looker Studio": "Looker_Studio",
+    "Power BI": "Power_BI",
+    "Tableau Desktop": "Tableau_Desktop",
+    "Data Studio": "Data_Studio",
+    # Cloud Platforms
+    "Google Cloud": "Google_Cloud",
+    "Google Cloud Platform": "Google_Cloud_Platform",
+    "Amazon Web Services": "Amazon_Web_Services",
+    "Microsoft Azure": "Microsoft_Azure",
+    # Programming & Data
+    "Machine Learning": "Machine_Learning",
+    "Deep Learning": "Deep_Learning",
+    "Natural Language Processing": "NLP",
+    "Data Visualization": "Data_Visualization",
+    "Data Analysis": "Data_Analysis",
+    "Data Science": "Data_Science",
+    "Big Data": "Big_Data",
+    "A/B Testing": "AB_Testing",
+    "Statistical Analysis": "Statistical_Analysis",
+    # Marketing
+    "Social Media": "Social_Media",
+    "Digital Marketing": "Digital_Marketing",
+    "Content Marketing": "Content_Marketing",
+    "Email Marketing": "Email_Marketing",
+    "SEO/SEM": "SEO_SEM",
+}
+
+# One alternation, longest first ("Google Analytics 4" before "Google Analytics")
+_COMPOUND_REGEX = re.compile(
+    "|".join(re.escape(term) for term in sorted(COMPOUND_TERMS, key=len, reverse=True)),
+    re.IGNORECASE,
+)
+_COMPOUND_LOOKUP = {term.lower(): replacement for term, replacement in COMPOUND_TERMS.items()}
+
+
+def preserve_compound_terms(text: str) -> str:
+    """Replace every compound tool name (any case) with its underscore form."""
+    return _COMPOUND_REGEX.sub(lambda m: _COMPOUND_LOOKUP[m.group(0).lower()], text)
+
+
+# =============================================================================
+# STOP WORDS
+# =============================================================================
+HR_STOP_WORDS = [
+    # Structural / Sections
+    'requirements', 'qualifications', 'responsibilities', 'duties', 'summary', 
+    'overview', 'description', 'profile', 'benefits', 'education', 'experience', 
+    'skills', 'background', 'about', 'us', 'team', 'company', 'role', 'job', 
+    'position', 'candidate', 'opportunity', 'location', 'category', 'status',
+    'salary', 'compensation', 'employment', 'type', 'industry', 'department',
+
+    # Common Adjectives / Qualifiers
+    'strong', 'excellent', 'good', 'great', 'proven', 'demonstrated', 'successful',
+    'ideal', 'passionate', 'motivated', 'proactive', 'hands-on', 'detail-oriented',
+    'dynamic', 'collaborative', 'fast-paced', 'global', 'international', 'leading',
+    'preferred', 'plus', 'advantage', 'bonus', 'desirable', 'essential', 'key',
+    'core', 'primary', 'required', 'proficient', 'proficiency', 'fluent',
+    'knowledge', 'understanding', 'familiarity', 'ability', 'capability', 
+
+    # Common Verbs / Actions
+    'work', 'working', 'join', 'apply', 'seeking', 'looking', 'ensure', 'provide',
+    'assist', 'support', 'help', 'manage', 'lead', 'coordinate', 'communicate',
+    'collaborate', 'participate', 'contribute', 'develop', 'create', 'maintain',
+    'deliver', 'drive', 'execute', 'perform', 'build', 'using', 'based',
+
+    # Time / Measure / Misc
+    'years', 'year', 'level', 'senior', 'junior', 'mid', 'associate',
+    'full-time', 'part-time', 'contract', 'permanent', 'temporary', 'remote', 'hybrid',
+    'degree', 'bachelor', 'master', 'phd', 'equivalent', 'related', 'relevant',
+    'including', 'include', 'includes', 'various', 'similar', 'etc', 'suite',
+    'must', 'will', 'can', 'may', 'should', 'would', 'tools', 'environment',
+    
+    # Company/Organization Names (should not be keywords)
+    'corp', 'corporation', 'inc', 'ltd', 'llc', 'gmbh', 'spa', 'srl',
+    'datadriven', 'techstart', 'startup', 'agency', 'group', 'italia',
+    
+    # Generic Qualifiers (noise)
+    'expert', 'expertise', 'skilled', 'specialist', 'professional',
+    'advanced', 'basic', 'intermediate', 'beginner', 'native', 'fluency',
+    'platform', 'platforms', 'solution', 'solutions', 'service', 'services',
+    'system', 'systems', 'technology', 'technologies', 'technique', 'techniques',
+    'method', 'methods', 'approach', 'approaches', 'strategy', 'strategies',
+    
+    # Action Verbs (Noise for Topic Modeling)
+    'programming', 'coding', 'developing', 'match', 'matching', 'gap', 'missing', 
+    'learn', 'learning', 'use', 'using', 'scikit', 'pandas', 'numpy', 'matplotlib', 'seaborn'
+]
+
+IT_STOP_WORDS = [
+    'di', 'a', 'da', 'in', 'con', 'su', 'per', 'tra', 'fra',
+    'il', 'lo', 'la', 'i', 'gli', 'le', 'un', 'uno', 'una',
+    'e', 'ed', 'o', 'ma', 'se', 'che', 'non', 'si', 'chi',
+    'mi', 'ti', 'ci', 'vi', 'li', 'ne', 'lei', 'lui', 'noi', 'voi', 'loro',
+    'mio', 'tuo', 'suo', 'nostro', 'vostro', 'loro',
+    'mia', 'tua', 'sua', 'nostra', 'vostra',
+    'questo', 'quello', 'quella', 'questi', 'quelle',
+    'cui', 'c', 'è', 'sono', 'siete', 'siamo', 'hanno', 'ha', 'ho', 'hai', 'hanno',
+    'avuto', 'fatto', 'fare', 'essere', 'avere', 'stato', 'stata', 'stati', 'state',
+    'presso', 'durante', 'tramite', 'verso', 'contro', 'sulla', 'dello', 'degli', 'della', 'dei', 'dal', 'dalla',
+    'ai', 'agli', 'alla', 'alle', 'negli', 'nelle', 'nella', 'del', 'al', 
+    'come', 'dove', 'quando', 'perché', 'anche', 'più', 'meno',
+    'tutto', 'tutti', 'tutta', 'tut te', 'ogni', 'altro', 'altra', 'altri', 'altre',
+    'molto', 'poco', 'abbastanza', 'proprio', 'già', 'ancora', 
+    'ecc', 'eccetera', 'via', 'poi', 'solo', 'soltanto',
+    'dell', 'all', 'sull', 'dall', 'nell', 'quest', 'quant', 'tant'
+]
+
+ES_STOP_WORDS = [
+    'de', 'la', 'que', 'el', 'en', 'y', 'a', 'los', 'del', 'se', 'las', 'por', 'un', 'para', 'con', 'no',
+    'una', 'su', 'al', 'es', 'lo', 'como', 'más', 'pero', 'sus', 'le', 'ya', 'o', 'fue', 'este', 'ha',
+    'si', 'porque', 'esta', 'son', 'entre', 'está', 'cuando', 'muy', 'sin', 'sobre', 'ser', 'tiene',
+    'también', 'me', 'hasta', 'hay', 'donde', 'han', 'quien', 'están', 'estado', 'desde', 'todos',
+    'durante', 'años', 'año', 'empresa', 'trabajo', 'experiencia', 'puesto', 'conocimientos'
+]
+
+FR_STOP_WORDS = [
+    'le', 'la', 'les', 'de', 'du', 'des', 'un', 'une', 'et', 'en', 'à', 'au', 'aux', 'ce', 'cette',
+    'ces', 'que', 'qui', 'quoi', 'dont', 'où', 'pour', 'par', 'sur', 'avec', 'sans', 'sous', 'dans',
+    'entre', 'vers', 'chez', 'il', 'elle', 'on', 'nous', 'vous', 'ils', 'elles', 'leur', 'leurs',
+    'mon', 'ma', 'mes', 'ton', 'ta', 'tes', 'son', 'sa', 'ses', 'notre', 'nos', 'votre', 'vos',
+    'est', 'sont', 'été', 'être', 'avoir', 'fait', 'faire', 'dit', 'dire', 'peut', 'pouvoir',
+    'plus', 'moins', 'très', 'bien', 'aussi', 'même', 'tout', 'tous', 'toute', 'toutes',
+    'entreprise', 'poste', 'expérience', 'années', 'année', 'travail', 'compétences'
+]
+
+DE_STOP_WORDS = [
+    'der', 'die', 'das', 'den', 'dem', 'des', 'ein', 'eine', 'einer', 'einem', 'einen', 'eines',
+    'und', 'in', 'zu', 'von', 'mit', 'ist', 'nicht', 'für', 'auf', 'sich', 'als', 'auch', 'an',
+    'es', 'bei', 'nach', 'aus', 'wenn', 'oder', 'aber', 'wie', 'noch', 'nur', 'durch', 'über',
+    'so', 'um', 'am', 'im', 'zum', 'zur', 'bis', 'seit', 'wir', 'sie', 'ihr', 'er', 'ich',
+    'werden', 'wurde', 'worden', 'wird', 'haben', 'hat', 'hatte', 'sein', 'seine', 'seiner',
+    'können', 'kann', 'sollen', 'soll', 'müssen', 'muss', 'dürfen', 'darf',
+    'jahre', 'jahr', 'unternehmen', 'erfahrung', 'stelle', 'position', 'kenntnisse'
+]
+
+
+def stop_words() -> FrozenSet[str]:
+    """sklearn ENGLISH_STOP_WORDS plus the HR and IT/ES/FR/DE lists."""
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return frozenset(ENGLISH_STOP_WORDS).union(HR_STOP_WORDS, IT_STOP_WORDS, ES_STOP_WORDS,
+                                               FR_STOP_WORDS, DE_STOP_WORDS)
+
+
+# =============================================================================
+# DYNAMIC COMPANY NAMES
+# =============================================================================
+# Words before corporate suffixes (Corp, Inc, Ltd, etc.)
+_CORP_REGEX = re.compile(r'(\b[A-Z][a-zA-Z]+)\s+(?:Corp|Inc|Ltd|LLC|GmbH|S\.?p\.?A\.?|S\.?r\.?l\.?)\b', re.IGNORECASE)
+# Company names after pipe separator (Job Title | Company)
+_PIPE_REGEX = re.compile(r'\|\s*([A-Z][A-Za-z]+)')
+# Words right after "at" or "presso" (employment context)
+_AT_REGEX = re.compile(r'(?:at|presso)\s+([A-Z][A-Za-z]+)\b', re.IGNORECASE)
+
+
+def company_words(text: str) -> Set[str]:
+    """Lowercase company names detected in a JD (longer than 2 characters)."""
+    words = set()
+    for regex in (_CORP_REGEX, _PIPE_REGEX):
+        for match in regex.finditer(text):
+            if len(match.group(1)) > 2:
+                words.add(match.group(1).lower())
+    for match in _AT_REGEX.finditer(text):
+        word = match.group(1).lower()
+        if len(word) > 2 and word not in {'the', 'our', 'their'}:
+            words.add(word)
+    return words
+
+
+# =============================================================================
+# REFERENCE CORPUS AND MODEL
+# =============================================================================
+def reference_corpus() -> List[str]:
+    """One JD-like document per JOB_ARCHETYPES_EXTENDED role (compound names preserved)."""
+    variations: Dict[str, List[str]] = {}
+    for table in ("HARD_SKILLS", "SOFT_SKILLS"):
+        for name, names in getattr(knowledge_base, table, {}).items():
+            variations[name.lower()] = list(names)
+    job_archetypes = getattr(knowledge_base, "JOB_ARCHETYPES", {})
+
+    docs = []
+    for title, data in getattr(knowledge_base, "JOB_ARCHETYPES_EXTENDED", {}).items():
+        skills = list(data.get("primary_skills", [])) + list(data.get("soft_skills", []))
+        skills += sorted(set(job_archetypes.get(title, ())) - set(skills))
+        parts = [title, data.get("sector", "")]
+        for skill in skills:
+            parts.append(skill)
+            parts.extend(variations.get(skill.lower(), ()))
+        docs.append(preserve_compound_terms(". ".join(parts)))
+    return docs
+
+
+class TopicModel:
+    """CountVectorizer + LDA fitted once on a reference corpus."""
+
+    def __init__(self, corpus: List[str]):
+        # Imported on first build (ImportError without scikit-learn)
+        from sklearn.decomposition import LatentDirichletAllocation
+        from sklearn.feature_extraction.text import CountVectorizer
+
+        if len(corpus) < 2:
+            raise ValueError(f"TopicModel needs at least 2 reference documents, got {len(corpus)}")
+        self.vectorizer = CountVectorizer(stop_words=sorted(stop_words()), **VECTORIZER_PARAMS)
+        counts = self.vectorizer.fit_transform(corpus)
+        self.lda = LatentDirichletAllocation(**LDA_PARAMS)
+        self.lda.fit(counts)
+
+        # Display form of each term (compound names back to spaces)
+        self.terms: List[str] = [t.replace('_', ' ') for t in self.vectorizer.get_feature_names_out()]
+        # phi[k, w] = p(w | topic k)
+        self.phi: np.ndarray = self.lda.components_ / self.lda.components_.sum(axis=1, keepdims=True)
+
+    def __len__(self) -> int:
+        return self.phi.shape[0]
+
+    def document_topics(self, docs: Iterable[str], n_topics: int = 3, n_words: int = 5,
+                        exclude: Iterable[str] = ()) -> Tuple[List[List[str]], List[str]]:
+        """
+        Topics of one document given as lines (compound names already preserved).
+
+        Returns (topics, keywords): the top n_words words of the n_topics
+        strongest topics, and the document's 10 best words per topic in
+        topic order (for the summary). Words in exclude are skipped; words
+        outside the reference vocabulary are placed by their lines.
+        """
+        from scipy import sparse
+
+        lines = list(docs)
+        exclude = set(exclude)
+        vocabulary = self.vectorizer.vocabulary_
+        keep = np.ones(len(self.terms))
+        for word in exclude:
+            col = vocabulary.get(word)
+            if col is not None:
+                keep[col] = 0.0
+        line_counts = self.vectorizer.transform(lines).multiply(keep[None, :]).tocsr()
+        counts = np.asarray(line_counts.sum(axis=0), dtype=np.float64).ravel()
+
+        # JD words the reference corpus does not know, counted per line
+        # (same tokens, stop words and lowercasing as the vectorizer)
+        analyzer = self.vectorizer.build_analyzer()
+        extra: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, line in enumerate(lines):
+            for word in analyzer(line):
+                if word not in vocabulary and word not in exclude:
+                    rows.append(row)
+                    cols.append(extra.setdefault(word, len(extra)))
+        if not counts.any() and not extra:
+            return [], []
+
+        theta = self.lda.transform(counts[None, :])[0]
+        strongest = np.argsort(-theta, kind="stable")[:n_topics]
+
+        # Each word goes to the topic that explains most of it in this document
+        responsibility = theta[:, None] * self.phi
+        terms = self.terms
+        if extra:
+            line_extra = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(lines), len(extra)))
+            line_theta = self.lda.transform(line_counts)
+            line_theta[line_counts.getnnz(axis=1) == 0] = theta
+            responsibility = np.hstack([responsibility, (line_extra.T @ line_theta).T])
+            counts = np.concatenate([counts, np.asarray(line_extra.sum(axis=0), dtype=np.float64).ravel()])
+            terms = terms + [word.replace('_', ' ') for word in extra]
+        # Only the reported topics compete, so no JD word is left unassigned
+        responsibility = responsibility[strongest]
+        owner = responsibility.argmax(axis=0)
+        responsibility /= np.maximum(responsibility.sum(axis=0, keepdims=True), np.finfo(float).tiny)
+
+        topics, keywords = [], []
+        for k in range(len(strongest)):
+            score = np.where((owner == k) & (counts > 0), counts * responsibility[k], 0.0)
+            ranked = [int(i) for i in np.argsort(-score, kind="stable") if score[i] > 0]
+            if not ranked:
+                continue
+            topics.append([terms[i] for i in ranked[:n_words]])
+            keywords.extend(terms[i] for i in ranked[:10])
+        return topics, keywords
+
+
+# =============================================================================
+# CACHED MODEL (one per knowledge-base version, persisted by model_store)
+# =============================================================================
+_MODELS: Dict[str, TopicModel] = {}
+
+
+def topic_model_key() -> str:
+    """Artifact key: reference tables + parameters + stop words + sklearn version."""
+    return model_store.artifact_key(TOPIC_MODEL_TABLES, {
+        "vectorizer": VECTORIZER_PARAMS, "lda": LDA_PARAMS,
+        "compound_terms": COMPOUND_TERMS, "stop_words": fingerprint(sorted(stop_words())),
+    })
+
+
+def build_topic_model() -> TopicModel:
+    """Fit the topic model on the reference corpus (no persistence)."""
+    return TopicModel(reference_corpus())
+
+
+def get_topic_model() -> Optional[TopicModel]:
+    """TopicModel for the current reference tables, loaded from disk or fitted once."""
+    version = knowledge_base_version(*TOPIC_MODEL_TABLES)
+    model = _MODELS.get(version)
+    if model is None:
+        try:
+            model = model_store.load_or_build(TOPIC_MODEL_ARTIFACT, topic_model_key(), build_topic_model)
+        except (ImportError, ValueError):
+            return None
+        _MODELS.clear()
+        _MODELS[version] = model
+    return model